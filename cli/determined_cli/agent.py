@@ -17,6 +17,7 @@ def local_id(address: str) -> str:
     return os.path.basename(address)
 
 
+@api.cache_responses
 @authentication_required
 def list_agents(args: argparse.Namespace) -> None:
     r = api.get(args.master, "agents")
@@ -46,6 +47,7 @@ def list_agents(args: argparse.Namespace) -> None:
     render.tabulate_or_csv(headers, values, args.csv)
 
 
+@api.cache_responses
 @authentication_required
 def list_slots(args: argparse.Namespace) -> None:
     task_res = api.get(args.master, "tasks")
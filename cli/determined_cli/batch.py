@@ -0,0 +1,98 @@
+from argparse import Namespace
+from typing import Any, Callable, Iterable, List, Optional, TypeVar, cast
+
+from termcolor import colored
+
+from determined_common import api
+from determined_common.batch import DEFAULT_PARALLELISM, BatchError, BatchExecutor
+
+from .declarative_argparse import Arg
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Arguments of commands that make a request for each of many IDs.
+batch_args = [
+    Arg(
+        "--parallelism",
+        type=int,
+        default=DEFAULT_PARALLELISM,
+        help="number of requests to make at the same time",
+    ),
+    Arg(
+        "--rate-limit",
+        type=float,
+        default=None,
+        help="maximum number of requests to start per second",
+    ),
+]
+
+# Arguments of commands that kill many tasks; see kill_tasks.
+kill_args = [
+    Arg(
+        "-f",
+        "--force",
+        action="store_true",
+        help="ignore errors; otherwise, up to --parallelism kill requests are sent at once, and "
+        "the tasks whose requests were not sent yet are left alone once one request fails",
+    ),
+    *batch_args,
+]
+
+
+def make_executor(args: Namespace, stop_on_error: bool = False) -> BatchExecutor:
+    return BatchExecutor(args.parallelism, args.rate_limit, stop_on_error=stop_on_error)
+
+
+def run(
+    args: Namespace,
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    on_result: Optional[Callable[[T, R], None]] = None,
+) -> List[R]:
+    """
+    Call fn on every item concurrently and return the values in the order of the items. If set,
+    on_result is called with every item that succeeded and its value, in order, as soon as it is
+    available. If only one item failed, its error is raised once every item is done; otherwise, a
+    BatchError with every failure is.
+    """
+    values = []  # type: List[R]
+    failures = []
+    for result in make_executor(args).map(fn, items):
+        if result.ok:
+            value = cast(R, result.value)
+            if on_result is not None:
+                on_result(result.item, value)
+            values.append(value)
+        else:
+            failures.append(result)
+    if len(failures) == 1 and failures[0].error is not None:
+        raise failures[0].error
+    if failures:
+        raise BatchError(failures)
+    return values
+
+
+def kill_tasks(args: Namespace, ids: List[str], url: Callable[[Any], str], noun: str) -> None:
+    """
+    Kill the tasks with the given IDs concurrently. Unless --force is set, the tasks that were not
+    killed yet when one fails to be killed are left alone.
+    """
+    error = None
+    for result in make_executor(args, stop_on_error=not args.force).map(
+        lambda task_id: api.delete(args.master, url(task_id)), ids
+    ):
+        if result.ok:
+            print(colored("Killed {} {}".format(noun, result.item), "green"))
+        elif result.skipped:
+            print("Cowardly not killing {}".format(result.item))
+        elif args.force and isinstance(result.error, api.errors.APIException):
+            print(
+                colored(
+                    "Skipping: {} ({})".format(result.error, type(result.error).__name__), "red"
+                )
+            )
+        else:
+            error = error or result.error
+    if error is not None:
+        raise error
@@ -1,12 +1,13 @@
 import json
-from argparse import Namespace
-from typing import Any, Dict, List, Optional
+import os
+from argparse import ONE_OR_MORE, Namespace
+from typing import Any, Dict, List, Optional, Tuple
 
 from determined_common import api, constants, experimental
 from determined_common.api.authentication import authentication_required
 from determined_common.experimental import Determined
 
-from . import render
+from . import batch, render
 from .declarative_argparse import Arg, Cmd
 
 
@@ -59,6 +60,7 @@ def render_checkpoint(checkpoint: experimental.Checkpoint, path: Optional[str] =
     render.tabulate_or_csv(headers, [values], False)
 
 
+@api.cache_responses
 @authentication_required
 def list(args: Namespace) -> None:
     params = {}
@@ -98,16 +100,26 @@ def list(args: Namespace) -> None:
 
 
 def download(args: Namespace) -> None:
-    checkpoint = Determined(args.master, None).get_checkpoint(args.uuid)
+    d = Determined(args.master, None)
 
-    path = checkpoint.download(path=args.output_dir)
+    def _download(uuid: str) -> Tuple[experimental.Checkpoint, str]:
+        checkpoint = d.get_checkpoint(uuid)
+        # Several checkpoints are each downloaded to a subdirectory of the output directory.
+        if args.output_dir is not None and len(args.uuid) > 1:
+            return checkpoint, checkpoint.download(path=os.path.join(args.output_dir, uuid))
+        return checkpoint, checkpoint.download(path=args.output_dir)
 
-    if args.quiet:
-        print(path)
-    else:
-        render_checkpoint(checkpoint, path)
+    def _render(uuid: str, result: Tuple[experimental.Checkpoint, str]) -> None:
+        checkpoint, path = result
+        if args.quiet:
+            print(path)
+        else:
+            render_checkpoint(checkpoint, path)
+
+    batch.run(args, _download, args.uuid, on_result=_render)
 
 
+@api.cache_responses
 def describe(args: Namespace) -> None:
     checkpoint = Determined(args.master, None).get_checkpoint(args.uuid)
     render_checkpoint(checkpoint)
@@ -123,12 +135,18 @@ args_description = Cmd(
             download,
             "download checkpoint from persistent storage",
             [
-                Arg("uuid", type=str, help="Download a checkpoint by specifying its UUID."),
+                Arg(
+                    "uuid",
+                    type=str,
+                    nargs=ONE_OR_MORE,
+                    help="Download checkpoints by specifying their UUIDs.",
+                ),
                 Arg(
                     "-o",
                     "--output-dir",
                     type=str,
-                    help="Desired output directory for the checkpoint.",
+                    help="Desired output directory for the checkpoint. When several checkpoints "
+                    "are downloaded, each one is placed in a subdirectory named after its UUID.",
                 ),
                 Arg(
                     "-q",
@@ -136,6 +154,7 @@ args_description = Cmd(
                     action="store_true",
                     help="Only print the path to the checkpoint.",
                 ),
+                *batch.batch_args,
             ],
         ),
         Cmd(
@@ -36,6 +36,7 @@ from determined_common.check import check_not_none
 from determined_common.util import chunks, debug_mode, get_default_master_address
 
 
+@api.cache_responses
 @authentication_required
 def list_tasks(args: Namespace) -> None:
     r = api.get(args.master, "tasks")
@@ -78,48 +79,40 @@ def list_tasks(args: Namespace) -> None:
     render.tabulate_or_csv(headers, values, args.csv)
 
 
-@authentication_required
-def preview_search(args: Namespace) -> None:
-    experiment_config = yaml.safe_load(args.config_file.read())
-    args.config_file.close()
-
-    if "searcher" not in experiment_config:
-        print("Experiment configuration must have 'searcher' section")
-        sys.exit(1)
-    r = api.post(args.master, "searcher/preview", body=experiment_config)
-    j = r.json()
-
-    def to_full_name(kind: str) -> str:
-        if kind[-1] == "R":
-            return "train {} records".format(kind[:-1])
-        if kind[-1] == "B":
-            return "train {} batch(es)".format(kind[:-1])
-        if kind[-1] == "E":
-            return "train {} epoch(s)".format(kind[:-1])
-        elif kind == "V":
-            return "validation"
+def _to_full_name(kind: str) -> str:
+    if kind[-1] == "R":
+        return "train {} records".format(kind[:-1])
+    if kind[-1] == "B":
+        return "train {} batch(es)".format(kind[:-1])
+    if kind[-1] == "E":
+        return "train {} epoch(s)".format(kind[:-1])
+    elif kind == "V":
+        return "validation"
+    else:
+        raise ValueError("unexpected kind: {}".format(kind))
+
+
+def _render_sequence(sequence: List[str]) -> str:
+    if not sequence:
+        return "N/A"
+    instructions = []
+    current = sequence[0]
+    count = 0
+    for k in sequence:
+        if k != current:
+            instructions.append("{} x {}".format(count, _to_full_name(current)))
+            current = k
+            count = 1
         else:
-            raise ValueError("unexpected kind: {}".format(kind))
-
-    def render_sequence(sequence: List[str]) -> str:
-        if not sequence:
-            return "N/A"
-        instructions = []
-        current = sequence[0]
-        count = 0
-        for k in sequence:
-            if k != current:
-                instructions.append("{} x {}".format(count, to_full_name(current)))
-                current = k
-                count = 1
-            else:
-                count += 1
-        instructions.append("{} x {}".format(count, to_full_name(current)))
-        return ", ".join(instructions)
+            count += 1
+    instructions.append("{} x {}".format(count, _to_full_name(current)))
+    return ", ".join(instructions)
 
+
+def _print_search_preview(experiment_config: Dict[str, Any], results: Dict[str, int]) -> None:
     headers = ["Trials", "Breakdown"]
     values = [
-        (count, render_sequence(operations.split())) for operations, count in j["results"].items()
+        (count, _render_sequence(operations.split())) for operations, count in results.items()
     ]
 
     print(colored("Using search configuration:", "green"))
@@ -127,10 +120,62 @@ def preview_search(args: Namespace) -> None:
     yml.indent(mapping=2, sequence=4, offset=2)
     yml.dump(experiment_config["searcher"], sys.stdout)
     print()
-    print("This search will create a total of {} trial(s).".format(sum(j["results"].values())))
+    print("This search will create a total of {} trial(s).".format(sum(results.values())))
     print(tabulate.tabulate(values, headers, tablefmt="presto"), flush=False)
 
 
+def _preview_search_locally(args: Namespace, experiment_config: Dict[str, Any]) -> None:
+    # Importing the simulator imports the expconf schema objects, which is slow enough that it
+    # should only happen when they are used.
+    from determined_cli import search_simulator
+
+    curve = search_simulator.CURVES[args.curve](args.seed)
+    result = search_simulator.simulate(
+        experiment_config,
+        curve=curve,
+        seconds_per_unit=args.seconds_per_unit,
+        max_slots=args.max_slots,
+    )
+    _print_search_preview(experiment_config, result.breakdown())
+
+    unit = {"B": "batches", "R": "records", "E": "epochs"}[result.unit]
+    summary = result.summary()
+    per_trial = summary.pop("units_per_trial")
+    values = [
+        (name.replace("_", " ").replace("units", unit), value) for name, value in summary.items()
+    ]
+    values += [("{} per trial ({})".format(unit, stat), value) for stat, value in per_trial.items()]
+
+    print()
+    print(colored("Simulated with the {} learning curve:".format(args.curve), "green"))
+    print(
+        tabulate.tabulate(
+            [(name, "{:.2f}".format(v) if isinstance(v, float) else v) for name, v in values],
+            tablefmt="presto",
+            disable_numparse=True,
+        ),
+        flush=False,
+    )
+
+
+def preview_search(args: Namespace) -> None:
+    experiment_config = yaml.safe_load(args.config_file.read())
+    args.config_file.close()
+
+    if "searcher" not in experiment_config:
+        print("Experiment configuration must have 'searcher' section")
+        sys.exit(1)
+
+    if args.local:
+        _preview_search_locally(args, experiment_config)
+        return
+
+    # Only previews on the master need authentication; see authentication_required.
+    auth.initialize_session(args.master, args.user, try_reauth=True)
+    r = api.post(args.master, "searcher/preview", body=experiment_config)
+    _print_search_preview(experiment_config, r.json()["results"])
+
+
 # fmt: off
 
 args_description = [
@@ -140,6 +185,8 @@ args_description = [
     Arg("-m", "--master",
         help="master address", metavar="address",
         default=get_default_master_address()),
+    Arg("--no-cache", action="store_true",
+        help="always fetch responses from the master, even for list and describe commands"),
     Arg("-v", "--version",
         action="version", help="print CLI version and exit",
         version="%(prog)s {}".format(determined_cli.__version__)),
@@ -156,7 +203,19 @@ args_description = [
 
     Cmd("preview-search", preview_search, "preview search", [
         Arg("config_file", type=FileType("r"),
-            help="experiment config file (.yaml)")
+            help="experiment config file (.yaml)"),
+        Arg("--local", action="store_true",
+            help="simulate the search locally instead of on the master, and estimate the "
+            "slot-hours and concurrency it needs"),
+        Arg("--curve", choices=["constant", "random", "power-law"], default="constant",
+            help="synthetic learning curve for --local to generate validation metrics with"),
+        Arg("--seed", type=int, default=0,
+            help="random seed for the --local learning curve"),
+        Arg("--seconds-per-unit", type=float, default=1.0,
+            help="seconds to train one batch, record or epoch with --local"),
+        Arg("--max-slots", type=int, default=None,
+            help="slots available to the --local search (default: resources.max_slots, "
+            "or unlimited)"),
     ]),
 ]  # type: List[object]
 
@@ -226,6 +285,10 @@ def main(args: List[str] = sys.argv[1:]) -> None:
             parser.print_usage()
             parser.exit(2, "{}: no subcommand specified\n".format(parser.prog))
 
+        # Only read-only commands reuse recent responses; see api.cache_responses.
+        if getattr(parsed_args.func, "cache_responses", False) and not parsed_args.no_cache:
+            api.request.enable_response_cache()
+
         cert_fn = str(auth.get_config_path().joinpath("master.crt"))
         if os.path.exists(cert_fn):
             api.request.set_master_cert_bundle(cert_fn)
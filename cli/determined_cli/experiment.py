@@ -9,12 +9,12 @@ import time
 from argparse import FileType, Namespace
 from pathlib import Path
 from pprint import pformat
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple, cast
 
 import tabulate
 
 import determined_common
-from determined_cli import checkpoint, render
+from determined_cli import batch, checkpoint, render
 from determined_cli.declarative_argparse import Arg, Cmd, Group
 from determined_common import api, constants, context, yaml
 from determined_common.api.authentication import authentication_required
@@ -154,6 +154,10 @@ def submit_experiment(args: Namespace) -> None:
         )
 
 
+# The options of benchmark_trial() that have a --benchmark-* flag with a default in the harness.
+_BENCHMARK_OPTIONS = ["warmup_steps", "steps", "validations", "checkpoints"]
+
+
 def local_experiment(args: Namespace) -> None:
     try:
         import determined as det
@@ -162,11 +166,12 @@ def local_experiment(args: Namespace) -> None:
         print("--local requires that the `determined` package is installed.")
         raise e
 
-    if not args.test_mode:
+    if not args.test_mode and not args.benchmark:
         raise NotImplementedError(
-            "Local training mode (--local mode without --test mode) is not yet supported. Please "
-            "try local test mode by adding the --test flag or cluster training mode by removing "
-            "the --local flag."
+            "Local training mode (--local mode without --test or --benchmark mode) is not yet "
+            "supported. Please try local test mode by adding the --test flag, local benchmark "
+            "mode by adding the --benchmark flag, or cluster training mode by removing the "
+            "--local flag."
         )
 
     experiment_config = _parse_config_file_or_exit(args.config_file)
@@ -175,10 +180,39 @@ def local_experiment(args: Namespace) -> None:
 
     with det._local_execution_manager(args.model_def.resolve()):
         trial_class = load.load_trial_implementation(experiment_config["entrypoint"])
-        experimental.test_one_batch(trial_class=trial_class, config=experiment_config)
+        if args.benchmark:
+            # Flags that are not given keep the defaults of benchmark_trial().
+            options = {
+                option: getattr(args, "benchmark_" + option)
+                for option in _BENCHMARK_OPTIONS
+                if getattr(args, "benchmark_" + option) is not None
+            }
+            report = experimental.benchmark_trial(
+                trial_class=trial_class,
+                config=experiment_config,
+                output_path=args.benchmark_output,
+                **options
+            )
+            print(json.dumps(report, indent=2))
+        else:
+            experimental.test_one_batch(trial_class=trial_class, config=experiment_config)
 
 
 def create(args: Namespace) -> None:
+    benchmark_flags = [
+        "--benchmark-" + option.replace("_", "-")
+        for option in _BENCHMARK_OPTIONS + ["output"]
+        if getattr(args, "benchmark_" + option) is not None
+    ]
+    if benchmark_flags and not (args.local and args.benchmark):
+        print(
+            "Error: {} can only be used with --local --benchmark".format(", ".join(benchmark_flags))
+        )
+        sys.exit(2)
+    if args.benchmark and not args.local:
+        print("Error: --benchmark can only be used with --local")
+        sys.exit(2)
+
     if args.local:
         local_experiment(args)
     else:
@@ -200,20 +234,51 @@ def delete_experiment(args: Namespace) -> None:
         print("Aborting experiment deletion.")
 
 
+@api.cache_responses
 @authentication_required
 def describe(args: Namespace) -> None:
-    docs = []
-    for experiment_id in args.experiment_ids.split(","):
-        if args.metrics:
-            r = api.get(args.master, "experiments/{}/metrics/summary".format(experiment_id))
-        else:
-            r = api.get(args.master, "experiments/{}".format(experiment_id))
-        docs.append(r.json())
+    experiment_ids = args.experiment_ids.split(",")
 
     if args.json:
+
+        def _get(experiment_id: str) -> Any:
+            if args.metrics:
+                r = api.get(args.master, "experiments/{}/metrics/summary".format(experiment_id))
+            else:
+                r = api.get(args.master, "experiments/{}".format(experiment_id))
+            return r.json()
+
+        docs = batch.run(args, _get, experiment_ids)
         print(json.dumps(docs, indent=4))
         return
 
+    # The summaries of experiments list their trials without any workloads, so they stay small
+    # however long the trials ran. The workloads are fetched and written out one trial at a time
+    # below.
+    docs = batch.run(
+        args,
+        lambda experiment_id: api.get(
+            args.master, "experiments/{}/summary".format(experiment_id)
+        ).json(),
+        experiment_ids,
+    )
+
+    if args.jsonl:
+        fmt = "jsonl"
+    elif args.tsv:
+        fmt = "tsv"
+    elif args.csv or args.outdir:
+        fmt = "csv"
+    else:
+        fmt = "table"
+
+    def _outfile(filename: str, title: str) -> Optional[Path]:
+        if args.outdir:
+            return cast(Path, args.outdir.joinpath(filename))
+        if fmt != "jsonl":
+            print(title)
+        return None
+
     # Display overall experiment information.
     headers = [
         "Experiment ID",
@@ -226,7 +291,7 @@ def describe(args: Namespace) -> None:
         "Resource Pool",
         "Labels",
     ]
-    values = [
+    values = (
         [
             doc["id"],
             doc["state"],
@@ -239,17 +304,12 @@ def describe(args: Namespace) -> None:
             ", ".join(sorted(doc["config"].get("labels", []))),
         ]
         for doc in docs
-    ]
-    if not args.outdir:
-        outfile = None
-        print("Experiment:")
-    else:
-        outfile = args.outdir.joinpath("experiments.csv")
-    render.tabulate_or_csv(headers, values, args.csv, outfile)
+    )
+    render.stream_rows(headers, values, fmt, _outfile("experiments.csv", "Experiment:"))
 
     # Display trial-related information.
     headers = ["Trial ID", "Experiment ID", "State", "Start Time", "End Time", "H-Params"]
-    values = [
+    values = (
         [
             trial["id"],
             doc["id"],
@@ -260,29 +320,23 @@ def describe(args: Namespace) -> None:
         ]
         for doc in docs
         for trial in doc["trials"]
-    ]
-    if not args.outdir:
-        outfile = None
-        print("\nTrials:")
-    else:
-        outfile = args.outdir.joinpath("trials.csv")
-    render.tabulate_or_csv(headers, values, args.csv, outfile)
+    )
+    render.stream_rows(headers, values, fmt, _outfile("trials.csv", "\nTrials:"))
 
     # Display step-related information.
     if args.metrics:
         # Accumulate the scalar training and validation metric names from all provided experiments.
-        t_metrics_names = sorted({n for doc in docs for n in scalar_training_metrics_names(doc)})
-        t_metrics_headers = ["Training Metric: {}".format(name) for name in t_metrics_names]
-
+        t_metrics_names = sorted(
+            {n for names in batch.run(args, _training_metrics_names(args), docs) for n in names}
+        )
         v_metrics_names = sorted({n for doc in docs for n in scalar_validation_metrics_names(doc)})
-        v_metrics_headers = ["Validation Metric: {}".format(name) for name in v_metrics_names]
     else:
-        t_metrics_headers = []
-        v_metrics_headers = []
+        t_metrics_names = []
+        v_metrics_names = []
 
     headers = (
         ["Trial ID", "# of Batches", "State", "Start Time", "End Time"]
-        + t_metrics_headers
+        + ["Training Metric: {}".format(name) for name in t_metrics_names]
         + [
             "Checkpoint State",
             "Checkpoint Start Time",
@@ -291,77 +345,79 @@ def describe(args: Namespace) -> None:
             "Validation Start Time",
             "Validation End Time",
         ]
-        + v_metrics_headers
+        + ["Validation Metric: {}".format(name) for name in v_metrics_names]
     )
 
-    values = []
-    for doc in docs:
-        for trial in doc["trials"]:
+    # Only the training metrics of the trial details are averaged over each step.
+    path = "trials/{}/details" if args.metrics else "trials/{}"
+
+    def _get_trial(trial_id: int) -> Dict[str, Any]:
+        return cast(Dict[str, Any], api.get(args.master, path.format(trial_id)).json())
+
+    trials = batch.make_executor(args).map(
+        _get_trial, (trial["id"] for doc in docs for trial in doc["trials"])
+    )
+
+    def _workload_rows() -> Iterator[List[Any]]:
+        for result in trials:
+            if result.error is not None:
+                raise result.error
+            trial = cast(Dict[str, Any], result.value)
             for step in trial["steps"]:
-                t_metrics_fields = []
-                if step.get("metrics"):
-                    avg_metrics = step["metrics"]["avg_metrics"]
-                    for name in t_metrics_names:
-                        if name in avg_metrics:
-                            t_metrics_fields.append(avg_metrics[name])
-                        else:
-                            t_metrics_fields.append(None)
-
-                checkpoint = step.get("checkpoint")
-                if checkpoint:
-                    checkpoint_state = checkpoint["state"]
-                    checkpoint_start_time = checkpoint.get("start_time")
-                    checkpoint_end_time = checkpoint.get("end_time")
-                else:
-                    checkpoint_state = None
-                    checkpoint_start_time = None
-                    checkpoint_end_time = None
-
-                validation = step.get("validation")
-                if validation:
-                    validation_state = validation["state"]
-                    validation_start_time = validation.get("start_time")
-                    validation_end_time = validation.get("end_time")
-                else:
-                    validation_state = None
-                    validation_start_time = None
-                    validation_end_time = None
-
-                if args.metrics:
-                    v_metrics_fields = [
-                        api.metric.get_validation_metric(name, validation)
-                        for name in v_metrics_names
-                    ]
-                else:
-                    v_metrics_fields = []
-
-                row = (
-                    [
-                        step["trial_id"],
-                        step["num_batches"] + step["prior_batches_processed"],
-                        step["state"],
-                        render.format_time(step.get("start_time")),
-                        render.format_time(step.get("end_time")),
-                    ]
-                    + t_metrics_fields
-                    + [
-                        checkpoint_state,
-                        render.format_time(checkpoint_start_time),
-                        render.format_time(checkpoint_end_time),
-                        validation_state,
-                        render.format_time(validation_start_time),
-                        render.format_time(validation_end_time),
-                    ]
-                    + v_metrics_fields
-                )
-                values.append(row)
-
-    if not args.outdir:
-        outfile = None
-        print("\nWorkloads:")
+                yield _workload_row(result.item, step, t_metrics_names, v_metrics_names)
+
+    render.stream_rows(headers, _workload_rows(), fmt, _outfile("workloads.csv", "\nWorkloads:"))
+
+
+def _workload_row(
+    trial_id: int, step: Dict[str, Any], t_metrics_names: List[str], v_metrics_names: List[str]
+) -> List[Any]:
+    avg_metrics = step.get("avg_metrics") or {}
+    t_metrics_fields = [avg_metrics.get(name) for name in t_metrics_names]
+
+    checkpoint = step.get("checkpoint")
+    if checkpoint:
+        checkpoint_state = checkpoint["state"]
+        checkpoint_start_time = checkpoint.get("start_time")
+        checkpoint_end_time = checkpoint.get("end_time")
     else:
-        outfile = args.outdir.joinpath("workloads.csv")
-    render.tabulate_or_csv(headers, values, args.csv, outfile)
+        checkpoint_state = None
+        checkpoint_start_time = None
+        checkpoint_end_time = None
+
+    validation = step.get("validation")
+    if validation:
+        validation_state = validation["state"]
+        validation_start_time = validation.get("start_time")
+        validation_end_time = validation.get("end_time")
+    else:
+        validation_state = None
+        validation_start_time = None
+        validation_end_time = None
+
+    v_metrics_fields = [
+        api.metric.get_validation_metric(name, validation) for name in v_metrics_names
+    ]
+
+    return (
+        [
+            trial_id,
+            step["num_batches"] + step["prior_batches_processed"],
+            step["state"],
+            render.format_time(step.get("start_time")),
+            render.format_time(step.get("end_time")),
+        ]
+        + t_metrics_fields
+        + [
+            checkpoint_state,
+            render.format_time(checkpoint_start_time),
+            render.format_time(checkpoint_end_time),
+            validation_state,
+            render.format_time(validation_start_time),
+            render.format_time(validation_end_time),
+        ]
+        + v_metrics_fields
+    )
 
 
 @authentication_required
@@ -421,6 +477,7 @@ def wait(args: Namespace) -> None:
         time.sleep(args.polling_interval)
 
 
+@api.cache_responses
 @authentication_required
 def list_experiments(args: Namespace) -> None:
     params = {}
@@ -467,37 +524,53 @@ def is_number(value: Any) -> bool:
     return isinstance(value, numbers.Number)
 
 
-def scalar_training_metrics_names(exp: Dict[str, Any]) -> Set[str]:
+def scalar_training_metrics_names(trial: Dict[str, Any]) -> Set[str]:
     """
-    Given an experiment history, return the names of training metrics
+    Given the details of a trial, return the names of training metrics
     that are associated with scalar, numeric values.
 
     This function assumes that all batches in an experiment return
     consistent training metric names and types. Therefore, the first
     non-null batch metrics dictionary is used to extract names.
     """
-    for trial in exp["trials"]:
-        for step in trial["steps"]:
-            metrics = step.get("metrics")
-            if not metrics:
-                continue
-            return set(metrics.get("avg_metrics", {}).keys())
+    for step in trial["steps"]:
+        metrics = step.get("avg_metrics")
+        if not metrics:
+            continue
+        return set(metrics.keys())
 
     return set()
 
 
+def _training_metrics_names(args: Namespace) -> Callable[[Dict[str, Any]], Set[str]]:
+    def _names(exp: Dict[str, Any]) -> Set[str]:
+        # Fetch the details of only the first trial with a completed step, which has metrics.
+        for trial in exp["trials"]:
+            if trial["total_batches_processed"]:
+                r = api.get(args.master, "trials/{}/details".format(trial["id"]))
+                return scalar_training_metrics_names(r.json())
+        return set()
+
+    return _names
+
+
 def scalar_validation_metrics_names(exp: Dict[str, Any]) -> Set[str]:
+    """
+    Given the summary of an experiment, return the names of validation metrics that are
+    associated with scalar, numeric values, from the latest validation of the first trial that
+    has one.
+    """
     for trial in exp["trials"]:
-        for step in trial["steps"]:
-            try:
-                v_metrics = step["validation"]["metrics"]["validation_metrics"]
-                return {metric for metric, value in v_metrics.items() if is_number(value)}
-            except Exception:
-                pass
+        try:
+            v_metrics = trial["latest_validation_metrics"]["validation_metrics"]
+            return {metric for metric, value in v_metrics.items() if is_number(value)}
+        except Exception:
+            pass
 
     return set()
 
 
+@api.cache_responses
 @authentication_required
 def list_trials(args: Namespace) -> None:
     r = api.get(args.master, "experiments/{}/summary".format(args.experiment_id))
@@ -533,14 +606,22 @@ def set_description(args: Namespace) -> None:
 
 @authentication_required
 def add_label(args: Namespace) -> None:
-    patch_experiment(args, "add label to", {"labels": {args.label: True}})
-    print("Added label '{}' to experiment {}".format(args.label, args.experiment_id))
+    _patch_labels(args, True, "Added label '{}' to experiment {}")
 
 
 @authentication_required
 def remove_label(args: Namespace) -> None:
-    patch_experiment(args, "remove label from", {"labels": {args.label: None}})
-    print("Removed label '{}' from experiment {}".format(args.label, args.experiment_id))
+    _patch_labels(args, None, "Removed label '{}' from experiment {}")
+
+
+def _patch_labels(args: Namespace, value: Optional[bool], message: str) -> None:
+    patch_doc = {"labels": {args.label: value}}
+    batch.run(
+        args,
+        lambda experiment_id: api.patch_experiment(args.master, experiment_id, patch_doc),
+        [int(experiment_id) for experiment_id in args.experiment_ids.split(",")],
+        on_result=lambda experiment_id, _: print(message.format(args.label, experiment_id)),
+    )
 
 
 @authentication_required
@@ -670,9 +751,12 @@ args_description = Cmd(
                 Arg("--metrics", action="store_true", help="display full metrics"),
                 Group(
                     Arg("--csv", action="store_true", help="print as CSV"),
+                    Arg("--tsv", action="store_true", help="print as TSV"),
                     Arg("--json", action="store_true", help="print as JSON"),
-                    Arg("--outdir", type=Path, help="directory to save output"),
+                    Arg("--jsonl", action="store_true", help="print as JSON lines"),
+                    Arg("--outdir", type=Path, help="directory to save output as CSV"),
                 ),
+                *batch.batch_args,
             ],
         ),
         Cmd(
@@ -756,6 +840,40 @@ args_description = Cmd(
                         "checkpoints can be saved. The test experiment will "
                         "be archived on creation.",
                     ),
+                    Arg(
+                        "--benchmark",
+                        action="store_true",
+                        help="With --local, benchmark the trial by running warmup and measured "
+                        "training, validation and checkpoint workloads and print a JSON report of "
+                        "its throughput, latency, memory and checkpoint statistics.",
+                    ),
+                ),
+                Arg(
+                    "--benchmark-warmup-steps",
+                    type=int,
+                    help="number of unmeasured training steps to run before benchmarking "
+                    "(default: 1)",
+                ),
+                Arg(
+                    "--benchmark-steps",
+                    type=int,
+                    help="number of measured training steps to benchmark (default: 10)",
+                ),
+                Arg(
+                    "--benchmark-validations",
+                    type=int,
+                    help="number of validation workloads to benchmark (default: 1)",
+                ),
+                Arg(
+                    "--benchmark-checkpoints",
+                    type=int,
+                    help="number of checkpoints to save (and restore once) while benchmarking "
+                    "(default: 1)",
+                ),
+                Arg(
+                    "--benchmark-output",
+                    type=str,
+                    help="path to write the JSON benchmark report to",
                 ),
             ],
         ),
@@ -856,13 +974,21 @@ args_description = Cmd(
                     "add",
                     add_label,
                     "add label",
-                    [experiment_id_arg("experiment ID"), Arg("label", help="label")],
+                    [
+                        Arg("experiment_ids", help="comma-separated list of experiment IDs"),
+                        Arg("label", help="label"),
+                        *batch.batch_args,
+                    ],
                 ),
                 Cmd(
                     "remove",
                     remove_label,
                     "remove label",
-                    [experiment_id_arg("experiment ID"), Arg("label", help="label")],
+                    [
+                        Arg("experiment_ids", help="comma-separated list of experiment IDs"),
+                        Arg("label", help="label"),
+                        *batch.batch_args,
+                    ],
                 ),
             ],
         ),
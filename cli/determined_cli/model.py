@@ -48,6 +48,7 @@ def render_model_version(checkpoint: Checkpoint) -> None:
     render.tabulate_or_csv(headers, values, False)
 
 
+@api.cache_responses
 def list_models(args: Namespace) -> None:
     models = Determined(args.master, None).get_models(
         sort_by=ModelSortBy[args.sort_by.upper()], order_by=ModelOrderBy[args.order_by.upper()]
@@ -65,6 +66,7 @@ def list_models(args: Namespace) -> None:
         render.tabulate_or_csv(headers, values, False)
 
 
+@api.cache_responses
 @authentication_required
 def list_versions(args: Namespace) -> None:
     if args.json:
@@ -95,7 +97,7 @@ def list_versions(args: Namespace) -> None:
                 json.dumps(ckpt.validation, indent=2),
                 json.dumps(ckpt.metadata, indent=2),
             ]
-            for ckpt in model.get_versions()
+            for ckpt in model.iter_versions()
         ]
 
         render.tabulate_or_csv(headers, values, False)
@@ -110,6 +112,7 @@ def create(args: Namespace) -> None:
         render_model(model)
 
 
+@api.cache_responses
 def describe(args: Namespace) -> None:
     model = Determined(args.master, None).get_model(args.name)
     checkpoint = model.get_version(args.version)
@@ -0,0 +1,328 @@
+"""
+multiplex.py carries many TCP streams over a single connection, such as one WebSocket connection
+to a Determined master that is proxied to a single port of a service.
+
+The connection carries frames with a 9-byte header: the kind of frame, the ID of the stream and
+a value, followed by a payload for DATA frames. The frames are decoded from a byte stream, so the
+proxy in between may split and coalesce WebSocket messages in any way.
+
+- OPEN starts a new stream.
+- DATA carries up to MAX_FRAME_SIZE bytes of the stream; the value is the length of the payload.
+- WINDOW grants the peer credit to send the number of bytes in the value on the stream.
+- CLOSE says that the sender will send no more data on the stream.
+
+Each side of a stream may only have as many bytes in flight as the peer has granted it, starting
+with DEFAULT_WINDOW, and the peer grants more once it has written them out, so that a slow stream
+cannot stall the others. The size of DATA frames adapts to each stream, from MIN_FRAME_SIZE for
+interactive traffic up to MAX_FRAME_SIZE for bulk transfers.
+
+The side that listens for local connections (listen()) opens the streams, and the side next to
+the service (start_demultiplexer()) connects each stream to the service.
+
+This module is a library-only API: no det command or tunnel script option uses it, because task
+containers do not run a demultiplexer. A service that runs start_demultiplexer() on its proxied
+port can be reached by calling listen() from Python.
+"""
+import asyncio
+import logging
+import struct
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+OPEN = 0
+DATA = 1
+WINDOW = 2
+CLOSE = 3
+
+_HEADER = struct.Struct("!BII")
+
+DEFAULT_WINDOW = 4 * 1024 * 1024
+MIN_FRAME_SIZE = 16 * 1024
+MAX_FRAME_SIZE = 256 * 1024
+
+Connection = Tuple[asyncio.StreamReader, asyncio.StreamWriter]
+
+
+Frame = NamedTuple("Frame", [("kind", int), ("stream_id", int), ("value", int), ("payload", bytes)])
+
+
+def encode_frame(kind: int, stream_id: int, value: int = 0, payload: bytes = b"") -> bytes:
+    return _HEADER.pack(kind, stream_id, value) + payload
+
+
+class FrameDecoder:
+    """Decode frames from a byte stream that may split them at any point."""
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+
+    def feed(self, data: bytes) -> List[Frame]:
+        self._buffer += data
+        frames = []
+        offset = 0
+        while len(self._buffer) - offset >= _HEADER.size:
+            kind, stream_id, value = _HEADER.unpack_from(self._buffer, offset)
+            start = offset + _HEADER.size
+            end = start + (value if kind == DATA else 0)
+            if len(self._buffer) < end:
+                break
+            frames.append(Frame(kind, stream_id, value, bytes(self._buffer[start:end])))
+            offset = end
+        del self._buffer[:offset]
+        return frames
+
+
+class _Stream:
+    def __init__(self, stream_id: int, window: int) -> None:
+        self.id = stream_id
+        self.reader = None  # type: Optional[asyncio.StreamReader]
+        self.writer = None  # type: Optional[asyncio.StreamWriter]
+        # The number of bytes that may be sent before the peer grants more.
+        self.credit = window
+        self.credit_granted = asyncio.Event()
+        # The number of bytes that were written out but not granted back to the peer yet.
+        self.ungranted = 0
+        # Payloads received from the peer, followed by None when the peer closes the stream.
+        self.inbound = asyncio.Queue()  # type: asyncio.Queue
+        self.frame_size = MIN_FRAME_SIZE
+
+    def adapt_frame_size(self, requested: int, received: int) -> None:
+        # A full read means that more data is waiting, as in a bulk transfer; a short one means
+        # that the stream is interactive, so large frames would only hold on to credit.
+        if received == requested == self.frame_size:
+            self.frame_size = min(self.frame_size * 2, MAX_FRAME_SIZE)
+        elif received < self.frame_size // 4:
+            self.frame_size = max(self.frame_size // 2, MIN_FRAME_SIZE)
+
+
+class Multiplexer:
+    """
+    One side of a multiplexed connection. Frames received from the peer must be passed to
+    handle_frame(), and frames for the peer are passed to send().
+    """
+
+    def __init__(
+        self,
+        send: Callable[[bytes], Awaitable[None]],
+        connect: Optional[Callable[[], Awaitable[Connection]]] = None,
+        window: int = DEFAULT_WINDOW,
+    ) -> None:
+        """
+        Arguments:
+            send: Send bytes to the peer.
+            connect: Open a connection for each stream that the peer opens. If it is not set,
+                streams opened by the peer are closed right away.
+            window: The number of bytes of each stream that may be in flight in each direction.
+        """
+        self._send_bytes = send
+        self._send_lock = asyncio.Lock()
+        self._connect = connect
+        self._window = window
+        self._streams = {}  # type: Dict[int, _Stream]
+        self._tasks = set()  # type: Set[asyncio.Future]
+        self._next_stream_id = 1
+
+    async def _send(self, kind: int, stream_id: int, value: int = 0, payload: bytes = b"") -> None:
+        async with self._send_lock:
+            await self._send_bytes(encode_frame(kind, stream_id, value, payload))
+
+    def open_stream(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Carry a local connection over a new stream."""
+        stream_id = self._next_stream_id
+        self._next_stream_id += 1
+
+        async def _open() -> Connection:
+            await self._send(OPEN, stream_id)
+            return reader, writer
+
+        self._start(stream_id, _open)
+
+    def handle_frame(self, frame: Frame) -> None:
+        if frame.kind == OPEN:
+            if self._connect is not None:
+                self._start(frame.stream_id, self._connect)
+            else:
+                self._start(frame.stream_id, self._refuse)
+            return
+
+        stream = self._streams.get(frame.stream_id)
+        if stream is None:
+            logging.debug("Ignoring frame for unknown stream %d.", frame.stream_id)
+        elif frame.kind == DATA:
+            stream.inbound.put_nowait(frame.payload)
+        elif frame.kind == WINDOW:
+            stream.credit += frame.value
+            stream.credit_granted.set()
+        elif frame.kind == CLOSE:
+            stream.inbound.put_nowait(None)
+        else:
+            logging.debug("Ignoring frame of unknown kind %d.", frame.kind)
+
+    async def _refuse(self) -> Connection:
+        raise ConnectionRefusedError("This side does not accept streams.")
+
+    def _start(self, stream_id: int, connect: Callable[[], Awaitable[Connection]]) -> None:
+        # The stream is registered right away, so that data that arrives while it is connecting
+        # is queued.
+        stream = _Stream(stream_id, self._window)
+        self._streams[stream_id] = stream
+        task = asyncio.ensure_future(self._run_stream(stream, connect))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_stream(
+        self, stream: _Stream, connect: Callable[[], Awaitable[Connection]]
+    ) -> None:
+        try:
+            try:
+                stream.reader, stream.writer = await connect()
+            except OSError as e:
+                logging.warning("Failed to open stream %d: %s", stream.id, e)
+            await asyncio.gather(self._send_outbound(stream), self._write_inbound(stream))
+        except Exception as e:
+            # The connection to the peer was lost; close() cleans up the other streams.
+            logging.debug("Stream %d failed: %s", stream.id, e)
+        finally:
+            if stream.writer is not None:
+                stream.writer.close()
+            self._streams.pop(stream.id, None)
+
+    async def _send_outbound(self, stream: _Stream) -> None:
+        try:
+            while stream.reader is not None:
+                while stream.credit <= 0:
+                    stream.credit_granted.clear()
+                    await stream.credit_granted.wait()
+                requested = min(stream.frame_size, stream.credit)
+                data = await stream.reader.read(requested)
+                if not data:
+                    break
+                stream.adapt_frame_size(requested, len(data))
+                stream.credit -= len(data)
+                await self._send(DATA, stream.id, len(data), data)
+        except ConnectionResetError:
+            pass
+        await self._send(CLOSE, stream.id)
+
+    async def _write_inbound(self, stream: _Stream) -> None:
+        broken = stream.writer is None
+        while True:
+            data = await stream.inbound.get()
+            if data is None:
+                break
+            if not broken:
+                try:
+                    stream.writer.write(data)  # type: ignore
+                    await stream.writer.drain()  # type: ignore
+                except ConnectionError:
+                    # Keep granting credit, so that the peer does not block on this stream.
+                    broken = True
+            stream.ungranted += len(data)
+            if stream.ungranted >= self._window // 4 or stream.inbound.empty():
+                await self._send(WINDOW, stream.id, stream.ungranted)
+                stream.ungranted = 0
+
+        if not broken and stream.writer.can_write_eof():  # type: ignore
+            try:
+                stream.writer.write_eof()  # type: ignore
+            except OSError:
+                pass
+
+    def close(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        for stream in self._streams.values():
+            if stream.writer is not None:
+                stream.writer.close()
+        self._streams.clear()
+
+
+def bound_port(server: asyncio.AbstractServer) -> int:
+    """
+    Return the port that a server started by asyncio.start_server() listens on.
+    """
+    sockets = server.sockets
+    if not sockets:
+        raise ValueError("The server is not listening on any socket")
+    return int(sockets[0].getsockname()[1])
+
+
+async def listen(
+    url: str,
+    port: int,
+    host: str = "localhost",
+    on_listening: Optional[Callable[[int], None]] = None,
+    **connect_kwargs: Any
+) -> None:
+    """
+    Listen on a local port and carry every connection to it over a single WebSocket connection
+    to url, until the WebSocket connection is closed.
+
+    Arguments:
+        url: The WebSocket URL to connect to.
+        port: The local port to listen on, or 0 to pick a free port.
+        host: The local address to listen on.
+        on_listening: Called with the local port once it is listening.
+        connect_kwargs: Passed on to websockets.connect(), e.g. ssl.
+    """
+    try:
+        import websockets
+    except ImportError:
+        raise ImportError(
+            "Multiplexed tunnels require the websockets package: pip install websockets"
+        )
+
+    async with websockets.connect(
+        url, max_size=2 * MAX_FRAME_SIZE, compression=None, **connect_kwargs
+    ) as ws:
+        mux = Multiplexer(ws.send)
+        server = await asyncio.start_server(mux.open_stream, host, port, limit=MAX_FRAME_SIZE)
+        if on_listening is not None:
+            on_listening(bound_port(server))
+
+        decoder = FrameDecoder()
+        try:
+            async for message in ws:
+                if not isinstance(message, bytes):
+                    logging.warning("Closing the tunnel after an unexpected text message.")
+                    break
+                for frame in decoder.feed(message):
+                    mux.handle_frame(frame)
+        except websockets.ConnectionClosed as e:
+            logging.warning("Tunnel connection closed: %s", e)
+        finally:
+            server.close()
+            mux.close()
+
+
+async def start_demultiplexer(
+    port: int, target_host: str, target_port: int, host: str = "0.0.0.0"
+) -> asyncio.AbstractServer:
+    """
+    Listen on a port for multiplexed connections, and connect every stream that they carry to
+    target_host:target_port.
+    """
+
+    async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        async def _send(data: bytes) -> None:
+            writer.write(data)
+            await writer.drain()
+
+        async def _connect() -> Connection:
+            return await asyncio.open_connection(target_host, target_port, limit=MAX_FRAME_SIZE)
+
+        mux = Multiplexer(_send, connect=_connect)
+        decoder = FrameDecoder()
+        try:
+            while True:
+                data = await reader.read(2 * MAX_FRAME_SIZE)
+                if not data:
+                    break
+                for frame in decoder.feed(data):
+                    mux.handle_frame(frame)
+        except ConnectionError:
+            pass
+        finally:
+            mux.close()
+            writer.close()
+
+    return await asyncio.start_server(_handle, host, port, limit=2 * MAX_FRAME_SIZE)
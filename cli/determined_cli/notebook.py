@@ -8,7 +8,7 @@ from determined_common import api
 from determined_common.api.authentication import authentication_required
 from determined_common.check import check_eq
 
-from . import render
+from . import batch, render
 from .command import (
     CONFIG_DESC,
     CONTEXT_DESC,
@@ -63,6 +63,7 @@ def tail_notebook_logs(args: Namespace) -> None:
             render_event_stream(msg)
 
 
+@api.cache_responses
 @authentication_required
 def list_notebooks(args: Namespace) -> None:
     if args.all:
@@ -85,16 +86,7 @@ def list_notebooks(args: Namespace) -> None:
 
 @authentication_required
 def kill_notebook(args: Namespace) -> None:
-    for i, nid in enumerate(args.notebook_id):
-        try:
-            api.delete(args.master, "notebooks/{}".format(nid))
-            print(colored("Killed notebook {}".format(nid), "green"))
-        except api.errors.APIException as e:
-            if not args.force:
-                for ignored in args.notebook_id[i + 1 :]:
-                    print("Cowardly not killing {}".format(ignored))
-                raise e
-            print(colored("Skipping: {} ({})".format(e, type(e).__name__), "red"))
+    batch.kill_tasks(args, args.notebook_id, "notebooks/{}".format, "notebook")
 
 
 @authentication_required
@@ -144,7 +136,7 @@ args_description = [
         ]),
         Cmd("kill", kill_notebook, "kill a notebook", [
             Arg("notebook_id", help="notebook ID", nargs=ONE_OR_MORE),
-            Arg("-f", "--force", action="store_true", help="ignore errors"),
+            *batch.kill_args,
         ]),
     ])
 ]  # type: List[Any]
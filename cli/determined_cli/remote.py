@@ -3,12 +3,10 @@ from argparse import ONE_OR_MORE, REMAINDER, FileType, Namespace
 from pathlib import Path
 from typing import Any, Dict, List
 
-from termcolor import colored
-
 from determined_common import api
 from determined_common.api.authentication import authentication_required
 
-from . import render
+from . import batch, render
 from .command import (
     CONFIG_DESC,
     CONTEXT_DESC,
@@ -45,6 +43,7 @@ def run_command(args: Namespace) -> None:
             render_event_stream(msg)
 
 
+@api.cache_responses
 @authentication_required
 def list_commands(args: Namespace) -> None:
     if args.all:
@@ -78,16 +77,7 @@ def tail_command_logs(args: Namespace) -> None:
 
 @authentication_required
 def kill_command(args: Namespace) -> None:
-    for i, cid in enumerate(args.command_id):
-        try:
-            api.delete(args.master, "commands/{}".format(cid))
-            print(colored("Killed command {}".format(cid), "green"))
-        except api.errors.APIException as e:
-            if not args.force:
-                for ignored in args.command_id[i + 1 :]:
-                    print("Cowardly not killing {}".format(ignored))
-                raise e
-            print(colored("Skipping: {} ({})".format(e, type(e).__name__), "red"))
+    batch.kill_tasks(args, args.command_id, "commands/{}".format, "command")
 
 
 @authentication_required
@@ -134,7 +124,7 @@ args_description = [
         ]),
         Cmd("kill", kill_command, "forcibly terminate a command", [
             Arg("command_id", help="command ID", nargs=ONE_OR_MORE),
-            Arg("-f", "--force", action="store_true", help="ignore errors"),
+            *batch.kill_args,
         ]),
     ])
 ]  # type: List[Any]
@@ -1,6 +1,7 @@
 import base64
 import csv
 import inspect
+import json
 import pathlib
 import sys
 from datetime import timezone
@@ -117,6 +118,39 @@ def tabulate_or_csv(
         print(tabulate.tabulate(values, headers, tablefmt="presto"), file=out, flush=False)
 
 
+STREAM_FORMATS = ("table", "csv", "tsv", "jsonl")
+
+
+def stream_rows(
+    headers: List[str],
+    rows: Iterable[Iterable[Any]],
+    fmt: str,
+    outfile: Optional[pathlib.Path] = None,
+) -> None:
+    """
+    Write rows in one of STREAM_FORMATS as they are produced, so that rows may be generated
+    lazily and never held in memory together. Tables are the exception: the width of their
+    columns depends on every row, so their rows are collected first.
+    """
+    out = outfile.open("w") if outfile else sys.stdout
+    try:
+        if fmt == "table":
+            print(tabulate.tabulate(list(rows), headers, tablefmt="presto"), file=out, flush=False)
+        elif fmt in ("csv", "tsv"):
+            writer = csv.writer(out, delimiter="\t" if fmt == "tsv" else ",")
+            writer.writerow(headers)
+            for row in rows:
+                writer.writerow(row)
+        elif fmt == "jsonl":
+            for row in rows:
+                out.write(json.dumps(dict(zip(headers, row)), default=str) + "\n")
+        else:
+            raise ValueError("Unknown format {}, expected one of {}".format(fmt, STREAM_FORMATS))
+    finally:
+        if outfile:
+            out.close()
+
+
 def yes_or_no(prompt: str) -> bool:
     """Get a yes or no answer from the CLI user."""
     yes = ("y", "yes")
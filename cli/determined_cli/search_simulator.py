@@ -0,0 +1,530 @@
+"""
+An offline simulator of the searchers configured in an experiment configuration.
+
+The simulator mirrors the master's implementations of the single, random, grid, async_halving,
+adaptive_asha and pbt searchers, but runs entirely locally: validation metrics come from a
+synthetic learning curve instead of real trials, and the time to train a trial is proportional to
+the length it trains for. It is an event-driven simulation, so large searches with thousands of
+trials simulate in well under a second.
+
+Trials hold their slots only while they train; a trial waiting for the searcher to decide whether
+to promote it does not count towards the concurrency of the search.
+"""
+import bisect
+import collections
+import heapq
+import math
+import random
+from typing import Any, Callable, Deque, Dict, List, NamedTuple, Optional, Tuple, TypeVar, cast
+
+from determined_common.schemas.expconf import _v0
+
+# A learning curve maps a trial ID and the number of units (batches, records or epochs) the trial
+# has been trained for to a validation metric. Smaller metrics are always better, regardless of the
+# searcher's smaller_is_better setting.
+LearningCurve = Callable[[int, int], float]
+
+
+def constant_curve(seed: int = 0) -> LearningCurve:
+    """Every validation returns the same metric, like the master's `preview-search`."""
+    return lambda trial_id, units: 1.0
+
+
+def random_curve(seed: int = 0) -> LearningCurve:
+    """Every validation returns an independent, uniformly random metric."""
+    rng = random.Random(seed)
+    return lambda trial_id, units: rng.random()
+
+
+def power_law_curve(seed: int = 0, exponent: float = 0.5, noise: float = 0.01) -> LearningCurve:
+    """
+    Each trial's metric decays as a power law of the units it has trained towards an asymptote
+    drawn uniformly from [0, 1) for that trial, with a little Gaussian noise on every validation.
+    Trials that are better early on tend to also be better later, which is the assumption that
+    successive halving relies on.
+    """
+    rng = random.Random(seed)
+    asymptotes = {}  # type: Dict[int, float]
+
+    def curve(trial_id: int, units: int) -> float:
+        if trial_id not in asymptotes:
+            asymptotes[trial_id] = rng.random()
+        return asymptotes[trial_id] + max(units, 1) ** -exponent + rng.gauss(0.0, noise)
+
+    return curve
+
+
+CURVES = {
+    "constant": constant_curve,
+    "random": random_curve,
+    "power-law": power_law_curve,
+}  # type: Dict[str, Callable[[int], LearningCurve]]
+
+
+class Create(NamedTuple):
+    trial_id: int
+    # PBT creates trials from the checkpoints of other trials.
+    parent_id: Optional[int] = None
+
+
+class Train(NamedTuple):
+    trial_id: int
+    units: int
+
+
+Operation = Any  # Union[Create, Train]; every Train is followed by a validation.
+
+
+class _Context:
+    def __init__(self) -> None:
+        self.num_trials = 0
+
+    def create(self, parent_id: Optional[int] = None) -> Create:
+        self.num_trials += 1
+        return Create(self.num_trials, parent_id)
+
+
+class SearchMethod:
+    """The searcher interface: operations to start with, and operations after each validation."""
+
+    def initial_operations(self) -> List[Operation]:
+        raise NotImplementedError()
+
+    def validation_completed(self, trial_id: int, metric: float) -> List[Operation]:
+        return []
+
+
+class _FixedSearch(SearchMethod):
+    """single, random and grid: train every trial for max_length, all at once."""
+
+    def __init__(self, ctx: _Context, num_trials: int, max_length: int) -> None:
+        self.ctx = ctx
+        self.num_trials = num_trials
+        self.max_length = max_length
+
+    def initial_operations(self) -> List[Operation]:
+        ops = []  # type: List[Operation]
+        for _ in range(self.num_trials):
+            create = self.ctx.create()
+            ops += [create, Train(create.trial_id, self.max_length)]
+        return ops
+
+
+class _Rung:
+    def __init__(self, units_needed: int) -> None:
+        self.units_needed = units_needed
+        # Sorted by metric; metrics and entries are kept in parallel for bisect.
+        self.metrics = []  # type: List[float]
+        self.entries = []  # type: List[List[Any]]  # [trial_id, promoted]
+
+    def promotions(self, trial_id: int, metric: float, divisor: float) -> List[int]:
+        old_num_promote = int(len(self.metrics) / divisor)
+        num_promote = int((len(self.metrics) + 1) / divisor)
+
+        index = bisect.bisect_right(self.metrics, metric)
+        promote_now = index < num_promote
+        self.metrics.insert(index, metric)
+        self.entries.insert(index, [trial_id, promote_now])
+
+        if promote_now:
+            return [trial_id]
+        if num_promote != old_num_promote and not self.entries[old_num_promote][1]:
+            self.entries[old_num_promote][1] = True
+            return [self.entries[old_num_promote][0]]
+        return []
+
+
+class _AsyncHalvingSearch(SearchMethod):
+    """One bracket of asynchronous successive halving (ASHA)."""
+
+    def __init__(
+        self,
+        ctx: _Context,
+        max_length: int,
+        num_rungs: int,
+        divisor: float,
+        max_trials: int,
+        max_concurrent_trials: int = 0,
+    ) -> None:
+        self.ctx = ctx
+        self.divisor = divisor
+        self.max_trials = max_trials
+        self.max_concurrent_trials = max_concurrent_trials
+        self.rungs = [
+            _Rung(max(int(max_length / divisor ** (num_rungs - i - 1)), 1))
+            for i in range(num_rungs)
+        ]
+        self.trial_rungs = {}  # type: Dict[int, int]
+
+    def _create(self) -> List[Operation]:
+        create = self.ctx.create()
+        self.trial_rungs[create.trial_id] = 0
+        return [create, Train(create.trial_id, self.rungs[0].units_needed)]
+
+    def initial_operations(self) -> List[Operation]:
+        if self.max_concurrent_trials > 0:
+            num_trials = min(self.max_concurrent_trials, self.max_trials)
+        else:
+            num_trials = max(min(int(self.divisor ** (len(self.rungs) - 1)), self.max_trials), 1)
+        ops = []  # type: List[Operation]
+        for _ in range(num_trials):
+            ops += self._create()
+        return ops
+
+    def validation_completed(self, trial_id: int, metric: float) -> List[Operation]:
+        rung_index = self.trial_rungs[trial_id]
+        rung = self.rungs[rung_index]
+        ops = []  # type: List[Operation]
+        if rung_index == len(self.rungs) - 1:
+            rung.metrics.append(metric)
+            rung.entries.append([trial_id, False])
+        else:
+            next_rung = self.rungs[rung_index + 1]
+            for promoted_id in rung.promotions(trial_id, metric, self.divisor):
+                self.trial_rungs[promoted_id] = rung_index + 1
+                units = max(next_rung.units_needed - rung.units_needed, 1)
+                ops.append(Train(promoted_id, units))
+
+        if not ops and len(self.trial_rungs) < self.max_trials:
+            ops += self._create()
+        return ops
+
+
+class _TournamentSearch(SearchMethod):
+    """Run several searches side by side, routing each trial's events to its own search."""
+
+    def __init__(self, methods: List[SearchMethod]) -> None:
+        self.methods = methods
+        self.owners = {}  # type: Dict[int, SearchMethod]
+
+    def _claim(self, method: SearchMethod, ops: List[Operation]) -> List[Operation]:
+        for op in ops:
+            if isinstance(op, Create):
+                self.owners[op.trial_id] = method
+        return ops
+
+    def initial_operations(self) -> List[Operation]:
+        ops = []  # type: List[Operation]
+        for method in self.methods:
+            ops += self._claim(method, method.initial_operations())
+        return ops
+
+    def validation_completed(self, trial_id: int, metric: float) -> List[Operation]:
+        method = self.owners[trial_id]
+        return self._claim(method, method.validation_completed(trial_id, metric))
+
+
+class _PBTSearch(SearchMethod):
+    """Population-based training."""
+
+    def __init__(
+        self,
+        ctx: _Context,
+        length_per_round: int,
+        num_rounds: int,
+        population_size: int,
+        truncate_fraction: float,
+    ) -> None:
+        self.ctx = ctx
+        self.length_per_round = length_per_round
+        self.num_rounds = num_rounds
+        self.population_size = population_size
+        self.truncate_fraction = truncate_fraction
+        self.rounds_completed = 0
+        self.metrics = {}  # type: Dict[int, float]
+
+    def initial_operations(self) -> List[Operation]:
+        ops = []  # type: List[Operation]
+        for _ in range(self.population_size):
+            create = self.ctx.create()
+            ops += [create, Train(create.trial_id, self.length_per_round)]
+        return ops
+
+    def validation_completed(self, trial_id: int, metric: float) -> List[Operation]:
+        self.metrics[trial_id] = metric
+        if len(self.metrics) < self.population_size:
+            return []
+
+        self.rounds_completed += 1
+        if self.rounds_completed >= self.num_rounds:
+            return []
+
+        num_truncate = int(self.truncate_fraction * self.population_size)
+        ranked = sorted(self.metrics, key=lambda t: (self.metrics[t], t))
+        self.metrics = {}
+
+        # The worst trials are closed and replaced by copies of the best ones.
+        ops = []  # type: List[Operation]
+        for parent_id in ranked[:num_truncate]:
+            create = self.ctx.create(parent_id)
+            ops += [create, Train(create.trial_id, self.length_per_round)]
+        for continued_id in ranked[: len(ranked) - num_truncate]:
+            ops.append(Train(continued_id, self.length_per_round))
+        return ops
+
+
+def _length_units(length: _v0.LengthV0) -> Tuple[int, str]:
+    for name, abbreviation in (("batches", "B"), ("records", "R"), ("epochs", "E")):
+        units = getattr(length, name, None)
+        if units is not None:
+            return units, abbreviation
+    raise ValueError("length must be specified in batches, records or epochs")
+
+
+def _grid_size(hyperparameters: Dict[str, Any]) -> int:
+    size = 1
+    for name, hp in hyperparameters.items():
+        if isinstance(hp, _v0.ConstHyperparameterV0):
+            count = 1
+        elif isinstance(hp, _v0.CategoricalHyperparameterV0):
+            count = len(hp.vals)
+        elif hp.count is None:
+            raise ValueError("grid search requires a count for hyperparameter {}".format(name))
+        elif isinstance(hp, _v0.IntHyperparameterV0):
+            count = min(hp.count, hp.maxval - hp.minval + 1)
+        else:
+            count = hp.count
+        size *= count
+    return size
+
+
+T = TypeVar("T")
+
+
+def _filled(value: Optional[T], name: str) -> T:
+    # fill_defaults() sets the optional fields of a searcher that the simulation needs.
+    if value is None:
+        raise ValueError("searcher.{} must be set".format(name))
+    return value
+
+
+def _adaptive_brackets(config: _v0.AdaptiveASHAConfigV0, max_length: int) -> List[int]:
+    brackets = list(config.bracket_rungs or [])
+    if not brackets:
+        divisor = _filled(config.divisor, "divisor")
+        max_rungs = min(
+            _filled(config.max_rungs, "max_rungs"),
+            int(math.log(max_length) / math.log(divisor)) + 1,
+            int(math.log(config.max_trials) / math.log(divisor)) + 1,
+        )
+        mode = config.mode.value if config.mode is not None else "standard"
+        if mode == "conservative":
+            brackets = list(range(1, max_rungs + 1))
+        elif mode == "aggressive":
+            brackets = [max_rungs]
+        else:
+            brackets = list(range((max_rungs - 1) // 2 + 1, max_rungs + 1))
+    # Brackets that perform more early stopping come first.
+    return sorted(brackets, reverse=True)
+
+
+def _adaptive_asha_search(
+    ctx: _Context, config: _v0.AdaptiveASHAConfigV0, max_length: int
+) -> SearchMethod:
+    brackets = _adaptive_brackets(config, max_length)
+    divisor = _filled(config.divisor, "divisor")
+
+    # Allocate trials so that each bracket gets roughly the same total training budget.
+    weights = [divisor ** (num_rungs - 1) / num_rungs for num_rungs in brackets]
+    max_trials = [max(int(w / sum(weights) * config.max_trials), 1) for w in weights]
+    max_trials[0] += max(config.max_trials - sum(max_trials), 0)
+
+    if not config.max_concurrent_trials:
+        max_concurrent = [max(max_trials[-1], int(divisor))] * len(brackets)
+    else:
+        total = max(config.max_concurrent_trials, len(brackets))
+        max_concurrent = [
+            total // len(brackets) + (1 if i < total % len(brackets) else 0)
+            for i in range(len(brackets))
+        ]
+
+    return _TournamentSearch(
+        [
+            _AsyncHalvingSearch(ctx, max_length, num_rungs, divisor, trials, concurrent)
+            for num_rungs, trials, concurrent in zip(brackets, max_trials, max_concurrent)
+        ]
+    )
+
+
+def make_search_method(
+    searcher: _v0.SearcherConfigV0_Type, hyperparameters: Dict[str, Any], ctx: _Context
+) -> Tuple[SearchMethod, str]:
+    """
+    Build the simulated search method for a searcher config (with defaults filled in), returning
+    it together with the abbreviation of the unit that it trains in.
+    """
+    if isinstance(searcher, _v0.PBTConfigV0):
+        length, unit = _length_units(searcher.length_per_round)
+        return (
+            _PBTSearch(
+                ctx,
+                length,
+                searcher.num_rounds,
+                searcher.population_size,
+                searcher.replace_function.truncate_fraction,
+            ),
+            unit,
+        )
+
+    max_length, unit = _length_units(searcher.max_length)
+    if isinstance(searcher, _v0.SingleConfigV0):
+        return _FixedSearch(ctx, 1, max_length), unit
+    if isinstance(searcher, _v0.RandomConfigV0):
+        return _FixedSearch(ctx, searcher.max_trials, max_length), unit
+    if isinstance(searcher, _v0.GridConfigV0):
+        return _FixedSearch(ctx, _grid_size(hyperparameters), max_length), unit
+    if isinstance(searcher, _v0.AsyncHalvingConfigV0):
+        method = _AsyncHalvingSearch(
+            ctx,
+            max_length,
+            searcher.num_rungs,
+            _filled(searcher.divisor, "divisor"),
+            searcher.max_trials,
+            searcher.max_concurrent_trials or 0,
+        )
+        return method, unit
+    if isinstance(searcher, _v0.AdaptiveASHAConfigV0):
+        return _adaptive_asha_search(ctx, searcher, max_length), unit
+    raise NotImplementedError(
+        "the {} searcher cannot be simulated locally".format(searcher.to_dict()["name"])
+    )
+
+
+class SimulationResult(NamedTuple):
+    # The sequence of lengths trained by each trial, in trial ID order.
+    trial_lengths: List[List[int]]
+    unit: str
+    seconds_per_unit: float
+    slots_per_trial: int
+    # Seconds from the start of the search until the last trial finished training.
+    seconds: float
+    peak_concurrency: int
+
+    @property
+    def num_trials(self) -> int:
+        return len(self.trial_lengths)
+
+    @property
+    def units_per_trial(self) -> List[int]:
+        return [sum(lengths) for lengths in self.trial_lengths]
+
+    @property
+    def slot_hours(self) -> float:
+        return sum(self.units_per_trial) * self.seconds_per_unit * self.slots_per_trial / 3600
+
+    def breakdown(self) -> Dict[str, int]:
+        """Count the trials by their operations, in the format of the master's search preview."""
+        return collections.Counter(
+            " ".join("{}{} V".format(length, self.unit) for length in lengths)
+            for lengths in self.trial_lengths
+        )
+
+    def summary(self) -> Dict[str, Any]:
+        units = sorted(self.units_per_trial)
+
+        def percentile(q: float) -> int:
+            return units[min(int(q * len(units)), len(units) - 1)] if units else 0
+
+        return {
+            "trials": self.num_trials,
+            "total_units": sum(units),
+            "slot_hours": self.slot_hours,
+            "wall_clock_hours": self.seconds / 3600,
+            "peak_concurrent_trials": self.peak_concurrency,
+            "peak_slots": self.peak_concurrency * self.slots_per_trial,
+            "units_per_trial": {
+                "min": percentile(0.0),
+                "p50": percentile(0.5),
+                "p90": percentile(0.9),
+                "max": percentile(1.0),
+            },
+        }
+
+
+def simulate_search_method(
+    method: SearchMethod,
+    unit: str,
+    curve: LearningCurve,
+    seconds_per_unit: float = 1.0,
+    slots_per_trial: int = 1,
+    max_slots: Optional[int] = None,
+) -> SimulationResult:
+    """
+    Run a search to completion. Trials train in the order the searcher asks for them, as soon as
+    `max_slots` (unlimited if None) allows.
+    """
+    max_running = None if max_slots is None else max(max_slots // slots_per_trial, 1)
+
+    lengths = {}  # type: Dict[int, List[int]]
+    # Units trained by each trial, including the units inherited from the checkpoint it started
+    # from, which is what the learning curve is evaluated at.
+    trained = {}  # type: Dict[int, int]
+    ready = collections.deque()  # type: Deque[Train]
+    running = []  # type: List[Tuple[float, int, Train]]
+    now = 0.0
+    peak = 0
+    sequence = 0
+
+    def handle(ops: List[Operation]) -> None:
+        for op in ops:
+            if isinstance(op, Create):
+                lengths[op.trial_id] = []
+                trained[op.trial_id] = 0 if op.parent_id is None else trained[op.parent_id]
+            else:
+                ready.append(op)
+
+    handle(method.initial_operations())
+    while ready or running:
+        while ready and (max_running is None or len(running) < max_running):
+            op = ready.popleft()
+            sequence += 1
+            heapq.heappush(running, (now + op.units * seconds_per_unit, sequence, op))
+        peak = max(peak, len(running))
+
+        now, _, op = heapq.heappop(running)
+        lengths[op.trial_id].append(op.units)
+        trained[op.trial_id] += op.units
+        handle(method.validation_completed(op.trial_id, curve(op.trial_id, trained[op.trial_id])))
+
+    return SimulationResult(
+        trial_lengths=[lengths[trial_id] for trial_id in sorted(lengths)],
+        unit=unit,
+        seconds_per_unit=seconds_per_unit,
+        slots_per_trial=slots_per_trial,
+        seconds=now,
+        peak_concurrency=peak,
+    )
+
+
+def simulate(
+    experiment_config: Dict[str, Any],
+    curve: Optional[LearningCurve] = None,
+    seconds_per_unit: float = 1.0,
+    max_slots: Optional[int] = None,
+) -> SimulationResult:
+    """
+    Simulate the searcher of an experiment configuration. The searcher, hyperparameters and
+    resources sections are parsed with the expconf schemas. `max_slots` defaults to the
+    experiment's resources.max_slots, and `curve` to the constant curve.
+    """
+    # Parsing a union returns an instance of the member that matches the searcher name.
+    searcher = cast(
+        _v0.SearcherConfigV0_Type, _v0.SearcherConfigV0.from_dict(experiment_config["searcher"])
+    )
+    searcher.fill_defaults()
+    hyperparameters = {
+        name: _v0.HyperparameterV0.from_dict(hp)
+        for name, hp in experiment_config.get("hyperparameters", {}).items()
+    }
+    resources = _v0.ResourcesConfigV0.from_dict(experiment_config.get("resources") or {})
+    resources.fill_defaults()
+
+    method, unit = make_search_method(searcher, hyperparameters, _Context())
+    return simulate_search_method(
+        method,
+        unit,
+        curve or constant_curve(),
+        seconds_per_unit=seconds_per_unit,
+        slots_per_trial=resources.slots_per_trial or 1,
+        max_slots=max_slots if max_slots is not None else resources.max_slots,
+    )
@@ -13,7 +13,7 @@ from determined_common.api import request
 from determined_common.api.authentication import authentication_required
 from determined_common.check import check_eq, check_len
 
-from . import render
+from . import batch, render
 from .command import (
     CONFIG_DESC,
     CONTEXT_DESC,
@@ -118,6 +118,7 @@ def tail_shell_logs(args: Namespace) -> None:
             render_event_stream(msg)
 
 
+@api.cache_responses
 @authentication_required
 def list_shells(args: Namespace) -> None:
     if args.all:
@@ -139,16 +140,7 @@ def list_shells(args: Namespace) -> None:
 
 @authentication_required
 def kill_shell(args: Namespace) -> None:
-    for i, nid in enumerate(args.shell_id):
-        try:
-            api.delete(args.master, "shells/{}".format(nid))
-            print(colored("Killed shell {}".format(nid), "green"))
-        except api.errors.APIException as e:
-            if not args.force:
-                for ignored in args.shell_id[i + 1 :]:
-                    print("Cowardly not killing {}".format(ignored))
-                raise e
-            print(colored("Skipping: {} ({})".format(e, type(e).__name__), "red"))
+    batch.kill_tasks(args, args.shell_id, "shells/{}".format, "shell")
 
 
 @authentication_required
@@ -200,7 +192,7 @@ args_description = [
         ]),
         Cmd("kill", kill_shell, "kill a shell", [
             Arg("shell_id", help="shell ID", nargs=ONE_OR_MORE),
-            Arg("-f", "--force", action="store_true", help="ignore errors"),
+            *batch.kill_args,
         ]),
     ])
 ]  # type: List[Any]
@@ -20,6 +20,7 @@ def _parse_config(field: Any) -> Any:
     return yaml.safe_dump(yaml.safe_load(base64.b64decode(field)), default_flow_style=False)
 
 
+@api.cache_responses
 @authentication_required
 def list_template(args: Namespace) -> None:
     templates = [
@@ -32,6 +33,7 @@ def list_template(args: Namespace) -> None:
         render.render_objects(TemplateClean, templates)
 
 
+@api.cache_responses
 @authentication_required
 def describe_template(args: Namespace) -> None:
     resp = api.get(args.master, path="templates/{}".format(args.template_name)).json()
@@ -10,7 +10,7 @@ from determined_common import api, constants, context
 from determined_common.api.authentication import authentication_required
 from determined_common.check import check_eq
 
-from . import render
+from . import batch, render
 from .command import CONTEXT_DESC, Command, parse_config, render_event_stream
 from .declarative_argparse import Arg, Cmd
 
@@ -103,6 +103,7 @@ def tail_tensorboard_logs(args: Namespace) -> None:
             render_event_stream(msg)
 
 
+@api.cache_responses
 @authentication_required
 def list_tensorboards(args: Namespace) -> None:
     if args.all:
@@ -125,16 +126,7 @@ def list_tensorboards(args: Namespace) -> None:
 
 @authentication_required
 def kill_tensorboard(args: Namespace) -> None:
-    for i, tid in enumerate(args.tensorboard_id):
-        try:
-            api.delete(args.master, "tensorboard/{}".format(tid))
-            print(colored("Killed tensorboard {}".format(tid), "green"))
-        except api.errors.APIException as e:
-            if not args.force:
-                for ignored in args.tensorboard_id[i + 1 :]:
-                    print("Cowardly not killing {}".format(ignored))
-                raise e
-            print(colored("Skipping: {} ({})".format(e, type(e).__name__), "red"))
+    batch.kill_tasks(args, args.tensorboard_id, "tensorboard/{}".format, "tensorboard")
 
 
 @authentication_required
@@ -189,7 +181,7 @@ args_description = [
         ]),
         Cmd("kill", kill_tensorboard, "kill TensorBoard instance", [
             Arg("tensorboard_id", help="TensorBoard ID", nargs=ONE_OR_MORE),
-            Arg("-f", "--force", action="store_true", help="ignore errors"),
+            *batch.kill_args,
         ]),
     ])
 ]  # type: List[Any]
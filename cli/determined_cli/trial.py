@@ -12,6 +12,7 @@ from .checkpoint import format_checkpoint, format_validation, render_checkpoint
 from .declarative_argparse import Arg, Cmd, Group
 
 
+@api.cache_responses
 @authentication_required
 def describe_trial(args: Namespace) -> None:
     if args.metrics:
@@ -62,6 +62,7 @@ def update_username(current_username: str, master_address: str, new_username: st
     return api.patch(master_address, "users/{}/username".format(current_username), body=request)
 
 
+@api.cache_responses
 @authentication_required
 def list_users(args: Namespace) -> None:
     render.render_objects(
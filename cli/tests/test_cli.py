@@ -1,17 +1,26 @@
+import base64
+import json
 import os
 import tempfile
+from argparse import Namespace
 from pathlib import Path
+from typing import Any
 
 import pytest
 import requests
 import requests_mock
+from _pytest.monkeypatch import MonkeyPatch
 
+import determined_cli.batch as batch
 import determined_cli.cli as cli
 import determined_cli.command as command
-from determined_common import constants, context
+import determined_cli.experiment as experiment
+from determined_common import api, constants, context
+from determined_common.api import authentication
 from tests.filetree import FileTree
 
 MINIMAL_CONFIG = '{"description": "test"}'
+MASTER = "http://master:8080"
 
 
 def test_parse_config() -> None:
@@ -194,3 +203,162 @@ def test_read_context_ignore_pycaches(tmp_path: Path) -> None:
     ) as tree:
         model_def, _ = context.read_context(tree)
         assert {f["path"] for f in model_def} == {"A.py", "subdir", "subdir/A.py"}
+
+
+def test_benchmark_flags_require_local_benchmark(capsys: Any) -> None:
+    def _args(**kwargs: Any) -> Namespace:
+        args = Namespace(
+            local=False,
+            benchmark=False,
+            benchmark_warmup_steps=None,
+            benchmark_steps=None,
+            benchmark_validations=None,
+            benchmark_checkpoints=None,
+            benchmark_output=None,
+        )
+        vars(args).update(kwargs)
+        return args
+
+    for args in [
+        _args(benchmark_steps=20),
+        _args(local=True, benchmark_output="report.json"),
+        _args(benchmark=True),
+    ]:
+        with pytest.raises(SystemExit) as e:
+            experiment.create(args)
+        assert e.value.code == 2
+    assert "--benchmark-steps can only be used with --local --benchmark" in capsys.readouterr().out
+
+
+def test_kill_many_tasks(requests_mock: requests_mock.Mocker, monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.setattr(authentication, "cur_task_token", "fake-token")
+    requests_mock.delete("/notebooks/a", status_code=200)
+    requests_mock.delete("/notebooks/b", status_code=404)
+    requests_mock.delete("/notebooks/c", status_code=200)
+
+    def _args(force: bool) -> Namespace:
+        return Namespace(master=MASTER, force=force, parallelism=1, rate_limit=None)
+
+    # With --force, every task is killed even though one of them fails.
+    batch.kill_tasks(_args(True), ["a", "b", "c"], "notebooks/{}".format, "notebook")
+    assert [r.path for r in requests_mock.request_history] == [
+        "/notebooks/a",
+        "/notebooks/b",
+        "/notebooks/c",
+    ]
+
+    # Otherwise, the tasks after the one that fails are left alone.
+    requests_mock.reset_mock()
+    with pytest.raises(api.errors.APIException):
+        batch.kill_tasks(_args(False), ["b", "c"], "notebooks/{}".format, "notebook")
+    assert [r.path for r in requests_mock.request_history] == ["/notebooks/b"]
+
+
+def test_describe_streams_workloads(
+    requests_mock: requests_mock.Mocker, monkeypatch: MonkeyPatch, capsys: Any
+) -> None:
+    monkeypatch.setattr(authentication, "cur_task_token", "fake-token")
+    requests_mock.get(
+        "/experiments/1/summary",
+        json={
+            "id": 1,
+            "state": "COMPLETED",
+            "progress": 1.0,
+            "config": {"resources": {}},
+            "archived": False,
+            "trials": [
+                {
+                    "id": trial_id,
+                    "state": "COMPLETED",
+                    "hparams": {},
+                    "total_batches_processed": 100,
+                    "latest_validation_metrics": {"validation_metrics": {"error": 0.5}},
+                }
+                for trial_id in (1, 2)
+            ],
+        },
+    )
+    for trial_id in (1, 2):
+        requests_mock.get(
+            "/trials/{}/details".format(trial_id),
+            json={
+                "id": trial_id,
+                "steps": [
+                    {
+                        "state": "COMPLETED",
+                        "num_batches": 100,
+                        "prior_batches_processed": 100 * i,
+                        "avg_metrics": {"loss": trial_id + i},
+                        "validation": {"state": "COMPLETED", "metrics": {}} if i == 1 else None,
+                    }
+                    for i in range(2)
+                ],
+            },
+        )
+
+    args = Namespace(
+        master=MASTER,
+        experiment_ids="1",
+        metrics=True,
+        csv=False,
+        tsv=False,
+        json=False,
+        jsonl=True,
+        outdir=None,
+        parallelism=2,
+        rate_limit=None,
+    )
+    experiment.describe.__wrapped__(args)  # type: ignore
+
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    workloads = [line for line in lines if "# of Batches" in line]
+    assert [(w["Trial ID"], w["# of Batches"], w["Training Metric: loss"]) for w in workloads] == [
+        (1, 100, 1),
+        (1, 200, 2),
+        (2, 100, 2),
+        (2, 200, 3),
+    ]
+    assert [w["Validation Metric: error"] for w in workloads] == [None] * 4
+    assert [w["Validation State"] for w in workloads] == [None, "COMPLETED"] * 2
+
+    # Only the first trial is fetched to find the names of the training metrics.
+    details = [r.path for r in requests_mock.request_history if r.path.endswith("/details")]
+    assert details[0] == "/trials/1/details"
+    assert sorted(details[1:]) == ["/trials/1/details", "/trials/2/details"]
+
+
+def test_create_experiment_streams_model_def(
+    requests_mock: requests_mock.Mocker, monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    monkeypatch.setattr(authentication, "cur_task_token", "fake-token")
+    monkeypatch.setattr(context, "_ENCODE_CHUNK_SIZE", 3 * 1024)
+    content = os.urandom(10000)
+    tmp_path.joinpath("model.py").write_bytes(content)
+    tmp_path.joinpath("sub").mkdir()
+
+    model_context = context.Context.from_local(tmp_path)
+    # Only the metadata of the files is read up front.
+    assert all(entry._content == b"" for entry in model_context.entries)
+
+    bodies = []
+
+    def _created(request: Any, context: Any) -> str:
+        bodies.append(json.loads(b"".join(request.body)))
+        return ""
+
+    requests_mock.post("/experiments", text=_created)
+    api.create_experiment(MASTER, {"description": "test"}, model_context, validate_only=True)
+
+    assert bodies[0]["validate_only"] is True
+    entries = {e["path"]: e for e in bodies[0]["model_definition"]}
+    assert sorted(entries) == ["model.py", "sub"]
+    assert base64.b64decode(entries["model.py"]["content"]) == content
+    assert "content" not in entries["sub"]
+
+
+def test_only_read_only_commands_cache_responses() -> None:
+    assert getattr(experiment.list_experiments, "cache_responses", False)
+    assert getattr(experiment.describe, "cache_responses", False)
+    # Commands that change the cluster or wait for it to change must see fresh responses.
+    assert not getattr(experiment.create, "cache_responses", False)
+    assert not getattr(experiment.wait, "cache_responses", False)
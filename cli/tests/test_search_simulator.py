@@ -0,0 +1,91 @@
+from typing import Any, Dict
+
+import pytest
+
+from determined_cli import search_simulator
+
+
+def _config(searcher: Dict[str, Any], **kwargs: Any) -> Dict[str, Any]:
+    return {"searcher": {"metric": "loss", **searcher}, "hyperparameters": {}, **kwargs}
+
+
+def test_single_and_random() -> None:
+    result = search_simulator.simulate(_config({"name": "single", "max_length": {"batches": 100}}))
+    assert result.trial_lengths == [[100]]
+    assert result.breakdown() == {"100B V": 1}
+
+    result = search_simulator.simulate(
+        _config({"name": "random", "max_length": {"epochs": 2}, "max_trials": 10}),
+        seconds_per_unit=3600,
+        max_slots=4,
+    )
+    assert result.num_trials == 10
+    assert result.peak_concurrency == 4
+    assert result.slot_hours == pytest.approx(20)
+    # 10 trials of 2 hours each, 4 at a time.
+    assert result.seconds / 3600 == pytest.approx(6)
+
+
+def test_grid() -> None:
+    config = _config(
+        {"name": "grid", "max_length": {"records": 1000}},
+        hyperparameters={
+            "lr": {"type": "log", "minval": -4, "maxval": -1, "base": 10, "count": 4},
+            "layers": {"type": "int", "minval": 1, "maxval": 2, "count": 5},
+            "activation": {"type": "categorical", "vals": ["relu", "tanh", "sigmoid"]},
+            "dropout": 0.5,
+        },
+        resources={"slots_per_trial": 2},
+    )
+    result = search_simulator.simulate(config)
+    assert result.num_trials == 4 * 2 * 3
+    assert result.summary()["peak_slots"] == 48
+
+
+def test_adaptive_asha() -> None:
+    config = _config(
+        {
+            "name": "adaptive_asha",
+            "max_length": {"batches": 6400},
+            "max_trials": 2000,
+            "max_concurrent_trials": 32,
+        }
+    )
+    for curve in search_simulator.CURVES.values():
+        result = search_simulator.simulate(config, curve=curve(1))
+        assert result.num_trials == 2000
+        assert result.peak_concurrency == 32
+        units = result.units_per_trial
+        assert max(units) == 6400
+        # Most trials are stopped early.
+        assert sorted(units)[len(units) // 2] < 6400 // 16
+
+
+def test_pbt() -> None:
+    config = _config(
+        {
+            "name": "pbt",
+            "length_per_round": {"batches": 100},
+            "num_rounds": 4,
+            "population_size": 10,
+            "replace_function": {"truncate_fraction": 0.2},
+            "explore_function": {"resample_probability": 0.2, "perturb_factor": 0.2},
+        }
+    )
+    result = search_simulator.simulate(config, curve=search_simulator.power_law_curve(0))
+    # Two trials are replaced after each of the first three rounds.
+    assert result.num_trials == 10 + 2 * 3
+    assert sum(result.units_per_trial) == 10 * 4 * 100
+    assert result.peak_concurrency == 10
+
+
+def test_unsupported_searcher() -> None:
+    config = _config(
+        {
+            "name": "adaptive_simple",
+            "max_length": {"batches": 100},
+            "max_trials": 4,
+        }
+    )
+    with pytest.raises(NotImplementedError):
+        search_simulator.simulate(config)
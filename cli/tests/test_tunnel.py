@@ -0,0 +1,141 @@
+import asyncio
+import os
+import sys
+from typing import Any, List
+
+import pytest
+
+from determined_cli import multiplex
+
+websockets = pytest.importorskip("websockets")
+
+
+def test_frame_decoder() -> None:
+    data = b"".join(
+        [
+            multiplex.encode_frame(multiplex.OPEN, 1),
+            multiplex.encode_frame(multiplex.DATA, 1, 5, b"hello"),
+            multiplex.encode_frame(multiplex.WINDOW, 1, 1024),
+            multiplex.encode_frame(multiplex.CLOSE, 1),
+        ]
+    )
+    decoder = multiplex.FrameDecoder()
+
+    # Frames may be split at any point.
+    frames = []  # type: List[multiplex.Frame]
+    for i in range(0, len(data), 7):
+        frames.extend(decoder.feed(data[i : i + 7]))
+
+    assert frames == [
+        (multiplex.OPEN, 1, 0, b""),
+        (multiplex.DATA, 1, 5, b"hello"),
+        (multiplex.WINDOW, 1, 1024, b""),
+        (multiplex.CLOSE, 1, 0, b""),
+    ]
+
+
+async def _echo(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    while True:
+        data = await reader.read(65536)
+        if not data:
+            break
+        writer.write(data)
+        await writer.drain()
+    writer.close()
+
+
+async def _start_proxy(demux_port: int) -> Any:
+    # A stand-in for the master, which proxies a WebSocket connection to a TCP port of a service.
+    async def _proxy(ws: Any, *args: Any) -> None:
+        reader, writer = await asyncio.open_connection("localhost", demux_port)
+
+        async def _to_service() -> None:
+            async for message in ws:
+                writer.write(message)
+                await writer.drain()
+            writer.close()
+
+        async def _from_service() -> None:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                await ws.send(data)
+
+        await asyncio.gather(_to_service(), _from_service())
+
+    return await websockets.serve(_proxy, "localhost", 0, max_size=None, compression=None)
+
+
+async def _run_tunnel(num_streams: int, size: int) -> None:
+    echo = await asyncio.start_server(_echo, "localhost", 0)
+    echo_port = multiplex.bound_port(echo)
+    demux = await multiplex.start_demultiplexer(0, "localhost", echo_port, host="localhost")
+    proxy = await _start_proxy(multiplex.bound_port(demux))
+    proxy_port = list(proxy.sockets)[0].getsockname()[1]
+
+    listening = asyncio.get_event_loop().create_future()
+    tunnel = asyncio.ensure_future(
+        multiplex.listen(
+            "ws://localhost:{}/".format(proxy_port), 0, on_listening=listening.set_result
+        )
+    )
+    port = await asyncio.wait_for(listening, 10)
+
+    async def _stream(payload: bytes) -> bytes:
+        reader, writer = await asyncio.open_connection("localhost", port)
+        writer.write(payload)
+        await writer.drain()
+        writer.write_eof()
+        received = await reader.read()
+        writer.close()
+        return received
+
+    # Every stream sends more than its window, so that it depends on the credit it is granted.
+    payloads = [os.urandom(size) for _ in range(num_streams)]
+    received = await asyncio.wait_for(asyncio.gather(*(_stream(p) for p in payloads)), 60)
+    assert received == payloads
+
+    tunnel.cancel()
+    await asyncio.gather(tunnel, return_exceptions=True)
+    for server in (proxy, demux, echo):
+        server.close()
+        await server.wait_closed()
+
+
+def test_multiplexed_tunnel() -> None:
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        loop.run_until_complete(_run_tunnel(num_streams=8, size=2 * multiplex.DEFAULT_WINDOW))
+    finally:
+        if sys.version_info >= (3, 7):
+            pending = asyncio.all_tasks(loop)
+        else:
+            pending = asyncio.Task.all_tasks(loop)
+        for task in pending:
+            task.cancel()
+        loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        asyncio.set_event_loop(None)
+        loop.close()
+
+
+async def _listen_to_text() -> None:
+    async def _send_text(ws: Any, *args: Any) -> None:
+        await ws.send("not a frame")
+        await ws.wait_closed()
+
+    server = await websockets.serve(_send_text, "localhost", 0)
+    port = list(server.sockets)[0].getsockname()[1]
+    # The tunnel is closed instead of decoding the text as frames.
+    await asyncio.wait_for(multiplex.listen("ws://localhost:{}/".format(port), 0), 10)
+    server.close()
+    await server.wait_closed()
+
+
+def test_listen_rejects_text_messages() -> None:
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(_listen_to_text())
+    finally:
+        loop.close()
@@ -1,4 +1,4 @@
-from determined_common.api import authentication, errors, metric, request
+from determined_common.api import authentication, errors, metric, request, response_cache
 from determined_common.api.authentication import Authentication, Session, salt_and_hash
 from determined_common.api.experiment import (
     activate_experiment,
@@ -15,9 +15,13 @@ from determined_common.api.experiment import (
 from determined_common.api.request import (
     WebSocket,
     add_token_to_headers,
+    cache_responses,
     delete,
+    disable_response_cache,
     do_request,
+    enable_response_cache,
     get,
+    iter_pages,
     make_url,
     open,
     parse_master_address,
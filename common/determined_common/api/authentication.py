@@ -260,11 +260,18 @@ def initialize_session(
 def _is_token_valid(master_address: str, token: str) -> bool:
     """
     Find out whether the given token is valid by attempting to use it
-    on the "/users/me" endpoint.
+    on the "/users/me" endpoint. If the response cache is enabled, a token
+    that was valid within the last few minutes is assumed to still be valid.
     """
     headers = {"Authorization": "Bearer {}".format(token)}
     try:
-        r = api.get(master_address, "users/me", headers=headers, authenticated=False)
+        r = api.get(
+            master_address,
+            "users/me",
+            headers=headers,
+            authenticated=False,
+            cache_ttl=api.response_cache.TOKEN_VALIDITY_WINDOW,
+        )
     except (api.errors.UnauthenticatedException, api.errors.APIException):
         return False
 
@@ -4,7 +4,7 @@ import random
 import sys
 import time
 import uuid
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 from urllib.parse import urlencode
 
 import simplejson
@@ -210,9 +210,8 @@ def create_experiment(
 ) -> int:
     body = {
         "experiment_config": yaml.safe_dump(config),
-        "model_definition": [e.dict() for e in model_context.entries],
         "validate_only": validate_only,
-    }
+    }  # type: Dict[str, Any]
     if template:
         body["template"] = template
     if archived:
@@ -220,7 +219,19 @@ def create_experiment(
     if additional_body_fields:
         body.update(additional_body_fields)
 
-    r = req.post(master_url, "experiments", body=body)
+    def _stream_body() -> Iterator[bytes]:
+        # The model definition is streamed file by file, so that it is never held in memory as a
+        # whole, let alone in its encoded forms.
+        yield (simplejson.dumps(body)[:-1] + ', "model_definition": ').encode("utf-8")
+        yield from model_context.iter_json()
+        yield b"}"
+
+    r = req.post(
+        master_url,
+        "experiments",
+        data=_stream_body(),
+        headers={"Content-Type": "application/json"},
+    )
     if not hasattr(r, "headers"):
         raise Exception(r)
 
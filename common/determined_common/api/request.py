@@ -4,7 +4,7 @@ import os
 import tempfile
 import webbrowser
 from types import TracebackType
-from typing import Any, Dict, Iterator, Optional, Union
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
 from urllib import parse
 
 import certifi
@@ -13,7 +13,7 @@ import requests
 import simplejson
 
 import determined_common.requests
-from determined_common.api import authentication, errors
+from determined_common.api import authentication, errors, response_cache
 
 # The path to a file containing an SSL certificate to trust specifically for the master, if any, or
 # False to disable cert verification entirely. If set to a path, it should always be a temporary
@@ -69,6 +69,35 @@ del f
 set_master_cert_name(os.environ.get("DET_MASTER_CERT_NAME"))
 
 
+# The cache of responses to GET requests, if it is enabled.
+_response_cache = None  # type: Optional[response_cache.ResponseCache]
+
+
+def enable_response_cache(ttl: float = response_cache.DEFAULT_TTL) -> None:
+    """
+    Cache the responses to GET requests on disk and reuse them for up to ``ttl`` seconds before
+    revalidating them with the master. See determined_common.api.response_cache.
+    """
+    global _response_cache
+    path = authentication.get_config_path().joinpath("response_cache")
+    _response_cache = response_cache.ResponseCache(path, ttl=ttl)
+
+
+def disable_response_cache() -> None:
+    global _response_cache
+    _response_cache = None
+
+
+def cache_responses(func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Mark a read-only CLI command, which the CLI runs with the response cache enabled. Commands
+    that change the cluster or wait for it to change, such as by polling or following logs, must
+    not be marked, since they must see the current state of the master.
+    """
+    setattr(func, "cache_responses", True)
+    return func
+
+
 def get_master_cert_bundle() -> Optional[Union[str, bool]]:
     return _master_cert_bundle
 
@@ -123,6 +152,7 @@ def do_request(
     headers: Optional[Dict[str, str]] = None,
     authenticated: bool = True,
     stream: bool = False,
+    data: Optional[Iterator[bytes]] = None,
 ) -> requests.Response:
     if headers is None:
         h = {}  # type: Dict[str, str]
@@ -141,6 +171,7 @@ def do_request(
             make_url(host, path),
             params=params,
             json=body,
+            data=data,
             headers=h,
             verify=_master_cert_bundle,
             stream=stream,
@@ -157,7 +188,12 @@ def do_request(
         username = authentication.Authentication.instance().get_session_user()
         raise errors.UnauthenticatedException(username=username)
 
-    if r.status_code >= 300:
+    # Anything but a GET may change what the master returns.
+    if method != "GET" and _response_cache is not None:
+        _response_cache.clear()
+
+    # A 304 Not Modified is only returned to the conditional requests of get().
+    if r.status_code >= 300 and r.status_code != 304:
         raise errors.APIException(r)
 
     return r
@@ -170,19 +206,67 @@ def get(
     headers: Optional[Dict[str, str]] = None,
     authenticated: bool = True,
     stream: bool = False,
+    cache_ttl: Optional[float] = None,
 ) -> requests.Response:
     """
     Send a GET request to the remote API.
+
+    If the response cache is enabled, a cached response is returned instead if it is younger
+    than ``cache_ttl`` seconds (by default, the TTL of the cache) or if the master confirms that
+    it has not changed. Streamed responses are never cached.
     """
-    return do_request(
-        "GET",
-        host,
-        path,
-        params=params,
-        headers=headers,
-        authenticated=authenticated,
-        stream=stream,
+    cache = _response_cache
+    if cache is None or stream:
+        return do_request(
+            "GET",
+            host,
+            path,
+            params=params,
+            headers=headers,
+            authenticated=authenticated,
+            stream=stream,
+        )
+
+    h = dict(headers or {})  # type: Dict[str, str]
+    key = cache.make_key(
+        make_url(host, path), params, add_token_to_headers(h) if authenticated else h
     )
+    entry = cache.load(key)
+    if entry is not None:
+        if cache.is_fresh(entry, cache.ttl if cache_ttl is None else cache_ttl):
+            return cache.to_response(entry)
+        h.update(cache.conditional_headers(entry))
+
+    r = do_request("GET", host, path, params=params, headers=h, authenticated=authenticated)
+    if r.status_code == 304 and entry is not None:
+        cache.refresh(key, entry)
+        return cache.to_response(entry)
+
+    cache.store(key, r)
+    return r
+
+
+def iter_pages(
+    host: str,
+    path: str,
+    key: str,
+    params: Optional[Dict[str, Any]] = None,
+    offset: int = 0,
+    page_size: int = 100,
+) -> Iterator[List[Any]]:
+    """
+    Yield the items of a paginated list API a page at a time, starting at offset. The items of
+    each page are the field `key` of its response, and the response's pagination total says when
+    to stop.
+    """
+    while True:
+        r = get(host, path, params=dict(params or {}, offset=offset, limit=page_size)).json()
+        items = r.get(key) or []
+        yield items
+        offset += len(items)
+        total = r.get("pagination", {}).get("total", 0)
+        if not items or offset >= total:
+            return
 
 
 def delete(
@@ -206,11 +290,15 @@ def post(
     body: Optional[Dict[str, Any]] = None,
     headers: Optional[Dict[str, str]] = None,
     authenticated: bool = True,
+    data: Optional[Iterator[bytes]] = None,
 ) -> requests.Response:
     """
-    Send a POST request to the remote API.
+    Send a POST request to the remote API. Instead of a body to encode as JSON, the encoded body
+    may be passed as data, an iterator of chunks that are sent as they are produced.
     """
-    return do_request("POST", host, path, body=body, headers=headers, authenticated=authenticated)
+    return do_request(
+        "POST", host, path, body=body, headers=headers, authenticated=authenticated, data=data
+    )
 
 
 def patch(
@@ -0,0 +1,130 @@
+"""
+A local cache of the responses to GET requests to the master.
+
+Read-only commands that are run repeatedly, such as ``det experiment list`` in a polling script,
+would otherwise refetch the same documents from the master every time. A cached response is
+reused without contacting the master while it is younger than the cache's TTL; after that, it is
+revalidated with If-None-Match or If-Modified-Since if the master sent an ETag or Last-Modified
+header, and refetched otherwise.
+
+Responses are cached per URL, query parameters and credentials, in one file per response under
+the Determined config directory, so that they are shared by consecutive CLI invocations. Any
+request that is not a GET may change what the master would return, so it clears the cache.
+"""
+import base64
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, cast
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# How long a cached response is used without revalidating it, in seconds.
+DEFAULT_TTL = 5.0
+
+# How long a session token that the master accepted is trusted without asking again, in seconds.
+TOKEN_VALIDITY_WINDOW = 300.0
+
+# Larger responses are not worth writing to disk.
+MAX_CACHED_BYTES = 16 * 1024 * 1024
+
+
+class ResponseCache:
+    def __init__(self, path: Path, ttl: float = DEFAULT_TTL) -> None:
+        self.path = path
+        self.ttl = ttl
+
+    @staticmethod
+    def make_key(url: str, params: Optional[Dict[str, Any]], headers: Dict[str, str]) -> str:
+        credentials = {
+            k: v
+            for k, v in headers.items()
+            if k.lower() in ("authorization", "grpc-metadata-x-task-token")
+        }
+        material = json.dumps([url, params or {}, credentials], sort_keys=True, default=str)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.path.joinpath(key + ".json")
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with self._entry_path(key).open() as f:
+                return cast(Dict[str, Any], json.load(f))
+        except (OSError, ValueError):
+            # Missing, or being replaced by another process.
+            return None
+
+    def _write(self, key: str, entry: Dict[str, Any]) -> None:
+        # Entries are written atomically, since other processes may read them at any time; the
+        # cache is only an optimization, so failing to write one is not an error.
+        try:
+            self.path.mkdir(parents=True, exist_ok=True, mode=0o700)
+            fd, tmp = tempfile.mkstemp(dir=str(self.path), suffix=".tmp")
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(entry, f)
+            os.replace(tmp, str(self._entry_path(key)))
+        except OSError:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+
+    def store(self, key: str, response: requests.Response) -> None:
+        if response.status_code != 200 or len(response.content) > MAX_CACHED_BYTES:
+            return
+        self._write(
+            key,
+            {
+                "stored_at": time.time(),
+                "url": response.url,
+                # The content is stored decoded, so it must not be decoded again.
+                "headers": {
+                    k: v
+                    for k, v in response.headers.items()
+                    if k.lower() not in ("content-encoding", "transfer-encoding")
+                },
+                "encoding": response.encoding,
+                "content": base64.b64encode(response.content).decode("ascii"),
+            },
+        )
+
+    def refresh(self, key: str, entry: Dict[str, Any]) -> None:
+        """Mark an entry that the master has just revalidated as fresh again."""
+        self._write(key, {**entry, "stored_at": time.time()})
+
+    def clear(self) -> None:
+        shutil.rmtree(str(self.path), ignore_errors=True)
+
+    @staticmethod
+    def is_fresh(entry: Dict[str, Any], ttl: float) -> bool:
+        age = time.time() - float(entry["stored_at"])
+        return 0 <= age < ttl
+
+    @staticmethod
+    def conditional_headers(entry: Dict[str, Any]) -> Dict[str, str]:
+        headers = CaseInsensitiveDict(entry["headers"])  # type: CaseInsensitiveDict[str]
+        conditional = {}  # type: Dict[str, str]
+        if "ETag" in headers:
+            conditional["If-None-Match"] = headers["ETag"]
+        if "Last-Modified" in headers:
+            conditional["If-Modified-Since"] = headers["Last-Modified"]
+        return conditional
+
+    @staticmethod
+    def to_response(entry: Dict[str, Any]) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 200
+        response.url = entry["url"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response.encoding = entry["encoding"]
+        # The body is read from the raw file-like object when Response.content is first accessed.
+        response.raw = io.BytesIO(base64.b64decode(entry["content"]))
+        return response
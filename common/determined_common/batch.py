@@ -0,0 +1,164 @@
+"""
+Concurrent execution of one operation over many items, such as a request for each of many
+experiment IDs.
+
+The operation runs on a bounded number of threads and, optionally, at a bounded rate. Results
+are returned in the order of the items, as soon as every earlier item is done, so they can be
+rendered while later items are still in flight. The error of each item is collected rather than
+raised, so that one failing item does not hide the results of the others.
+
+    executor = BatchExecutor(parallelism=16, rate_limit=50)
+    for result in executor.map(lambda i: api.get(master, "experiments/{}".format(i)), ids):
+        if result.error is not None:
+            ...
+"""
+import collections
+import concurrent.futures
+import threading
+import time
+from typing import Callable, Deque, Generic, Iterable, Iterator, List, Optional, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+DEFAULT_PARALLELISM = 8
+
+
+class RateLimiter:
+    """Allow at most `rate` calls to acquire() to return per second, with bursts of `burst`."""
+
+    def __init__(self, rate: float, burst: Optional[int] = None) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive, got {}".format(rate))
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class ItemResult(Generic[T, R]):
+    """
+    The outcome of an operation on one item: its return value, or the exception it raised, or
+    neither if the operation was skipped because an earlier item failed.
+    """
+
+    def __init__(
+        self,
+        item: T,
+        value: Optional[R] = None,
+        error: Optional[BaseException] = None,
+        skipped: bool = False,
+    ) -> None:
+        self.item = item
+        self.value = value
+        self.error = error
+        self.skipped = skipped
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and not self.skipped
+
+    def __repr__(self) -> str:
+        return "ItemResult(item={!r}, value={!r}, error={!r}, skipped={!r})".format(
+            self.item, self.value, self.error, self.skipped
+        )
+
+
+class BatchError(Exception):
+    """Raised by BatchExecutor.run() when the operation failed for some of the items."""
+
+    def __init__(self, failures: List[ItemResult]) -> None:
+        self.failures = failures
+        super().__init__(
+            "Failed for {} item(s): {}".format(
+                len(failures), ", ".join("{} ({})".format(f.item, f.error) for f in failures)
+            )
+        )
+
+
+class BatchExecutor:
+    def __init__(
+        self,
+        parallelism: int = DEFAULT_PARALLELISM,
+        rate_limit: Optional[float] = None,
+        stop_on_error: bool = False,
+    ) -> None:
+        """
+        Arguments:
+            parallelism: The most items that are processed at the same time.
+            rate_limit: The most items that are started per second, or None for no limit.
+            stop_on_error: If set, the items that have not been started when an item fails are
+                skipped.
+        """
+        if parallelism < 1:
+            raise ValueError("parallelism must be at least 1, got {}".format(parallelism))
+        self.parallelism = parallelism
+        self.rate_limiter = RateLimiter(rate_limit) if rate_limit else None
+        self.stop_on_error = stop_on_error
+
+    def map(self, fn: Callable[[T], R], items: Iterable[T]) -> Iterator[ItemResult[T, R]]:
+        """
+        Call fn on every item and yield the results in the order of the items. At most twice
+        `parallelism` items are submitted ahead of the result that is yielded next, so items may
+        be a long or lazy iterable.
+        """
+        failed = threading.Event()
+
+        def _run(item: T) -> ItemResult[T, R]:
+            if self.stop_on_error and failed.is_set():
+                return ItemResult(item, skipped=True)
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            try:
+                return ItemResult(item, value=fn(item))
+            except Exception as e:
+                failed.set()
+                return ItemResult(item, error=e)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.parallelism) as executor:
+            pending = collections.deque()  # type: Deque[concurrent.futures.Future]
+            try:
+                for item in items:
+                    pending.append(executor.submit(_run, item))
+                    while len(pending) >= 2 * self.parallelism or (pending and pending[0].done()):
+                        yield pending.popleft().result()
+                while pending:
+                    yield pending.popleft().result()
+            finally:
+                # If the caller stops early, do not start any more items.
+                for future in pending:
+                    future.cancel()
+
+    def run(self, fn: Callable[[T], R], items: Iterable[T]) -> List[R]:
+        """
+        Call fn on every item and return the values in the order of the items, or raise a
+        BatchError with every failure if any item failed.
+        """
+        results = list(self.map(fn, items))
+        failures = [r for r in results if not r.ok]
+        if failures:
+            raise BatchError(failures)
+        return [r.value for r in results]  # type: ignore
+
+
+def run_batch(
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    parallelism: int = DEFAULT_PARALLELISM,
+    rate_limit: Optional[float] = None,
+) -> List[R]:
+    """A shortcut for BatchExecutor(parallelism, rate_limit).run(fn, items)."""
+    return BatchExecutor(parallelism, rate_limit).run(fn, items)
@@ -1,19 +1,31 @@
 import base64
 import collections
+import json
 import os
 import pathlib
 import tarfile
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import pathspec
 
 from determined_common import check, constants
 from determined_common.util import sizeof_fmt
 
+# Files are read and base64-encoded this many bytes at a time when a context is streamed. It is a
+# multiple of 3, so that the encoded chunks can be concatenated.
+_ENCODE_CHUNK_SIZE = 3 * 256 * 1024
+
+
+def _encoded_size(size: int) -> int:
+    return 4 * ((size + 2) // 3)
+
 
 class ContextItem:
     """
     ContextItem wraps the content and metadata of a file or a directory.
+
+    The content of a local file is only read when it is needed, so that a context holds only the
+    metadata of its files however large they are.
     """
 
     def __init__(self, path: str):
@@ -21,26 +33,69 @@ class ContextItem:
         self.type = ord(tarfile.REGTYPE)
         self.uid = 0
         self.gid = 0
-        self.content = bytes()
+        self._content = bytes()
         self.mtime = -1
         self.mode = -1
+        self.local_path = None  # type: Optional[pathlib.Path]
+        self._local_size = 0
+
+    @property
+    def content(self) -> bytes:
+        """The base64-encoded content of the file."""
+        if self.local_path is not None:
+            return b"".join(self.iter_content())
+        return self._content
+
+    @content.setter
+    def content(self, content: bytes) -> None:
+        self.local_path = None
+        self._content = content
 
     @property
     def size(self) -> int:
-        if self.content:
-            return len(self.content)
+        if self.local_path is not None:
+            return _encoded_size(self._local_size)
+        if self._content:
+            return len(self._content)
         return 0
 
-    def dict(self) -> Dict[str, Any]:
+    def iter_content(self) -> Iterator[bytes]:
+        """Yield the base64-encoded content of the file a chunk at a time."""
+        if self.local_path is None:
+            yield self._content
+            return
+        with self.local_path.open("rb") as f:
+            while True:
+                chunk = f.read(_ENCODE_CHUNK_SIZE)
+                if not chunk:
+                    return
+                yield base64.b64encode(chunk)
+
+    def _metadata(self) -> Dict[str, Any]:
         d = {"path": self.path, "type": self.type, "uid": self.uid, "gid": self.gid}
-        if self.type == ord(tarfile.REGTYPE):
-            d["content"] = self.content
         if self.mtime != -1:
             d["mtime"] = self.mtime
         if self.mode != -1:
             d["mode"] = self.mode
         return d
 
+    def dict(self) -> Dict[str, Any]:
+        d = self._metadata()
+        if self.type == ord(tarfile.REGTYPE):
+            d["content"] = self.content
+        return d
+
+    def iter_json(self) -> Iterator[bytes]:
+        """Yield the JSON encoding of dict() a chunk at a time, streaming the content."""
+        metadata = json.dumps(self._metadata())
+        if self.type != ord(tarfile.REGTYPE):
+            yield metadata.encode("utf-8")
+            return
+        # The base64 alphabet needs no escaping in JSON strings.
+        yield (metadata[:-1] + ', "content": "').encode("utf-8")
+        yield from self.iter_content()
+        yield b'"}'
+
     @classmethod
     def from_content_str(cls, path: str, content: str) -> "ContextItem":
         context_item = ContextItem(path)
@@ -52,11 +107,14 @@ class ContextItem:
     def from_local_file(cls, path: str, local_path: pathlib.Path) -> "ContextItem":
         context_item = ContextItem(path)
         context_item.type = ord(tarfile.REGTYPE)
-        context_item.mtime = int(local_path.stat().st_mtime)
-        context_item.mode = local_path.stat().st_mode
-        with local_path.open("rb") as f:
-            content = f.read()
-            context_item.content = base64.b64encode(content)
+        stat = local_path.stat()
+        context_item.mtime = int(stat.st_mtime)
+        context_item.mode = stat.st_mode
+        # Fail now rather than when the context is sent if the file cannot be read.
+        with local_path.open("rb"):
+            pass
+        context_item.local_path = local_path
+        context_item._local_size = stat.st_size
         return context_item
 
     @classmethod
@@ -92,6 +150,18 @@ class Context:
         self._items[entry.path] = entry
         self._size += entry.size
 
+    def iter_json(self) -> Iterator[bytes]:
+        """
+        Yield the JSON encoding of the list of the dict() of every entry a chunk at a time, so
+        that the context can be sent while only one chunk of it is in memory.
+        """
+        yield b"["
+        for i, entry in enumerate(self._items.values()):
+            if i:
+                yield b","
+            yield from entry.iter_json()
+        yield b"]"
+
     @classmethod
     def from_local(
         cls,
@@ -1,11 +1,10 @@
 import enum
 import json
 import pathlib
-import shutil
 from typing import Any, Dict, List, Optional, cast
 
 from determined_common import api, constants, storage
-from determined_common.storage import shared
+from determined_common.storage import shared, staging
 
 
 class ModelFramework(enum.Enum):
@@ -55,6 +54,26 @@ class Checkpoint(object):
         master (string, optional): The address of the Determined master instance.
     """
 
+    __slots__ = (
+        "uuid",
+        "experiment_config",
+        "experiment_id",
+        "trial_id",
+        "hparams",
+        "batch_number",
+        "start_time",
+        "end_time",
+        "resources",
+        "validation",
+        "framework",
+        "format",
+        "determined_version",
+        "model_version",
+        "model_name",
+        "metadata",
+        "_master",
+    )
+
     def __init__(
         self,
         uuid: str,
@@ -123,6 +142,11 @@ class Checkpoint(object):
         """
         Download checkpoint to local storage.
 
+        Checkpoints stored in S3 or GCS are verified against the checksums recorded when they
+        were saved. If a download is interrupted, calling this method again resumes it: files
+        that were already downloaded intact are skipped and partially downloaded files are
+        completed.
+
         Arguments:
             path (string, optional): Top level directory to place the
                 checkpoint under. If this parameter is not set, the checkpoint will
@@ -146,7 +170,8 @@ class Checkpoint(object):
             # checkpoint, attempt to fetch one.
             if self.experiment_config["checkpoint_storage"]["type"] == "shared_fs":
                 src_ckpt_dir = self._find_shared_fs_path()
-                shutil.copytree(str(src_ckpt_dir), str(local_ckpt_dir))
+                # The downloaded checkpoint may be modified, so it is not hardlinked.
+                staging.stage_tree(str(src_ckpt_dir), str(local_ckpt_dir))
             else:
                 local_ckpt_dir.mkdir(parents=True, exist_ok=True)
                 manager = storage.build(
@@ -318,7 +343,12 @@ class Checkpoint(object):
         return "Checkpoint(uuid={}, trial_id={})".format(self.uuid, self.trial_id)
 
     @staticmethod
-    def from_json(data: Dict[str, Any], master: Optional[str] = None) -> "Checkpoint":
+    def from_json(
+        data: Dict[str, Any],
+        master: Optional[str] = None,
+        model_version: Optional[int] = None,
+        model_name: Optional[str] = None,
+    ) -> "Checkpoint":
         validation = {
             "metrics": data.get("metrics", {}),
             "state": data.get("validation_state", None),
@@ -339,7 +369,7 @@ class Checkpoint(object):
             framework=data.get("framework"),
             format=data.get("format"),
             determined_version=data.get("determined_version", data.get("determinedVersion")),
-            model_version=data.get("model_version"),
-            model_name=data.get("model_name"),
+            model_version=model_version if model_version is not None else data.get("model_version"),
+            model_name=model_name if model_name is not None else data.get("model_name"),
             master=master,
         )
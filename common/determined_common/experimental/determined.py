@@ -1,6 +1,7 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
 from determined_common import api
+from determined_common.batch import DEFAULT_PARALLELISM, BatchExecutor
 from determined_common.experimental.checkpoint import Checkpoint
 from determined_common.experimental.experiment import ExperimentReference
 from determined_common.experimental.model import Model, ModelOrderBy, ModelSortBy
@@ -49,6 +50,20 @@ class Determined:
         r = api.get(self._session._master, "/api/v1/checkpoints/{}".format(uuid)).json()
         return Checkpoint.from_json(r["checkpoint"], master=self._session._master)
 
+    def get_checkpoints(
+        self, uuids: Iterable[str], parallelism: int = DEFAULT_PARALLELISM
+    ) -> List[Checkpoint]:
+        """
+        Get the :class:`~determined.experimental.Checkpoint` objects representing the
+        checkpoints with the provided UUIDs, in the same order. The checkpoints are
+        fetched concurrently.
+
+        Arguments:
+            uuids (iterable of strings): The UUIDs of the checkpoints.
+            parallelism (int, optional): The number of checkpoints to fetch at the same time.
+        """
+        return BatchExecutor(parallelism).run(self.get_checkpoint, uuids)
+
     def create_model(
         self, name: str, description: Optional[str] = "", metadata: Optional[Dict[str, Any]] = None
     ) -> Model:
@@ -96,16 +111,32 @@ class Determined:
             description: If this parameter is set, models will be filtered to
                 only include models with descriptions matching this parameter.
         """
-        r = api.get(
+        return list(self.iter_models(sort_by, order_by, name, description))
+
+    def iter_models(
+        self,
+        sort_by: ModelSortBy = ModelSortBy.NAME,
+        order_by: ModelOrderBy = ModelOrderBy.ASCENDING,
+        name: str = "",
+        description: str = "",
+        page_size: int = 100,
+    ) -> Iterator[Model]:
+        """
+        Iterate over the models in the model registry, filtered and sorted as by
+        :meth:`get_models`. The models are fetched ``page_size`` at a time, and only one
+        page of them is held in memory.
+        """
+        for page in api.iter_pages(
             self._session._master,
             "/api/v1/models/",
+            "models",
             params={
                 "sort_by": sort_by.value,
                 "order_by": order_by.value,
                 "name": name,
                 "description": description,
             },
-        )
-
-        models = r.json().get("models")
-        return [Model.from_json(m, self._session._master) for m in models]
+            page_size=page_size,
+        ):
+            for m in page:
+                yield Model.from_json(m, self._session._master)
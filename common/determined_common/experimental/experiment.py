@@ -1,8 +1,10 @@
-from typing import List, Optional
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional
 
-from determined_common import api
 from determined_common.experimental import checkpoint
 
+if TYPE_CHECKING:
+    import numpy as np
+
 
 class ExperimentReference:
     """
@@ -54,6 +56,7 @@ class ExperimentReference:
         limit: int,
         sort_by: Optional[str] = None,
         smaller_is_better: Optional[bool] = None,
+        use_cache: bool = True,
     ) -> List[checkpoint.Checkpoint]:
         """
         Return the N :class:`~determined.experimental.Checkpoint` instances with the best
@@ -74,38 +77,84 @@ class ExperimentReference:
                 metric above in ascending or descending order. If ``sort_by`` is unset,
                 this parameter is ignored. By default, the value of ``smaller_is_better``
                 from the experiment's configuration is used.
+
+            use_cache (bool, optional): Whether to use the local checkpoint cache, which only
+                fetches the checkpoints that finished since the last call. The cache lives
+                in ``~/.cache/determined/checkpoints`` unless ``DET_METRICS_CACHE_DIR`` is set.
+                (default: ``True``)
         """
-        r = api.get(
-            self._master,
-            "/api/v1/experiments/{}/checkpoints".format(self.id),
-            params={
-                "states": checkpoint.CheckpointState.COMPLETED.value,
-                "validation_states": checkpoint.CheckpointState.COMPLETED.value,
-            },
-        )
-        checkpoints = r.json()["checkpoints"]
+        from determined_common.experimental import selection
 
-        if not checkpoints:
+        cache = selection.CheckpointCache(self._master) if use_cache else None
+        table, searcher = selection.fetch_experiment_table(self._master, self.id, cache)
+
+        if not selection.table_len(table):
             raise AssertionError("No checkpoint found for experiment {}".format(self.id))
 
-        if not sort_by:
-            sort_by = checkpoints[0]["experimentConfig"]["searcher"]["metric"]
-            smaller_is_better = checkpoints[0]["experimentConfig"]["searcher"]["smaller_is_better"]
+        metric = sort_by or searcher["metric"]  # type: str
+        if not sort_by or smaller_is_better is None:
+            smaller_is_better = searcher["smaller_is_better"]
 
-        checkpoints.sort(
-            reverse=not smaller_is_better,
-            key=lambda x: (x["metrics"]["validationMetrics"][sort_by], x["trialId"]),
-        )
+        rows = selection.top_k_rows(table, metric, bool(smaller_is_better), limit)
+        return selection.fetch_checkpoints(self._master, [str(table["uuid"][i]) for i in rows])
+
+    def iter_metrics(
+        self, kind: str = "validation", use_cache: bool = True, page_size: int = 100
+    ) -> Iterator[Dict[str, "np.ndarray"]]:
+        """
+        Iterate over the metrics of this experiment, one record batch per trial. A record batch
+        is a dictionary mapping column names to NumPy arrays of equal length: ``trial_id``,
+        ``batches``, and one float64 column per metric. Trials are fetched from the master
+        ``page_size`` at a time.
+
+        Arguments:
+            kind (string, optional): Which metrics to iterate over, ``"training"`` or
+                ``"validation"``. (default: ``"validation"``)
+
+            use_cache (bool, optional): Whether to use the local metrics cache. (default:
+                ``True``)
 
-        # Ensure returned checkpoints are from distinct trials.
-        t_ids = set()
-        checkpoint_refs = []
-        for ckpt in checkpoints:
-            if ckpt["trialId"] not in t_ids:
-                checkpoint_refs.append(checkpoint.Checkpoint.from_json(ckpt, self._master))
-                t_ids.add(ckpt["trialId"])
+            page_size (int, optional): The number of trials to list per request. (default:
+                ``100``)
+        """
+        from determined_common.experimental import metrics
+
+        metric_kind = metrics.MetricKind(kind)
+        cache = metrics.MetricsCache(self._master) if use_cache else None
+        for trial in metrics.iter_experiment_trials(self._master, self.id, page_size):
+            yield metrics.fetch_trial_batch(self._master, trial["id"], metric_kind, cache)
+
+    def export_metrics(
+        self,
+        kind: str = "validation",
+        path: Optional[str] = None,
+        use_cache: bool = True,
+        page_size: int = 100,
+    ) -> Dict[str, "np.ndarray"]:
+        """
+        Return the metrics of every trial in this experiment as a single record batch; see
+        :meth:`iter_metrics`. Metrics that some trials do not report are NaN for those trials.
+
+        Arguments:
+            kind (string, optional): Which metrics to export, ``"training"`` or
+                ``"validation"``. (default: ``"validation"``)
+
+            path (string, optional): If set, the metrics are also written to this path. The
+                format is chosen by its extension: ``.npz`` or ``.parquet`` (requires pyarrow).
+
+            use_cache (bool, optional): Whether to use the local metrics cache. The cache lives
+                in ``~/.cache/determined/metrics`` unless ``DET_METRICS_CACHE_DIR`` is set.
+                (default: ``True``)
+
+            page_size (int, optional): The number of trials to list per request. (default:
+                ``100``)
+        """
+        from determined_common.experimental import metrics
 
-        return checkpoint_refs[:limit]
+        batch = metrics.concat_batches(self.iter_metrics(kind, use_cache, page_size))
+        if path is not None:
+            metrics.write_batch(batch, path)
+        return batch
 
     def __repr__(self) -> str:
         return "Experiment(id={})".format(self.id)
@@ -0,0 +1,229 @@
+"""
+Columnar export of trial metrics.
+
+Metrics are fetched one trial at a time and converted into record batches: dictionaries mapping
+column names to equal-length NumPy arrays. Every batch has a ``trial_id`` and a ``batches`` column
+(the total number of batches the trial had processed when the metrics were recorded) plus one
+float64 column per metric; values that are missing or not numeric are NaN.
+
+Converted batches are cached on disk, one file per trial and metric kind. Trials that have
+finished are read from the cache without contacting the master; for trials that are still running
+only the workloads newer than the cached ones are converted and appended to the cache.
+"""
+import enum
+import hashlib
+import json
+import math
+import os
+import pathlib
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from determined_common import api
+
+RecordBatch = Dict[str, np.ndarray]
+
+_TERMINAL_STATES = {"STATE_COMPLETED", "STATE_CANCELED", "STATE_ERROR"}
+_INDEX_COLUMNS = ["trial_id", "batches"]
+
+
+class MetricKind(enum.Enum):
+    TRAINING = "training"
+    VALIDATION = "validation"
+
+
+def default_cache_dir() -> pathlib.Path:
+    return pathlib.Path(
+        os.environ.get(
+            "DET_METRICS_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "determined")
+        )
+    ).joinpath("metrics")
+
+
+def _to_float(value: Any) -> float:
+    if isinstance(value, bool):
+        return float(value)
+    if isinstance(value, (int, float)):
+        return float(value)
+    return math.nan
+
+
+def _empty_batch() -> RecordBatch:
+    return {
+        "trial_id": np.zeros(0, dtype=np.int64),
+        "batches": np.zeros(0, dtype=np.int64),
+    }
+
+
+def _batch_len(batch: RecordBatch) -> int:
+    return len(batch["trial_id"])
+
+
+def concat_batches(batches: Iterable[RecordBatch]) -> RecordBatch:
+    """
+    Concatenate record batches into one. Metric columns that are missing from some batches are
+    filled with NaN.
+    """
+    batches = list(batches)
+    if not batches:
+        return _empty_batch()
+
+    metric_names = sorted(
+        {name for batch in batches for name in batch if name not in _INDEX_COLUMNS}
+    )
+    result = {
+        name: np.concatenate([batch[name] for batch in batches]) for name in _INDEX_COLUMNS
+    }  # type: RecordBatch
+    for name in metric_names:
+        result[name] = np.concatenate(
+            [
+                batch[name]
+                if name in batch
+                else np.full(_batch_len(batch), np.nan, dtype=np.float64)
+                for batch in batches
+            ]
+        )
+    return result
+
+
+def workloads_to_batch(
+    trial_id: int, workloads: List[Dict[str, Any]], kind: MetricKind, after_batches: int = -1
+) -> RecordBatch:
+    """
+    Convert the completed workloads of the given kind from a GetTrial response into a record
+    batch, skipping workloads at or before `after_batches`.
+    """
+    batches = []  # type: List[int]
+    columns = {}  # type: Dict[str, List[float]]
+    for container in workloads:
+        w = container.get(kind.value)
+        if not w or w.get("state") != "STATE_COMPLETED":
+            continue
+        total_batches = w.get("priorBatchesProcessed", 0) + w.get("numBatches", 0)
+        if total_batches <= after_batches:
+            continue
+
+        row = len(batches)
+        batches.append(total_batches)
+        for name, value in (w.get("metrics") or {}).items():
+            if name not in columns:
+                columns[name] = [math.nan] * row
+            columns[name].append(_to_float(value))
+        for values in columns.values():
+            if len(values) < row + 1:
+                values.append(math.nan)
+
+    result = {
+        "trial_id": np.full(len(batches), trial_id, dtype=np.int64),
+        "batches": np.array(batches, dtype=np.int64),
+    }  # type: RecordBatch
+    for name, values in columns.items():
+        result[name] = np.array(values, dtype=np.float64)
+    return result
+
+
+class MetricsCache:
+    """
+    MetricsCache stores the converted metrics of each trial in a directory, as a ``.npz`` file of
+    columns next to a small JSON file recording the trial state at the time of the last fetch.
+    """
+
+    def __init__(self, master: str, cache_dir: Optional[pathlib.Path] = None) -> None:
+        # Trial IDs are only unique within a master.
+        master_key = hashlib.sha256(master.encode("utf-8")).hexdigest()[:16]
+        self._dir = (cache_dir or default_cache_dir()).joinpath(master_key)
+
+    def _paths(self, trial_id: int, kind: MetricKind) -> Dict[str, pathlib.Path]:
+        stem = "trial-{}-{}".format(trial_id, kind.value)
+        return {
+            "data": self._dir.joinpath(stem + ".npz"),
+            "meta": self._dir.joinpath(stem + ".json"),
+        }
+
+    def load(self, trial_id: int, kind: MetricKind) -> Optional[Dict[str, Any]]:
+        paths = self._paths(trial_id, kind)
+        if not paths["data"].exists() or not paths["meta"].exists():
+            return None
+        with paths["meta"].open() as f:
+            meta = json.load(f)  # type: Dict[str, Any]
+        with np.load(str(paths["data"]), allow_pickle=False) as data:
+            meta["batch"] = {name: data[name] for name in data.files}
+        return meta
+
+    def store(self, trial_id: int, kind: MetricKind, state: str, batch: RecordBatch) -> None:
+        self._dir.mkdir(parents=True, exist_ok=True)
+        paths = self._paths(trial_id, kind)
+        # Write to temporary files and rename them so that an interrupted write never leaves a
+        # partial cache entry behind.
+        tmp_data = paths["data"].with_suffix(".tmp.npz")
+        np.savez(str(tmp_data), **batch)
+        os.replace(str(tmp_data), str(paths["data"]))
+        tmp_meta = paths["meta"].with_suffix(".tmp")
+        with tmp_meta.open("w") as f:
+            json.dump({"state": state}, f)
+        os.replace(str(tmp_meta), str(paths["meta"]))
+
+
+def fetch_trial_batch(
+    master: str,
+    trial_id: int,
+    kind: MetricKind,
+    cache: Optional[MetricsCache] = None,
+) -> RecordBatch:
+    """
+    Return the metrics of one trial as a record batch. Trials that had already finished when they
+    were cached are returned from the cache without contacting the master.
+    """
+    cached = cache.load(trial_id, kind) if cache is not None else None
+    if cached is not None and cached["state"] in _TERMINAL_STATES:
+        return cached["batch"]  # type: ignore
+
+    r = api.get(master, "/api/v1/trials/{}".format(trial_id)).json()
+    trial_state = r["trial"]["state"]
+
+    if cached is not None and _batch_len(cached["batch"]) > 0:
+        old = cached["batch"]  # type: RecordBatch
+        new = workloads_to_batch(
+            trial_id, r.get("workloads") or [], kind, after_batches=int(old["batches"][-1])
+        )
+        batch = concat_batches([old, new]) if _batch_len(new) > 0 else old
+    else:
+        batch = workloads_to_batch(trial_id, r.get("workloads") or [], kind)
+
+    if cache is not None:
+        cache.store(trial_id, kind, trial_state, batch)
+    return batch
+
+
+def iter_experiment_trials(master: str, experiment_id: int, page_size: int) -> Iterator[Any]:
+    """Yield the trials of an experiment, ordered by ID, fetching `page_size` trials at a time."""
+    for page in api.iter_pages(
+        master,
+        "/api/v1/experiments/{}/trials".format(experiment_id),
+        "trials",
+        params={"sort_by": "SORT_BY_ID"},
+        page_size=page_size,
+    ):
+        yield from page
+
+
+def write_batch(batch: RecordBatch, path: str) -> None:
+    """
+    Write a record batch to a ``.npz`` or ``.parquet`` file. Writing Parquet requires pyarrow.
+    """
+    if path.endswith(".npz"):
+        np.savez_compressed(path, **batch)
+    elif path.endswith(".parquet"):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("pyarrow must be installed to export metrics to Parquet")
+        pyarrow.parquet.write_table(
+            pyarrow.table({name: pyarrow.array(col) for name, col in batch.items()}), path
+        )
+    else:
+        raise ValueError(
+            "Unsupported metrics export format: {} (use .npz or .parquet)".format(path)
+        )
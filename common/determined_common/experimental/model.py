@@ -1,7 +1,7 @@
 import datetime
 import enum
 import json
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
 from determined_common import api
 from determined_common.experimental.checkpoint import Checkpoint
@@ -58,6 +58,15 @@ class Model:
         master (string, optional): The address of the Determined master instance.
     """
 
+    __slots__ = (
+        "_master",
+        "name",
+        "description",
+        "creation_time",
+        "last_updated_time",
+        "metadata",
+    )
+
     def __init__(
         self,
         name: str,
@@ -100,11 +109,10 @@ class Model:
 
             latest_version = data["modelVersions"][0]
             return Checkpoint.from_json(
-                {
-                    **latest_version["checkpoint"],
-                    "model_version": latest_version["version"],
-                    "model_name": data["model"]["name"],
-                }
+                latest_version["checkpoint"],
+                self._master,
+                model_version=latest_version["version"],
+                model_name=data["model"]["name"],
             )
         else:
             resp = api.get(self._master, "/api/v1/models/{}/versions/{}".format(self.name, version))
@@ -116,29 +124,41 @@ class Model:
         """
         Get a list of checkpoints corresponding to versions of this model. The
         models are sorted by version number and are returned in descending
-        order by default.
+        order by default. To go through the versions of a model with many of them,
+        use :meth:`iter_versions` instead.
 
         Arguments:
             order_by (enum): A member of the :class:`ModelOrderBy` enum.
         """
-        resp = api.get(
+        return list(self.iter_versions(order_by))
+
+    def iter_versions(
+        self, order_by: ModelOrderBy = ModelOrderBy.DESC, page_size: int = 100
+    ) -> Iterator[Checkpoint]:
+        """
+        Iterate over the checkpoints corresponding to versions of this model, in the same
+        order as :meth:`get_versions`. The versions are fetched ``page_size`` at a time, and
+        only one page of them is held in memory.
+
+        Arguments:
+            order_by (enum): A member of the :class:`ModelOrderBy` enum.
+            page_size (int, optional): The number of versions to fetch per request.
+                (default: ``100``)
+        """
+        for page in api.iter_pages(
             self._master,
             "/api/v1/models/{}/versions/".format(self.name),
+            "modelVersions",
             params={"order_by": order_by.value},
-        )
-        data = resp.json()
-
-        return [
-            Checkpoint.from_json(
-                {
-                    **version["checkpoint"],
-                    "model_version": version["version"],
-                    "model_name": data["model"]["name"],
-                },
-                self._master,
-            )
-            for version in data["modelVersions"]
-        ]
+            page_size=page_size,
+        ):
+            for version in page:
+                yield Checkpoint.from_json(
+                    version["checkpoint"],
+                    self._master,
+                    model_version=version["version"],
+                    model_name=self.name,
+                )
 
     def register_version(self, checkpoint_uuid: str) -> Checkpoint:
         """
@@ -158,12 +178,10 @@ class Model:
         data = resp.json()
 
         return Checkpoint.from_json(
-            {
-                **data["modelVersion"]["checkpoint"],
-                "model_version": data["modelVersion"]["version"],
-                "model_name": data["modelVersion"]["model"]["name"],
-            },
+            data["modelVersion"]["checkpoint"],
             self._master,
+            model_version=data["modelVersion"]["version"],
+            model_name=data["modelVersion"]["model"]["name"],
         )
 
     def add_metadata(self, metadata: Dict[str, Any]) -> None:
@@ -0,0 +1,227 @@
+"""
+Selection of the best checkpoints by validation metric.
+
+Checkpoints are fetched a page at a time and reduced to a columnar table: a ``uuid`` column, a
+``trial_id`` column and one column of floats per validation metric, prefixed with ``metric.``;
+values that are missing or not numeric are NaN. Only the rows that are selected are turned into
+:class:`~determined.experimental.Checkpoint` objects, by fetching them by UUID.
+
+The table of an experiment is cached on disk, next to the metrics cache. Checkpoints are listed in
+the order in which they finished, so a refresh only fetches the checkpoints after the cached ones;
+the last cached checkpoint is fetched again to make sure that no cached checkpoint was deleted in
+the meantime, in which case the table is rebuilt.
+"""
+import hashlib
+import heapq
+import json
+import math
+import os
+import pathlib
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from determined_common import api
+from determined_common.batch import DEFAULT_PARALLELISM, BatchExecutor
+from determined_common.experimental import checkpoint
+
+Table = Dict[str, List[Any]]
+
+_METRIC_PREFIX = "metric."
+_COMPLETED = "STATE_COMPLETED"
+
+
+def default_cache_dir() -> pathlib.Path:
+    return pathlib.Path(
+        os.environ.get(
+            "DET_METRICS_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "determined")
+        )
+    ).joinpath("checkpoints")
+
+
+def _to_float(value: Any) -> float:
+    if isinstance(value, (bool, int, float)):
+        return float(value)
+    return math.nan
+
+
+def _empty_table() -> Table:
+    return {"uuid": [], "trial_id": []}
+
+
+def table_len(table: Table) -> int:
+    return len(table["trial_id"])
+
+
+def checkpoints_to_table(checkpoints: List[Dict[str, Any]]) -> Table:
+    """Convert checkpoints as returned by the checkpoint APIs into a table."""
+    columns = {}  # type: Dict[str, List[float]]
+    for row, ckpt in enumerate(checkpoints):
+        validation_metrics = (ckpt.get("metrics") or {}).get("validationMetrics") or {}
+        for name, value in validation_metrics.items():
+            if name not in columns:
+                columns[name] = [math.nan] * row
+            columns[name].append(_to_float(value))
+        for values in columns.values():
+            if len(values) < row + 1:
+                values.append(math.nan)
+
+    table = {
+        "uuid": [c["uuid"] for c in checkpoints],
+        "trial_id": [c["trialId"] for c in checkpoints],
+    }  # type: Table
+    for name, values in columns.items():
+        table[_METRIC_PREFIX + name] = values
+    return table
+
+
+def concat_tables(tables: List[Table]) -> Table:
+    """Concatenate tables into one. Metric columns missing from some tables are NaN there."""
+    tables = [t for t in tables if table_len(t) > 0]
+    if not tables:
+        return _empty_table()
+    if len(tables) == 1:
+        return tables[0]
+
+    names = sorted({name for t in tables for name in t if name.startswith(_METRIC_PREFIX)})
+    result = _empty_table()
+    for name in names:
+        result[name] = []
+    for t in tables:
+        result["uuid"].extend(t["uuid"])
+        result["trial_id"].extend(t["trial_id"])
+        for name in names:
+            result[name].extend(t[name] if name in t else [math.nan] * table_len(t))
+    return result
+
+
+def top_k_rows(
+    table: Table, metric: str, smaller_is_better: bool, k: int, distinct_trials: bool = True
+) -> List[int]:
+    """
+    Return the indices of the k rows with the best values of the metric, best first. Ties are
+    broken by trial ID, in the same direction as the metric. If distinct_trials is set, only the
+    best row of each trial is considered. Rows without a value of the metric are never returned.
+    """
+    name = _METRIC_PREFIX + metric
+    if name not in table or k <= 0:
+        return []
+
+    column = table[name]
+
+    sign = 1 if smaller_is_better else -1
+    trial_ids = table["trial_id"]
+    rows = [i for i, value in enumerate(column) if not math.isnan(value)]
+
+    if distinct_trials:
+        # Keep the first row of each trial with the best value of the trial.
+        best = {}  # type: Dict[int, int]
+        for i in rows:
+            j = best.get(trial_ids[i])
+            if j is None or sign * column[i] < sign * column[j]:
+                best[trial_ids[i]] = i
+        rows = sorted(best.values())
+
+    return heapq.nsmallest(k, rows, key=lambda i: (sign * column[i], sign * trial_ids[i]))
+
+
+def iter_checkpoint_pages(
+    master: str, path: str, params: Dict[str, Any], offset: int, page_size: int
+) -> Iterator[List[Dict[str, Any]]]:
+    """Yield the checkpoints listed by a checkpoint API a page at a time, starting at offset."""
+    return api.iter_pages(master, path, "checkpoints", params, offset, page_size)
+
+
+def searcher_of(ckpt: Dict[str, Any]) -> Dict[str, Any]:
+    searcher = ckpt["experimentConfig"]["searcher"]
+    return {"metric": searcher["metric"], "smaller_is_better": searcher["smaller_is_better"]}
+
+
+class CheckpointCache:
+    """
+    CheckpointCache stores the checkpoint table of each experiment in a directory, as a JSON file
+    with the columns of the table and the searcher settings of the experiment.
+    """
+
+    def __init__(self, master: str, cache_dir: Optional[pathlib.Path] = None) -> None:
+        # Experiment IDs are only unique within a master.
+        master_key = hashlib.sha256(master.encode("utf-8")).hexdigest()[:16]
+        self._dir = (cache_dir or default_cache_dir()).joinpath(master_key)
+
+    def _path(self, experiment_id: int) -> pathlib.Path:
+        return self._dir.joinpath("experiment-{}.json".format(experiment_id))
+
+    def load(self, experiment_id: int) -> Optional[Tuple[Table, Dict[str, Any]]]:
+        path = self._path(experiment_id)
+        if not path.exists():
+            return None
+        with path.open() as f:
+            entry = json.load(f)
+        return entry["table"], entry["searcher"]
+
+    def store(self, experiment_id: int, table: Table, searcher: Dict[str, Any]) -> None:
+        self._dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(experiment_id)
+        # Write to a temporary file and rename it so that an interrupted write never leaves a
+        # partial cache entry behind. NaN is written as the non-standard literal that json reads.
+        tmp = path.with_suffix(".tmp")
+        with tmp.open("w") as f:
+            json.dump({"table": table, "searcher": searcher}, f)
+        os.replace(str(tmp), str(path))
+
+
+def fetch_experiment_table(
+    master: str,
+    experiment_id: int,
+    cache: Optional[CheckpointCache] = None,
+    page_size: int = 1000,
+) -> Tuple[Table, Dict[str, Any]]:
+    """
+    Return the table of the completed checkpoints with completed validations of an experiment,
+    in the order in which they finished, and the searcher settings of the experiment (empty if
+    it has no such checkpoints).
+    """
+    path = "/api/v1/experiments/{}/checkpoints".format(experiment_id)
+    params = {
+        "states": _COMPLETED,
+        "validation_states": _COMPLETED,
+        "sort_by": "SORT_BY_END_TIME",
+        "order_by": "ORDER_BY_ASC",
+    }
+
+    cached = cache.load(experiment_id) if cache is not None else None
+    if cached is not None and table_len(cached[0]) > 0:
+        table, searcher = cached
+        last_uuid = str(table["uuid"][-1])
+        tables = [table]
+        pages = iter_checkpoint_pages(master, path, params, table_len(table) - 1, page_size)
+        first = next(pages)
+        if first and first[0]["uuid"] == last_uuid:
+            tables.append(checkpoints_to_table(first[1:]))
+            tables.extend(checkpoints_to_table(page) for page in pages)
+            table = concat_tables(tables)
+            if cache is not None:
+                cache.store(experiment_id, table, searcher)
+            return table, searcher
+        # Some of the cached checkpoints were deleted; start over.
+
+    searcher = {}
+    tables = []
+    for page in iter_checkpoint_pages(master, path, params, 0, page_size):
+        if page and not searcher:
+            searcher = searcher_of(page[0])
+        tables.append(checkpoints_to_table(page))
+    table = concat_tables(tables)
+    if cache is not None:
+        cache.store(experiment_id, table, searcher)
+    return table, searcher
+
+
+def fetch_checkpoints(
+    master: str, uuids: List[str], parallelism: int = DEFAULT_PARALLELISM
+) -> List[checkpoint.Checkpoint]:
+    """Fetch the checkpoints with the given UUIDs concurrently, in the same order."""
+
+    def _get(uuid: str) -> checkpoint.Checkpoint:
+        r = api.get(master, "/api/v1/checkpoints/{}".format(uuid)).json()
+        return checkpoint.Checkpoint.from_json(r["checkpoint"], master=master)
+
+    return BatchExecutor(parallelism).run(_get, uuids)
@@ -1,8 +1,11 @@
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Dict, Optional
 
 from determined_common import api, check
 from determined_common.experimental import checkpoint
 
+if TYPE_CHECKING:
+    import numpy as np
+
 
 class TrialReference:
     """
@@ -102,33 +105,70 @@ class TrialReference:
             resp = api.get(self._master, "/api/v1/checkpoints/{}".format(uuid))
             return checkpoint.Checkpoint.from_json(resp.json()["checkpoint"], master=self._master)
 
-        r = api.get(
-            self._master,
-            "/api/v1/trials/{}/checkpoints".format(self.id),
-            # The default sort order from the API is by batch number. The order
-            # by parameter indicates descending order.
-            params={"order_by": 2},
-        ).json()
-        checkpoints = r["checkpoints"]
+        from determined_common.experimental import selection
 
-        if not checkpoints:
-            raise AssertionError("No checkpoint found for trial {}".format(self.id))
+        path = "/api/v1/trials/{}/checkpoints".format(self.id)
+        # The default sort order from the API is by batch number. The order
+        # by parameter indicates descending order.
+        params = {"order_by": 2}
 
         if latest:
-            return checkpoint.Checkpoint.from_json(checkpoints[0], master=self._master)
+            r = api.get(self._master, path, params=dict(params, limit=1)).json()
+            if not r["checkpoints"]:
+                raise AssertionError("No checkpoint found for trial {}".format(self.id))
+            return checkpoint.Checkpoint.from_json(r["checkpoints"][0], master=self._master)
+
+        tables = []
+        searcher = {}  # type: Dict[str, Any]
+        for page in selection.iter_checkpoint_pages(self._master, path, params, 0, 1000):
+            if page and not searcher:
+                searcher = selection.searcher_of(page[0])
+            tables.append(selection.checkpoints_to_table(page))
+        table = selection.concat_tables(tables)
+
+        if not selection.table_len(table):
+            raise AssertionError("No checkpoint found for trial {}".format(self.id))
 
+        metric = sort_by or searcher["metric"]  # type: str
         if not sort_by:
-            sort_by = checkpoints[0]["experimentConfig"]["searcher"]["metric"]
-            smaller_is_better = checkpoints[0]["experimentConfig"]["searcher"]["smaller_is_better"]
-
-        best_checkpoint_func = min if smaller_is_better else max
-        return checkpoint.Checkpoint.from_json(
-            best_checkpoint_func(
-                [c for c in checkpoints if c["metrics"] is not None],
-                key=lambda x: x["metrics"]["validationMetrics"][sort_by],
-            ),
-            master=self._master,
+            smaller_is_better = searcher["smaller_is_better"]
+
+        rows = selection.top_k_rows(
+            table, metric, bool(smaller_is_better), 1, distinct_trials=False
         )
+        if not rows:
+            raise AssertionError(
+                "No checkpoint with validation metric {} found for trial {}".format(metric, self.id)
+            )
+        return selection.fetch_checkpoints(self._master, [str(table["uuid"][rows[0]])])[0]
+
+    def export_metrics(
+        self, kind: str = "validation", path: Optional[str] = None, use_cache: bool = True
+    ) -> Dict[str, "np.ndarray"]:
+        """
+        Return the metrics of this trial as a record batch: a dictionary mapping column names
+        to NumPy arrays of equal length. The columns are ``trial_id``, ``batches`` (the total
+        number of batches processed when the metrics were recorded), and one float64 column per
+        metric.
+
+        Arguments:
+            kind (string, optional): Which metrics to export, ``"training"`` or
+                ``"validation"``. (default: ``"validation"``)
+
+            path (string, optional): If set, the metrics are also written to this path. The
+                format is chosen by its extension: ``.npz`` or ``.parquet`` (requires pyarrow).
+
+            use_cache (bool, optional): Whether to use the local metrics cache. The cache lives
+                in ``~/.cache/determined/metrics`` unless ``DET_METRICS_CACHE_DIR`` is set.
+                (default: ``True``)
+        """
+        from determined_common.experimental import metrics
+
+        cache = metrics.MetricsCache(self._master) if use_cache else None
+        batch = metrics.fetch_trial_batch(self._master, self.id, metrics.MetricKind(kind), cache)
+        if path is not None:
+            metrics.write_batch(batch, path)
+        return batch
 
     def __repr__(self) -> str:
         return "Trial(id={})".format(self.id)
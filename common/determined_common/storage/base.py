@@ -1,11 +1,41 @@
 import abc
+import concurrent.futures
 import contextlib
+import hashlib
+import json
+import logging
 import os
 import shutil
 import uuid
-from typing import Any, Dict, Iterator, Optional, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, cast
 
-from determined_common.check import check_gt, check_not_none, check_true, check_type
+from determined_common.check import check_eq, check_gt, check_not_none, check_true, check_type
+
+# The checksum manifest is stored alongside the other files of checkpoints in remote storage, so
+# that downloads can be verified without help from the master.
+CHECKSUM_MANIFEST = "determined_checksums.json"
+CHECKSUM_ALGORITHM = "sha256"
+
+_HASH_CHUNK_SIZE = 1 << 20
+
+
+def _checksum_file(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _scan_files(root: str, prefix: str = "") -> Iterator[Tuple[str, str]]:
+    """Yield the (relative path, absolute path) of every file under `root`."""
+    with os.scandir(root) as it:
+        for entry in it:
+            rel_path = prefix + entry.name
+            if entry.is_dir(follow_symlinks=True):
+                yield from _scan_files(entry.path, rel_path + "/")
+            else:
+                yield rel_path, entry.path
 
 
 class StorageMetadata:
@@ -15,20 +45,25 @@ class StorageMetadata:
         resources: Dict[str, int],
         framework: Optional[str] = None,
         format: Optional[str] = None,
+        checksums: Optional[Dict[str, str]] = None,
     ) -> None:
         check_gt(len(storage_id), 0, "Invalid storage ID")
         self.storage_id = storage_id
         self.resources = resources
         self.framework = framework
         self.format = format
+        self.checksums = checksums
 
     def __json__(self) -> Dict[str, Any]:
-        return {
+        record = {
             "uuid": self.storage_id,
             "resources": self.resources,
             "framework": self.framework,
             "format": self.format,
-        }
+        }  # type: Dict[str, Any]
+        if self.checksums is not None:
+            record["checksums"] = self.checksums
+        return record
 
     def __str__(self) -> str:
         return "<storage {}, framework {}, format {}>".format(
@@ -45,7 +80,11 @@ class StorageMetadata:
         check_not_none(record["uuid"], "Storage ID is undefined")
         check_not_none(record["resources"], "Resources are undefined")
         return StorageMetadata(
-            record["uuid"], record["resources"], record.get("framework"), record.get("format")
+            record["uuid"],
+            record["resources"],
+            record.get("framework"),
+            record.get("format"),
+            record.get("checksums"),
         )
 
 
@@ -78,7 +117,11 @@ class StorageManager:
         pass
 
     @contextlib.contextmanager
-    def store_path(self, storage_id: str = "") -> Iterator[Tuple[str, str]]:
+    def store_path(
+        self,
+        storage_id: str = "",
+        on_stored: Optional[Callable[[StorageMetadata], None]] = None,
+    ) -> Iterator[Tuple[str, str]]:
         """
         Prepare a local directory that will become a checkpoint.
 
@@ -86,6 +129,8 @@ class StorageManager:
         random checkpoint ID, but subclasses whose storage backends are in
         remote places are responsible for uploading the data after the files are
         created and deleting the temporary checkpoint directory.
+
+        If `on_stored` is set, it is called with the metadata of the checkpoint once it is stored.
         """
 
         if storage_id == "":
@@ -107,6 +152,8 @@ class StorageManager:
 
         metadata = StorageMetadata(storage_id, StorageManager._list_directory(storage_dir))
         self.post_store_path(storage_id, storage_dir, metadata)
+        if on_stored is not None:
+            on_stored(metadata)
 
     @abc.abstractmethod
     @contextlib.contextmanager
@@ -132,6 +179,27 @@ class StorageManager:
 
         self._remove_checkpoint_directory(metadata.storage_id, ignore_errors=False)
 
+    def delete_many(
+        self, metadata: List[StorageMetadata], max_workers: int = 8
+    ) -> Iterator[Tuple[StorageMetadata, Optional[Exception]]]:
+        """
+        Delete many storages from persistent storage, yielding each storage together with the
+        exception raised while deleting it (or None) as soon as it has been processed. A failure
+        to delete one storage does not stop the others from being deleted.
+
+        This base implementation calls delete() from a pool of `max_workers` threads. Subclasses
+        whose backends support bulk deletion should override this to batch requests.
+        """
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(self.delete, m): m for m in metadata}
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    yield futures[future], e
+                else:
+                    yield futures[future], None
+
     def _remove_checkpoint_directory(self, storage_id: str, ignore_errors: bool = True) -> None:
         """
         Recursively delete a checkpoint directory from the local filesystem.
@@ -165,3 +233,141 @@ class StorageManager:
                 result[rel_path] = os.path.getsize(abs_path)
 
         return result
+
+    @staticmethod
+    def _compute_checksums(root: str, max_workers: int = 8) -> Dict[str, str]:
+        """
+        Returns a dict mapping the path names of all files in the directory `root`, relative to
+        `root`, to their checksums. Files are hashed in parallel by `max_workers` threads; hashlib
+        releases the GIL while hashing, so large checkpoints are hashed at disk speed.
+        """
+        check_true(os.path.isdir(root), "{} must be an extant directory".format(root))
+        files = [(rel, abs_path) for rel, abs_path in _scan_files(root) if rel != CHECKSUM_MANIFEST]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            checksums = executor.map(lambda f: _checksum_file(f[1]), files)
+            return {rel: checksum for (rel, _), checksum in zip(files, checksums)}
+
+    @staticmethod
+    def _write_checksum_manifest(root: str) -> Dict[str, str]:
+        """
+        Write the checksum manifest of the directory `root` into `root` and return the checksums
+        it contains. If `root` already has a manifest, it is read instead of hashing the files a
+        second time.
+        """
+        path = os.path.join(root, CHECKSUM_MANIFEST)
+        if os.path.exists(path):
+            return StorageManager._read_checksum_manifest(path)
+
+        checksums = StorageManager._compute_checksums(root)
+        with open(path, "w") as f:
+            json.dump({"algorithm": CHECKSUM_ALGORITHM, "checksums": checksums}, f, indent=2)
+        return checksums
+
+    @staticmethod
+    def _upload_with_checksum_manifest(
+        metadata: StorageMetadata,
+        storage_dir: str,
+        upload: Callable[[StorageMetadata, str], None],
+    ) -> None:
+        """
+        Upload the files of a checkpoint with `upload(metadata, storage_dir)` while they are
+        hashed, then upload the checksum manifest and add it to `metadata`. Hashing reads the
+        files while they are uploaded rather than before, so it does not delay the checkpoint.
+        """
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            hashing = executor.submit(StorageManager._write_checksum_manifest, storage_dir)
+            upload(metadata, storage_dir)
+            metadata.checksums = hashing.result()
+
+        if CHECKSUM_MANIFEST not in metadata.resources:
+            size = os.path.getsize(os.path.join(storage_dir, CHECKSUM_MANIFEST))
+            upload(StorageMetadata(metadata.storage_id, {CHECKSUM_MANIFEST: size}), storage_dir)
+            metadata.resources[CHECKSUM_MANIFEST] = size
+
+    @staticmethod
+    def _read_checksum_manifest(path: str) -> Dict[str, str]:
+        with open(path) as f:
+            manifest = json.load(f)
+        check_eq(
+            manifest.get("algorithm"),
+            CHECKSUM_ALGORITHM,
+            "Unsupported checksum algorithm in {}".format(path),
+        )
+        return cast(Dict[str, str], manifest["checksums"])
+
+    def _download_resources(
+        self,
+        metadata: StorageMetadata,
+        storage_dir: str,
+        fetch: Callable[[str, str, int], None],
+    ) -> None:
+        """
+        Download every resource of a checkpoint into `storage_dir`, using `fetch(rel_path, path,
+        offset)` to write the stored file `rel_path` to the local file `path`. If `offset` is not
+        zero, `path` already holds the first `offset` bytes of the file and `fetch` appends the
+        rest.
+
+        If the checkpoint has checksums, either in `metadata` or in its checksum manifest, files
+        that are already present and intact are skipped, files left partially downloaded by an
+        interrupted download are resumed, and every file is verified once it is downloaded.
+        Checkpoints without checksums are always downloaded in full.
+        """
+        checksums = metadata.checksums
+        fetched_manifest = False
+        if checksums is None and CHECKSUM_MANIFEST in metadata.resources:
+            manifest_path = os.path.join(storage_dir, CHECKSUM_MANIFEST)
+            os.makedirs(storage_dir, exist_ok=True)
+            fetch(CHECKSUM_MANIFEST, manifest_path, 0)
+            checksums = StorageManager._read_checksum_manifest(manifest_path)
+            fetched_manifest = True
+
+        for rel_path, size in metadata.resources.items():
+            abs_path = os.path.join(storage_dir, rel_path)
+            os.makedirs(os.path.dirname(abs_path), exist_ok=True)
+
+            # Only create empty directory for keys that end with "/".
+            if rel_path.endswith("/") or rel_path == CHECKSUM_MANIFEST and fetched_manifest:
+                continue
+
+            checksum = (checksums or {}).get(rel_path)
+            self._download_file(rel_path, abs_path, size, checksum, fetch)
+
+    @staticmethod
+    def _download_file(
+        rel_path: str,
+        abs_path: str,
+        size: int,
+        checksum: Optional[str],
+        fetch: Callable[[str, str, int], None],
+    ) -> None:
+        if checksum is not None and os.path.isfile(abs_path):
+            if os.path.getsize(abs_path) == size and _checksum_file(abs_path) == checksum:
+                logging.debug("Skipping {}, which is already downloaded".format(rel_path))
+                return
+
+        # Download into a separate file so that a partial download is never mistaken for a
+        # complete one, and so that an interrupted download can be resumed where it stopped.
+        partial_path = abs_path + ".partial"
+        offset = 0
+        if checksum is not None and os.path.isfile(partial_path):
+            offset = os.path.getsize(partial_path)
+            if offset > size:
+                offset = 0
+
+        if offset:
+            logging.info("Resuming download of {} at byte {}".format(rel_path, offset))
+        if offset == 0 or offset < size:
+            fetch(rel_path, partial_path, offset)
+
+        if checksum is not None:
+            actual = _checksum_file(partial_path)
+            if actual != checksum:
+                os.remove(partial_path)
+                if offset:
+                    # The bytes downloaded earlier may have been corrupted; start over.
+                    logging.warning("Resumed download of {} is corrupt, retrying".format(rel_path))
+                    StorageManager._download_file(rel_path, abs_path, size, checksum, fetch)
+                    return
+            check_eq(actual, checksum, "Checksum mismatch for downloaded file {}".format(rel_path))
+
+        os.replace(partial_path, abs_path)
@@ -2,7 +2,7 @@ import contextlib
 import logging
 import os
 import tempfile
-from typing import Iterator, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 
 import google.api_core.exceptions
 import requests.exceptions
@@ -13,6 +13,9 @@ from google.cloud import storage
 from determined_common import util
 from determined_common.storage.base import StorageManager, StorageMetadata
 
+# Google recommends no more than 100 calls in a single batch request.
+_MAX_BATCH_SIZE = 100
+
 retry_network_errors = retry.Retry(
     retry.if_exception_type(
         ConnectionError,
@@ -31,8 +34,9 @@ class GCSStorageManager(StorageManager):
     rather than the boto library we use to access S3 -- boto uses
     various S3 features that are not supported by GCS.
 
-    Batching is supported by the GCS API for deletion, however it is not used because
-    of observed request failures. Batching is not used for uploading
+    Batching is supported by the GCS API for deletion. It is only used when deleting many
+    checkpoints at once (see delete_many), and because of observed request failures, a failed
+    batch is retried one blob at a time. Batching is not used for uploading
     or downloading files, because the GCS API does not support it. Upload/download
     performance could be improved by using multiple clients in a multithreaded fashion.
 
@@ -52,7 +56,7 @@ class GCSStorageManager(StorageManager):
         """post_store_path uploads the checkpoint to gcs and deletes the original files."""
         try:
             logging.info("Uploading checkpoint {} to GCS".format(storage_id))
-            self.upload(metadata, storage_dir)
+            self._upload_with_checksum_manifest(metadata, storage_dir, self.upload)
         finally:
             self._remove_checkpoint_directory(metadata.storage_id)
 
@@ -87,21 +91,22 @@ class GCSStorageManager(StorageManager):
 
     @util.preserve_random_state
     def download(self, metadata: StorageMetadata, storage_dir: str) -> None:
-        for rel_path in metadata.resources.keys():
-            abs_path = os.path.join(storage_dir, rel_path)
-            os.makedirs(os.path.dirname(abs_path), exist_ok=True)
-
-            # Only create empty directory for keys that end with "/".
-            # See `upload` method for more context.
-            if rel_path.endswith("/"):
-                continue
+        """
+        Download a checkpoint into `storage_dir`. Files that are already present and match the
+        checkpoint's checksums are skipped and partially downloaded files are resumed with ranged
+        reads; see StorageManager._download_resources.
+        """
 
+        def fetch(rel_path: str, path: str, offset: int) -> None:
             blob_name = "{}/{}".format(metadata.storage_id, rel_path)
             blob = self.bucket.blob(blob_name)
 
             logging.debug("Downloading from GCS: {}".format(blob_name))
 
-            blob.download_to_filename(abs_path)
+            with open(path, "ab" if offset else "wb") as f:
+                blob.download_to_file(f, start=offset or None)
+
+        self._download_resources(metadata, storage_dir, fetch)
 
     @util.preserve_random_state
     def delete(self, metadata: StorageMetadata) -> None:
@@ -112,3 +117,54 @@ class GCSStorageManager(StorageManager):
             blob_name = "{}/{}".format(metadata.storage_id, rel_path)
             blob = self.bucket.blob(blob_name)
             blob.delete()
+
+    def delete_many(
+        self, metadata: List[StorageMetadata], max_workers: int = 8
+    ) -> Iterator[Tuple[StorageMetadata, Optional[Exception]]]:
+        """
+        Delete many checkpoints from GCS, packing blobs from all of the checkpoints into batch
+        requests of up to 100 deletions each. If a batch fails, its blobs are deleted one at a
+        time so that failures can be attributed to individual checkpoints; blobs that are already
+        gone are not treated as failures.
+
+        The batches are sent sequentially, because a GCS client only tracks one batch at a time, so
+        `max_workers` is unused.
+        """
+        blobs = [
+            (m.storage_id, "{}/{}".format(m.storage_id, rel_path))
+            for m in metadata
+            for rel_path in m.resources.keys()
+        ]
+        by_id = {m.storage_id: m for m in metadata}
+        pending = {m.storage_id: 0 for m in metadata}  # type: Dict[str, int]
+        errors = {}  # type: Dict[str, Exception]
+        for storage_id, _ in blobs:
+            pending[storage_id] += 1
+
+        for storage_id, count in pending.items():
+            if count == 0:
+                yield by_id[storage_id], None
+
+        for chunk in util.chunks(blobs, _MAX_BATCH_SIZE):
+            logging.debug("Deleting {} blobs from GCS".format(len(chunk)))
+            try:
+                with self.client.batch():
+                    for _, blob_name in chunk:
+                        self.bucket.blob(blob_name).delete()
+            except Exception as e:
+                logging.warning(
+                    "Batch deletion of {} blobs from GCS failed ({}), retrying one at a "
+                    "time".format(len(chunk), e)
+                )
+                for storage_id, blob_name in chunk:
+                    try:
+                        self.bucket.blob(blob_name).delete()
+                    except google.api_core.exceptions.NotFound:
+                        pass
+                    except Exception as e:
+                        errors.setdefault(storage_id, e)
+
+            for storage_id, _ in chunk:
+                pending[storage_id] -= 1
+                if pending[storage_id] == 0:
+                    yield by_id[storage_id], errors.get(storage_id)
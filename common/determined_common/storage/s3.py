@@ -1,15 +1,26 @@
+import concurrent.futures
 import contextlib
 import logging
 import os
+import shutil
 import tempfile
-from typing import Iterator, Optional
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
 
 import boto3
 import requests
+from boto3.s3.transfer import TransferConfig
 
 from determined_common import util
 from determined_common.storage.base import StorageManager, StorageMetadata
 
+# S3 delete_objects has a limit of 1000 objects.
+_MAX_DELETE_OBJECTS = 1000
+
+# Files are downloaded with boto3's managed transfers, which fetch large files in concurrent
+# parts. Only the rest of a partially downloaded file is fetched with a single ranged GET.
+_TRANSFER_CONFIG = TransferConfig()
+_DOWNLOAD_CHUNK_SIZE = 1 << 20
+
 
 class S3StorageManager(StorageManager):
     """
@@ -52,7 +63,7 @@ class S3StorageManager(StorageManager):
         """post_store_path uploads the checkpoint to s3 and deletes the original files."""
         try:
             logging.info("Uploading checkpoint {} to s3".format(storage_id))
-            self.upload(metadata, storage_dir)
+            self._upload_with_checksum_manifest(metadata, storage_dir, self.upload)
         finally:
             self._remove_checkpoint_directory(metadata.storage_id)
 
@@ -95,21 +106,28 @@ class S3StorageManager(StorageManager):
 
     @util.preserve_random_state
     def download(self, metadata: StorageMetadata, storage_dir: str) -> None:
-        for rel_path in metadata.resources.keys():
-            abs_path = os.path.join(storage_dir, rel_path)
-
-            os.makedirs(os.path.dirname(abs_path), exist_ok=True)
-
-            # Only create empty directory for keys that end with "/".
-            # See `upload` method for more context.
-            if rel_path.endswith("/"):
-                continue
+        """
+        Download a checkpoint into `storage_dir`. Files that are already present and match the
+        checkpoint's checksums are skipped and partially downloaded files are resumed with ranged
+        GETs; see StorageManager._download_resources.
+        """
 
+        def fetch(rel_path: str, path: str, offset: int) -> None:
             key_name = "{}/{}".format(metadata.storage_id, rel_path)
             url = "s3://{}/{}".format(self.bucket, key_name)
             logging.debug("Downloading {} from {}".format(url, rel_path))
 
-            self.client.download_file(self.bucket, key_name, abs_path)
+            if offset == 0:
+                self.client.download_file(self.bucket, key_name, path, Config=_TRANSFER_CONFIG)
+                return
+
+            body = self.client.get_object(
+                Bucket=self.bucket, Key=key_name, Range="bytes={}-".format(offset)
+            )["Body"]
+            with open(path, "ab") as f:
+                shutil.copyfileobj(body, f, _DOWNLOAD_CHUNK_SIZE)
+
+        self._download_resources(metadata, storage_dir, fetch)
 
     @util.preserve_random_state
     def delete(self, metadata: StorageMetadata) -> None:
@@ -120,7 +138,73 @@ class S3StorageManager(StorageManager):
             for rel_path in metadata.resources.keys()
         ]
 
-        # S3 delete_objects has a limit of 1000 objects.
-        for chunk in util.chunks(objects, 1000):
+        for chunk in util.chunks(objects, _MAX_DELETE_OBJECTS):
             logging.debug("Deleting {} objects from S3".format(len(chunk)))
             self.client.delete_objects(Bucket=self.bucket, Delete={"Objects": chunk})
+
+    @util.preserve_random_state
+    def delete_many(
+        self, metadata: List[StorageMetadata], max_workers: int = 8
+    ) -> Iterator[Tuple[StorageMetadata, Optional[Exception]]]:
+        """
+        Delete many checkpoints from S3. Keys from all of the checkpoints are packed into full
+        1000-key delete_objects requests, which are issued from a pool of `max_workers` threads. A
+        checkpoint is yielded once every request containing one of its keys has completed.
+        """
+        objects = [
+            (m.storage_id, {"Key": "{}/{}".format(m.storage_id, rel_path)})
+            for m in metadata
+            for rel_path in m.resources.keys()
+        ]
+        chunks = list(util.chunks(objects, _MAX_DELETE_OBJECTS))
+
+        by_id = {m.storage_id: m for m in metadata}
+        pending = {m.storage_id: 0 for m in metadata}  # type: Dict[str, int]
+        errors = {}  # type: Dict[str, Exception]
+        for chunk in chunks:
+            for storage_id in {storage_id for storage_id, _ in chunk}:
+                pending[storage_id] += 1
+
+        # Checkpoints without any resources have nothing to delete.
+        for storage_id, count in pending.items():
+            if count == 0:
+                yield by_id[storage_id], None
+
+        # The random state is preserved around the whole call rather than in each worker, whose
+        # saves and restores of the global state would race with each other.
+        def delete_chunk(chunk: Sequence[Tuple[str, Dict[str, str]]]) -> Dict[str, str]:
+            logging.debug("Deleting {} objects from S3".format(len(chunk)))
+            response = self.client.delete_objects(
+                Bucket=self.bucket, Delete={"Objects": [obj for _, obj in chunk]}
+            )
+            # delete_objects reports per-key failures in the response rather than raising.
+            return {
+                err["Key"]: "{}: {}".format(err.get("Code"), err.get("Message"))
+                for err in (response or {}).get("Errors", [])
+            }
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(delete_chunk, chunk): chunk for chunk in chunks}
+            for future in concurrent.futures.as_completed(futures):
+                chunk = futures[future]
+                try:
+                    key_errors = future.result()
+                except Exception as e:
+                    for storage_id, _ in chunk:
+                        errors.setdefault(storage_id, e)
+                else:
+                    for storage_id, obj in chunk:
+                        if obj["Key"] in key_errors:
+                            errors.setdefault(
+                                storage_id,
+                                Exception(
+                                    "Failed to delete {} from S3: {}".format(
+                                        obj["Key"], key_errors[obj["Key"]]
+                                    )
+                                ),
+                            )
+
+                for storage_id in {storage_id for storage_id, _ in chunk}:
+                    pending[storage_id] -= 1
+                    if pending[storage_id] == 0:
+                        yield by_id[storage_id], errors.get(storage_id)
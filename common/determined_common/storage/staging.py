@@ -0,0 +1,143 @@
+"""
+Staging of files into checkpoint directories without copying their contents where possible.
+
+Each file is staged with the cheapest method that the filesystem supports:
+
+- a reflink (``FICLONE``), a copy-on-write clone that shares the data blocks of the original
+  file until either of them is modified, which is supported by filesystems like btrfs and XFS;
+- a hardlink, which shares the file itself, so it is only used where the caller guarantees that
+  neither the original file nor the staged file is ever modified in place;
+- a copy, made in parallel with the copies of the other files of a tree.
+"""
+import concurrent.futures
+import errno
+import logging
+import os
+import shutil
+from typing import Callable, Iterable, List, Optional, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    # Reflinks are only supported on Linux.
+    fcntl = None  # type: ignore
+
+# The FICLONE ioctl from linux/fs.h.
+FICLONE = 0x40049409
+
+DEFAULT_MAX_WORKERS = 8
+
+# Errors that mean that a method of staging is not supported between the two paths, as opposed
+# to errors with the files themselves.
+_UNSUPPORTED_ERRNOS = {
+    errno.EXDEV,
+    errno.EPERM,
+    errno.EINVAL,
+    errno.ENOTTY,
+    errno.EOPNOTSUPP,
+    errno.EMLINK,
+    errno.EBADF,
+}
+
+REFLINK = "reflink"
+HARDLINK = "hardlink"
+COPY = "copy"
+
+
+def _reflink(src: str, dst: str) -> None:
+    if fcntl is None:
+        raise OSError(errno.EOPNOTSUPP, "reflinks are not supported on this platform")
+    with open(src, "rb") as s, open(dst, "wb") as d:
+        fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+    shutil.copystat(src, dst)
+
+
+def stage_file(src: str, dst: str, allow_hardlink: bool = False) -> str:
+    """
+    Stage the file src at dst, which must not exist, and return the method that was used: one of
+    REFLINK, HARDLINK or COPY.
+    """
+    try:
+        _reflink(src, dst)
+        return REFLINK
+    except OSError as e:
+        if e.errno not in _UNSUPPORTED_ERRNOS:
+            raise
+        if os.path.exists(dst):
+            os.unlink(dst)
+
+    if allow_hardlink:
+        try:
+            os.link(src, dst)
+            return HARDLINK
+        except OSError as e:
+            if e.errno not in _UNSUPPORTED_ERRNOS:
+                raise
+
+    shutil.copy2(src, dst)
+    return COPY
+
+
+def _list_tree(
+    src: str, ignore: Optional[Callable[[str, List[str]], Set[str]]]
+) -> Tuple[List[str], List[str]]:
+    dirs = []  # type: List[str]
+    files = []  # type: List[str]
+    for root, dirnames, filenames in os.walk(src, followlinks=True):
+        ignored = ignore(root, dirnames + filenames) if ignore is not None else set()
+        dirnames[:] = [d for d in dirnames if d not in ignored]
+        rel_root = os.path.relpath(root, src)
+        dirs.extend(os.path.normpath(os.path.join(rel_root, d)) for d in dirnames)
+        files.extend(
+            os.path.normpath(os.path.join(rel_root, f)) for f in filenames if f not in ignored
+        )
+    return dirs, files
+
+
+def stage_tree(
+    src: str,
+    dst: str,
+    files: Optional[Iterable[str]] = None,
+    ignore: Optional[Callable[[str, List[str]], Set[str]]] = None,
+    allow_hardlinks: bool = False,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> None:
+    """
+    Stage the directory src at dst, like shutil.copytree.
+
+    Arguments:
+        src: The directory to stage.
+        dst: The directory to create; its parents are created as needed.
+        files: If set, only these paths relative to src are staged, instead of the whole tree.
+        ignore: A callable like the ones returned by shutil.ignore_patterns.
+        allow_hardlinks: Whether files may be hardlinked. Only set this when the files of src
+            and dst are replaced rather than modified in place.
+        max_workers: The number of files that are staged concurrently.
+    """
+    if files is None:
+        dirs, rel_files = _list_tree(src, ignore)
+    else:
+        rel_files = [os.path.normpath(f) for f in files]
+        dirs = sorted({os.path.dirname(f) for f in rel_files} - {""})
+
+    os.makedirs(dst)
+    for d in dirs:
+        os.makedirs(os.path.join(dst, d), exist_ok=True)
+
+    def _stage(rel_path: str) -> str:
+        return stage_file(
+            os.path.join(src, rel_path), os.path.join(dst, rel_path), allow_hardlink=allow_hardlinks
+        )
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        methods = list(executor.map(_stage, rel_files))
+
+    for d in [*reversed(dirs), os.curdir]:
+        shutil.copystat(os.path.join(src, d), os.path.join(dst, d))
+
+    logging.debug(
+        "Staged %s to %s: %s.",
+        src,
+        dst,
+        ", ".join(f"{methods.count(m)} by {m}" for m in (REFLINK, HARDLINK, COPY)),
+    )
@@ -1,4 +1,5 @@
 import functools
+import inspect
 import os
 import random
 from typing import Any, Callable, Iterator, Sequence, TypeVar, Union, overload
@@ -47,7 +48,22 @@ def debug_mode() -> bool:
 
 
 def preserve_random_state(fn: Callable) -> Callable:
-    """A decorator to run a function with a fork of the random state."""
+    """
+    A decorator to run a function with a fork of the random state. The state of a generator
+    function is restored once the generator is exhausted or closed.
+    """
+
+    if inspect.isgeneratorfunction(fn):
+
+        @functools.wraps(fn)
+        def wrapped_generator(*arg: Any, **kwarg: Any) -> Iterator[Any]:
+            state = random.getstate()
+            try:
+                yield from fn(*arg, **kwarg)
+            finally:
+                random.setstate(state)
+
+        return wrapped_generator
 
     @functools.wraps(fn)
     def wrapped(*arg: Any, **kwarg: Any) -> Any:
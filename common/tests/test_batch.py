@@ -0,0 +1,73 @@
+import threading
+import time
+from typing import List
+
+import pytest
+
+from determined_common.batch import BatchError, BatchExecutor, RateLimiter
+
+
+def test_results_are_in_order() -> None:
+    def _slow_for_small(i: int) -> int:
+        time.sleep(0.01 * (10 - i))
+        return i * i
+
+    results = list(BatchExecutor(parallelism=4).map(_slow_for_small, range(10)))
+    assert [r.item for r in results] == list(range(10))
+    assert [r.value for r in results] == [i * i for i in range(10)]
+
+
+def test_parallelism_is_bounded() -> None:
+    lock = threading.Lock()
+    running = [0]
+    most = [0]
+
+    def _track(i: int) -> int:
+        with lock:
+            running[0] += 1
+            most[0] = max(most[0], running[0])
+        time.sleep(0.01)
+        with lock:
+            running[0] -= 1
+        return i
+
+    assert BatchExecutor(parallelism=3).run(_track, range(20)) == list(range(20))
+    assert most[0] <= 3
+
+
+def test_errors_are_collected() -> None:
+    def _fail_on_odd(i: int) -> int:
+        if i % 2:
+            raise ValueError(i)
+        return i
+
+    results = list(BatchExecutor(parallelism=2).map(_fail_on_odd, range(6)))
+    assert [r.ok for r in results] == [True, False] * 3
+    assert [r.value for r in results if r.ok] == [0, 2, 4]
+
+    with pytest.raises(BatchError) as e:
+        BatchExecutor(parallelism=2).run(_fail_on_odd, range(6))
+    assert [f.item for f in e.value.failures] == [1, 3, 5]
+
+
+def test_stop_on_error_skips_later_items() -> None:
+    started = []  # type: List[int]
+
+    def _fail_first(i: int) -> int:
+        started.append(i)
+        if i == 0:
+            raise ValueError(i)
+        return i
+
+    results = list(BatchExecutor(parallelism=1, stop_on_error=True).map(_fail_first, range(5)))
+    assert results[0].error is not None
+    assert all(r.skipped for r in results[1:])
+    assert started == [0]
+
+
+def test_rate_limiter() -> None:
+    limiter = RateLimiter(rate=100, burst=1)
+    start = time.monotonic()
+    for _ in range(11):
+        limiter.acquire()
+    assert time.monotonic() - start >= 0.09
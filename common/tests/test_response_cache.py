@@ -0,0 +1,85 @@
+import time
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+import requests_mock
+from _pytest.monkeypatch import MonkeyPatch
+
+from determined_common import api
+from determined_common.api import authentication
+
+MASTER = "http://master:8080"
+
+
+@pytest.fixture
+def response_cache(tmp_path: Path, monkeypatch: MonkeyPatch) -> Iterator[None]:
+    monkeypatch.setattr(authentication, "get_config_path", lambda: tmp_path)
+    api.enable_response_cache(ttl=60)
+    yield
+    api.disable_response_cache()
+
+
+def test_fresh_responses_are_reused(
+    requests_mock: requests_mock.Mocker, response_cache: None
+) -> None:
+    requests_mock.get("/experiments", json=[{"id": 1}])
+    requests_mock.get("/experiments?archived=true", json=[{"id": 2}])
+
+    assert api.get(MASTER, "experiments", authenticated=False).json() == [{"id": 1}]
+    assert api.get(MASTER, "experiments", authenticated=False).json() == [{"id": 1}]
+    assert requests_mock.call_count == 1
+
+    # Different query parameters and credentials are cached separately.
+    assert api.get(
+        MASTER, "experiments", params={"archived": "true"}, authenticated=False
+    ).json() == [{"id": 2}]
+    api.get(MASTER, "experiments", headers={"Authorization": "Bearer x"}, authenticated=False)
+    assert requests_mock.call_count == 3
+
+
+def test_stale_responses_are_revalidated(
+    requests_mock: requests_mock.Mocker, response_cache: None
+) -> None:
+    api.enable_response_cache(ttl=0)
+    requests_mock.get("/models", json={"models": []}, headers={"ETag": '"v1"'})
+    assert api.get(MASTER, "models", authenticated=False).json() == {"models": []}
+
+    requests_mock.get("/models", status_code=304)
+    assert api.get(MASTER, "models", authenticated=False).json() == {"models": []}
+    assert requests_mock.last_request is not None
+    assert requests_mock.last_request.headers["If-None-Match"] == '"v1"'
+
+    # A response without validators is simply refetched.
+    requests_mock.get("/models", json={"models": [1]})
+    assert api.get(MASTER, "models", authenticated=False).json() == {"models": [1]}
+
+
+def test_other_requests_clear_the_cache(
+    requests_mock: requests_mock.Mocker, response_cache: None
+) -> None:
+    requests_mock.get("/experiments", json=[])
+    requests_mock.post("/experiments", status_code=201)
+
+    api.get(MASTER, "experiments", authenticated=False)
+    api.post(MASTER, "experiments", body={}, authenticated=False)
+    api.get(MASTER, "experiments", authenticated=False)
+    assert requests_mock.call_count == 3
+
+    # Streamed responses are never cached.
+    api.get(MASTER, "experiments", authenticated=False, stream=True)
+    api.get(MASTER, "experiments", authenticated=False, stream=True)
+    assert requests_mock.call_count == 5
+
+
+def test_token_validity_window(requests_mock: requests_mock.Mocker, response_cache: None) -> None:
+    api.enable_response_cache(ttl=0)
+    requests_mock.get("/users/me", json={"username": "determined"})
+
+    assert authentication._is_token_valid(MASTER, "token")
+    time.sleep(0.01)
+    assert authentication._is_token_valid(MASTER, "token")
+    assert requests_mock.call_count == 1
+
+    assert authentication._is_token_valid(MASTER, "other-token")
+    assert requests_mock.call_count == 2
@@ -1,16 +1,10 @@
 import sys
-import time
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import boto3
-import tqdm
-from botocore.exceptions import ClientError, WaiterError
+from botocore.exceptions import ClientError
 
-from determined_deploy.aws import constants
-
-# Try waiting for stack to delete this many times. We break up the waiting so the delete job
-# will not fail CI.
-NUM_WAITS = 5
+from determined_deploy.aws import constants, teardown
 
 
 def get_user(boto3_session: boto3.session.Session) -> str:
@@ -22,60 +16,41 @@ def get_user(boto3_session: boto3.session.Session) -> str:
 
 
 def stop_master(master_id: str, boto3_session: boto3.session.Session) -> None:
-    ec2 = boto3_session.client("ec2")
-    waiter = ec2.get_waiter("instance_stopped")
-    ec2.stop_instances(InstanceIds=[master_id])
-    ec2.modify_instance_attribute(
-        Attribute="disableApiTermination", Value="false", InstanceId=master_id
-    )
-
-    for n in range(NUM_WAITS):
-        print("Waiting For Master Instance To Stop")
-        try:
-            waiter.wait(InstanceIds=[master_id], WaiterConfig={"Delay": 10})
-            break
-        except WaiterError as e:
-            if n == NUM_WAITS - 1:
-                raise e
-
-    print("Master Instance Stopped")
+    with teardown.StackTeardown(boto3_session) as t:
+        t.stop_instance("Master", master_id)
 
 
 def delete(stack_name: str, boto3_session: boto3.session.Session) -> None:
-    ec2 = boto3_session.client("ec2")
-
-    # First, shut down the master so no new agents are started.
     stack_output = get_output(stack_name, boto3_session)
     master_id = stack_output[constants.cloudformation.MASTER_ID]
-    describe_instance_response = ec2.describe_instances(
-        Filters=[{"Name": "instance-id", "Values": [master_id]}],
-    )
-
-    if describe_instance_response["Reservations"]:
-        print("Stopping Master Instance")
-        stop_master(master_id, boto3_session)
+    bucket_name = stack_output.get(constants.cloudformation.CHECKPOINT_BUCKET)
+    tag_key, tag_val = get_management_tag_key_value(stack_name)
+    uses_spot = stack_uses_spot(stack_name, boto3_session)
 
-    # Second, terminate the agents so nothing can write to the checkpoint bucket. We create agent
-    # instances outside of cloudformation, so we have to manually terminate them.
-    if stack_uses_spot(stack_name, boto3_session):
-        print("Terminating Running Agents and Pending Spot Requests")
-        clean_up_spot(stack_name, boto3_session)
-        print("Agents and Spot Requests Terminated")
-    else:
-        print("Terminating Running Agents")
-        terminate_running_agents(
-            stack_output[constants.cloudformation.AGENT_TAG_NAME], boto3_session
+    with teardown.StackTeardown(boto3_session) as t:
+        # First, shut down the master so no new agents are started.
+        describe_instance_response = t.ec2.describe_instances(
+            Filters=[{"Name": "instance-id", "Values": [master_id]}],
         )
-        print("Agents Terminated")
+        if describe_instance_response["Reservations"]:
+            t.stop_instance("Master", master_id)
+
+        # Second, terminate the agents, which we create outside of cloudformation, and empty the
+        # bucket that was created for this stack at the same time.
+        steps = {}  # type: Dict[str, Callable[[], None]]
+        if uses_spot:
+            steps["Spot agents"] = lambda: t.clean_up_spot("Spot agents", tag_key, tag_val)
+        else:
+            agent_tag_name = stack_output[constants.cloudformation.AGENT_TAG_NAME]
+            steps["Agents"] = lambda: t.terminate_agents("Agents", agent_tag_name)
+        if bucket_name:
+            bucket = bucket_name
+            steps["Checkpoint bucket"] = lambda: t.empty_bucket("Checkpoint bucket", bucket)
+        t.run(steps)
 
-    # Third, empty the bucket that was created for this stack.
-    bucket_name = get_output(stack_name, boto3_session).get(
-        constants.cloudformation.CHECKPOINT_BUCKET
-    )
-    if bucket_name:
-        print("Emptying Checkpoint Bucket")
-        empty_bucket(bucket_name, boto3_session)
-        print("Checkpoint Bucket Empty")
+        # Agents may have written to the bucket until they were terminated.
+        if bucket_name:
+            t.empty_bucket("Checkpoint bucket", bucket_name)
 
     delete_stack(stack_name, boto3_session)
 
@@ -313,33 +288,8 @@ def check_keypair(name: str, boto3_session: boto3.session.Session) -> bool:
 
 
 def terminate_running_agents(agent_tag_name: str, boto3_session: boto3.session.Session) -> None:
-    ec2 = boto3_session.client("ec2")
-    waiter = ec2.get_waiter("instance_terminated")
-
-    response = ec2.describe_instances(
-        Filters=[
-            {"Name": "tag:Name", "Values": [agent_tag_name]},
-            {"Name": "instance-state-name", "Values": ["running", "pending"]},
-        ]
-    )
-
-    reservations = response["Reservations"]
-
-    instance_ids = []
-    for reservation in reservations:
-        for instance in reservation["Instances"]:
-            instance_ids.append(instance["InstanceId"])
-
-    if instance_ids:
-        ec2.terminate_instances(InstanceIds=instance_ids)
-        for n in range(NUM_WAITS):
-            print("Waiting For Agents To Terminate")
-            try:
-                waiter.wait(InstanceIds=instance_ids, WaiterConfig={"Delay": 10})
-                break
-            except WaiterError as e:
-                if n == NUM_WAITS - 1:
-                    raise e
+    with teardown.StackTeardown(boto3_session) as t:
+        t.terminate_agents("Agents", agent_tag_name)
 
 
 # EC2 Spot
@@ -380,89 +330,25 @@ def delete_spot_requests_and_agents(
     Returns the list of instance_ids that were deleted so at the end of spot
     cleanup, we can wait until all instances have been terminated.
     """
-    spot_reqs = list_spot_requests_for_stack(stack_name, boto3_session)
-    instances_to_del = []
-    requests_to_term = []
-    for req in spot_reqs:
-        if req["instanceId"] is not None:
-            instances_to_del.append(req["instanceId"])
-        else:
-            requests_to_term.append(req["id"])
-
-    ec2 = boto3_session.client("ec2")
-
-    if len(instances_to_del) > 0:
-        ec2.terminate_instances(InstanceIds=instances_to_del)
-
-    if len(requests_to_term) > 0:
-        ec2.cancel_spot_instance_requests(SpotInstanceRequestIds=requests_to_term)
-
-    return instances_to_del
+    tag_key, tag_val = get_management_tag_key_value(stack_name)
+    with teardown.StackTeardown(boto3_session) as t:
+        return t.delete_spot_requests_and_agents(tag_key, tag_val)
 
 
 def clean_up_spot(
     stack_name: str, boto3_session: boto3.session.Session, disable_tqdm: bool = False
 ) -> None:
-
-    # The spot API is eventually consistent and the only way to guarantee
-    # that we don't leave any spot requests alive (that may eventually be
-    # fulfilled and lead to running EC2 instances) is to wait a long enough
-    # period that any created spot requests will have shown up in the API.
-    # 60 seconds seems like a relatively safe amount of time.
-    SPOT_WAIT_SECONDS = 60
-
-    start_time = time.time()
-
-    all_terminated_instance_ids = set()
-
-    format_str = "{l_bar}{bar}| (remaining time: {remaining})"
-    pbar = tqdm.tqdm(
-        total=SPOT_WAIT_SECONDS,
-        desc="Cleaning up spot instances and spot instance requests",
-        bar_format=format_str,
-        disable=disable_tqdm,
-    )
-    progress_bar_state = 0.0
-    while True:
-        elapsed_time = time.time() - start_time
-        if elapsed_time >= SPOT_WAIT_SECONDS:
-            pbar.update(SPOT_WAIT_SECONDS - progress_bar_state)  # Exit TQDM with it showing 100%
-            pbar.close()
-            break
-
-        tqdm_update = elapsed_time - progress_bar_state
-        pbar.update(tqdm_update)
-        progress_bar_state = elapsed_time
-
-        instance_ids = delete_spot_requests_and_agents(stack_name, boto3_session)
-        for i in instance_ids:
-            all_terminated_instance_ids.add(i)
-
-    # Final cleanup
-    instance_ids = delete_spot_requests_and_agents(stack_name, boto3_session)
-    for i in instance_ids:
-        all_terminated_instance_ids.add(i)
-
-    if len(instance_ids) > 0:
-        ec2 = boto3_session.client("ec2")
-        waiter = ec2.get_waiter("instance_terminated")
-        for n in range(NUM_WAITS):
-            print("Waiting For Spot Agents To Terminate")
-            try:
-                waiter.wait(InstanceIds=instance_ids, WaiterConfig={"Delay": 10})
-                break
-            except WaiterError as e:
-                if n == NUM_WAITS - 1:
-                    raise e
+    """
+    Clean up the spot instances and spot instance requests of a stack. disable_tqdm keeps its
+    name from when progress was shown with tqdm; it hides the status line.
+    """
+    tag_key, tag_val = get_management_tag_key_value(stack_name)
+    status = teardown.TeardownStatus(quiet=disable_tqdm)
+    with teardown.StackTeardown(boto3_session, status=status) as t:
+        t.clean_up_spot("Spot agents", tag_key, tag_val)
 
 
 # S3
 def empty_bucket(bucket_name: str, boto3_session: boto3.session.Session) -> None:
-    s3 = boto3_session.resource("s3")
-    try:
-        bucket = s3.Bucket(bucket_name)
-        bucket.objects.all().delete()
-
-    except ClientError as e:
-        if e.response["Error"]["Code"] != "NoSuchBucket":
-            raise e
+    with teardown.StackTeardown(boto3_session) as t:
+        t.empty_bucket("Checkpoint bucket", bucket_name)
@@ -0,0 +1,302 @@
+"""
+Concurrent teardown of the resources of a stack that CloudFormation does not delete by itself:
+the agent instances and spot requests that the master creates, and the objects in the checkpoint
+bucket.
+
+Independent steps run concurrently, and the requests of each step are batched and spread over a
+shared thread pool: instances are terminated and spot requests are cancelled 1000 at a time, and
+the checkpoint bucket is emptied one page of 1000 keys at a time. Steps that wait for AWS poll
+with exponential backoff, and the progress of every step is shown on a single status line.
+"""
+import collections
+import concurrent.futures
+import sys
+import threading
+import time
+from typing import IO, Any, Callable, Dict, List, Optional, Sequence, Set
+
+import boto3
+from botocore.exceptions import ClientError
+
+from determined_common.util import chunks
+
+# The most instance IDs, spot request IDs or object keys that a single request accepts.
+BATCH_SIZE = 1000
+
+DEFAULT_MAX_WORKERS = 16
+
+# How long to wait for instances to reach a state before giving up, in seconds.
+DEFAULT_TIMEOUT = 30 * 60
+
+# The spot API is eventually consistent and the only way to guarantee that we don't leave any spot
+# requests alive (that may eventually be fulfilled and lead to running EC2 instances) is to keep
+# cleaning up for long enough that any created spot requests will have shown up in the API. 60
+# seconds seems like a relatively safe amount of time.
+SPOT_WAIT_SECONDS = 60
+
+
+def poll_with_backoff(
+    poll: Callable[[], bool],
+    timeout: float = DEFAULT_TIMEOUT,
+    initial_delay: float = 1.0,
+    max_delay: float = 30.0,
+) -> None:
+    """
+    Call poll until it returns True, sleeping twice as long after each call, up to max_delay.
+    Raise TimeoutError if it has not returned True after timeout seconds.
+    """
+    deadline = time.time() + timeout
+    delay = initial_delay
+    while not poll():
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            raise TimeoutError(f"Timed out after {timeout} seconds")
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, max_delay)
+
+
+class TeardownStatus:
+    """
+    The state of every step of a teardown, shown on one line that is rewritten in place on a
+    terminal, or printed again whenever it changes otherwise.
+    """
+
+    def __init__(self, out: IO[str] = sys.stdout, quiet: bool = False) -> None:
+        self._out = out
+        self._quiet = quiet
+        self._lock = threading.Lock()
+        self._states = collections.OrderedDict()  # type: Dict[str, str]
+
+    def update(self, step: str, state: str) -> None:
+        with self._lock:
+            if self._states.get(step) == state:
+                return
+            self._states[step] = state
+            if self._quiet:
+                return
+            line = " | ".join(f"{s}: {v}" for s, v in self._states.items())
+            if self._out.isatty():
+                self._out.write("\r\x1b[K" + line)
+            else:
+                self._out.write(line + "\n")
+            self._out.flush()
+
+    def get(self, step: str) -> Optional[str]:
+        with self._lock:
+            return self._states.get(step)
+
+    def finish(self) -> None:
+        with self._lock:
+            if not self._quiet and self._states and self._out.isatty():
+                self._out.write("\n")
+                self._out.flush()
+
+
+class StackTeardown:
+    def __init__(
+        self,
+        boto3_session: boto3.session.Session,
+        status: Optional[TeardownStatus] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        timeout: float = DEFAULT_TIMEOUT,
+        initial_delay: float = 1.0,
+        max_delay: float = 30.0,
+        spot_wait_seconds: float = SPOT_WAIT_SECONDS,
+    ) -> None:
+        # Clients, unlike resources, may be shared between threads.
+        self.ec2 = boto3_session.client("ec2")
+        self.s3 = boto3_session.client("s3")
+        self.status = status or TeardownStatus()
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.spot_wait_seconds = spot_wait_seconds
+        self._executor = None  # type: Optional[concurrent.futures.ThreadPoolExecutor]
+
+    def __enter__(self) -> "StackTeardown":
+        # Batches of requests run on this pool; steps run on threads of their own, so that a step
+        # waiting for its batches never holds a thread that the batches need.
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers)
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        self.status.finish()
+
+    def _submit_batches(
+        self, fn: Callable[[Sequence[str]], Any], items: Sequence[str]
+    ) -> List[concurrent.futures.Future]:
+        assert self._executor is not None, "StackTeardown must be used as a context manager"
+        return [self._executor.submit(fn, batch) for batch in chunks(items, BATCH_SIZE)]
+
+    def _map(self, fn: Callable[[Sequence[str]], Any], items: Sequence[str]) -> List[Any]:
+        return [future.result() for future in self._submit_batches(fn, items)]
+
+    def _poll(self, poll: Callable[[], bool]) -> None:
+        poll_with_backoff(poll, self.timeout, self.initial_delay, self.max_delay)
+
+    def run(self, steps: Dict[str, Callable[[], None]]) -> None:
+        """Run independent steps concurrently, and raise the first error of any of them."""
+        errors = []  # type: List[BaseException]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(len(steps), 1)) as executor:
+            futures = {executor.submit(fn): name for name, fn in steps.items()}
+            for future in concurrent.futures.as_completed(futures):
+                error = future.exception()
+                if error is not None:
+                    self.status.update(futures[future], f"failed ({error})")
+                    errors.append(error)
+        if errors:
+            raise errors[0]
+
+    # EC2
+
+    def _instance_states(self, instance_ids: Sequence[str]) -> Dict[str, str]:
+        def _describe(batch: Sequence[str]) -> Dict[str, str]:
+            paginator = self.ec2.get_paginator("describe_instances")
+            states = {}
+            for page in paginator.paginate(
+                Filters=[{"Name": "instance-id", "Values": list(batch)}]
+            ):
+                for reservation in page["Reservations"]:
+                    for instance in reservation["Instances"]:
+                        states[instance["InstanceId"]] = instance["State"]["Name"]
+            return states
+
+        states = {}  # type: Dict[str, str]
+        for batch_states in self._map(_describe, instance_ids):
+            states.update(batch_states)
+        return states
+
+    def wait_for_instances(self, step: str, instance_ids: Sequence[str], state: str) -> None:
+        """Wait until every instance has reached the state "stopped" or "terminated"."""
+        if not instance_ids:
+            self.status.update(step, "done")
+            return
+
+        def _poll() -> bool:
+            states = self._instance_states(instance_ids)
+            # Instances that no longer show up at all are long gone.
+            done = sum(states.get(i, "terminated") in (state, "terminated") for i in instance_ids)
+            self.status.update(step, f"{done}/{len(instance_ids)} {state}")
+            return done == len(instance_ids)
+
+        self._poll(_poll)
+        self.status.update(step, "done")
+
+    def stop_instance(self, step: str, instance_id: str) -> None:
+        self.status.update(step, "stopping")
+        self.ec2.stop_instances(InstanceIds=[instance_id])
+        self.ec2.modify_instance_attribute(
+            Attribute="disableApiTermination", Value="false", InstanceId=instance_id
+        )
+        self.wait_for_instances(step, [instance_id], "stopped")
+
+    def terminate_instances(self, instance_ids: Sequence[str]) -> None:
+        self._map(lambda batch: self.ec2.terminate_instances(InstanceIds=list(batch)), instance_ids)
+
+    def terminate_agents(self, step: str, agent_tag_name: str) -> None:
+        self.status.update(step, "listing")
+        paginator = self.ec2.get_paginator("describe_instances")
+        instance_ids = [
+            instance["InstanceId"]
+            for page in paginator.paginate(
+                Filters=[
+                    {"Name": "tag:Name", "Values": [agent_tag_name]},
+                    {"Name": "instance-state-name", "Values": ["running", "pending"]},
+                ]
+            )
+            for reservation in page["Reservations"]
+            for instance in reservation["Instances"]
+        ]
+        self.terminate_instances(instance_ids)
+        self.wait_for_instances(step, instance_ids, "terminated")
+
+    # EC2 Spot
+
+    def delete_spot_requests_and_agents(self, tag_key: str, tag_val: str) -> List[str]:
+        """
+        Terminate the instances of the spot requests that have one, which cancels the requests
+        too, and cancel the other requests, concurrently. Return the IDs of the instances.
+        """
+        paginator = self.ec2.get_paginator("describe_spot_instance_requests")
+        instance_ids = []
+        request_ids = []
+        for page in paginator.paginate(
+            Filters=[
+                {"Name": f"tag:{tag_key}", "Values": [tag_val]},
+                {"Name": "state", "Values": ["open", "active"]},
+            ]
+        ):
+            for request in page["SpotInstanceRequests"]:
+                if request.get("InstanceId"):
+                    instance_ids.append(request["InstanceId"])
+                else:
+                    request_ids.append(request["SpotInstanceRequestId"])
+
+        futures = self._submit_batches(
+            lambda batch: self.ec2.terminate_instances(InstanceIds=list(batch)), instance_ids
+        ) + self._submit_batches(
+            lambda batch: self.ec2.cancel_spot_instance_requests(
+                SpotInstanceRequestIds=list(batch)
+            ),
+            request_ids,
+        )
+        for future in futures:
+            future.result()
+        return instance_ids
+
+    def clean_up_spot(self, step: str, tag_key: str, tag_val: str) -> None:
+        start = time.time()
+        terminated = set()  # type: Set[str]
+
+        def _poll() -> bool:
+            elapsed = time.time() - start
+            terminated.update(self.delete_spot_requests_and_agents(tag_key, tag_val))
+            self.status.update(
+                step,
+                f"{len(terminated)} instances terminated, "
+                f"{max(self.spot_wait_seconds - elapsed, 0):.0f}s left",
+            )
+            return elapsed >= self.spot_wait_seconds
+
+        # Clean up once more after the whole waiting period has passed.
+        self._poll(_poll)
+        self.wait_for_instances(step, sorted(terminated), "terminated")
+
+    # S3
+
+    def empty_bucket(self, step: str, bucket_name: str) -> None:
+        deleted = 0
+        lock = threading.Lock()
+
+        def _delete(batch: Sequence[str]) -> None:
+            nonlocal deleted
+            response = self.s3.delete_objects(
+                Bucket=bucket_name,
+                Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+            )
+            if response.get("Errors"):
+                error = response["Errors"][0]
+                raise Exception(f"Failed to delete {error['Key']}: {error['Message']}")
+            with lock:
+                deleted += len(batch)
+                self.status.update(step, f"{deleted} objects deleted")
+
+        self.status.update(step, "listing")
+        futures = []  # type: List[concurrent.futures.Future]
+        try:
+            paginator = self.s3.get_paginator("list_objects_v2")
+            for page in paginator.paginate(
+                Bucket=bucket_name, PaginationConfig={"PageSize": BATCH_SIZE}
+            ):
+                keys = [obj["Key"] for obj in page.get("Contents", [])]
+                futures.extend(self._submit_batches(_delete, keys))
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "NoSuchBucket":
+                raise e
+        for future in futures:
+            future.result()
+        self.status.update(step, f"done, {deleted} objects deleted")
@@ -0,0 +1,135 @@
+import io
+from typing import Any, Iterator
+
+import boto3
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+
+from determined_deploy.aws import teardown
+
+moto = pytest.importorskip("moto")
+
+REGION = "us-west-2"
+AMI = "ami-12c6146b"
+
+
+@pytest.fixture
+def session(monkeypatch: MonkeyPatch) -> Iterator[boto3.session.Session]:
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with moto.mock_aws():
+        yield boto3.session.Session(region_name=REGION)
+
+
+def _make_teardown(session: boto3.session.Session, out: Any) -> teardown.StackTeardown:
+    return teardown.StackTeardown(
+        session,
+        status=teardown.TeardownStatus(out=out),
+        initial_delay=0.01,
+        max_delay=0.05,
+        timeout=10,
+        spot_wait_seconds=0.1,
+    )
+
+
+def _run_agents(ec2: Any, count: int, name: str) -> Any:
+    return ec2.run_instances(
+        ImageId=AMI,
+        MinCount=count,
+        MaxCount=count,
+        TagSpecifications=[{"ResourceType": "instance", "Tags": [{"Key": "Name", "Value": name}]}],
+    )
+
+
+def test_poll_with_backoff() -> None:
+    calls = []
+
+    def _poll() -> bool:
+        calls.append(1)
+        return len(calls) == 4
+
+    teardown.poll_with_backoff(_poll, timeout=5, initial_delay=0.001)
+    assert len(calls) == 4
+
+    with pytest.raises(TimeoutError):
+        teardown.poll_with_backoff(lambda: False, timeout=0.05, initial_delay=0.01)
+
+
+def test_teardown(session: boto3.session.Session) -> None:
+    ec2 = session.client("ec2")
+    agents = _run_agents(ec2, 5, "det-agent")
+    other = _run_agents(ec2, 1, "other")
+
+    s3 = session.client("s3")
+    s3.create_bucket(Bucket="checkpoints", CreateBucketConfiguration={"LocationConstraint": REGION})
+    for i in range(2100):
+        s3.put_object(Bucket="checkpoints", Key=f"checkpoint-{i}", Body=b"x")
+
+    out = io.StringIO()
+    with _make_teardown(session, out) as t:
+        t.run(
+            {
+                "Agents": lambda: t.terminate_agents("Agents", "det-agent"),
+                "Checkpoint bucket": lambda: t.empty_bucket("Checkpoint bucket", "checkpoints"),
+            }
+        )
+        # Emptying a bucket that is already empty or gone is fine.
+        t.empty_bucket("Checkpoint bucket", "checkpoints")
+        t.empty_bucket("Checkpoint bucket", "missing")
+
+    assert s3.list_objects_v2(Bucket="checkpoints")["KeyCount"] == 0
+
+    states = {
+        i["InstanceId"]: i["State"]["Name"]
+        for r in ec2.describe_instances()["Reservations"]
+        for i in r["Instances"]
+    }
+    assert all(states[i["InstanceId"]] == "terminated" for i in agents["Instances"])
+    assert states[other["Instances"][0]["InstanceId"]] == "running"
+
+    # Every update shows the state of every step.
+    assert "Agents: done | Checkpoint bucket: done, 2100 objects deleted\n" in out.getvalue()
+
+
+def test_stop_instance(session: boto3.session.Session) -> None:
+    ec2 = session.client("ec2")
+    master_id = _run_agents(ec2, 1, "det-master")["Instances"][0]["InstanceId"]
+
+    with _make_teardown(session, io.StringIO()) as t:
+        t.stop_instance("Master", master_id)
+        assert t.status.get("Master") == "done"
+
+    instance = ec2.describe_instances(InstanceIds=[master_id])["Reservations"][0]["Instances"][0]
+    assert instance["State"]["Name"] == "stopped"
+
+
+def test_clean_up_spot(session: boto3.session.Session) -> None:
+    ec2 = session.client("ec2")
+    ec2.request_spot_instances(
+        InstanceCount=3,
+        LaunchSpecification={"ImageId": AMI},
+        TagSpecifications=[
+            {
+                "ResourceType": "spot-instances-request",
+                "Tags": [{"Key": "det-stack", "Value": "det-agent-stack"}],
+            }
+        ],
+    )
+    ec2.request_spot_instances(InstanceCount=1, LaunchSpecification={"ImageId": AMI})
+    other_id = next(
+        r["InstanceId"]
+        for r in ec2.describe_spot_instance_requests()["SpotInstanceRequests"]
+        if not r.get("Tags")
+    )
+
+    with _make_teardown(session, io.StringIO()) as t:
+        t.clean_up_spot("Spot agents", "det-stack", "det-agent-stack")
+        assert t.status.get("Spot agents") == "done"
+
+    states = {
+        i["InstanceId"]: i["State"]["Name"]
+        for r in ec2.describe_instances()["Reservations"]
+        for i in r["Instances"]
+    }
+    assert sorted(states.values()) == ["running", "terminated", "terminated", "terminated"]
+    assert states[other_id] == "running"
@@ -5,18 +5,25 @@ from determined import _data_layer, horovod
 
 
 class DataLayerContext:
-    def __init__(self, env: det.EnvContext, hvd_config: horovod.HorovodContext) -> None:
+    def __init__(
+        self,
+        env: det.EnvContext,
+        hvd_config: horovod.HorovodContext,
+        output_records: bool = False,
+    ) -> None:
         self._training_cacheable = _data_layer._CacheableDecorator(
             env=env,
             hvd_config=hvd_config,
             training=True,
             per_slot_batch_size=env.per_slot_batch_size,
+            output_records=output_records,
         )
         self._validation_cacheable = _data_layer._CacheableDecorator(
             env=env,
             hvd_config=hvd_config,
             training=False,
             per_slot_batch_size=env.per_slot_batch_size,
+            output_records=output_records,
         )
 
     def cache_train_dataset(
@@ -10,6 +10,7 @@ from yogadl import storage, tensorflow
 
 import determined as det
 from determined import horovod
+from determined._data_layer import _records
 from determined.horovod import hvd
 from determined_common import check
 
@@ -37,11 +38,15 @@ class _CacheableDecorator:
         hvd_config: horovod.HorovodContext,
         training: bool,
         per_slot_batch_size: int,
+        output_records: bool = False,
     ) -> None:
         self._env = env
         self._hvd_config = hvd_config
         self._training = training
         self._per_slot_batch_size = per_slot_batch_size
+        # If set, decorated functions return a map-style _records.CachedDataset instead of a
+        # tf.data.Dataset, and sharding, offsets and shuffling are left to the data loader.
+        self._output_records = output_records
 
         self._offset = 0
         self._shard_rank = 0
@@ -92,7 +97,7 @@ class _CacheableDecorator:
             )
 
             storage_config = storage.LFSConfigurations(storage_dir_path=str(local_cache_path))
-            self._storage = storage.LFSStorage(storage_config, tensorflow_config=session_config)
+            self._storage = _records.LFSStorage(storage_config, tensorflow_config=session_config)
 
         elif data_layer_type == StorageTypes.S3.value:
             local_cache_dir_path = self._env.experiment_config["data_layer"].get(
@@ -115,7 +120,7 @@ class _CacheableDecorator:
                 coordinator_cert_file=self._env.master_cert_file,
                 coordinator_cert_name=self._env.master_cert_name,
             )
-            self._storage = storage.S3Storage(storage_config, tensorflow_config=session_config)
+            self._storage = _records.S3Storage(storage_config, tensorflow_config=session_config)
 
         elif data_layer_type == StorageTypes.GCS.value:
             local_cache_dir_path = self._env.experiment_config["data_layer"].get(
@@ -134,7 +139,7 @@ class _CacheableDecorator:
                 coordinator_cert_file=self._env.master_cert_file,
                 coordinator_cert_name=self._env.master_cert_name,
             )
-            self._storage = storage.GCSStorage(storage_config, tensorflow_config=session_config)
+            self._storage = _records.GCSStorage(storage_config, tensorflow_config=session_config)
 
         else:
             raise AssertionError(
@@ -185,6 +190,15 @@ class _CacheableDecorator:
                     return make_dataset_fn(*args, **kwargs)
 
                 logging.info(f"Preparing dataset: {dataset_id}:{dataset_version}.")
+                if self._output_records:
+                    make_dataset()
+                    dataset = _records.CachedDataset(
+                        self._storage.cache_filepath(dataset_id, dataset_version)
+                    )
+                    self._dataset_length = len(dataset)
+                    logging.info(f"Dataset {dataset_id}:{dataset_version} preparation finished.")
+                    return dataset
+
                 logging.debug(
                     f"Calling make dataset for: {dataset_id}:{dataset_version} "
                     f"with following start_offset: {self._offset}, "
@@ -203,6 +217,11 @@ class _CacheableDecorator:
                     drop_shard_remainder=True if self._training else False,
                 )
                 self._dataset_length = len(stream_from_cache)
+                check.is_not_none(
+                    stream_from_cache.output_types,
+                    f"Dataset {dataset_id}:{dataset_version} was not cached from a "
+                    "tf.data.Dataset, so it cannot be read as one.",
+                )
                 logging.info(f"Dataset {dataset_id}:{dataset_version} preparation finished.")
 
                 return tensorflow.make_tf_dataset(stream_from_cache)
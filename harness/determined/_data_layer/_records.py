@@ -0,0 +1,162 @@
+"""
+Support for caching datasets that are not ``tf.data.Dataset``s, such as map-style PyTorch
+datasets or generators of NumPy records, with the data layer.
+
+yogadl only knows how to serialize a ``tf.data.Dataset``. The storages in this module serialize
+any other dataset record by record into the same LMDB cache format, and CachedDataset reads the
+records back with random access, so that it can be used like any map-style dataset: sharding,
+shuffling and resuming from an offset are left to the data loader, as they are for any other
+dataset.
+"""
+import logging
+import os
+import pathlib
+from typing import Any, Dict, Iterator, List, Optional, cast
+
+import tensorflow as tf
+import yogadl
+from yogadl import storage, tensorflow
+
+
+def _iterate_records(data: Any) -> Iterator[Any]:
+    # Map-style datasets, like PyTorch datasets and NumPy arrays, are read in index order: a
+    # PyTorch dataset need not be iterable and need not raise IndexError at its end.
+    if hasattr(data, "__getitem__") and hasattr(data, "__len__") and not isinstance(data, dict):
+        for i in range(len(data)):
+            yield data[i]
+    else:
+        yield from data
+
+
+def serialize_records_to_lmdb(data: Any, lmdb_path: pathlib.Path) -> int:
+    """
+    Serialize every record of a map-style dataset or of an iterable of records to an LMDB cache
+    and return the number of records.
+    """
+    return cast(
+        int,
+        yogadl.serialize_generator_to_lmdb(
+            dataset_generator=_iterate_records(data),
+            data_shapes=None,
+            data_types=None,
+            lmdb_path=lmdb_path,
+        ),
+    )
+
+
+def _serialize_to_lmdb(
+    data: Any, lmdb_path: pathlib.Path, tf_config: Optional[tf.compat.v1.ConfigProto]
+) -> None:
+    if isinstance(data, tf.data.Dataset):
+        tensorflow.serialize_tf_dataset_to_lmdb(
+            dataset=data, checkpoint_path=lmdb_path, tf_config=tf_config
+        )
+    else:
+        serialize_records_to_lmdb(data, lmdb_path)
+
+
+# yogadl ships no type stubs, so its storages are Any to mypy and subclassing them is allowed
+# explicitly. The subclasses override submit() to serialize datasets of any kind.
+class LFSStorage(storage.LFSStorage):  # type: ignore
+    def submit(self, data: Any, dataset_id: str, dataset_version: str) -> None:
+        cache_filepath = self.cache_filepath(dataset_id, dataset_version)
+        cache_filepath.parent.mkdir(parents=True, exist_ok=True)
+
+        if cache_filepath.exists():
+            logging.info(f"Removing old cache: {cache_filepath}.")
+            cache_filepath.unlink()
+
+        _serialize_to_lmdb(data, cache_filepath, self._tensorflow_config)
+        logging.info(f"Serialized dataset {dataset_id}:{dataset_version} to: {cache_filepath}.")
+
+    def cache_filepath(self, dataset_id: str, dataset_version: str) -> pathlib.Path:
+        return cast(
+            pathlib.Path,
+            self._get_cache_filepath(dataset_id=dataset_id, dataset_version=dataset_version),
+        )
+
+
+def _submit_to_cloud(
+    cloud_storage: storage.BaseCloudStorage, data: Any, dataset_id: str, dataset_version: str
+) -> None:
+    local_cache_filepath = cloud_storage._get_local_cache_filepath(
+        dataset_id=dataset_id, dataset_version=dataset_version
+    )
+    local_cache_filepath.parent.mkdir(parents=True, exist_ok=True)
+
+    if local_cache_filepath.exists():
+        logging.debug(f"Removing old local cache: {local_cache_filepath}.")
+        local_cache_filepath.unlink()
+
+    _serialize_to_lmdb(data, local_cache_filepath, cloud_storage._tensorflow_config)
+    logging.info(
+        f"Serialized dataset {dataset_id}:{dataset_version} to local cache: "
+        f"{local_cache_filepath} and uploading to remote storage."
+    )
+
+    timestamp = cloud_storage._upload_to_cloud_storage(
+        dataset_id=dataset_id,
+        dataset_version=dataset_version,
+        local_cache_filepath=local_cache_filepath,
+    ).timestamp()
+    logging.info("Cache upload to remote storage finished.")
+
+    local_metadata = cloud_storage._get_local_metadata(
+        dataset_id=dataset_id, dataset_version=dataset_version
+    )
+    local_metadata["time_created"] = timestamp
+    cloud_storage._save_local_metadata(
+        dataset_id=dataset_id, dataset_version=dataset_version, metadata=local_metadata
+    )
+
+
+class S3Storage(storage.S3Storage):  # type: ignore
+    def submit(self, data: Any, dataset_id: str, dataset_version: str) -> None:
+        _submit_to_cloud(self, data, dataset_id, dataset_version)
+
+    def cache_filepath(self, dataset_id: str, dataset_version: str) -> pathlib.Path:
+        return cast(
+            pathlib.Path,
+            self._get_local_cache_filepath(dataset_id=dataset_id, dataset_version=dataset_version),
+        )
+
+
+class GCSStorage(storage.GCSStorage):  # type: ignore
+    def submit(self, data: Any, dataset_id: str, dataset_version: str) -> None:
+        _submit_to_cloud(self, data, dataset_id, dataset_version)
+
+    def cache_filepath(self, dataset_id: str, dataset_version: str) -> pathlib.Path:
+        return cast(
+            pathlib.Path,
+            self._get_local_cache_filepath(dataset_id=dataset_id, dataset_version=dataset_version),
+        )
+
+
+class CachedDataset:
+    """
+    A map-style dataset of the records in a data layer cache. The records are read from the
+    memory-mapped LMDB file on demand, so the dataset is cheap to create and to send to data
+    loader worker processes.
+    """
+
+    def __init__(self, cache_filepath: pathlib.Path) -> None:
+        self._cache_filepath = cache_filepath
+        self._keys = yogadl.LmdbAccess(lmdb_path=cache_filepath).get_keys()  # type: List[bytes]
+        # LMDB environments must not be used across a fork, so each process opens its own.
+        self._access = None  # type: Optional[yogadl.LmdbAccess]
+        self._access_pid = None  # type: Optional[int]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __getitem__(self, index: int) -> Any:
+        if self._access is None or self._access_pid != os.getpid():
+            self._access = yogadl.LmdbAccess(lmdb_path=self._cache_filepath)
+            self._access_pid = os.getpid()
+        return self._access.read_value_by_key(self._keys[index])
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = dict(self.__dict__)
+        state["_access"] = None
+        state["_access_pid"] = None
+        return state
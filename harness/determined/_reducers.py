@@ -0,0 +1,343 @@
+"""
+Framework-independent streaming metric reducers with constant-size, mergeable state.
+
+Each reducer keeps its state in a small float64 NumPy array whose size depends only on the
+reducer's configuration, never on the number of values it has seen. The per-slot states are
+combined with a cheap merge (usually a sum) in cross_slot_reduce, so distributed validation
+allgathers a few kilobytes per metric no matter how large the validation set is.
+
+These classes implement the methods of both :class:`determined.pytorch.MetricReducer` and
+:class:`determined.estimator.MetricReducer`; the framework-specific subclasses exported from
+``determined.pytorch`` and ``determined.estimator`` only add the matching base class.
+"""
+import abc
+import math
+from typing import Any, Callable, List, Optional, Sequence, Union
+
+import numpy as np
+
+
+def _to_numpy(values: Any) -> np.ndarray:
+    # Accept torch tensors, including ones on the GPU, without importing torch.
+    if hasattr(values, "detach"):
+        values = values.detach().cpu().numpy()
+    return np.asarray(values, dtype=np.float64).ravel()
+
+
+class _StreamingReducer(abc.ABC):
+    # Every reducer defines update() to add a batch of values to its state. Its arguments depend on
+    # the reducer, so they are not part of this interface.
+    update: Callable[..., None]
+
+    def __init__(self) -> None:
+        self.reset()
+
+    @abc.abstractmethod
+    def _initial_state(self) -> np.ndarray:
+        pass
+
+    def _merge(self, states: List[np.ndarray]) -> np.ndarray:
+        return np.sum(states, axis=0)
+
+    @abc.abstractmethod
+    def _result(self, state: np.ndarray) -> Any:
+        pass
+
+    def reset(self) -> None:
+        self._state = self._initial_state()
+
+    def per_slot_reduce(self) -> np.ndarray:
+        return self._state
+
+    def cross_slot_reduce(self, per_slot_metrics: Sequence[Optional[np.ndarray]]) -> Any:
+        # A slot that saw no batches during an Estimator evaluation never called accumulate().
+        states = [np.asarray(s) for s in per_slot_metrics if s is not None]
+        return self._result(self._merge(states or [self._initial_state()]))
+
+    def accumulate(self, metric: Any) -> np.ndarray:
+        """Update the reducer with the value(s) of a metric and return a copy of the state."""
+        if isinstance(metric, (list, tuple)):
+            self.update(*metric)
+        elif isinstance(metric, dict):
+            self.update(**metric)
+        else:
+            self.update(metric)
+        return self._state.copy()
+
+
+class WelfordReducer(_StreamingReducer):
+    """
+    Compute the mean, variance, or standard deviation of all values passed to
+    ``update(values)``, using Welford's online algorithm and Chan's parallel merge.
+
+    Arguments:
+        output: One of ``"mean"``, ``"variance"``, ``"std"``, or ``"count"``.
+    """
+
+    OUTPUTS = ("mean", "variance", "std", "count")
+
+    def __init__(self, output: str = "mean") -> None:
+        if output not in self.OUTPUTS:
+            raise ValueError(f"output must be one of {self.OUTPUTS}, not {output}")
+        self.output = output
+        super().__init__()
+
+    def _initial_state(self) -> np.ndarray:
+        # count, mean, sum of squared differences from the mean
+        return np.zeros(3, dtype=np.float64)
+
+    @staticmethod
+    def _combine(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        count = a[0] + b[0]
+        if count == 0:
+            return np.zeros(3, dtype=np.float64)
+        delta = b[1] - a[1]
+        mean = a[1] + delta * b[0] / count
+        m2 = a[2] + b[2] + delta * delta * a[0] * b[0] / count
+        return np.array([count, mean, m2], dtype=np.float64)
+
+    def update(self, values: Any) -> None:
+        v = _to_numpy(values)
+        v = v[~np.isnan(v)]
+        if len(v) == 0:
+            return
+        mean = np.mean(v)
+        batch = np.array([len(v), mean, np.sum((v - mean) ** 2)], dtype=np.float64)
+        self._state = self._combine(self._state, batch)
+
+    def _merge(self, states: List[np.ndarray]) -> np.ndarray:
+        merged = self._initial_state()
+        for state in states:
+            merged = self._combine(merged, state)
+        return merged
+
+    def _result(self, state: np.ndarray) -> float:
+        count, mean, m2 = state
+        if self.output == "count":
+            return float(count)
+        if count == 0:
+            return math.nan
+        if self.output == "mean":
+            return float(mean)
+        variance = float(m2 / count)
+        return variance if self.output == "variance" else math.sqrt(variance)
+
+
+class HistogramReducer(_StreamingReducer):
+    """
+    Count the values passed to ``update(values)`` in ``num_bins`` equal-width bins between
+    ``low`` and ``high``.
+
+    The result is an int64 array of length ``num_bins + 2``: element 0 counts values below
+    ``low``, element -1 counts values at or above ``high``, and the elements in between are the
+    counts of each bin.
+    """
+
+    def __init__(self, low: float, high: float, num_bins: int = 100) -> None:
+        if not high > low:
+            raise ValueError("high must be greater than low")
+        if num_bins < 1:
+            raise ValueError("num_bins must be positive")
+        self.low = low
+        self.high = high
+        self.num_bins = num_bins
+        super().__init__()
+
+    def _initial_state(self) -> np.ndarray:
+        return np.zeros(self.num_bins + 2, dtype=np.float64)
+
+    def update(self, values: Any) -> None:
+        v = _to_numpy(values)
+        v = v[~np.isnan(v)]
+        idx = np.floor((v - self.low) / (self.high - self.low) * self.num_bins)
+        idx = np.clip(idx, -1, self.num_bins).astype(np.int64) + 1
+        self._state += np.bincount(idx, minlength=self.num_bins + 2)
+
+    def _result(self, state: np.ndarray) -> np.ndarray:
+        return state.astype(np.int64)
+
+
+class QuantileReducer(_StreamingReducer):
+    """
+    Estimate quantiles of the values passed to ``update(values)`` with a fixed-size, mergeable
+    sketch in the style of DDSketch: values are counted in logarithmically-sized buckets so that
+    every estimate is within ``relative_accuracy`` of the true quantile value.
+
+    Values whose magnitude is below ``min_value`` are counted as zero and values whose magnitude
+    is above ``max_value`` are counted in the largest bucket. The size of the state grows with
+    ``log(max_value / min_value) / relative_accuracy``.
+
+    Arguments:
+        q: A quantile in [0, 1] or a sequence of them. The result is a float for a single
+            quantile or a float64 array with one element per quantile otherwise.
+    """
+
+    def __init__(
+        self,
+        q: Union[float, Sequence[float]],
+        relative_accuracy: float = 0.01,
+        min_value: float = 1e-9,
+        max_value: float = 1e9,
+    ) -> None:
+        qs = np.atleast_1d(np.asarray(q, dtype=np.float64))
+        if np.any((qs < 0) | (qs > 1)):
+            raise ValueError("quantiles must be in [0, 1]")
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be in (0, 1)")
+        if not 0 < min_value < max_value:
+            raise ValueError("min_value must be positive and less than max_value")
+
+        self.q = q
+        self._qs = qs
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._min_value = min_value
+        self._offset = math.floor(math.log(min_value) / self._log_gamma)
+        self._num_buckets = math.ceil(math.log(max_value) / self._log_gamma) - self._offset + 1
+        super().__init__()
+
+    def _initial_state(self) -> np.ndarray:
+        # zero count, then positive buckets, then negative buckets (by magnitude)
+        return np.zeros(1 + 2 * self._num_buckets, dtype=np.float64)
+
+    def _bucket_counts(self, magnitudes: np.ndarray) -> np.ndarray:
+        keys = np.ceil(np.log(magnitudes) / self._log_gamma) - self._offset
+        keys = np.clip(keys, 0, self._num_buckets - 1).astype(np.int64)
+        return np.bincount(keys, minlength=self._num_buckets)
+
+    def update(self, values: Any) -> None:
+        v = _to_numpy(values)
+        v = v[~np.isnan(v)]
+        pos = v[v > self._min_value]
+        neg = -v[v < -self._min_value]
+        n = self._num_buckets
+        self._state[0] += len(v) - len(pos) - len(neg)
+        self._state[1 : n + 1] += self._bucket_counts(pos)
+        self._state[n + 1 :] += self._bucket_counts(neg)
+
+    def _result(self, state: np.ndarray) -> Union[float, np.ndarray]:
+        n = self._num_buckets
+        zero, pos, neg = state[0], state[1 : n + 1], state[n + 1 :]
+        total = state.sum()
+        if total == 0:
+            result = np.full(len(self._qs), np.nan)
+        else:
+            magnitudes = 2 * self._gamma ** (np.arange(n) + self._offset) / (self._gamma + 1)
+            # Order the buckets from the most negative value to the most positive value.
+            counts = np.concatenate([neg[::-1], [zero], pos])
+            values = np.concatenate([-magnitudes[::-1], [0.0], magnitudes])
+            ranks = self._qs * (total - 1)
+            idx = np.searchsorted(np.cumsum(counts), ranks, side="right")
+            result = values[np.minimum(idx, len(values) - 1)]
+        return float(result[0]) if np.ndim(self.q) == 0 else result
+
+
+class AUCReducer(_StreamingReducer):
+    """
+    Compute the area under the ROC or precision-recall curve from ``update(labels, scores)``
+    calls, where labels are 0 or 1 and scores are probabilities in [0, 1].
+
+    Scores are counted in ``num_thresholds`` equal-width bins per label, so the result is exact
+    up to the resolution of the bins, like ``tf.metrics.auc``.
+
+    Arguments:
+        curve: ``"ROC"`` or ``"PR"``.
+    """
+
+    def __init__(self, num_thresholds: int = 200, curve: str = "ROC") -> None:
+        if curve not in ("ROC", "PR"):
+            raise ValueError(f"curve must be 'ROC' or 'PR', not {curve}")
+        if num_thresholds < 1:
+            raise ValueError("num_thresholds must be positive")
+        self.num_thresholds = num_thresholds
+        self.curve = curve
+        super().__init__()
+
+    def _initial_state(self) -> np.ndarray:
+        # score histogram of positive examples, then of negative examples
+        return np.zeros(2 * self.num_thresholds, dtype=np.float64)
+
+    def update(self, labels: Any, scores: Any) -> None:
+        y = _to_numpy(labels) > 0.5
+        s = _to_numpy(scores)
+        if len(y) != len(s):
+            raise ValueError(f"got {len(y)} labels but {len(s)} scores")
+        n = self.num_thresholds
+        idx = np.clip(np.floor(s * n), 0, n - 1).astype(np.int64)
+        self._state[:n] += np.bincount(idx[y], minlength=n)
+        self._state[n:] += np.bincount(idx[~y], minlength=n)
+
+    def _result(self, state: np.ndarray) -> float:
+        n = self.num_thresholds
+        # True and false positives when thresholding at each bin edge, from the lowest
+        # threshold (everything is predicted positive) to above the highest (nothing is).
+        tp = np.append(np.cumsum(state[:n][::-1])[::-1], 0.0)
+        fp = np.append(np.cumsum(state[n:][::-1])[::-1], 0.0)
+        if tp[0] == 0 or (self.curve == "ROC" and fp[0] == 0):
+            return math.nan
+
+        recall = tp / tp[0]
+        if self.curve == "ROC":
+            x, y = fp / fp[0], recall
+        else:
+            predicted = tp + fp
+            precision = np.divide(tp, predicted, out=np.ones_like(tp), where=predicted > 0)
+            x, y = recall, precision
+        return float(np.sum((x[:-1] - x[1:]) * (y[:-1] + y[1:]) / 2))
+
+
+class ConfusionMatrixReducer(_StreamingReducer):
+    """
+    Accumulate a ``num_classes`` x ``num_classes`` confusion matrix from
+    ``update(labels, predictions)`` calls. ``predictions`` may be class indices with the same
+    shape as ``labels`` or scores with an extra trailing class dimension, in which case the
+    argmax is used.
+
+    Arguments:
+        output: ``"matrix"`` (an int64 array indexed by [label, prediction]), ``"accuracy"``,
+            ``"iou"`` (a float64 array of per-class intersection-over-union), or ``"mean_iou"``.
+    """
+
+    OUTPUTS = ("matrix", "accuracy", "iou", "mean_iou")
+
+    def __init__(self, num_classes: int, output: str = "matrix") -> None:
+        if output not in self.OUTPUTS:
+            raise ValueError(f"output must be one of {self.OUTPUTS}, not {output}")
+        if num_classes < 1:
+            raise ValueError("num_classes must be positive")
+        self.num_classes = num_classes
+        self.output = output
+        super().__init__()
+
+    def _initial_state(self) -> np.ndarray:
+        return np.zeros(self.num_classes * self.num_classes, dtype=np.float64)
+
+    def update(self, labels: Any, predictions: Any) -> None:
+        if hasattr(labels, "detach"):
+            labels = labels.detach().cpu().numpy()
+        if hasattr(predictions, "detach"):
+            predictions = predictions.detach().cpu().numpy()
+        labels = np.asarray(labels)
+        predictions = np.asarray(predictions)
+        if predictions.ndim == labels.ndim + 1:
+            predictions = np.argmax(predictions, axis=-1)
+        y = labels.astype(np.int64).ravel()
+        p = predictions.astype(np.int64).ravel()
+        n = self.num_classes
+        if np.any((y < 0) | (y >= n) | (p < 0) | (p >= n)):
+            raise ValueError(f"labels and predictions must be in [0, {n})")
+        self._state += np.bincount(y * n + p, minlength=n * n)
+
+    def _result(self, state: np.ndarray) -> Union[float, np.ndarray]:
+        matrix = state.reshape(self.num_classes, self.num_classes)
+        if self.output == "matrix":
+            return matrix.astype(np.int64)
+        diag = np.diag(matrix)
+        if self.output == "accuracy":
+            total = matrix.sum()
+            return float(diag.sum() / total) if total else math.nan
+        union = matrix.sum(axis=0) + matrix.sum(axis=1) - diag
+        iou = np.divide(diag, union, out=np.full(len(diag), np.nan), where=union > 0)
+        if self.output == "iou":
+            return iou
+        return float(np.nanmean(iou)) if np.any(union > 0) else math.nan
@@ -7,7 +7,12 @@ from determined.estimator._estimator_context import (
     ServingInputReceiverFn,
 )
 from determined.estimator._reducer import (
+    AUCReducer,
+    ConfusionMatrixReducer,
+    HistogramReducer,
     MetricReducer,
+    QuantileReducer,
+    WelfordReducer,
     _SimpleMetricReducer,
     _DistributedMetricMaker,
 )
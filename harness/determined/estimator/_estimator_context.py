@@ -1,6 +1,6 @@
 import inspect
 import logging
-from typing import Any, Callable, Dict, List, Tuple, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 import tensorflow as tf
 
@@ -166,9 +166,11 @@ class EstimatorExperimentalContext(_data_layer.DataLayerContext):
     def __init__(self, env: det.EnvContext, hvd_config: horovod.HorovodContext) -> None:
         super().__init__(env=env, hvd_config=hvd_config)
         self._allgather_fn = default_allgather_fn  # type: Callable[[Any], List]
-        # allgather is not parallelizable, so we have to strictly order how they are placed in the
-        # graph via tf.control_dependencies().
-        self._allgather_ops = []  # type: List[tf.Operation]
+        # All of the custom metrics of an evaluation are reduced with a single allgather, run by
+        # one op which the value op of every metric depends on.
+        self._metric_makers = []  # type: List[estimator._DistributedMetricMaker]
+        self._allgather_op = None  # type: Optional[tf.Operation]
+        self._allgathered_states = {}  # type: Dict[estimator._DistributedMetricMaker, List[Any]]
 
     def _set_allgather_fn(self, fn: Callable[[Any], List]) -> None:
         self._allgather_fn = fn
@@ -176,17 +178,32 @@ class EstimatorExperimentalContext(_data_layer.DataLayerContext):
     def allgather_metrics(self, metrics: Any) -> List:
         return self._allgather_fn(metrics)
 
-    def _build_allgather_op(self, build_op_fn: Callable[[], tf.Operation]) -> tf.Operation:
-        """Build an op that uses allgather in a way that is safely sequentialized."""
-
-        with tf.compat.v1.control_dependencies(self._allgather_ops):
-            new_op = build_op_fn()
-        self._allgather_ops.append(new_op)
-        return new_op
+    def _register_metric_maker(self, maker: "estimator._DistributedMetricMaker") -> tf.Operation:
+        """
+        Register a custom metric and return the op that allgathers the states of all the custom
+        metrics in the current graph.
+        """
+        graph = tf.compat.v1.get_default_graph()
+        if self._allgather_op is None or self._allgather_op.graph is not graph:
+            self._reset_allgather_ops()
+            self._allgather_op = tf.compat.v1.py_func(self._allgather_metric_states, [], [])
+        self._metric_makers.append(maker)
+        return self._allgather_op
+
+    def _allgather_metric_states(self) -> None:
+        states = [maker.last_accumulate for maker in self._metric_makers]
+        per_slot_states = self.allgather_metrics(states)
+        # Transpose the per-slot lists of states into per-metric lists of states.
+        self._allgathered_states = {
+            maker: [slot_states[i] for slot_states in per_slot_states]
+            for i, maker in enumerate(self._metric_makers)
+        }
 
     def _reset_allgather_ops(self) -> None:
         """Every Estimator evaluation happens on a clean graph, so forget the old operations."""
-        self._allgather_ops = []
+        self._metric_makers = []
+        self._allgather_op = None
+        self._allgathered_states = {}
 
     def make_metric(
         self,
@@ -20,6 +20,7 @@ import determined as det
 from determined import estimator, horovod, ipc, monkey_patch, tensorboard, workload
 from determined.horovod import hvd
 from determined_common import check
+from determined_common.storage import staging
 
 VERY_LARGE_NUMBER = 9999999999999999
 
@@ -245,10 +246,33 @@ class DeterminedControlHook(estimator.RunHook):
         checkpoint_dir = os.path.dirname(
             self.estimator_trial_controller.estimator.latest_checkpoint()
         )
-        shutil.copytree(checkpoint_dir, str(checkpoint_path))
 
-        # Calibrate the CheckpointState metadata file to the new location.
-        estimator._update_checkpoint_path_in_state_file(checkpoint_path)
+        # Only the files of the latest checkpoint of each CheckpointState are needed. TensorFlow
+        # never modifies checkpoint files in place, so they can be hardlinked.
+        checkpoints = estimator._scan_checkpoint_directory(checkpoint_dir)
+        files = [
+            os.path.relpath(path, checkpoint_dir)
+            for checkpoint in checkpoints
+            for path in checkpoint.paths[os.path.basename(checkpoint.state.model_checkpoint_path)]
+        ]
+        if os.path.exists(os.path.join(checkpoint_dir, "graph.pbtxt")):
+            files.append("graph.pbtxt")
+        staging.stage_tree(checkpoint_dir, str(checkpoint_path), files=files, allow_hardlinks=True)
+
+        # Write CheckpointState metadata files for the new location.
+        for checkpoint in checkpoints:
+            model_checkpoint_path = str(
+                checkpoint_path.joinpath(os.path.basename(checkpoint.state.model_checkpoint_path))
+            )
+            timestamps = checkpoint.state.all_model_checkpoint_timestamps
+            tf.compat.v1.train.update_checkpoint_state(
+                str(checkpoint_path),
+                model_checkpoint_path,
+                all_model_checkpoint_paths=[model_checkpoint_path],
+                latest_filename=os.path.basename(checkpoint.state_file),
+                all_model_checkpoint_timestamps=timestamps[-1:] if timestamps else None,
+                last_preserved_timestamp=checkpoint.state.last_preserved_timestamp,
+            )
 
     def _save_serving_input_receiver_fns(self, checkpoint_path: str) -> None:
         for name, fn in self.estimator_trial_controller.serving_input_receiver_fns.items():
@@ -755,7 +779,9 @@ class EstimatorTrialController(det.LoopTrialController):
         if self.estimator_dir.exists():
             shutil.rmtree(str(self.estimator_dir))
         logging.debug(f"Copying from {self.load_path} to {self.estimator_dir}.")
-        shutil.copytree(str(self.load_path), str(self.estimator_dir))
+        # The checkpoint must not change when the estimator directory does, so it is not
+        # hardlinked.
+        staging.stage_tree(str(self.load_path), str(self.estimator_dir))
 
         # Calibrate the CheckpointState metadata file to the new location.
         estimator._update_checkpoint_path_in_state_file(self.estimator_dir)
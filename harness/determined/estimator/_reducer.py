@@ -4,7 +4,7 @@ from typing import Any, Callable, List, Sequence, Tuple
 import numpy as np
 import tensorflow as tf
 
-from determined import estimator
+from determined import _reducers, estimator
 
 
 class MetricReducer:
@@ -117,6 +117,29 @@ class _SimpleMetricReducer(MetricReducer):
         return self.reduce_fn(flat_metrics)
 
 
+# Built-in reducers with constant-size, mergeable state; see determined._reducers.
+
+
+class WelfordReducer(_reducers.WelfordReducer, MetricReducer):
+    __doc__ = _reducers.WelfordReducer.__doc__
+
+
+class HistogramReducer(_reducers.HistogramReducer, MetricReducer):
+    __doc__ = _reducers.HistogramReducer.__doc__
+
+
+class QuantileReducer(_reducers.QuantileReducer, MetricReducer):
+    __doc__ = _reducers.QuantileReducer.__doc__
+
+
+class AUCReducer(_reducers.AUCReducer, MetricReducer):
+    __doc__ = _reducers.AUCReducer.__doc__
+
+
+class ConfusionMatrixReducer(_reducers.ConfusionMatrixReducer, MetricReducer):
+    __doc__ = _reducers.ConfusionMatrixReducer.__doc__
+
+
 def _deconstruct_metric(metric: Any) -> Tuple[Sequence, Any]:
     """
     Break down lists and dictionaries into a list of tensors that can each be passed through the
@@ -178,8 +201,10 @@ def _reconstruct_metric(args: Sequence, reconstruct_info: Any) -> Any:
 class _DistributedMetricMaker:
     """
     _DistributedMetricMaker.make_metric() returns a tf.metrics-style tuple of (value_op, update_op).
-    The value_op is read once after all evaluation is completed, which is where we do the allgather
-    and call the user's cross_slot_reduce to calculate the distributed metric.
+    The value_op is read once after all evaluation is completed. It depends on an op shared by all
+    the custom metrics in the graph which allgathers the final accumulated state of every metric at
+    once; the value_op then calls the user's cross_slot_reduce on this metric's states to calculate
+    the distributed metric.
     """
 
     def __init__(
@@ -209,15 +234,16 @@ class _DistributedMetricMaker:
         return tf.compat.v1.py_func(self._update, self.update_args, [])
 
     def _value(self) -> Any:
-        allgathered = self.context.allgather_metrics(self.last_accumulate)
+        allgathered = self.context._allgathered_states[self]
         value = self.reducer.cross_slot_reduce(allgathered)
         return np.array(value).astype(self.np_dtype)
 
-    def _value_op(self) -> tf.Operation:
-        return tf.compat.v1.py_func(self._value, [], self.tf_dtype)
+    def _value_op(self, allgather_op: tf.Operation) -> tf.Operation:
+        with tf.compat.v1.control_dependencies([allgather_op]):
+            return tf.compat.v1.py_func(self._value, [], self.tf_dtype)
 
     def make_metric(self) -> Tuple[tf.Operation, tf.Operation]:
-        value_op = self.context._build_allgather_op(self._value_op)
+        value_op = self._value_op(self.context._register_metric_maker(self))
         update_op = self._update_op()
 
         return value_op, update_op
@@ -6,31 +6,134 @@ import json
 import logging
 import os
 import sys
-from typing import Any, Dict, List
+from typing import IO, Any, Dict, List, Optional, Set
+
+import simplejson
 
 import determined as det
 from determined_common import constants, storage
 
 
+class CheckpointGCError(Exception):
+    """
+    CheckpointGCError is raised after a GC run in which some of the checkpoints could not be
+    deleted. Every other checkpoint has been deleted by the time it is raised.
+    """
+
+    def __init__(self, failed: Dict[str, Exception]) -> None:
+        super().__init__(
+            "Failed to delete {} checkpoints: {}".format(
+                len(failed), ", ".join("{} ({})".format(k, v) for k, v in failed.items())
+            )
+        )
+        self.failed = failed
+
+
+def read_manifest(path: str) -> Set[str]:
+    """
+    Return the UUIDs of the checkpoints that a previous GC run recorded as deleted in the manifest
+    at `path`. The manifest is a file of JSON lines, one per processed checkpoint.
+    """
+    deleted = set()  # type: Set[str]
+    if not os.path.exists(path):
+        return deleted
+
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = simplejson.loads(line)
+            except ValueError:
+                # The previous run may have been killed while writing its last entry.
+                logging.warning("Ignoring malformed manifest entry: {}".format(line))
+                continue
+            if entry.get("status") == "deleted":
+                deleted.add(entry["uuid"])
+    return deleted
+
+
+def _record(
+    manifest: Optional[IO[str]],
+    metadata: storage.StorageMetadata,
+    status: str,
+    error: Optional[Exception],
+) -> None:
+    if manifest is None:
+        return
+    entry = {
+        "uuid": metadata.storage_id,
+        "status": status,
+        "resources": len(metadata.resources),
+        "bytes": sum(metadata.resources.values()),
+    }  # type: Dict[str, Any]
+    if error is not None:
+        entry["error"] = str(error)
+    manifest.write(simplejson.dumps(entry) + "\n")
+    manifest.flush()
+
+
 def delete_checkpoints(
-    manager: storage.StorageManager, to_delete: List[Dict[str, Any]], dry_run: bool
+    manager: storage.StorageManager,
+    to_delete: List[Dict[str, Any]],
+    dry_run: bool,
+    max_workers: int = 8,
+    manifest_path: Optional[str] = None,
 ) -> None:
     """
     Delete some of the checkpoints associated with a single
     experiment. `to_delete` is a list of two-element dicts,
     {"uuid": str, "resources": List[str]}.
+
+    Checkpoints are deleted concurrently with StorageManager.delete_many, using up to
+    `max_workers` workers. A failure to delete one checkpoint does not stop the others from being
+    deleted; a CheckpointGCError listing every failure is raised at the end instead.
+
+    If `manifest_path` is set, the outcome of every checkpoint (deleted, failed, or dry run) is
+    appended to it as a JSON line, and checkpoints that the manifest already records as deleted
+    are skipped, so an interrupted GC run can be resumed by running it again.
     """
-    logging.info("Deleting {} checkpoints".format(len(to_delete)))
+    already_deleted = read_manifest(manifest_path) if manifest_path is not None else set()
 
+    metadata = []  # type: List[storage.StorageMetadata]
     for record in to_delete:
-        metadata = storage.StorageMetadata.from_json(record)
-        if not dry_run:
-            logging.info("Deleting checkpoint {}".format(metadata))
-            manager.delete(metadata)
+        m = storage.StorageMetadata.from_json(record)
+        if m.storage_id in already_deleted:
+            logging.info("Skipping checkpoint {}, already deleted".format(m.storage_id))
+            continue
+        metadata.append(m)
+
+    total = len(metadata)
+    logging.info("Deleting {} checkpoints".format(total))
+
+    manifest = open(manifest_path, "a") if manifest_path is not None else None
+    failed = {}  # type: Dict[str, Exception]
+    try:
+        if dry_run:
+            for i, m in enumerate(metadata, 1):
+                logging.info("Dry run: deleting checkpoint {} ({}/{})".format(m, i, total))
+                _record(manifest, m, "dry_run", None)
         else:
-            logging.info("Dry run: deleting checkpoint {}".format(metadata.storage_id))
-
-    logging.info("Finished deleting {} checkpoints".format(len(to_delete)))
+            for i, (m, error) in enumerate(manager.delete_many(metadata, max_workers), 1):
+                if error is None:
+                    logging.info("Deleted checkpoint {} ({}/{})".format(m, i, total))
+                    _record(manifest, m, "deleted", None)
+                else:
+                    logging.error(
+                        "Failed to delete checkpoint {} ({}/{}): {}".format(m, i, total, error)
+                    )
+                    _record(manifest, m, "failed", error)
+                    failed[m.storage_id] = error
+    finally:
+        if manifest is not None:
+            manifest.close()
+
+    logging.info(
+        "Finished deleting {} checkpoints ({} failed)".format(total - len(failed), len(failed))
+    )
+    if failed:
+        raise CheckpointGCError(failed)
 
 
 def json_file_arg(val: str) -> Any:
@@ -70,6 +173,18 @@ def main(argv: List[str]) -> None:
         default=("DET_DRY_RUN" in os.environ),
         help="Do not actually delete any checkpoints from storage",
     )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=int(os.getenv("DET_GC_MAX_WORKERS", 8)),
+        help="Maximum number of concurrent deletion workers",
+    )
+    parser.add_argument(
+        "--manifest",
+        default=os.getenv("DET_GC_MANIFEST"),
+        help="Record the outcome of each checkpoint in this file (JSON lines) and skip "
+        "checkpoints it already records as deleted",
+    )
 
     args = parser.parse_args(argv)
 
@@ -84,7 +199,13 @@ def main(argv: List[str]) -> None:
 
     manager = storage.build(storage_config, container_path=constants.SHARED_FS_CONTAINER_PATH)
 
-    delete_checkpoints(manager, args.delete["checkpoints"], dry_run=args.dry_run)
+    delete_checkpoints(
+        manager,
+        args.delete["checkpoints"],
+        dry_run=args.dry_run,
+        max_workers=args.max_workers,
+        manifest_path=args.manifest,
+    )
 
 
 if __name__ == "__main__":
@@ -146,7 +146,10 @@ def build_and_run_training_pipeline(env: det.EnvContext) -> None:
                             socket_mgr.get_rendezvous_info(),
                             hvd_config,
                         )
-                    controller.run()
+                    try:
+                        controller.run()
+                    finally:
+                        det.util.close_user_code_snapshot()
 
 
 def main() -> None:
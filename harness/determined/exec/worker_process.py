@@ -56,6 +56,9 @@ def main() -> None:
                 broadcast_client.send_exception_message()
                 raise e
 
+            finally:
+                det.util.close_user_code_snapshot()
+
 
 if __name__ == "__main__":
     try:
@@ -14,3 +14,4 @@ from determined.experimental._native import (
     init_native,
     _load_trial_on_local,
 )
+from determined.experimental._benchmark import benchmark_trial
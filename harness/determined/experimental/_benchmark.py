@@ -0,0 +1,264 @@
+import logging
+import os
+import pathlib
+import resource
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Type
+
+import numpy as np
+import simplejson
+
+import determined as det
+import determined_common
+from determined import load, workload
+from determined_common import check, util
+
+
+def _peak_rss_bytes() -> int:
+    """Return the peak resident set size of this process and its reaped children."""
+    usage = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    # ru_maxrss is reported in bytes on macOS and in kilobytes everywhere else.
+    return usage if sys.platform == "darwin" else usage * 1024
+
+
+def _directory_size(path: pathlib.Path) -> int:
+    total = 0
+    for root, _, files in os.walk(str(path)):
+        for f in files:
+            total += os.path.getsize(os.path.join(root, f))
+    return total
+
+
+def _summarize_latencies(latencies: List[float]) -> Dict[str, Optional[float]]:
+    if not latencies:
+        return {"count": 0, "mean": None, "p50": None, "p99": None, "max": None}
+    arr = np.array(latencies, dtype=np.float64)
+    return {
+        "count": len(latencies),
+        "mean": float(np.mean(arr)),
+        "p50": float(np.percentile(arr, 50)),
+        "p99": float(np.percentile(arr, 99)),
+        "max": float(np.max(arr)),
+    }
+
+
+class BenchmarkRecorder:
+    """
+    BenchmarkRecorder accumulates the wall-clock timings observed while a benchmark workload stream
+    is consumed by a TrialController and turns them into a machine-readable report.
+    """
+
+    def __init__(self, scheduling_unit: int, global_batch_size: Optional[int]) -> None:
+        self.scheduling_unit = scheduling_unit
+        self.global_batch_size = global_batch_size
+        self.warmup_latencies = []  # type: List[float]
+        self.train_latencies = []  # type: List[float]
+        self.validation_latencies = []  # type: List[float]
+        self.checkpoint_latencies = []  # type: List[float]
+        self.checkpoint_bytes = []  # type: List[int]
+        self.init_seconds = None  # type: Optional[float]
+        self.restore_seconds = None  # type: Optional[float]
+
+    def report(self) -> Dict[str, Any]:
+        measured_batches = len(self.train_latencies) * self.scheduling_unit
+        measured_seconds = sum(self.train_latencies)
+
+        batches_per_second = None  # type: Optional[float]
+        records_per_second = None  # type: Optional[float]
+        if measured_seconds > 0:
+            batches_per_second = measured_batches / measured_seconds
+            if self.global_batch_size is not None:
+                records_per_second = batches_per_second * self.global_batch_size
+
+        return {
+            "scheduling_unit": self.scheduling_unit,
+            "global_batch_size": self.global_batch_size,
+            "trial_init_seconds": self.init_seconds,
+            "training": {
+                "warmup_steps": len(self.warmup_latencies),
+                "steps": len(self.train_latencies),
+                "batches": measured_batches,
+                "seconds": measured_seconds,
+                "batches_per_second": batches_per_second,
+                "records_per_second": records_per_second,
+                "step_latency_seconds": _summarize_latencies(self.train_latencies),
+            },
+            "validation": {"latency_seconds": _summarize_latencies(self.validation_latencies)},
+            "checkpoint": {
+                "save_seconds": _summarize_latencies(self.checkpoint_latencies),
+                "bytes": self.checkpoint_bytes[-1] if self.checkpoint_bytes else None,
+                "restore_seconds": self.restore_seconds,
+            },
+            "peak_rss_bytes": _peak_rss_bytes(),
+        }
+
+
+def _make_benchmark_workloads(
+    checkpoint_dir: pathlib.Path,
+    recorder: BenchmarkRecorder,
+    warmup_steps: int,
+    steps: int,
+    validations: int,
+    checkpoints: int,
+) -> workload.Stream:
+    """
+    Extend the single-batch smoke test of _make_test_workloads into a configurable sequence of
+    warmup and measured workloads. Because workload messaging is synchronous, the time between
+    yielding a workload and resuming the generator is the time the TrialController spent on it.
+    """
+    interceptor = workload.WorkloadResponseInterceptor()
+    num_batches = recorder.scheduling_unit
+    total_batches_processed = 0
+    step_id = 0
+
+    for i in range(warmup_steps + steps):
+        step_id += 1
+        start = time.perf_counter()
+        yield from interceptor.send(
+            workload.train_workload(
+                step_id, num_batches=num_batches, total_batches_processed=total_batches_processed
+            ),
+            [],
+        )
+        elapsed = time.perf_counter() - start
+        metrics = interceptor.metrics_result()
+        check.len_eq(metrics["metrics"]["batch_metrics"], num_batches)
+        total_batches_processed += num_batches
+
+        if i < warmup_steps:
+            recorder.warmup_latencies.append(elapsed)
+        else:
+            recorder.train_latencies.append(elapsed)
+
+    logging.info(f"Benchmark finished {steps} training steps after {warmup_steps} warmup steps.")
+
+    for _ in range(validations):
+        start = time.perf_counter()
+        yield from interceptor.send(
+            workload.validation_workload(step_id, total_batches_processed=total_batches_processed),
+            [],
+        )
+        recorder.validation_latencies.append(time.perf_counter() - start)
+        interceptor.metrics_result()
+
+    logging.info(f"Benchmark finished {validations} validations.")
+
+    for i in range(checkpoints):
+        path = checkpoint_dir.joinpath(f"checkpoint-{i}")
+        start = time.perf_counter()
+        yield workload.checkpoint_workload(
+            step_id, total_batches_processed=total_batches_processed
+        ), [path], workload.ignore_workload_response
+        recorder.checkpoint_latencies.append(time.perf_counter() - start)
+        recorder.checkpoint_bytes.append(_directory_size(path))
+
+    logging.info(f"Benchmark finished {checkpoints} checkpoints.")
+
+    yield workload.terminate_workload(), [], workload.ignore_workload_response
+
+
+def benchmark_trial(
+    trial_class: Type[det.Trial],
+    config: Optional[Dict[str, Any]] = None,
+    warmup_steps: int = 1,
+    steps: int = 10,
+    validations: int = 1,
+    checkpoints: int = 1,
+    output_path: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Run a Trial locally through warmup and measured training, validation and checkpoint workloads
+    and report its throughput.
+
+    Each training step trains ``scheduling_unit`` batches, and each validation evaluates the
+    whole validation dataset, as on a cluster. The report contains records/sec,
+    batches/sec, p50/p99 training step latency, validation latency, checkpoint save time, size and
+    restore time, and the peak resident set size of the process.
+
+    Arguments:
+        trial_class: A class definition implementing the :class:`determined.Trial` interface.
+        config: An optional experiment configuration dictionary.
+        warmup_steps: The number of training steps to run before measuring.
+        steps: The number of measured training steps.
+        validations: The number of validation workloads to run after training.
+        checkpoints:
+            The number of checkpoints to save after validating. If positive, the last
+            checkpoint is also restored into a fresh trial to measure the restore time.
+        output_path: If set, the report is also written to this path as JSON.
+
+    Returns:
+        The benchmark report as a dictionary.
+    """
+    check.gt_eq(warmup_steps, 0, "warmup_steps must be non-negative")
+    check.gt(steps, 0, "steps must be positive")
+    check.gt_eq(validations, 0, "validations must be non-negative")
+    check.gt_eq(checkpoints, 0, "checkpoints must be non-negative")
+
+    determined_common.set_logger(
+        util.debug_mode() or det.ExperimentConfig(config or {}).debug_enabled()
+    )
+
+    # Test mode would cut every validation short after one batch. The number of training batches
+    # is bounded by the workloads of the benchmark instead.
+    env, rendezvous_info, hvd_config = det._make_local_execution_env(
+        managed_training=True, test_mode=False, config=config, limit_gpus=1
+    )
+    global_batch_size = env.hparams.get("global_batch_size")
+    recorder = BenchmarkRecorder(
+        env.experiment_config.scheduling_unit(),
+        int(global_batch_size) if global_batch_size is not None else None,
+    )
+    logging.info(f"Benchmarking {trial_class.__name__} with hyperparameters: {env.hparams}.")
+
+    with tempfile.TemporaryDirectory() as checkpoint_dir:
+        workloads = _make_benchmark_workloads(
+            pathlib.Path(checkpoint_dir),
+            recorder,
+            warmup_steps=warmup_steps,
+            steps=steps,
+            validations=validations,
+            checkpoints=checkpoints,
+        )
+
+        start = time.perf_counter()
+        controller = load.load_controller_from_trial(
+            trial_class=trial_class,
+            env=env,
+            workloads=workloads,
+            load_path=None,
+            rendezvous_info=rendezvous_info,
+            hvd_config=hvd_config,
+        )
+        recorder.init_seconds = time.perf_counter() - start
+        controller.run()
+
+        if checkpoints > 0:
+            # Restoring happens while the TrialController is constructed, so this measurement
+            # includes building the trial and its data loaders; compare it to trial_init_seconds.
+            start = time.perf_counter()
+            restored = load.load_controller_from_trial(
+                trial_class=trial_class,
+                env=env,
+                workloads=iter(
+                    [(workload.terminate_workload(), [], workload.ignore_workload_response)]
+                ),
+                load_path=pathlib.Path(checkpoint_dir).joinpath(f"checkpoint-{checkpoints - 1}"),
+                rendezvous_info=rendezvous_info,
+                hvd_config=hvd_config,
+            )
+            recorder.restore_seconds = time.perf_counter() - start
+            restored.run()
+
+    report = recorder.report()
+    logging.info(f"Benchmark report: {report}")
+
+    if output_path is not None:
+        with open(output_path, "w") as f:
+            simplejson.dump(report, f, indent=2, ignore_nan=True)
+
+    return report
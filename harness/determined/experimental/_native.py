@@ -178,7 +178,8 @@ def _load_trial_on_local(
     hparams: Dict[str, Any],
 ) -> Tuple[Type[det.Trial], det.TrialContext]:
     with det._local_execution_manager(context_dir):
-        trial_class = load.load_trial_implementation(config["entrypoint"])
+        # Loading many checkpoints of the same experiment only imports the user code once.
+        trial_class = load.load_trial_implementation(config["entrypoint"], cache=True)
         env, rendezvous_info, hvd_config = det._make_local_execution_env(
             managed_training=managed_training, test_mode=False, config=config, hparams=hparams
         )
@@ -1,5 +1,8 @@
+import itertools
 import math
-from typing import Any, Dict, List, Optional, Tuple, Union
+import mmap
+import pathlib
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 import numpy as np
 import tensorflow as tf
@@ -10,6 +13,10 @@ from determined_common import check
 
 ArrayLike = Union[np.ndarray, List[np.ndarray], Dict[str, np.ndarray]]
 
+PathLike = Union[str, pathlib.Path]
+_ArraySource = Union[PathLike, np.ndarray]
+MemmapArrayLike = Union[_ArraySource, List[_ArraySource], Dict[str, _ArraySource]]
+
 InputData = Union[tf.keras.utils.Sequence, tf.data.Dataset, "SequenceAdapter", tuple]
 
 
@@ -144,6 +151,256 @@ class _ArrayLikeAdapter(tf.keras.utils.Sequence):  # type: ignore
             )
 
 
+def _is_path(x: Any) -> bool:
+    return isinstance(x, (str, pathlib.Path))
+
+
+def _contains_path(data: Any) -> bool:
+    if isinstance(data, (list, tuple)):
+        return any(_is_path(v) for v in data)
+    if isinstance(data, dict):
+        return any(_is_path(v) for v in data.values())
+    return _is_path(data)
+
+
+def _map_multi_arraylike(fn: Callable[[Any], Any], data: Any) -> Any:
+    if isinstance(data, (list, tuple)):
+        return [fn(v) for v in data]
+    if isinstance(data, dict):
+        return {name: fn(data[name]) for name in data}
+    return fn(data)
+
+
+def _memmap_location(array: np.ndarray) -> Optional[Dict[str, Any]]:
+    """
+    Return the arguments of np.memmap() that map the data of a memory-mapped array again, or None
+    if the array is not a contiguous view of a file.
+    """
+    if not isinstance(array, np.memmap) or array.filename is None or array.size == 0:
+        return None
+    mapping = getattr(array, "_mmap", None)
+    if mapping is None:
+        return None
+    if array.flags.c_contiguous:
+        order = "C"
+    elif array.flags.f_contiguous:
+        order = "F"
+    else:
+        return None
+
+    # Slices of a memory-mapped array keep the offset of the array that they were sliced from, so
+    # the offset of their data is found from where it starts within the mapping. np.memmap maps
+    # the file from the offset rounded down to the allocation granularity.
+    mapping_start = np.frombuffer(mapping, dtype=np.uint8).ctypes.data
+    mapping_offset = array.offset - array.offset % mmap.ALLOCATIONGRANULARITY
+    return {
+        "filename": array.filename,
+        "dtype": array.dtype,
+        "offset": mapping_offset + array.ctypes.data - mapping_start,
+        "shape": array.shape,
+        "order": order,
+    }
+
+
+class _ShardedArray:
+    """
+    _ShardedArray presents one or more arrays, usually memory-mapped .npy files, as a single array
+    concatenated along the first axis, without loading or copying them.
+    """
+
+    def __init__(self, source: _ArraySource) -> None:
+        self._source = source
+        if isinstance(source, np.ndarray):
+            shards = [source]
+        else:
+            path = pathlib.Path(source)
+            paths = sorted(path.glob("*.npy")) if path.is_dir() else [path]
+            check.gt(len(paths), 0, f"No .npy files found in {path}.")
+            # Memory-mapped files are backed by the page cache, which is shared by every process
+            # on the machine that maps the same file.
+            shards = [np.load(str(p), mmap_mode="r") for p in paths]
+
+        for shard in shards[1:]:
+            check.eq(shard.dtype, shards[0].dtype, "All shards of an array must have one dtype.")
+            check.eq(
+                shard.shape[1:], shards[0].shape[1:], "All shards of an array must have one shape."
+            )
+
+        self.shards = shards
+        self.dtype = shards[0].dtype
+        self.shape = (sum(len(shard) for shard in shards),) + shards[0].shape[1:]
+        self.offsets = np.cumsum([0] + [len(shard) for shard in shards])
+
+    def __len__(self) -> int:
+        return int(self.shape[0])
+
+    def __getstate__(self) -> Any:
+        # Pickling a memory-mapped array would copy all of its data; reopen the files instead.
+        if isinstance(self._source, np.ndarray):
+            location = _memmap_location(self._source)
+            if location is not None:
+                return {"memmap": location}
+        return {"source": self._source}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        if "memmap" in state:
+            source = np.memmap(mode="r", **state["memmap"])  # type: _ArraySource
+        else:
+            source = state["source"]
+        self.__init__(source)  # type: ignore
+
+    def slice(self, start: int, end: int) -> np.ndarray:
+        """Return rows [start, end); this is a view rather than a copy within a single shard."""
+        first = int(np.searchsorted(self.offsets, start, side="right")) - 1
+        if end <= self.offsets[first + 1]:
+            offset = self.offsets[first]
+            return self.shards[first][start - offset : end - offset]
+        return self.gather(
+            np.arange(start, end), np.empty((end - start,) + self.shape[1:], self.dtype)
+        )
+
+    def gather(self, indices: np.ndarray, out: np.ndarray) -> np.ndarray:
+        """Copy the rows at the sorted indices into out, with one vectorized take per shard."""
+        bounds = np.searchsorted(indices, self.offsets)
+        for i, shard in enumerate(self.shards):
+            lo, hi = bounds[i], bounds[i + 1]
+            if lo < hi:
+                np.take(shard, indices[lo:hi] - self.offsets[i], axis=0, out=out[lo:hi])
+        return out
+
+
+def _length_of_sharded_arraylike(data: Any) -> int:
+    if isinstance(data, list):
+        return len(data[0])
+    if isinstance(data, dict):
+        return len(list(data.values())[0])
+    return len(data)
+
+
+class MemmapArrayAdapter(tf.keras.utils.Sequence):  # type: ignore
+    """
+    MemmapArrayAdapter serves batches from NumPy arrays that are stored on disk, without ever
+    loading the arrays into memory. It can be returned from
+    :meth:`~determined.keras.TFKerasTrial.build_training_data_loader` or
+    :meth:`~determined.keras.TFKerasTrial.build_validation_data_loader` to train on arrays that
+    are larger than RAM.
+
+    Each array can be given as the path of a ``.npy`` file, the path of a directory of ``.npy``
+    files that are concatenated in name order along the first axis, or an ``np.memmap``. Files are
+    memory-mapped, so every process on an agent that reads the same file shares one copy of it in
+    the page cache, which means that a multi-slot trial only keeps one copy of the data per agent.
+
+    Without ``shuffle_seed``, each batch is a contiguous range of rows, which is returned as a
+    view of the memory-mapped file whenever it does not cross a shard boundary. With
+    ``shuffle_seed``, each batch is made of randomly chosen rows (from a fixed permutation of the
+    dataset), gathered with one vectorized take per shard. The order of the batches is shuffled
+    every epoch by Determined unless ``shuffle=False`` is passed to
+    :meth:`~determined.keras.TFKerasTrialContext.configure_fit`.
+
+    Arguments:
+        x: Input data: an array (a path or an array, as above), a list of arrays if the model has
+            multiple inputs, or a dict mapping input names to arrays if the model has named
+            inputs.
+        y: Target data, in the same format as ``x``.
+        batch_size: Number of samples per batch.
+        sample_weights: An optional array of weights for the samples.
+        drop_leftovers: If True, drop the data that cannot complete the last batch.
+        shuffle_seed: If set, batches are made of randomly chosen rows.
+        num_buffers: If greater than zero, shuffled batches are gathered into a ring of this
+            many preallocated buffers instead of newly allocated arrays. A buffer is reused
+            ``num_buffers`` batches later, so it must be larger than the number of batches that
+            can be in flight at once, which is ``max_queue_size + workers + 1`` for the
+            arguments of :meth:`~determined.keras.TFKerasTrialContext.configure_fit`.
+    """
+
+    def __init__(
+        self,
+        x: MemmapArrayLike,
+        y: MemmapArrayLike,
+        batch_size: int,
+        sample_weights: Optional[_ArraySource] = None,
+        drop_leftovers: bool = False,
+        shuffle_seed: Optional[int] = None,
+        num_buffers: int = 0,
+    ) -> None:
+        self.x = _map_multi_arraylike(_ShardedArray, x)
+        self.y = _map_multi_arraylike(_ShardedArray, y)
+        self.sample_weight = _ShardedArray(sample_weights) if sample_weights is not None else None
+
+        self._length = _length_of_sharded_arraylike(self.x)
+        check.eq(
+            self._length, _length_of_sharded_arraylike(self.y), "Length of x and y do not match."
+        )
+        check.check_gt_eq(self._length, batch_size, "Batch size is too large for the input data.")
+        if self.sample_weight is not None:
+            check.eq(
+                self._length,
+                len(self.sample_weight),
+                "Lengths of input data and sample weights do not match.",
+            )
+
+        self.batch_size = batch_size
+        self.drop_leftovers = drop_leftovers
+
+        self._permutation = None  # type: Optional[np.ndarray]
+        if shuffle_seed is not None:
+            self._permutation = np.random.RandomState(shuffle_seed).permutation(self._length)
+
+        self.num_buffers = num_buffers
+        self._buffers = [{} for _ in range(num_buffers)]  # type: List[Dict[int, np.ndarray]]
+        # itertools.count() is atomic, so threaded data loading workers never share a buffer.
+        self._calls = itertools.count()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Buffers are per process and are not sent to multiprocessing data loading workers.
+        state = dict(self.__dict__)
+        del state["_buffers"], state["_calls"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._buffers = [{} for _ in range(self.num_buffers)]
+        self._calls = itertools.count()
+
+    def __len__(self) -> int:
+        # Returns number of batches (keeps last partial batch).
+        if self.drop_leftovers:
+            return math.floor(self._length / self.batch_size)
+        else:
+            return math.ceil(self._length / self.batch_size)
+
+    def _out(self, buffers: Optional[Dict[int, np.ndarray]], array: _ShardedArray, n: int) -> Any:
+        if buffers is None:
+            return np.empty((n,) + array.shape[1:], array.dtype)
+        if id(array) not in buffers:
+            buffers[id(array)] = np.empty((self.batch_size,) + array.shape[1:], array.dtype)
+        return buffers[id(array)][:n]
+
+    def __getitem__(self, index: int) -> Tuple[Any, ...]:
+        start = index * self.batch_size
+        end = min((index + 1) * self.batch_size, self._length)
+
+        if self._permutation is None:
+
+            def get(array: _ShardedArray) -> np.ndarray:
+                return array.slice(start, end)
+
+        else:
+            # Sorting the rows of a batch makes reads from each file sequential.
+            indices = np.sort(self._permutation[start:end])
+            buffers = None
+            if self.num_buffers > 0:
+                buffers = self._buffers[next(self._calls) % self.num_buffers]
+
+            def get(array: _ShardedArray) -> np.ndarray:
+                return array.gather(indices, self._out(buffers, array, len(indices)))
+
+        batch = (_map_multi_arraylike(get, self.x), _map_multi_arraylike(get, self.y))
+        if self.sample_weight is None:
+            return batch
+        return batch + (get(self.sample_weight),)
+
+
 class SequenceAdapter:
     """
     Deprecated: use context.configure_fit() instead.
@@ -187,6 +444,9 @@ def _adapt_data_from_data_loader(
     y = input_data[1]
     sample_weight = input_data[2] if len(input_data) == 3 else None
 
+    if _contains_path(x) or _contains_path(y) or _is_path(sample_weight):
+        return MemmapArrayAdapter(x, y, batch_size, sample_weight)
+
     return _ArrayLikeAdapter(x, y, batch_size, sample_weight)
 
 
@@ -210,4 +470,7 @@ def _adapt_data_from_fit_args(
             )
         return x
 
+    if _contains_path(x) or _contains_path(y) or _is_path(sample_weight):
+        return MemmapArrayAdapter(x, y, batch_size, sample_weight)
+
     return _ArrayLikeAdapter(x, y, batch_size, sample_weight)
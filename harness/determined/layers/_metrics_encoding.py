@@ -0,0 +1,123 @@
+"""
+Encodings of the WORKLOAD_COMPLETED messages that the harness sends to the master.
+
+  * "json" is the original encoding: util.json_encode() of the message, sent as a text frame.
+
+  * "columnar" replaces the list of per-batch dicts in ``metrics["batch_metrics"]`` with
+    ``{"num_batches": N, "columns": {name: [value, ...]}}``, so that metric names are not repeated
+    for every batch and each column of numbers is converted to JSON by NumPy in one step instead
+    of one NumPy scalar at a time. It is sent as a text frame.
+
+  * "columnar+zlib" is "columnar" compressed with zlib, sent as a binary frame.
+
+The master lists the encodings that it accepts in the "metrics_encodings" field of the
+RENDEZVOUS_INFO message. A master that does not send the field only accepts "json".
+"""
+import os
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import simplejson
+
+from determined import util
+
+JSON = "json"
+COLUMNAR = "columnar"
+COLUMNAR_ZLIB = "columnar+zlib"
+
+# The encodings the harness can send, most preferred first.
+ENCODINGS = [COLUMNAR_ZLIB, COLUMNAR, JSON]
+
+# Fast compression; metrics compress well even at the lowest level.
+_ZLIB_LEVEL = 1
+
+
+def choose_encoding(offered: Optional[Iterable[str]], requested: Optional[str] = None) -> str:
+    """
+    Choose the encoding to send messages with, given the encodings that the master offered and
+    the encoding requested with the DET_METRICS_ENCODING environment variable, if any.
+    """
+    offered = set(offered or []) | {JSON}
+    if requested is None:
+        requested = os.environ.get("DET_METRICS_ENCODING")
+    if requested:
+        if requested not in ENCODINGS:
+            raise ValueError(
+                f"Unknown metrics encoding {requested}; expected one of {', '.join(ENCODINGS)}"
+            )
+        return requested if requested in offered else JSON
+    return next(e for e in ENCODINGS if e in offered)
+
+
+def _column_to_list(values: List[Any]) -> List[Any]:
+    arr = np.asarray(values)
+    # Numeric columns are converted by NumPy in a single call; NaN and infinity become null when
+    # the message is encoded, as in util.json_encode. Anything else is left for the JSON encoder.
+    if arr.ndim == 1 and arr.dtype.kind in "fiu":
+        return arr.tolist()  # type: ignore
+    return values
+
+
+def columnize_batch_metrics(batch_metrics: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Convert a list of per-batch metric dicts into columns, or return None if the batches do not
+    all have the same metrics.
+    """
+    names = list(batch_metrics[0]) if batch_metrics else []
+    for batch in batch_metrics:
+        if len(batch) != len(names) or any(name not in batch for name in names):
+            return None
+    return {
+        "num_batches": len(batch_metrics),
+        "columns": {
+            name: _column_to_list([batch[name] for batch in batch_metrics]) for name in names
+        },
+    }
+
+
+def decolumnize_batch_metrics(columnar: Dict[str, Any]) -> List[Dict[str, Any]]:
+    columns = columnar["columns"]
+    return [
+        {name: values[i] for name, values in columns.items()}
+        for i in range(columnar["num_batches"])
+    ]
+
+
+def encode(msg: Dict[str, Any], encoding: str) -> Union[str, bytes]:
+    """Encode a message to send to the master: a str for a text frame, bytes for a binary one."""
+    if encoding == JSON:
+        return util.json_encode(msg)
+
+    metrics = msg.get("metrics")
+    if isinstance(metrics, dict) and isinstance(metrics.get("batch_metrics"), list):
+        columnar = columnize_batch_metrics(metrics["batch_metrics"])
+        if columnar is not None:
+            msg = {**msg, "metrics": {**metrics, "batch_metrics": columnar}}
+        else:
+            return util.json_encode(msg)
+
+    text = util.json_encode({**msg, "encoding": COLUMNAR})
+    if encoding == COLUMNAR_ZLIB:
+        return zlib.compress(text.encode("utf-8"), _ZLIB_LEVEL)
+    return text
+
+
+def decode(payload: Union[str, bytes]) -> Dict[str, Any]:
+    """
+    Decode a message produced by encode() with any encoding into the format of the "json"
+    encoding. Binary payloads are zlib-compressed.
+    """
+    if isinstance(payload, bytes):
+        try:
+            payload = zlib.decompress(payload)
+        except zlib.error:
+            pass
+        payload = payload.decode("utf-8")
+
+    msg = simplejson.loads(payload)  # type: Dict[str, Any]
+    if msg.pop("encoding", JSON) == COLUMNAR:
+        metrics = msg.get("metrics")
+        if isinstance(metrics, dict) and isinstance(metrics.get("batch_metrics"), dict):
+            metrics["batch_metrics"] = decolumnize_batch_metrics(metrics["batch_metrics"])
+    return msg
@@ -8,7 +8,8 @@ import lomond.session
 import simplejson
 
 import determined as det
-from determined import layers, util, workload
+from determined import layers, workload
+from determined.layers import _metrics_encoding
 
 
 class CustomSSLWebsocketSession(lomond.session.WebsocketSession):  # type: ignore
@@ -54,6 +55,9 @@ class SocketManager(workload.Source):
         # own connection to the master.
         self.socket = lomond.WebSocket(url, proxies={})
 
+        # The encoding of WORKLOAD_COMPLETED messages, negotiated with the rendezvous message.
+        self.metrics_encoding = _metrics_encoding.JSON
+
         self.ws_events = self.socket.connect(
             ping_rate=0, session_class=lambda socket: CustomSSLWebsocketSession(socket, env)
         )
@@ -143,6 +147,11 @@ class SocketManager(workload.Source):
                 addrs, rank = msg["addrs"], msg["rank"]
                 addrs2 = msg["addrs2"]
 
+                self.metrics_encoding = _metrics_encoding.choose_encoding(
+                    msg.get("metrics_encodings")
+                )
+                logging.info("Sending metrics with the %s encoding", self.metrics_encoding)
+
                 # The rendezvous info contains the external addresses for
                 # all the containers, but we need to set what to actually
                 # bind to inside this container. We just bind to the
@@ -197,7 +206,11 @@ class SocketManager(workload.Source):
             duration = metrics["end_time"] - metrics["start_time"]
             logging.info(f"Workload completed: {metrics['workload']} (duration {duration})")
 
-            self.socket.send_text(util.json_encode(metrics))
+            payload = _metrics_encoding.encode(metrics, self.metrics_encoding)
+            if isinstance(payload, bytes):
+                self.socket.send_binary(payload)
+            else:
+                self.socket.send_text(payload)
 
         yield wkld, [], respond
 
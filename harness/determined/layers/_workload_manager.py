@@ -41,6 +41,7 @@ class WorkloadManager(workload.Source):
         self.rendezvous_info = rendezvous_info
         self.storage_mgr = storage_mgr
         self.tensorboard_mgr = tensorboard_mgr
+        self.metric_writer = metric_writer
         self.callbacks = [metric_writer]  # type: List[det.callback.Callback]
 
 
@@ -218,6 +219,9 @@ class _TrialWorkloadManager(WorkloadManager):
                     wkld.step_id, wkld.total_batches_processed, v_metrics
                 )
 
+            # Training metrics may still be queued in the metric writer; validation is infrequent
+            # enough to wait for them so that the synced event files are complete.
+            self.metric_writer.flush()
             self.tensorboard_mgr.sync()
 
             # Check that the validation metrics computed by the model code
@@ -303,18 +307,13 @@ class _TrialWorkloadManager(WorkloadManager):
             return
 
         # Save the workload completed message for after checkpoint upload completes.
-        message = None  # type: Optional[workload.Response]
-
-        def _respond(checkpoint_info: workload.Response) -> None:
-            checkpoint_info = cast(Dict[str, Any], checkpoint_info)
-            metadata = storage.StorageMetadata(
-                storage_id,
-                storage.StorageManager._list_directory(path),
-                checkpoint_info.get("framework", ""),
-                checkpoint_info.get("format", ""),
-            )
+        message = None  # type: Optional[Dict[str, Any]]
+        checkpoint_info = {}  # type: Dict[str, Any]
+        stored = []  # type: List[storage.StorageMetadata]
 
-            logging.info("Saved trial to checkpoint {}".format(metadata.storage_id))
+        def _respond(response: workload.Response) -> None:
+            checkpoint_info.update(cast(Dict[str, Any], response))
+            self.metric_writer.flush()
             self.tensorboard_mgr.sync()
 
             nonlocal message
@@ -323,15 +322,22 @@ class _TrialWorkloadManager(WorkloadManager):
                 "workload": wkld,
                 "start_time": start_time,
                 "end_time": _current_timestamp(),
-                "metrics": metadata,
             }
 
-        with self.storage_mgr.store_path() as (storage_id, path):
+        # The resources of the checkpoint are known once it is stored, since remote storage adds a
+        # checksum manifest to the checkpoint while it is uploaded.
+        with self.storage_mgr.store_path(on_stored=stored.append) as (storage_id, path):
             yield wkld, [pathlib.Path(path)], _respond
 
         # Because the messaging is synchronous, the layer below us must have called _respond.
         check_not_none(message, "response function did not get called")
-        message = cast(workload.Response, message)
+        message = cast(Dict[str, Any], message)
+
+        metadata = stored[0]
+        metadata.framework = checkpoint_info.get("framework", "")
+        metadata.format = checkpoint_info.get("format", "")
+        message["metrics"] = metadata
+        logging.info("Saved trial to checkpoint {}".format(metadata.storage_id))
 
         respond(message)
 
@@ -341,6 +347,9 @@ class _TrialWorkloadManager(WorkloadManager):
 
         # The master can't actually handle WORKLOAD_COMPLETED messages for TERMINATE workloads.
         def _respond(_: workload.Response) -> None:
+            if self.rendezvous_info.get_rank() == 0:
+                self.metric_writer.flush()
+                self.tensorboard_mgr.sync()
             respond(workload.Skipped())
 
         yield wkld, [], _respond
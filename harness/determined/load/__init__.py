@@ -1,5 +1,8 @@
+from determined.load._import_profile import ImportProfile, ImportTime, profile_imports
 from determined.load._load_implementation import (
     RunpyGlobals,
+    clear_trial_cache,
+    hash_code_dir,
     load_native_implementation,
     load_trial_implementation,
 )
@@ -0,0 +1,120 @@
+"""
+Measurement of the time spent importing each module while user code is loaded, in the spirit of
+``python -X importtime`` but within a running process.
+
+Every call to ``__import__`` that loads a module that was not loaded yet is timed, and so is every
+module that is loaded explicitly with ImportProfile.record(). The time of a module includes the
+time of the modules that it imports in turn; its self time does not.
+
+    with profile_imports() as profile:
+        trial_class = load_trial_implementation("model_def:MyTrial")
+    logging.info(profile.report())
+"""
+import builtins
+import contextlib
+import importlib.util
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, cast
+
+ImportTime = NamedTuple(
+    "ImportTime", [("module", str), ("seconds", float), ("self_seconds", float), ("depth", int)]
+)
+
+
+class ImportProfile:
+    def __init__(self) -> None:
+        self.imports = []  # type: List[ImportTime]
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _stack(self) -> List[float]:
+        # The time spent in nested imports of each import in progress on this thread.
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack  # type: ignore
+
+    @contextlib.contextmanager
+    def record(self, module: str) -> Iterator[None]:
+        """Time the import of a module that happens within the context."""
+        stack = self._stack()
+        depth = len(stack)
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            nested = stack.pop()
+            if stack:
+                stack[-1] += seconds
+            with self._lock:
+                self.imports.append(ImportTime(module, seconds, seconds - nested, depth))
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(i.seconds for i in self.imports if i.depth == 0)
+
+    def slowest(self, n: int = 10) -> List[ImportTime]:
+        """Return the n modules that took the longest to import, nested imports included."""
+        return sorted(self.imports, key=lambda i: i.seconds, reverse=True)[:n]
+
+    def report(self, n: Optional[int] = None) -> str:
+        """
+        Format the import time of every module, or of the n slowest ones, as a table sorted by
+        import time.
+        """
+        rows = self.slowest(n if n is not None else len(self.imports))
+        lines = [
+            "Imported {} module(s) in {:.3f}s.".format(len(self.imports), self.total_seconds),
+            "{:>10} {:>10}  {}".format("total (s)", "self (s)", "module"),
+        ]
+        for row in rows:
+            lines.append(
+                "{:>10.3f} {:>10.3f}  {}{}".format(
+                    row.seconds, row.self_seconds, "  " * row.depth, row.module
+                )
+            )
+        return "\n".join(lines)
+
+
+def _resolve(name: str, globals: Optional[Dict[str, Any]], level: int) -> Optional[str]:
+    if level == 0:
+        return name
+    package = (globals or {}).get("__package__") or (globals or {}).get("__name__")
+    if not package:
+        return None
+    try:
+        return importlib.util.resolve_name("." * level + name, package)
+    except (ImportError, ValueError):
+        return None
+
+
+@contextlib.contextmanager
+def profile_imports() -> Iterator[ImportProfile]:
+    """
+    Time every module that is imported for the first time within the context, on any thread.
+    The imports themselves are unchanged.
+    """
+    profile = ImportProfile()
+    original_import = builtins.__import__
+
+    def _import(
+        name: str,
+        globals: Optional[Dict[str, Any]] = None,
+        locals: Optional[Dict[str, Any]] = None,
+        fromlist: Any = (),
+        level: int = 0,
+    ) -> Any:
+        module = _resolve(name, globals, level)
+        if module is None or module in sys.modules:
+            return original_import(name, globals, locals, fromlist, level)
+        with profile.record(module):
+            return original_import(name, globals, locals, fromlist, level)
+
+    builtins.__import__ = cast(Callable[..., Any], _import)
+    try:
+        yield profile
+    finally:
+        builtins.__import__ = original_import
@@ -1,17 +1,60 @@
 import contextlib
+import hashlib
 import importlib
 import json
 import logging
+import os
+import pathlib
 import runpy
 import sys
-from typing import Any, Iterator, List, Optional, Tuple, Type, cast
+import threading
+import types
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type, cast
 
 import determined as det
 from determined import horovod
 from determined_common import check
 
+_CachedTrial = Tuple[Type[det.Trial], Dict[str, types.ModuleType]]
 
-def load_trial_implementation(entrypoint_spec: str) -> Type[det.Trial]:
+# Trial classes loaded with load_trial_implementation(..., cache=True), by the hash of the code they
+# were loaded from and their entrypoint, along with the modules of the code that were imported.
+_trial_cache = {}  # type: Dict[Tuple[str, str], _CachedTrial]
+_trial_cache_lock = threading.Lock()
+
+
+def hash_code_dir(code_dir: pathlib.Path) -> str:
+    """Return a hash of the paths and contents of the files in a directory of user code."""
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(str(code_dir)):
+        dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+        for name in sorted(files):
+            path = pathlib.Path(root, name)
+            digest.update(str(path.relative_to(code_dir)).encode("utf-8") + b"\0")
+            with path.open("rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(chunk)
+            digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _modules_under(code_dir: pathlib.Path) -> Dict[str, types.ModuleType]:
+    modules = {}
+    prefix = str(code_dir) + os.sep
+    for name, module in list(sys.modules.items()):
+        path = getattr(module, "__file__", None)
+        if path and os.path.abspath(path).startswith(prefix):
+            modules[name] = module
+    return modules
+
+
+def clear_trial_cache() -> None:
+    """Forget the trial classes loaded by load_trial_implementation(..., cache=True)."""
+    with _trial_cache_lock:
+        _trial_cache.clear()
+
+
+def load_trial_implementation(entrypoint_spec: str, cache: bool = False) -> Type[det.Trial]:
     """
     Load and initialize a Trial class from an entrypoint specification.
 
@@ -39,8 +82,41 @@ def load_trial_implementation(entrypoint_spec: str) -> Type[det.Trial]:
     is prefixed to <module>, or used as the module if <module> is empty.
 
     [1] https://packaging.python.org/specifications/entry-points/
+
+    If cache is set, the Trial class is reused if the same entrypoint was loaded from a current
+    directory with the same files before within this process, as when many checkpoints of one
+    experiment are loaded. The modules of the user code that the class was loaded with are put
+    back in sys.modules, so the code behaves as if it had just been imported.
+
+    On a cache miss, the modules of the user code of every cached Trial class are removed from
+    sys.modules before the entrypoint is imported, so that helper modules with the same names in
+    different directories are not mixed up. Without cache, only the entrypoint module is removed:
+    any other module of the user code that is already loaded, such as a ``data.py`` of another
+    model definition, is reused as it is.
     """
 
+    if not cache:
+        return _import_trial_implementation(entrypoint_spec)
+
+    code_dir = pathlib.Path(os.getcwd()).resolve()
+    key = (hash_code_dir(code_dir), entrypoint_spec)
+    with _trial_cache_lock:
+        cached = _trial_cache.get(key)
+        if cached is not None:
+            trial_class, modules = cached
+            logging.info(f"Reusing Trial implementation with entrypoint {entrypoint_spec}.")
+            sys.modules.update(modules)
+            return trial_class
+
+        for _, modules in _trial_cache.values():
+            for name in modules:
+                sys.modules.pop(name, None)
+        trial_class = _import_trial_implementation(entrypoint_spec)
+        _trial_cache[key] = (trial_class, _modules_under(code_dir))
+        return trial_class
+
+
+def _import_trial_implementation(entrypoint_spec: str) -> Type[det.Trial]:
     logging.info(f"Loading Trial implementation with entrypoint {entrypoint_spec}.")
     module, qualname_separator, qualname = entrypoint_spec.partition(":")
 
@@ -50,7 +126,9 @@ def load_trial_implementation(entrypoint_spec: str) -> Type[det.Trial]:
     # python will only load the module once. Thus, it would be impossible to
     # load trials from different experiments into the same process. To avoid
     # this, we remove the module name from sys.modules if it already exists to
-    # force python to load the module regardless of its name.
+    # force python to load the module regardless of its name. Only the entrypoint module is
+    # removed; load_trial_implementation(..., cache=True) also removes the other modules of the
+    # user code it loaded before.
     if module in sys.modules:
         sys.modules.pop(module)
 
@@ -150,6 +228,12 @@ def convert_notebook_to_python_script(notebook_path: str) -> str:
     )
     processed_cells_path = f"{notebook_path[:-6]}__det__.py"
 
+    # The script only changes when the notebook does.
+    if os.path.exists(processed_cells_path) and os.path.getmtime(
+        processed_cells_path
+    ) >= os.path.getmtime(notebook_path):
+        return processed_cells_path
+
     with open(notebook_path, "r") as f1, open(processed_cells_path, "w") as f2:
         obj = json.load(f1)
         check.true("cells" in obj, f"Invalid notebook file {notebook_path}")
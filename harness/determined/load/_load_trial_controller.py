@@ -1,4 +1,7 @@
+import contextlib
+import distutils.util
 import logging
+import os
 import pathlib
 from typing import Optional, Tuple, Type, cast
 
@@ -126,20 +129,41 @@ def prepare_controller(
 ) -> det.TrialController:
     """
     Load a user's python code, locate the Trial and Trial Controller, then instantiate one.
+
+    The time spent importing each module is logged if debug logging is enabled or the
+    DET_PROFILE_IMPORTS environment variable is set to true.
     """
 
-    if env.experiment_config.native_enabled():
-        controller = load_native_implementation_controller(
-            env, workloads, load_path, rendezvous_info, hvd_config
-        )
-    else:
-        controller = load_trial_implementation_controller(
-            env, workloads, load_path, rendezvous_info, hvd_config
-        )
+    profile: Optional[load.ImportProfile] = None
+    with contextlib.ExitStack() as stack:
+        if _should_profile_imports():
+            profile = stack.enter_context(load.profile_imports())
+        if env.experiment_config.native_enabled():
+            controller = load_native_implementation_controller(
+                env, workloads, load_path, rendezvous_info, hvd_config
+            )
+        else:
+            controller = load_trial_implementation_controller(
+                env, workloads, load_path, rendezvous_info, hvd_config
+            )
+
+    if profile is not None:
+        slowest = ", ".join(f"{i.module} ({i.seconds:.2f}s)" for i in profile.slowest(5))
+        logging.info(f"Imported {len(profile.imports)} module(s) in {profile.total_seconds:.2f}s.")
+        if slowest:
+            logging.info(f"Slowest imports: {slowest}.")
+        logging.debug(f"Import profile:\n{profile.report()}")
 
     return controller
 
 
+def _should_profile_imports() -> bool:
+    # Replacing builtins.__import__ slows down every import a little, so it is opt-in.
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        return True
+    return bool(distutils.util.strtobool(os.environ.get("DET_PROFILE_IMPORTS", "false")))
+
+
 def prepare_tensorboard(
     env: det.EnvContext,
     container_path: Optional[str] = None,
@@ -160,5 +184,5 @@ def prepare_tensorboard(
 
     return (
         tensorboard_mgr,
-        tensorboard.BatchMetricWriter(writer),
+        tensorboard.build_batch_metric_writer(writer),
     )
@@ -1,6 +1,7 @@
 from determined.pytorch._data import (
     DataLoader,
     DistributedBatchSampler,
+    PersistentDataLoader,
     RepeatBatchSampler,
     SkipBatchSampler,
     TorchData,
@@ -9,9 +10,20 @@ from determined.pytorch._data import (
     data_length,
     to_device,
 )
+from determined.pytorch._shared_memory import SlabDataLoader
 from determined.pytorch._callback import PyTorchCallback
 from determined.pytorch._lr_scheduler import LRScheduler
-from determined.pytorch._reducer import MetricReducer, _SimpleReducer, Reducer, _reduce_metrics
+from determined.pytorch._reducer import (
+    AUCReducer,
+    ConfusionMatrixReducer,
+    HistogramReducer,
+    MetricReducer,
+    QuantileReducer,
+    _SimpleReducer,
+    Reducer,
+    WelfordReducer,
+    _reduce_metrics,
+)
 from determined.pytorch._experimental import PyTorchExperimentalContext
 from determined.pytorch._pytorch_context import PyTorchTrialContext
 from determined.pytorch._pytorch_trial import PyTorchTrial, PyTorchTrialController, reset_parameters
@@ -1,14 +1,17 @@
 import logging
+import random
 from typing import (
     Any,
     Callable,
     Dict,
     Generator,
+    Iterable,
     Iterator,
     List,
     Optional,
     Sequence,
     Set,
+    Tuple,
     Type,
     TypeVar,
     Union,
@@ -19,6 +22,7 @@ import numpy as np
 import torch
 
 # from torch.utils.data.dataloader import _InfiniteConstantSampler
+from determined.pytorch import _shared_memory
 from determined_common.check import check_gt, check_lt
 
 # TODO(DET-1524): Uncomment inports.
@@ -85,6 +89,15 @@ class DataLoader:
         worker_init_fn (callable, optional): If not ``None``, this will be called on each
             worker subprocess with the worker id (an int in ``[0, num_workers - 1]``) as
             input, after seeding and before data loading. (default: ``None``)
+
+    <END ARGUMENTS DOCUMENTATION FROM PYTORCH>
+        shared_memory_slabs (bool, optional): set to ``True`` to have workers collate batches
+            directly into shared memory that is allocated, and pinned if :attr:`pin_memory` is
+            set, once for the whole data loader, instead of into new shared memory for every
+            batch. The layout of the batches is inferred from the first sample of the dataset,
+            so :attr:`batch_size` must be set. A batch is only valid until the batch after the
+            next one is loaded, after which its memory is reused, so batches that are kept
+            longer must be copied. (default: ``False``)
     """
 
     def __init__(
@@ -100,6 +113,7 @@ class DataLoader:
         drop_last: bool = False,
         timeout: float = 0,
         worker_init_fn: _worker_init_fn_t = None,
+        shared_memory_slabs: bool = False,
     ):
 
         # BEGIN VENDORED CODE FROM PYTORCH
@@ -180,6 +194,10 @@ class DataLoader:
         self.collate_fn = collate_fn
         # END VENDORED CODE FROM PYTORCH
 
+        if shared_memory_slabs and batch_size is None:
+            raise ValueError("shared_memory_slabs requires batch_size to be set")
+        self.shared_memory_slabs = shared_memory_slabs
+
     # BEGIN VENDORED CODE FROM PYTORCH
     # https://github.com/pytorch/pytorch/blob/v1.3.1/torch/utils/data/dataloader.py#L280
     @property
@@ -195,6 +213,19 @@ class DataLoader:
         batch_sampler = adapt_batch_sampler(
             batch_sampler, repeat=repeat, skip=skip, num_replicas=num_replicas, rank=rank
         )
+        if self.shared_memory_slabs:
+            return _shared_memory.SlabDataLoader(  # type: ignore
+                self.dataset,
+                batch_sampler,
+                batch_size=cast(int, self.batch_size),
+                num_workers=self.num_workers,
+                collate_fn=(
+                    None if self.collate_fn is _utils.collate.default_collate else self.collate_fn
+                ),
+                pin_memory=self.pin_memory,
+                timeout=self.timeout,
+                worker_init_fn=self.worker_init_fn,
+            )
         return torch.utils.data.DataLoader(
             self.dataset,
             batch_sampler=batch_sampler,
@@ -205,6 +236,26 @@ class DataLoader:
             worker_init_fn=self.worker_init_fn,  # type: ignore
         )
 
+    def get_persistent_data_loader(
+        self, num_replicas: int = 1, rank: int = 0
+    ) -> "PersistentDataLoader":
+        """
+        Return a PersistentDataLoader over this DataLoader's data, which keeps the same worker
+        processes alive across passes over the data instead of forking new ones for each pass.
+        """
+        batch_sampler = cast(BatchSampler, self.batch_sampler)
+        return PersistentDataLoader(
+            self.dataset,
+            adapt_batch_sampler(batch_sampler, num_replicas=num_replicas, rank=rank),
+            num_workers=self.num_workers,
+            collate_fn=self.collate_fn,
+            pin_memory=self.pin_memory,
+            timeout=self.timeout,
+            worker_init_fn=self.worker_init_fn,
+            shared_memory_slabs=self.shared_memory_slabs,
+            batch_size=self.batch_size,
+        )
+
     def __iter__(self) -> Iterator:
         """Compatibiliy with the real DataLoader when using a PyTorchTrial outside of Determined."""
         return iter(self.get_data_loader())
@@ -218,6 +269,131 @@ class DataLoader:
         return len(batch_sampler)
 
 
+class _ReseedingDataset(Dataset):
+    """
+    Wrap a dataset whose indices are tagged with a seed by _SeededBatchSampler. Whenever the seed
+    changes, the random number generators of the worker process are reseeded, just as they would
+    be in freshly-started worker processes.
+    """
+
+    def __init__(self, dataset: Dataset) -> None:
+        self.dataset = dataset
+        self._seed = None  # type: Optional[int]
+
+    def __getitem__(self, key: Tuple[int, Any]) -> Any:
+        seed, index = key
+        if seed != self._seed:
+            worker_info = torch.utils.data.get_worker_info()
+            # Never reseed the main process, where training also draws random numbers.
+            if worker_info is not None:
+                worker_seed = (seed + worker_info.id) % 2**32
+                random.seed(worker_seed)
+                np.random.seed(worker_seed)
+                torch.manual_seed(worker_seed)
+            self._seed = seed
+        return self.dataset[index]
+
+    def __len__(self) -> int:
+        return len(self.dataset)  # type: ignore
+
+
+class _SeededBatchSampler(torch.utils.data.BatchSampler):
+    """
+    _SeededBatchSampler yields infinite batches by repeatedly iterating through the batches of
+    another BatchSampler, like RepeatBatchSampler, tagging every index with a seed that is
+    different for each pass.
+    """
+
+    def __init__(self, batch_sampler: torch.utils.data.BatchSampler, base_seed: int) -> None:
+        self.batch_sampler = batch_sampler
+        self.base_seed = base_seed
+
+    def __len__(self) -> int:
+        return len(self.batch_sampler)
+
+    def __iter__(self) -> Generator:
+        seeds = random.Random(self.base_seed)
+        while True:
+            seed = seeds.getrandbits(32)
+            for batch in self.batch_sampler:
+                yield [(seed, index) for index in batch]
+
+
+class PersistentDataLoader:
+    """
+    PersistentDataLoader makes one pass over a dataset each time it is iterated, but unlike a
+    torch.utils.data.DataLoader it does not start new worker processes for each pass: the same
+    workers keep loading batches from one pass to the next. The random number generators of each
+    worker are reseeded with a new seed at the start of every pass, so the data is as random as it
+    would be with new workers.
+
+    If a pass is stopped early, the workers are shut down and new ones are started for the next
+    pass.
+
+    With shared_memory_slabs, the workers collate batches into shared memory like a
+    SlabDataLoader, and the same memory is reused from one pass to the next.
+    """
+
+    def __init__(
+        self,
+        dataset: Dataset,
+        batch_sampler: torch.utils.data.BatchSampler,
+        num_workers: int = 0,
+        collate_fn: _collate_fn_t = None,
+        pin_memory: bool = False,
+        timeout: float = 0,
+        worker_init_fn: _worker_init_fn_t = None,
+        shared_memory_slabs: bool = False,
+        batch_size: Optional[int] = None,
+    ) -> None:
+        if shared_memory_slabs and batch_size is None:
+            raise ValueError("shared_memory_slabs requires batch_size to be set")
+        self.dataset = dataset
+        self.batch_sampler = batch_sampler
+        # Like the base seed of a DataLoader's workers, this is drawn from torch's default
+        # generator, so it is determined by the trial seed.
+        base_seed = int(torch.empty((), dtype=torch.int64).random_().item())
+        if shared_memory_slabs:
+            self._loader = _shared_memory.SlabDataLoader(
+                _ReseedingDataset(dataset),
+                _SeededBatchSampler(batch_sampler, base_seed),
+                batch_size=cast(int, batch_size),
+                num_workers=num_workers,
+                collate_fn=None if collate_fn is _utils.collate.default_collate else collate_fn,
+                pin_memory=pin_memory,
+                timeout=timeout,
+                worker_init_fn=worker_init_fn,
+                sample=dataset[0],
+            )  # type: Iterable
+        else:
+            self._loader = torch.utils.data.DataLoader(
+                _ReseedingDataset(dataset),
+                batch_sampler=_SeededBatchSampler(batch_sampler, base_seed),
+                num_workers=num_workers,
+                collate_fn=collate_fn,
+                pin_memory=pin_memory,
+                timeout=timeout,
+                worker_init_fn=worker_init_fn,  # type: ignore
+            )
+        self._iterator = None  # type: Optional[Iterator]
+
+    def __len__(self) -> int:
+        return len(self.batch_sampler)
+
+    def __iter__(self) -> Generator:
+        if self._iterator is None:
+            self._iterator = iter(self._loader)
+        finished = False
+        try:
+            for _ in range(len(self)):
+                yield next(self._iterator)
+            finished = True
+        finally:
+            if not finished:
+                # The workers are in the middle of a pass; start over with new ones next time.
+                self._iterator = None
+
+
 def adapt_batch_sampler(
     batch_sampler: torch.utils.data.BatchSampler,
     repeat: bool = False,
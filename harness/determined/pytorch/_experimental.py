@@ -1,4 +1,4 @@
-from typing import Any, Callable, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Union, cast
 
 from determined import pytorch
 
@@ -75,6 +75,9 @@ class PyTorchExperimentalContext:
         self._allgather_fn = default_allgather_fn
         self._parent = parent
         self._auto_amp = False
+        self._distribute_full_dataset_evaluation = False
+        # The data layer imports TensorFlow, so it is only loaded if a trial uses it.
+        self._data_layer = None  # type: Optional[Any]
 
     def use_amp(self) -> None:
         """
@@ -89,6 +92,82 @@ class PyTorchExperimentalContext:
         self._parent.wrap_scaler(amp.GradScaler())
         self._auto_amp = True
 
+    def distribute_full_dataset_evaluation(self) -> None:
+        """
+        Call :meth:`~determined.pytorch.PyTorchTrial.evaluate_full_dataset` on every slot of a
+        distributed trial, each time with a data loader over a different shard of the validation
+        dataset, instead of only on the chief with the whole dataset. This makes validation time
+        scale down with the number of slots.
+
+        The metrics returned by each slot are combined with
+        :meth:`~determined.pytorch.PyTorchTrial.evaluation_reducer`, weighting each slot by its
+        number of batches, in the same way as the per-batch metrics returned by
+        ``evaluate_batch()``. Metrics which cannot be combined that way, such as ROC AUC, should
+        instead be computed with a reducer from :meth:`wrap_reducer`, like
+        :class:`determined.pytorch.AUCReducer`, that is updated in ``evaluate_full_dataset()``.
+
+        This must be called in the ``__init__()`` of the trial.
+        """
+        self._distribute_full_dataset_evaluation = True
+
+    def _get_data_layer(self) -> Any:
+        if self._data_layer is None:
+            from determined import _data_layer
+
+            self._data_layer = _data_layer.DataLayerContext(
+                env=self._parent.env, hvd_config=self._parent.hvd_config, output_records=True
+            )
+        return self._data_layer
+
+    def cache_train_dataset(self, dataset_id: str, dataset_version: str) -> Callable:
+        """
+        cache_train_dataset is a decorator for creating your training dataset with the
+        :ref:`data layer <data-layer>`. It should decorate a function that returns a map-style
+        ``torch.utils.data.Dataset``, a NumPy array, or any iterable of records, such as a
+        generator of NumPy arrays. The records are stored in a cache, keyed by ``dataset_id`` and
+        ``dataset_version``, and the cache is re-used by every later call with the same keys, so
+        the decorated function only runs once per dataset version.
+
+        The decorated function returns a map-style dataset that reads the records from the cache.
+        Wrap it in a :class:`determined.pytorch.DataLoader`, which shards it across slots,
+        resumes it from the right offset and shuffles it (``shuffle=True``) just as it would any
+        other dataset.
+
+        Example Usage:
+
+        .. code-block:: python
+
+            def build_training_data_loader(self):
+                @self.context.experimental.cache_train_dataset("mnist", "v1")
+                def make_dataset():
+                    return expensive_preprocessing(torchvision.datasets.MNIST(...))
+
+                return det.pytorch.DataLoader(
+                    make_dataset(), batch_size=self.context.get_per_slot_batch_size(), shuffle=True
+                )
+
+        .. note::
+            Batching and runtime augmentation should be done after caching, in the data loader.
+        """
+        return cast(
+            Callable,
+            self._get_data_layer().cache_train_dataset(
+                dataset_id=dataset_id, dataset_version=dataset_version
+            ),
+        )
+
+    def cache_validation_dataset(self, dataset_id: str, dataset_version: str) -> Callable:
+        """
+        cache_validation_dataset is a decorator for creating your validation dataset with the
+        :ref:`data layer <data-layer>`, in the same way as :meth:`cache_train_dataset`.
+        """
+        return cast(
+            Callable,
+            self._get_data_layer().cache_validation_dataset(
+                dataset_id=dataset_id, dataset_version=dataset_version
+            ),
+        )
+
     def _set_allgather_fn(self, fn: Callable) -> None:
         self._allgather_fn = fn
 
@@ -20,6 +20,9 @@ except ImportError:
     pass
 
 
+_ValidationLoader = Union[torch.utils.data.DataLoader, pytorch.PersistentDataLoader]
+
+
 class PyTorchTrialController(det.LoopTrialController):
     def __init__(self, trial_inst: det.Trial, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
@@ -44,9 +47,9 @@ class PyTorchTrialController(det.LoopTrialController):
         )
         self._check_evaluate_implementation()
 
-        # Validation loader will be undefined on process ranks > 0
-        # when the user defines `validate_full_dataset()`.
-        self.validation_loader = None  # type: Optional[torch.utils.data.DataLoader]
+        # Validation loader will be undefined on process ranks > 0 when the user defines
+        # `validate_full_dataset()`, unless full-dataset evaluation is distributed.
+        self.validation_loader = None  # type: Optional[_ValidationLoader]
         self._set_data_loaders()
 
         # We don't want the training_iterator shuffling values after we load state
@@ -132,6 +135,17 @@ class PyTorchTrialController(det.LoopTrialController):
 
         validation_dataset = self.trial.build_validation_data_loader()
         if self._evaluate_batch_defined():
+            if validation_dataset.num_workers > 0:
+                # Keep the validation workers alive between validation workloads rather than
+                # starting new ones and reinitializing the dataset in them for every validation.
+                self.validation_loader = validation_dataset.get_persistent_data_loader(
+                    num_replicas=nreplicas, rank=rank
+                )
+            else:
+                self.validation_loader = validation_dataset.get_data_loader(
+                    repeat=False, skip=0, num_replicas=nreplicas, rank=rank
+                )
+        elif self.context.experimental._distribute_full_dataset_evaluation:
             self.validation_loader = validation_dataset.get_data_loader(
                 repeat=False, skip=0, num_replicas=nreplicas, rank=rank
             )
@@ -410,17 +424,28 @@ class PyTorchTrialController(det.LoopTrialController):
             if self.hvd_config.use:
                 num_inputs *= hvd.size()
 
+        elif self.context.experimental._distribute_full_dataset_evaluation:
+            # Every process evaluates its own shard of the validation data, and the per-shard
+            # metrics are combined like the per-batch metrics of evaluate_batch().
+            check.true(self._evaluate_full_dataset_defined())
+            metrics = self._evaluate_full_dataset()
+            keys = metrics.keys()
+            metrics = self._reduce_metrics(
+                batch_metrics=[metrics],
+                keys=keys,
+                metrics_reducers=self._prepare_metrics_reducers(keys=keys),
+            )
+
+            self.validation_loader = cast(torch.utils.data.DataLoader, self.validation_loader)
+            num_inputs = self.context.get_per_slot_batch_size() * len(self.validation_loader)
+            if self.hvd_config.use:
+                num_inputs *= hvd.size()
+
         else:
             check.true(self._evaluate_full_dataset_defined())
             self.validation_loader = cast(torch.utils.data.DataLoader, self.validation_loader)
             if self.is_chief:
-                metrics = self.trial.evaluate_full_dataset(data_loader=self.validation_loader)
-
-                check.is_instance(
-                    metrics, dict, f"eval() must return a dictionary, got {type(metrics)}."
-                )
-
-                metrics = self._convert_metrics_to_numpy(metrics)
+                metrics = self._evaluate_full_dataset()
                 num_inputs = self.context.get_per_slot_batch_size() * len(self.validation_loader)
 
         metrics.update(
@@ -456,6 +481,14 @@ class PyTorchTrialController(det.LoopTrialController):
 
         return {"num_inputs": num_inputs, "validation_metrics": metrics}
 
+    def _evaluate_full_dataset(self) -> Dict[str, Any]:
+        self.validation_loader = cast(torch.utils.data.DataLoader, self.validation_loader)
+        metrics = self.trial.evaluate_full_dataset(data_loader=self.validation_loader)
+
+        check.is_instance(metrics, dict, f"eval() must return a dictionary, got {type(metrics)}.")
+
+        return self._convert_metrics_to_numpy(metrics)
+
     def _prepare_metrics_reducers(self, keys: Any) -> Dict[str, pytorch.Reducer]:
         metrics_reducers = {}  # type: Dict[str, pytorch.Reducer]
         reducer = self.trial.evaluation_reducer()
@@ -918,10 +951,14 @@ class PyTorchTrial(det.Trial):
         values (i.e., each returned metric is the average or sum of that metric
         across the entire validation set).
 
-        This validation can not be distributed and is performed on a single
-        device, even when multiple devices (slots) are used for training. Only
-        one of :meth:`evaluate_full_dataset` and :meth:`evaluate_batch` should
-        be overridden by a trial.
+        By default, this validation is not distributed and is performed on a
+        single device, even when multiple devices (slots) are used for
+        training. To evaluate a separate shard of the validation dataset on
+        every slot instead, call
+        :meth:`context.experimental.distribute_full_dataset_evaluation()
+        <determined.pytorch.PyTorchExperimentalContext.distribute_full_dataset_evaluation>`.
+        Only one of :meth:`evaluate_full_dataset` and :meth:`evaluate_batch`
+        should be overridden by a trial.
 
         The metrics returned from this function must be JSON-serializable.
 
@@ -5,6 +5,7 @@ from typing import Any, Callable, List, Optional
 import numpy as np
 
 import determined_common.check as check
+from determined import _reducers
 
 
 class Reducer(enum.Enum):
@@ -186,3 +187,26 @@ class _SimpleReducer(MetricReducer):
     def cross_slot_reduce(self, per_slot_metrics: List) -> Any:
         flat_metrics = [item for sublist in per_slot_metrics for item in sublist]
         return self.fn(flat_metrics)
+
+
+# Built-in reducers with constant-size, mergeable state; see determined._reducers.
+
+
+class WelfordReducer(_reducers.WelfordReducer, MetricReducer):
+    __doc__ = _reducers.WelfordReducer.__doc__
+
+
+class HistogramReducer(_reducers.HistogramReducer, MetricReducer):
+    __doc__ = _reducers.HistogramReducer.__doc__
+
+
+class QuantileReducer(_reducers.QuantileReducer, MetricReducer):
+    __doc__ = _reducers.QuantileReducer.__doc__
+
+
+class AUCReducer(_reducers.AUCReducer, MetricReducer):
+    __doc__ = _reducers.AUCReducer.__doc__
+
+
+class ConfusionMatrixReducer(_reducers.ConfusionMatrixReducer, MetricReducer):
+    __doc__ = _reducers.ConfusionMatrixReducer.__doc__
@@ -0,0 +1,305 @@
+"""
+Collation of batches into preallocated shared-memory slabs.
+
+With a stock torch.utils.data.DataLoader, each batch that a worker process collates is put in
+new shared memory: every tensor of the batch gets a freshly created shared-memory file whose
+descriptor is sent to the main process, which maps it again, and the structure of the batch is
+pickled through a queue. If memory pinning is enabled, the main process then copies every batch
+once more into pinned memory.
+
+With slab collation, the layout of a batch is inferred once from the first sample of the dataset,
+and a ring of shared-memory buffers ("slabs") with that layout is allocated, and optionally
+pinned, before the workers start. Each batch is assigned a slot of the ring; the worker stacks
+the samples of the batch directly into the slabs of that slot and only sends back the slot and
+the batch size, and the main process returns views of the slabs, without copying them.
+
+Since the slabs are reused, a batch is only valid until the batch after the next one is
+requested from the loader; a batch that is kept longer must be copied. Batches whose tensors do
+not fit the inferred layout are returned the usual way.
+"""
+import collections
+import logging
+from typing import Any, Callable, Generator, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import torch
+from torch.utils.data import _utils
+
+_default_collate = _utils.collate.default_collate
+
+
+class _Slab:
+    """A shared-memory buffer for one tensor of the batch in each slot of the ring."""
+
+    def __init__(self, example: torch.Tensor, num_slots: int) -> None:
+        self.buffer = torch.empty((num_slots,) + tuple(example.shape), dtype=example.dtype)
+        self.buffer.share_memory_()
+
+    def fits(self, tensor: torch.Tensor) -> bool:
+        return bool(
+            tensor.dtype == self.buffer.dtype
+            and tensor.shape[1:] == self.buffer.shape[2:]
+            and len(tensor) <= self.buffer.shape[1]
+        )
+
+    def view(self, slot: int, length: int) -> torch.Tensor:
+        return self.buffer[slot, :length]
+
+    def pin(self) -> None:
+        nbytes = self.buffer.numel() * self.buffer.element_size()
+        # Pin the shared memory in place; pin_memory() would copy it to new, private memory.
+        try:
+            result = int(torch.cuda.cudart().cudaHostRegister(self.buffer.data_ptr(), nbytes, 0))
+        except (AttributeError, RuntimeError):
+            result = -1
+        if result != 0:
+            logging.warning("Unable to pin shared-memory batch buffers; they will not be pinned.")
+
+
+class _DoesNotFit(Exception):
+    pass
+
+
+class _SlabBatch(NamedTuple):
+    slot: int
+    # The length of each tensor of the batch and the value of everything else, in the order in
+    # which they appear in the layout.
+    lengths: List[int]
+    others: List[Any]
+
+
+def _is_namedtuple(obj: Any) -> bool:
+    return isinstance(obj, tuple) and hasattr(obj, "_fields")
+
+
+def _walk_slabs(node: Any) -> Iterator[_Slab]:
+    if isinstance(node, _Slab):
+        yield node
+    elif isinstance(node, dict):
+        for v in node.values():
+            yield from _walk_slabs(v)
+    elif isinstance(node, (list, tuple)):
+        for v in node:
+            yield from _walk_slabs(v)
+
+
+class _Layout:
+    """
+    The structure of a collated batch: nested dicts, lists and tuples whose tensors are stored
+    in slabs. Anything else in the batch is sent to the main process as usual.
+    """
+
+    def __init__(self, example_batch: Any, num_slots: int) -> None:
+        self.tree = self._build(example_batch, num_slots)
+
+    def _build(self, batch: Any, num_slots: int) -> Any:
+        if isinstance(batch, torch.Tensor) and batch.dim() > 0:
+            return _Slab(batch, num_slots)
+        if isinstance(batch, collections.abc.Mapping):
+            node = {k: self._build(v, num_slots) for k, v in batch.items()}  # type: Any
+        elif _is_namedtuple(batch):
+            node = type(batch)(*(self._build(v, num_slots) for v in batch))
+        elif isinstance(batch, (list, tuple)):
+            node = type(batch)(self._build(v, num_slots) for v in batch)
+        else:
+            return None
+        # Parts of the batch without tensors, like the list that strings are collated into, are
+        # passed through whole.
+        return node if any(True for _ in _walk_slabs(node)) else None
+
+    def slabs(self) -> Iterator[_Slab]:
+        return _walk_slabs(self.tree)
+
+    def collate_into(self, samples: List[Any], slot: int) -> _SlabBatch:
+        """Collate samples like default_collate, writing every tensor into the slot's slabs."""
+        lengths = []  # type: List[int]
+        others = []  # type: List[Any]
+
+        def _collate(node: Any, batch: List[Any]) -> None:
+            elem = batch[0]
+            if isinstance(node, _Slab):
+                if isinstance(elem, np.ndarray):
+                    if elem.dtype.kind in "OSU":
+                        raise _DoesNotFit()
+                    batch = [torch.as_tensor(b) for b in batch]
+                    elem = batch[0]
+                if isinstance(elem, torch.Tensor):
+                    if (
+                        elem.dtype != node.buffer.dtype
+                        or elem.shape != node.buffer.shape[2:]
+                        or len(batch) > node.buffer.shape[1]
+                    ):
+                        raise _DoesNotFit()
+                    torch.stack(batch, 0, out=node.view(slot, len(batch)))
+                elif isinstance(elem, (float, int, np.number)):
+                    values = _default_collate(batch)
+                    if not node.fits(values):
+                        raise _DoesNotFit()
+                    node.view(slot, len(batch)).copy_(values)
+                else:
+                    raise _DoesNotFit()
+                lengths.append(len(batch))
+            elif isinstance(node, dict):
+                if not isinstance(elem, collections.abc.Mapping) or elem.keys() != node.keys():
+                    raise _DoesNotFit()
+                for k, v in node.items():
+                    _collate(v, [b[k] for b in batch])
+            elif isinstance(node, (list, tuple)):
+                if not isinstance(elem, (list, tuple)) or len(elem) != len(node):
+                    raise _DoesNotFit()
+                for v, column in zip(node, zip(*batch)):
+                    _collate(v, list(column))
+            else:
+                others.append(_default_collate(batch))
+
+        _collate(self.tree, samples)
+        return _SlabBatch(slot, lengths, others)
+
+    def copy_into(self, batch: Any, slot: int) -> _SlabBatch:
+        """Copy every tensor of an already collated batch into the slot's slabs."""
+        lengths = []  # type: List[int]
+        others = []  # type: List[Any]
+
+        def _copy(node: Any, value: Any) -> None:
+            if isinstance(node, _Slab):
+                if not isinstance(value, torch.Tensor) or not node.fits(value):
+                    raise _DoesNotFit()
+                node.view(slot, len(value)).copy_(value)
+                lengths.append(len(value))
+            elif isinstance(node, dict):
+                if not isinstance(value, collections.abc.Mapping) or value.keys() != node.keys():
+                    raise _DoesNotFit()
+                for k, v in node.items():
+                    _copy(v, value[k])
+            elif isinstance(node, (list, tuple)):
+                if not isinstance(value, (list, tuple)) or len(value) != len(node):
+                    raise _DoesNotFit()
+                for v, item in zip(node, value):
+                    _copy(v, item)
+            else:
+                others.append(value)
+
+        _copy(self.tree, batch)
+        return _SlabBatch(slot, lengths, others)
+
+    def unpack(self, slab_batch: _SlabBatch) -> Any:
+        """Rebuild a batch from views of the slabs of its slot."""
+        lengths = iter(slab_batch.lengths)
+        others = iter(slab_batch.others)
+
+        def _unpack(node: Any) -> Any:
+            if isinstance(node, _Slab):
+                return node.view(slab_batch.slot, next(lengths))
+            if isinstance(node, dict):
+                return {k: _unpack(v) for k, v in node.items()}
+            if _is_namedtuple(node):
+                return type(node)(*(_unpack(v) for v in node))
+            if isinstance(node, (list, tuple)):
+                return type(node)(_unpack(v) for v in node)
+            return next(others)
+
+        return _unpack(self.tree)
+
+
+class _SlotTaggedDataset(torch.utils.data.Dataset):
+    """Pass the slot that _SlotBatchSampler tagged every index with along with each sample."""
+
+    def __init__(self, dataset: torch.utils.data.Dataset) -> None:
+        self.dataset = dataset
+
+    def __getitem__(self, key: Tuple[int, Any]) -> Tuple[int, Any]:
+        slot, index = key
+        return slot, self.dataset[index]
+
+    def __len__(self) -> int:
+        return len(self.dataset)
+
+
+class _SlotBatchSampler(torch.utils.data.BatchSampler):
+    """Assign the batches of another BatchSampler to the slots of the ring in turn."""
+
+    def __init__(self, batch_sampler: torch.utils.data.BatchSampler, num_slots: int) -> None:
+        self.batch_sampler = batch_sampler
+        self.num_slots = num_slots
+
+    def __len__(self) -> int:
+        return len(self.batch_sampler)
+
+    def __iter__(self) -> Generator:
+        for i, batch in enumerate(self.batch_sampler):
+            slot = i % self.num_slots
+            yield [(slot, index) for index in batch]
+
+
+class _SlabCollator:
+    def __init__(self, layout: _Layout, collate_fn: Optional[Callable]) -> None:
+        self.layout = layout
+        self.collate_fn = collate_fn
+        self._warned = False
+
+    def __call__(self, tagged: List[Tuple[int, Any]]) -> Any:
+        slot = tagged[0][0]
+        samples = [sample for _, sample in tagged]
+        try:
+            if self.collate_fn is None:
+                return self.layout.collate_into(samples, slot)
+            batch = self.collate_fn(samples)
+            return self.layout.copy_into(batch, slot)
+        except _DoesNotFit:
+            if not self._warned:
+                logging.warning(
+                    "A batch does not match the layout inferred from the first sample of the "
+                    "dataset, so it is not collated into shared memory."
+                )
+                self._warned = True
+            return _default_collate(samples) if self.collate_fn is None else batch
+
+
+class SlabDataLoader:
+    """
+    An iterable over the batches of a torch.utils.data.DataLoader whose workers collate into
+    shared-memory slabs; see the module docstring.
+    """
+
+    def __init__(
+        self,
+        dataset: torch.utils.data.Dataset,
+        batch_sampler: torch.utils.data.BatchSampler,
+        batch_size: int,
+        num_workers: int = 0,
+        collate_fn: Optional[Callable] = None,
+        pin_memory: bool = False,
+        timeout: float = 0,
+        worker_init_fn: Optional[Callable[[int], None]] = None,
+        sample: Optional[Any] = None,
+    ) -> None:
+        """
+        The layout of the batches is inferred from `sample`, which is ``dataset[0]`` unless it is
+        set, as it must be if the indices of the dataset are not ints.
+        """
+        # Each worker has two batches in flight, and the main process holds the last batch it
+        # returned while the next one is loaded.
+        num_slots = 2 * num_workers + 2
+
+        example = [dataset[0] if sample is None else sample] * batch_size
+        example_batch = _default_collate(example) if collate_fn is None else collate_fn(example)
+        self.layout = _Layout(example_batch, num_slots)
+        if pin_memory and torch.cuda.is_available():
+            for slab in self.layout.slabs():
+                slab.pin()
+
+        self._loader = torch.utils.data.DataLoader(
+            _SlotTaggedDataset(dataset),
+            batch_sampler=_SlotBatchSampler(batch_sampler, num_slots),
+            num_workers=num_workers,
+            collate_fn=_SlabCollator(self.layout, collate_fn),
+            timeout=timeout,
+            worker_init_fn=worker_init_fn,
+        )
+
+    def __len__(self) -> int:
+        return len(self._loader)
+
+    def __iter__(self) -> Iterator:
+        for batch in self._loader:
+            yield self.layout.unpack(batch) if isinstance(batch, _SlabBatch) else batch
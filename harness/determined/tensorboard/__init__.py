@@ -1,5 +1,10 @@
 from determined.tensorboard.base import TensorboardManager
-from determined.tensorboard.build import build, get_base_path, get_sync_path
-from determined.tensorboard.metric_writers import BatchMetricWriter, MetricWriter
+from determined.tensorboard.build import (
+    build,
+    build_batch_metric_writer,
+    get_base_path,
+    get_sync_path,
+)
+from determined.tensorboard.metric_writers import AsyncMetricWriter, BatchMetricWriter, MetricWriter
 from determined.tensorboard.s3 import S3TensorboardManager
 from determined.tensorboard.shared import SharedFSTensorboardManager
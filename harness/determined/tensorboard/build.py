@@ -4,6 +4,7 @@ from typing import Any, Dict, Optional
 
 import determined as det
 from determined.tensorboard import base, gcs, hdfs, s3, shared
+from determined.tensorboard.metric_writers import AsyncMetricWriter, BatchMetricWriter, MetricWriter
 from determined_common.storage.shared import _full_storage_path
 
 
@@ -94,3 +95,25 @@ def build(
 
     else:
         raise TypeError(f"Unknown storage type: {type_name}")
+
+
+def build_batch_metric_writer(writer: MetricWriter) -> BatchMetricWriter:
+    """
+    Wrap a MetricWriter in a BatchMetricWriter configured by the environment of the trial
+    container, which can be set with ``environment.environment_variables``:
+
+      * DET_TENSORBOARD_ASYNC: whether to write metrics from a background thread (default true),
+      * DET_TENSORBOARD_FLUSH_SECS and DET_TENSORBOARD_FLUSH_SIZE: how often the background thread
+        flushes, in seconds and in number of scalars (default 10 and 1000),
+      * DET_TENSORBOARD_BATCH_METRICS: ``all`` (the default), ``every_n:<N>``, or ``window:<N>``;
+        see BatchMetricWriter.
+    """
+    if os.getenv("DET_TENSORBOARD_ASYNC", "true").lower() in ("true", "1", "yes"):
+        writer = AsyncMetricWriter(
+            writer,
+            flush_secs=float(os.getenv("DET_TENSORBOARD_FLUSH_SECS", 10)),
+            flush_size=int(os.getenv("DET_TENSORBOARD_FLUSH_SIZE", 1000)),
+        )
+
+    mode, _, period = os.getenv("DET_TENSORBOARD_BATCH_METRICS", "all").partition(":")
+    return BatchMetricWriter(writer, mode, int(period) if period else 1)
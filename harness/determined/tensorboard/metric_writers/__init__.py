@@ -1 +1,2 @@
+from determined.tensorboard.metric_writers.async_writer import AsyncMetricWriter
 from determined.tensorboard.metric_writers.callback import BatchMetricWriter, MetricWriter
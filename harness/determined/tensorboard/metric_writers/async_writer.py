@@ -0,0 +1,128 @@
+import threading
+import time
+from typing import Dict, Optional, Tuple, Union
+
+import numpy as np
+
+from determined.tensorboard.metric_writers.callback import MetricWriter
+
+
+class AsyncMetricWriter(MetricWriter):
+    """
+    AsyncMetricWriter wraps another MetricWriter, such as TFWriter or TorchWriter, and moves the
+    encoding and writing of scalars off of the training thread.
+
+    add_scalar() only queues the scalar. Queued scalars are coalesced, so that writing the same
+    tag at the same step twice only writes the last value, and handed to the wrapped writer by a
+    background thread whenever reset() is called or `flush_size` scalars are queued. The wrapped
+    writer is flushed (with its own reset()) once `flush_size` scalars have been written since the
+    last flush or `flush_secs` seconds have passed, whichever comes first, or when flush() is
+    called.
+    """
+
+    def __init__(
+        self, writer: MetricWriter, flush_secs: float = 10.0, flush_size: int = 1000
+    ) -> None:
+        self.writer = writer
+        self._flush_secs = flush_secs
+        self._flush_size = flush_size
+
+        self._cond = threading.Condition()
+        self._pending = {}  # type: Dict[Tuple[str, int], float]
+        self._drain_requested = False
+        self._flush_requested = 0
+        self._flushed = 0
+        self._closed = False
+        self._error = None  # type: Optional[BaseException]
+
+        # Only accessed by the background thread.
+        self._unflushed = 0
+        self._last_flush = time.time()
+
+        self._thread = threading.Thread(target=self._run, name="AsyncMetricWriter", daemon=True)
+        self._thread.start()
+
+    def add_scalar(self, name: str, value: Union[int, float, np.number], step: int) -> None:
+        with self._cond:
+            self._raise_if_failed()
+            # Convert to a Python float now; zero-dimensional arrays may be modified in place by
+            # the caller before the background thread gets to them.
+            self._pending[(name, int(step))] = float(value)
+            if len(self._pending) >= self._flush_size:
+                self._cond.notify_all()
+
+    def reset(self) -> None:
+        """Hand the queued scalars to the background thread without waiting for them."""
+        with self._cond:
+            self._raise_if_failed()
+            self._drain_requested = True
+            self._cond.notify_all()
+
+    def flush(self) -> None:
+        """Block until every queued scalar has been written and the wrapped writer is flushed."""
+        with self._cond:
+            self._raise_if_failed()
+            self._flush_requested += 1
+            target = self._flush_requested
+            self._cond.notify_all()
+            self._cond.wait_for(lambda: self._flushed >= target or self._error is not None)
+            self._raise_if_failed()
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._flush_requested += 1
+            self._cond.notify_all()
+        self._thread.join()
+        self._raise_if_failed()
+
+    def _raise_if_failed(self) -> None:
+        if self._error is not None:
+            raise RuntimeError("Background TensorBoard metric writer failed") from self._error
+
+    def _has_work(self) -> bool:
+        return (
+            self._closed
+            or self._drain_requested
+            or self._flush_requested > self._flushed
+            or len(self._pending) >= self._flush_size
+        )
+
+    def _time_to_flush(self) -> Optional[float]:
+        if not self._unflushed and not self._pending:
+            return None
+        return max(0.0, self._flush_secs - (time.time() - self._last_flush))
+
+    def _run(self) -> None:
+        try:
+            while True:
+                with self._cond:
+                    self._cond.wait_for(self._has_work, timeout=self._time_to_flush())
+                    pending, self._pending = self._pending, {}
+                    self._drain_requested = False
+                    flush_target = self._flush_requested
+                    closed = self._closed
+
+                for (name, step), value in pending.items():
+                    self.writer.add_scalar(name, value, step)
+                self._unflushed += len(pending)
+
+                if self._unflushed and (
+                    flush_target > self._flushed
+                    or self._unflushed >= self._flush_size
+                    or time.time() - self._last_flush >= self._flush_secs
+                ):
+                    self.writer.reset()
+                    self._unflushed = 0
+                    self._last_flush = time.time()
+
+                with self._cond:
+                    self._flushed = flush_target
+                    self._cond.notify_all()
+
+                if closed:
+                    return
+        except BaseException as e:
+            with self._cond:
+                self._error = e
+                self._cond.notify_all()
@@ -1,5 +1,5 @@
 import abc
-from typing import Any, Dict, Union
+from typing import Any, Dict, List, Union
 
 import numpy as np
 
@@ -16,10 +16,45 @@ class MetricWriter(abc.ABC):
     def reset(self) -> None:
         pass
 
+    def flush(self) -> None:
+        """
+        Block until everything written so far is on disk. Writers that write synchronously
+        already flush in reset(), so this does nothing by default.
+        """
+        pass
+
 
 class BatchMetricWriter(callback.Callback):
-    def __init__(self, writer: MetricWriter) -> None:
+    """
+    BatchMetricWriter writes training and validation metrics to a MetricWriter.
+
+    Per-batch training metrics can be decimated with `batch_metrics_mode`:
+
+      * ``"all"`` writes every batch,
+      * ``"every_n"`` writes every `batch_metrics_period`-th batch,
+      * ``"window"`` aggregates windows of `batch_metrics_period` batches within each training
+        step and writes the mean under the metric name, plus ``<name>_min`` and ``<name>_max``,
+        at the last batch of the window.
+    """
+
+    BATCH_METRICS_MODES = ("all", "every_n", "window")
+
+    def __init__(
+        self, writer: MetricWriter, batch_metrics_mode: str = "all", batch_metrics_period: int = 1
+    ) -> None:
+        if batch_metrics_mode not in self.BATCH_METRICS_MODES:
+            raise ValueError(
+                f"Unknown batch metrics mode {batch_metrics_mode}, expected one of "
+                f"{self.BATCH_METRICS_MODES}"
+            )
+        if batch_metrics_period < 1:
+            raise ValueError(
+                f"Expected batch_metrics_period to be a positive int, but it is "
+                f"{batch_metrics_period}"
+            )
         self.writer = writer
+        self.batch_metrics_mode = batch_metrics_mode
+        self.batch_metrics_period = batch_metrics_period
 
     def _maybe_write_metric(self, metric_key: str, metric_val: Any, step: int) -> None:
         # For now, we only log scalar metrics.
@@ -28,6 +63,25 @@ class BatchMetricWriter(callback.Callback):
 
         self.writer.add_scalar("Determined/" + metric_key, metric_val, step)
 
+    def _write_window(self, window: List[Dict[str, Any]], step: int) -> List[str]:
+        values = {}  # type: Dict[str, List[Any]]
+        for batch_metric in window:
+            for name, value in batch_metric.items():
+                values.setdefault(name, []).append(value)
+
+        for name, series in values.items():
+            scalars = [v for v in series if util.is_numerical_scalar(v)]
+            if not scalars:
+                continue
+            arr = np.array(scalars, dtype=np.float64)
+            self._maybe_write_metric(name, np.mean(arr), step)
+            self._maybe_write_metric(name + "_min", np.min(arr), step)
+            self._maybe_write_metric(name + "_max", np.max(arr), step)
+        return list(values)
+
+    def flush(self) -> None:
+        self.writer.flush()
+
     def on_train_step_end(
         self,
         step_id: int,
@@ -39,12 +93,24 @@ class BatchMetricWriter(callback.Callback):
             raise AssertionError(f"Expected step_id to be a positive int, but it is {step_id}")
         metrics_seen = set()
 
-        # Log all batch metrics.
-        for batch_idx, batch_metrics in enumerate(metrics["batch_metrics"]):
-            batches_seen = total_batches_processed + batch_idx
-            for name, value in batch_metrics.items():
-                self._maybe_write_metric(name, value, batches_seen)
-                metrics_seen.add(name)
+        # Log batch metrics.
+        batch_metrics = metrics["batch_metrics"]  # type: List[Dict[str, Any]]
+        if self.batch_metrics_mode == "window":
+            for start in range(0, len(batch_metrics), self.batch_metrics_period):
+                window = batch_metrics[start : start + self.batch_metrics_period]
+                metrics_seen.update(
+                    self._write_window(window, total_batches_processed + start + len(window) - 1)
+                )
+        else:
+            for batch_idx, batch_metric in enumerate(batch_metrics):
+                batches_seen = total_batches_processed + batch_idx
+                if self.batch_metrics_mode == "every_n":
+                    metrics_seen.update(batch_metric)
+                    if batches_seen % self.batch_metrics_period != 0:
+                        continue
+                for name, value in batch_metric.items():
+                    self._maybe_write_metric(name, value, batches_seen)
+                    metrics_seen.add(name)
 
         # Log avg metrics which were calculated by a custom reducer and are not in batch metrics.
         batches_seen = total_batches_processed + num_batches
@@ -1,3 +1,4 @@
+import atexit
 import collections
 import datetime
 import enum
@@ -5,6 +6,7 @@ import os
 import pathlib
 import random
 import shutil
+import tempfile
 import time
 import uuid
 from typing import Any, Dict, List, Optional, cast
@@ -14,6 +16,7 @@ import simplejson
 
 import determined as det
 from determined_common import check, util
+from determined_common.storage import staging
 
 
 @util.preserve_random_state
@@ -161,6 +164,66 @@ def json_encode(obj: Any, indent: Optional[str] = None, sort_keys: bool = False)
     return s
 
 
+class _UserCodeSnapshot:
+    """
+    The user code of a trial, which is written to every checkpoint of the trial.
+
+    The working directory is copied once per trial, to a private directory whose files are
+    never modified, and the code of every checkpoint is hardlinked from there instead of copying
+    the working directory again. Checkpoints on other filesystems are hardlinked from the code
+    of the previous checkpoint on the same filesystem, if it still exists.
+
+    The private copy is deleted by close(), which is also called when the process exits.
+    """
+
+    def __init__(self) -> None:
+        self._snapshot = None  # type: Optional[pathlib.Path]
+        self._last_code_path_by_device = {}  # type: Dict[int, pathlib.Path]
+
+    def _take_snapshot(self) -> pathlib.Path:
+        if self._snapshot is None or not self._snapshot.exists():
+            self.close()
+            snapshot = pathlib.Path(tempfile.mkdtemp(prefix="determined-user-code-"), "code")
+            try:
+                staging.stage_tree(
+                    os.getcwd(), str(snapshot), ignore=shutil.ignore_patterns("__pycache__")
+                )
+            except Exception:
+                shutil.rmtree(str(snapshot.parent), ignore_errors=True)
+                raise
+            self._snapshot = snapshot
+            atexit.register(self.close)
+        return self._snapshot
+
+    def close(self) -> None:
+        if self._snapshot is not None:
+            shutil.rmtree(str(self._snapshot.parent), ignore_errors=True)
+            atexit.unregister(self.close)
+            self._snapshot = None
+
+    def write(self, code_path: pathlib.Path) -> None:
+        device = os.stat(str(code_path.parent)).st_dev
+        source = self._last_code_path_by_device.get(device)
+        try:
+            if source is None or not source.exists():
+                raise FileNotFoundError()
+            staging.stage_tree(str(source), str(code_path), allow_hardlinks=True)
+        except OSError:
+            # The previous checkpoint may have been deleted in the meantime.
+            if code_path.exists():
+                shutil.rmtree(str(code_path))
+            staging.stage_tree(str(self._take_snapshot()), str(code_path), allow_hardlinks=True)
+        self._last_code_path_by_device[device] = code_path
+
+
+_user_code_snapshot = _UserCodeSnapshot()
+
+
+def close_user_code_snapshot() -> None:
+    """Delete the copy of the user code that write_user_code() keeps for the trial, if any."""
+    _user_code_snapshot.close()
+
+
 def write_user_code(path: pathlib.Path) -> None:
     code_path = path.joinpath("code")
 
@@ -173,5 +236,5 @@ def write_user_code(path: pathlib.Path) -> None:
     # Pytorch and tf.1 keras models can only be restored from a checkpoint if
     # the original code is present. The model code is the current working
     # directory. Therefore we save the current directory with the checkpoint.
-    shutil.copytree(os.getcwd(), code_path, ignore=shutil.ignore_patterns("__pycache__"))
+    _user_code_snapshot.write(code_path)
     os.chmod(code_path, 0o755)
@@ -0,0 +1,115 @@
+"""
+Compare the default collation of determined.pytorch.DataLoader with collation into shared-memory
+slabs (DataLoader(..., shared_memory_slabs=True)) on the CPU.
+
+For each configuration, the benchmark iterates over a synthetic dataset of dict samples (an image
+tensor, a NumPy feature vector and an integer label) and reports the throughput and the time the
+main process spends waiting for each batch and moving it to the device with to_device().
+
+Usage (from the harness directory):
+
+    python -m tests.benchmarks.data_loader_collation --workers 0,2,4 --batch-sizes 32,256
+"""
+import argparse
+import json
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import torch
+
+from determined import pytorch
+
+
+class SyntheticDataset(torch.utils.data.Dataset):
+    def __init__(self, length: int, image_shape: List[int]) -> None:
+        self.length = length
+        self.image_shape = image_shape
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        return {
+            "image": torch.full(self.image_shape, float(index)),
+            "features": np.full((64,), index, dtype=np.float32),
+            "label": index % 10,
+        }
+
+
+def _summarize(samples: List[float]) -> Dict[str, float]:
+    arr = np.array(samples, dtype=np.float64)
+    return {
+        "mean": float(np.mean(arr)),
+        "p50": float(np.percentile(arr, 50)),
+        "p99": float(np.percentile(arr, 99)),
+    }
+
+
+def run_collation_benchmark(
+    shared_memory_slabs: bool,
+    num_workers: int,
+    batch_size: int,
+    num_batches: int = 50,
+    image_shape: Optional[List[int]] = None,
+) -> Dict[str, Any]:
+    dataset = SyntheticDataset(batch_size * num_batches, image_shape or [3, 64, 64])
+    loader = pytorch.DataLoader(
+        dataset,
+        batch_size=batch_size,
+        num_workers=num_workers,
+        shared_memory_slabs=shared_memory_slabs,
+    ).get_data_loader()
+    device = torch.device("cpu")
+
+    wait_seconds = []
+    to_device_seconds = []
+    start = time.perf_counter()
+    iterator = iter(loader)
+    while True:
+        t0 = time.perf_counter()
+        try:
+            batch = next(iterator)
+        except StopIteration:
+            break
+        t1 = time.perf_counter()
+        batch = pytorch.to_device(batch, device)
+        t2 = time.perf_counter()
+        wait_seconds.append(t1 - t0)
+        to_device_seconds.append(t2 - t1)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "shared_memory_slabs": shared_memory_slabs,
+        "num_workers": num_workers,
+        "batch_size": batch_size,
+        "batches": len(wait_seconds),
+        "batches_per_second": len(wait_seconds) / elapsed,
+        "wait_seconds": _summarize(wait_seconds),
+        "to_device_seconds": _summarize(to_device_seconds),
+    }
+
+
+def _int_list(s: str) -> List[int]:
+    return [int(x) for x in s.split(",") if x]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--workers", type=_int_list, default=[0, 2, 4])
+    parser.add_argument("--batch-sizes", type=_int_list, default=[32, 256])
+    parser.add_argument("--batches", type=int, default=50)
+    parser.add_argument("--image-shape", type=_int_list, default=[3, 64, 64])
+    args = parser.parse_args(argv)
+
+    results = [
+        run_collation_benchmark(slabs, workers, batch_size, args.batches, args.image_shape)
+        for workers in args.workers
+        for batch_size in args.batch_sizes
+        for slabs in (False, True)
+    ]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
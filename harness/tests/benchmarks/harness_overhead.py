@@ -0,0 +1,323 @@
+"""
+Measure how much time the harness itself adds to each workload.
+
+The benchmark runs exec.harness.build_and_run_training_pipeline against an in-process FakeMaster,
+with the NoOpTrial from the e2e no_op fixtures as the model, and splits each RUN_STEP round trip
+into the time spent in each layer:
+
+  * socket: websocket receive/parse in SocketManager and the network round trip,
+  * encode: encoding the WORKLOAD_COMPLETED message with the negotiated metrics encoding,
+  * workload_manager: _TrialWorkloadManager callbacks, metric sanity checks and tensorboard sync,
+  * controller: the NoOpTrialController itself (mostly det.util.make_metrics).
+
+A second sweep measures the ZMQ broadcast/gather used by SubprocessLauncher as a function of the
+number of worker processes.
+
+Usage (from the harness directory):
+
+    python -m tests.benchmarks.harness_overhead --batches 1,100 --metrics 1,100 --workers 1,4 \
+        --encodings json,columnar,columnar+zlib
+"""
+import argparse
+import contextlib
+import json
+import multiprocessing
+import pathlib
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from unittest import mock
+
+import numpy as np
+
+import determined as det
+from determined import constants, ipc, layers, load, util, workload
+from determined.exec import harness
+from determined.layers import _metrics_encoding
+from determined_common import constants as common_constants
+from tests.fixtures.fake_master import FakeMaster
+
+NO_OP_MODEL_DEF = (
+    pathlib.Path(__file__).resolve().parents[3].joinpath("e2e_tests", "tests", "fixtures", "no_op")
+)
+
+
+def _summarize(samples: List[float]) -> Dict[str, Optional[float]]:
+    if not samples:
+        return {"mean": None, "p50": None, "p99": None}
+    arr = np.array(samples, dtype=np.float64)
+    return {
+        "mean": float(np.mean(arr)),
+        "p50": float(np.percentile(arr, 50)),
+        "p99": float(np.percentile(arr, 99)),
+    }
+
+
+class _StreamProbe:
+    """
+    Wrap a workload.Stream and record, for every RUN_STEP workload, the time between yielding the
+    workload to the next layer down and that layer calling the response function.
+    """
+
+    def __init__(self) -> None:
+        self.seconds = []  # type: List[float]
+
+    def wrap(self, stream: workload.Stream) -> workload.Stream:
+        for wkld, args, respond in stream:
+            start = time.perf_counter()
+
+            def _respond(response: workload.Response, respond: Any = respond) -> None:
+                if wkld.kind == workload.Workload.Kind.RUN_STEP:
+                    self.seconds.append(time.perf_counter() - start)
+                respond(response)
+
+            yield wkld, args, _respond
+
+
+class _CallTimer:
+    def __init__(self, fn: Callable) -> None:
+        self._fn = fn
+        self.seconds = []  # type: List[float]
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            return self._fn(*args, **kwargs)
+        finally:
+            self.seconds.append(time.perf_counter() - start)
+
+
+def _make_env(
+    port: int, batches_per_workload: int, num_metrics: int, storage_dir: str
+) -> det.EnvContext:
+    experiment_config = {
+        **constants.DEFAULT_EXP_CFG,
+        "entrypoint": "model_def:NoOpTrial",
+        "checkpoint_storage": {"type": "shared_fs", "host_path": storage_dir},
+        "searcher": {"name": "single", "metric": "validation_error", "max_length": {"batches": 1}},
+        "scheduling_unit": batches_per_workload,
+        "data_layer": {"type": "shared_fs"},
+    }
+    hparams = {"global_batch_size": 32, "num_training_metrics": num_metrics}
+    rendezvous_ports = f"{constants.LOCAL_RENDEZVOUS_PORT},{constants.LOCAL_RENDEZVOUS_PORT + 1}"
+
+    return det.EnvContext(
+        master_addr="127.0.0.1",
+        master_port=port,
+        use_tls=False,
+        master_cert_file=None,
+        master_cert_name=None,
+        container_id="benchmark",
+        experiment_config=experiment_config,
+        hparams=hparams,
+        initial_workload=workload.train_workload(1, num_batches=batches_per_workload),
+        latest_checkpoint=None,
+        use_gpu=False,
+        container_gpus=[],
+        slot_ids=[],
+        debug=False,
+        workload_manager_type="TRIAL_WORKLOAD_MANAGER",
+        det_rendezvous_ports=rendezvous_ports,
+        det_trial_unique_port_offset=0,
+        det_trial_runner_network_interface=constants.AUTO_DETECT_TRIAL_RUNNER_NETWORK_INTERFACE,
+        det_trial_id="1",
+        det_experiment_id="1",
+        det_cluster_id="benchmark",
+        trial_seed=0,
+    )
+
+
+def _make_master_workloads(steps: int, batches_per_workload: int) -> List[workload.Workload]:
+    # The initial workload (step 1) is read by the trial runner from its environment.
+    workloads = [
+        workload.train_workload(
+            step_id,
+            num_batches=batches_per_workload,
+            total_batches_processed=(step_id - 1) * batches_per_workload,
+        )
+        for step_id in range(2, steps + 2)
+    ]
+    workloads.append(workload.terminate_workload(step_id=steps + 1))
+    return workloads
+
+
+@contextlib.contextmanager
+def _instrument_pipeline(
+    socket_probe: _StreamProbe, controller_probe: _StreamProbe, encode_timer: _CallTimer
+) -> Iterator[None]:
+    build_workload_manager = layers.build_workload_manager
+    prepare_controller = load.prepare_controller
+
+    def _build_workload_manager(
+        env: det.EnvContext, workloads: workload.Stream, *args: Any
+    ) -> layers.WorkloadManager:
+        return build_workload_manager(env, socket_probe.wrap(workloads), *args)
+
+    def _prepare_controller(
+        env: det.EnvContext, workloads: workload.Stream, *args: Any
+    ) -> det.TrialController:
+        return prepare_controller(env, controller_probe.wrap(workloads), *args)
+
+    with mock.patch.object(layers, "build_workload_manager", _build_workload_manager):
+        with mock.patch.object(load, "prepare_controller", _prepare_controller):
+            with mock.patch.object(_metrics_encoding, "encode", encode_timer):
+                yield
+
+
+def run_pipeline_benchmark(
+    batches_per_workload: int,
+    num_metrics: int,
+    steps: int = 20,
+    model_def: pathlib.Path = NO_OP_MODEL_DEF,
+    encoding: str = _metrics_encoding.JSON,
+) -> Dict[str, Any]:
+    """
+    Run `steps` RUN_STEP workloads through the full harness pipeline and report the per-layer
+    overhead of each workload, in seconds. The master offers only `encoding` for metrics.
+    """
+    socket_probe = _StreamProbe()
+    controller_probe = _StreamProbe()
+    encode_timer = _CallTimer(_metrics_encoding.encode)
+
+    master = FakeMaster(
+        _make_master_workloads(steps, batches_per_workload), metrics_encodings=[encoding]
+    )
+    with tempfile.TemporaryDirectory() as storage_dir, master:
+        env = _make_env(master.port, batches_per_workload, num_metrics, storage_dir)
+        with mock.patch.object(common_constants, "SHARED_FS_CONTAINER_PATH", storage_dir):
+            with _instrument_pipeline(socket_probe, controller_probe, encode_timer):
+                with det._local_execution_manager(model_def):
+                    harness.build_and_run_training_pipeline(env)
+
+    # Skip the initial workload, which the master does not time.
+    below_socket = socket_probe.seconds[1:]
+    controller = controller_probe.seconds[1:]
+    encode = encode_timer.seconds[1 : len(below_socket) + 1]
+    round_trip = master.round_trip_seconds
+
+    workload_manager = [s - c for s, c in zip(below_socket, controller)]
+    socket = [r - s - e for r, s, e in zip(round_trip, below_socket, encode)]
+    harness_total = [r - c for r, c in zip(round_trip, controller)]
+
+    return {
+        "batches_per_workload": batches_per_workload,
+        "num_metrics": num_metrics,
+        "encoding": encoding,
+        "steps": len(round_trip),
+        "response_bytes": _summarize([float(b) for b in master.response_bytes[1:]]),
+        "round_trip_seconds": _summarize(round_trip),
+        "controller_seconds": _summarize(controller),
+        "layer_overhead_seconds": {
+            "socket": _summarize(socket),
+            "encode": _summarize(encode),
+            "workload_manager": _summarize(workload_manager),
+            "total": _summarize(harness_total),
+        },
+    }
+
+
+def _broadcast_worker(pub_url: str, pull_url: str, num_metrics: int, batches: int) -> None:
+    with ipc.ZMQBroadcastClient(pub_url, pull_url) as broadcast_client:
+        receiver = layers.SubprocessReceiver(broadcast_client)
+        batch_metrics = [{f"metric_{i}": 0.5 for i in range(num_metrics)}] * batches
+        for wkld, _, respond in receiver:
+            if wkld.kind == workload.Workload.Kind.TERMINATE:
+                respond({})
+                break
+            respond(util.wrap_metrics(det.util.make_metrics(None, batch_metrics), False, False))
+
+
+def run_broadcast_benchmark(
+    num_workers: int, batches_per_workload: int, num_metrics: int, steps: int = 20
+) -> Dict[str, Any]:
+    """
+    Time the ZMQ broadcast/gather that SubprocessLauncher performs for every workload, with
+    `num_workers` worker processes each responding through a SubprocessReceiver.
+    """
+    server = ipc.ZMQBroadcastServer(num_connections=num_workers)
+    pub_url = f"tcp://localhost:{server.get_pub_port()}"
+    pull_url = f"tcp://localhost:{server.get_pull_port()}"
+    procs = [
+        multiprocessing.Process(
+            target=_broadcast_worker, args=(pub_url, pull_url, num_metrics, batches_per_workload)
+        )
+        for _ in range(num_workers)
+    ]
+    for p in procs:
+        p.start()
+
+    def _health_check() -> None:
+        if not all(p.is_alive() for p in procs):
+            raise det.errors.WorkerError("Benchmark worker process died.")
+
+    seconds = []  # type: List[float]
+    try:
+        server.gather_with_polling(_health_check)
+        for step_id in range(1, steps + 1):
+            wkld = workload.train_workload(step_id, num_batches=batches_per_workload)
+            start = time.perf_counter()
+            server.broadcast((wkld, []))
+            server.gather_with_polling(_health_check)
+            seconds.append(time.perf_counter() - start)
+        server.broadcast((workload.terminate_workload(step_id=steps), []))
+        server.gather_with_polling(lambda: None)
+    finally:
+        for p in procs:
+            p.join(timeout=10)
+            if p.is_alive():
+                p.terminate()
+        server.close()
+
+    return {
+        "num_workers": num_workers,
+        "batches_per_workload": batches_per_workload,
+        "num_metrics": num_metrics,
+        "steps": steps,
+        "broadcast_gather_seconds": _summarize(seconds),
+    }
+
+
+def _int_list(s: str) -> List[int]:
+    return [int(x) for x in s.split(",") if x]
+
+
+def _str_list(s: str) -> List[str]:
+    return [x for x in s.split(",") if x]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--batches", type=_int_list, default=[1, 10, 100])
+    parser.add_argument("--metrics", type=_int_list, default=[1, 10, 100])
+    parser.add_argument("--workers", type=_int_list, default=[1, 2, 4])
+    parser.add_argument("--encodings", type=_str_list, default=[_metrics_encoding.JSON])
+    parser.add_argument("--steps", type=int, default=20)
+    parser.add_argument("--model-def", type=pathlib.Path, default=NO_OP_MODEL_DEF)
+    parser.add_argument("--output", type=str, help="path to write the JSON results to")
+    args = parser.parse_args(argv)
+
+    results = {"pipeline": [], "broadcast": []}  # type: Dict[str, List[Dict[str, Any]]]
+    for batches in args.batches:
+        for metrics in args.metrics:
+            for encoding in args.encodings:
+                results["pipeline"].append(
+                    run_pipeline_benchmark(
+                        batches, metrics, args.steps, args.model_def.resolve(), encoding
+                    )
+                )
+            for workers in args.workers:
+                results["broadcast"].append(
+                    run_broadcast_benchmark(workers, batches, metrics, args.steps)
+                )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
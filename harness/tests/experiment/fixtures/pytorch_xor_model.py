@@ -243,6 +243,12 @@ class XORTrialCustomEval(BaseXORTrial):
         return {"loss": loss}
 
 
+class XORTrialDistributedCustomEval(XORTrialCustomEval):
+    def __init__(self, context: pytorch.PyTorchTrialContext) -> None:
+        super().__init__(context)
+        self.context.experimental.distribute_full_dataset_evaluation()
+
+
 class XORTrialWithLRScheduler(XORTrialMulti):
     def __init__(self, context: pytorch.PyTorchTrialContext) -> None:
         self.context = context
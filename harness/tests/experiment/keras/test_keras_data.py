@@ -1,9 +1,13 @@
+import pathlib
+import pickle
+
 import numpy as np
 import pytest
 from tensorflow.keras.utils import Sequence
 
 import determined as det
 from determined import keras
+from determined.keras import _data
 from determined_common import check
 from tests.experiment import utils  # noqa: I100
 
@@ -45,6 +49,82 @@ def test_arraylike_data_adapter_with_unmatched_batch_size() -> None:
         keras._ArrayLikeAdapter(np.arange(0, 16), np.arange(0, 16), batch_size=32)
 
 
+def _save_shards(path: pathlib.Path, data: np.ndarray, bounds: list) -> None:
+    path.mkdir()
+    for i, (start, end) in enumerate(zip(bounds[:-1], bounds[1:])):
+        np.save(str(path.joinpath(f"{i:03d}.npy")), data[start:end])
+
+
+def test_memmap_array_adapter(tmp_path: pathlib.Path) -> None:
+    x = np.arange(300, dtype=np.float32).reshape(100, 3)
+    y = np.arange(100)
+    _save_shards(tmp_path.joinpath("x"), x, [0, 30, 31, 100])
+    np.save(str(tmp_path.joinpath("y.npy")), y)
+
+    seq = keras.MemmapArrayAdapter(str(tmp_path.joinpath("x")), tmp_path.joinpath("y.npy"), 16)
+    assert len(seq) == 7
+    batch_x, batch_y = seq[0]
+    # Batches within one shard are views of the memory-mapped file.
+    assert isinstance(batch_x, np.memmap)
+    assert np.array_equal(batch_x, x[:16]) and np.array_equal(batch_y, y[:16])
+    # Batches which cross shard boundaries are gathered.
+    assert np.array_equal(seq[1][0], x[16:32])
+    assert np.array_equal(seq[6][0], x[96:])
+
+    # Tuples of paths returned from a data loader are adapted automatically.
+    adapted = keras._adapt_data_from_data_loader(
+        (str(tmp_path.joinpath("x")), str(tmp_path.joinpath("y.npy"))), batch_size=16
+    )
+    assert isinstance(adapted, keras.MemmapArrayAdapter)
+
+
+def test_memmap_array_adapter_shuffle(tmp_path: pathlib.Path) -> None:
+    x = np.arange(300, dtype=np.float32).reshape(100, 3)
+    y = np.arange(100)
+    _save_shards(tmp_path.joinpath("x"), x, [0, 50, 100])
+
+    seq = keras.MemmapArrayAdapter(
+        {"a": str(tmp_path.joinpath("x"))},
+        [y],
+        batch_size=16,
+        sample_weights=y.astype(np.float64),
+        shuffle_seed=777,
+        num_buffers=2,
+    )
+    seen = []
+    for i in range(len(seq)):
+        batch_x, batch_y, weights = seq[i]
+        assert np.array_equal(batch_x["a"][:, 0], batch_y[0] * 3)
+        assert np.array_equal(weights, batch_y[0])
+        seen.extend(batch_y[0].tolist())
+    assert sorted(seen) == list(range(100))
+    assert seen != list(range(100))
+
+    # Multiprocessing workers reopen the files instead of receiving a copy of the data.
+    assert len(pickle.dumps(seq.x["a"])) < 1000
+    unpickled = pickle.loads(pickle.dumps(seq))
+    assert np.array_equal(unpickled[3][0]["a"], seq[3][0]["a"])
+
+
+def test_sharded_memmap_pickles_location(tmp_path: pathlib.Path) -> None:
+    sizes = []
+    for n in [10, 100000]:
+        path = tmp_path.joinpath(f"x-{n}.npy")
+        np.save(str(path), np.arange(n * 3, dtype=np.float32).reshape(n, 3))
+        memmap = np.load(str(path), mmap_mode="r")
+        for array in [memmap, memmap[5:9]]:
+            sharded = _data._ShardedArray(array)
+            pickled = pickle.dumps(sharded)
+            sizes.append(len(pickled))
+            unpickled = pickle.loads(pickled)
+            assert isinstance(unpickled.shards[0], np.memmap)
+            assert np.array_equal(unpickled.slice(0, len(array)), array)
+
+    # Only the location of the data is pickled, however large the array is.
+    assert max(sizes) < 1000
+    assert abs(sizes[0] - sizes[2]) < 10
+
+
 def test_adapt_invalid_data_type() -> None:
     seqs = utils.make_xor_data_sequences()
     test = keras._adapt_data_from_data_loader(seqs[1], batch_size=1)
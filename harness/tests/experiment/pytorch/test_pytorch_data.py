@@ -1,5 +1,7 @@
 import logging
 import multiprocessing
+import os
+import pathlib
 import typing
 from logging import handlers
 
@@ -8,6 +10,7 @@ import pytest
 import torch
 
 import determined as det
+from determined import pytorch
 from determined.pytorch import (
     DistributedBatchSampler,
     RepeatBatchSampler,
@@ -188,3 +191,181 @@ def test_to_device_warnings(dedup_between_calls) -> None:
     while queue.qsize():
         msg = queue.get().message
         assert "not able to move data" in msg
+
+
+class WorkerInfoDataset(torch.utils.data.Dataset):
+    def __len__(self) -> int:
+        return 8
+
+    def __getitem__(self, index: int) -> typing.Any:
+        return index, os.getpid(), np.random.randint(2**31), torch.randint(2**31, ()).item()
+
+
+def _one_pass(loader: typing.Iterable) -> typing.List[typing.List]:
+    return [[x.tolist() for x in batch] for batch in loader]
+
+
+def test_persistent_data_loader() -> None:
+    torch.manual_seed(0)
+    loader = pytorch.DataLoader(WorkerInfoDataset(), batch_size=2, num_workers=2)
+    persistent = loader.get_persistent_data_loader(num_replicas=2, rank=1)
+    assert len(persistent) == 2
+
+    first, second = _one_pass(persistent), _one_pass(persistent)
+    # The same batches of this rank's shard are loaded in every pass...
+    assert [b[0] for b in first] == [b[0] for b in second] == [[2, 3], [6, 7]]
+    # ...by the same worker processes...
+    assert {pid for b in first for pid in b[1]} == {pid for b in second for pid in b[1]}
+    # ...which are reseeded for every pass.
+    assert first[0][2] != second[0][2] and first[0][3] != second[0][3]
+
+    # The worker seeds are determined by torch's default generator.
+    torch.manual_seed(0)
+    again = loader.get_persistent_data_loader(num_replicas=2, rank=1)
+    assert _one_pass(again)[0][2:] == first[0][2:]
+
+    # Stopping a pass early starts over from the beginning with new workers.
+    for _ in persistent:
+        break
+    third = _one_pass(persistent)
+    assert [b[0] for b in third] == [[2, 3], [6, 7]]
+    assert not {pid for b in third for pid in b[1]} & {pid for b in first for pid in b[1]}
+
+
+def test_cached_dataset(tmp_path: pathlib.Path) -> None:
+    # yogadl, and so the data layer, requires TensorFlow.
+    pytest.importorskip("tensorflow")
+    from yogadl import storage
+
+    from determined._data_layer import _records
+
+    lfs = _records.LFSStorage(storage.LFSConfigurations(str(tmp_path)))
+    calls = []
+
+    @lfs.cacheable("xor", "v1")
+    def make_cached_dataset() -> torch.utils.data.Dataset:
+        calls.append(None)
+        return make_dataset()
+
+    make_cached_dataset()
+    make_cached_dataset()
+    # The dataset is only made once per version.
+    assert len(calls) == 1
+
+    cached = _records.CachedDataset(lfs.cache_filepath("xor", "v1"))
+    assert len(cached) == 4
+
+    # The cached dataset is sharded and batched by the DataLoader like the original one, also in
+    # worker processes.
+    expected = _one_pass(
+        pytorch.DataLoader(make_dataset(), batch_size=1).get_data_loader(num_replicas=2, rank=1)
+    )
+    loader = pytorch.DataLoader(cached, batch_size=1, num_workers=2)
+    assert _one_pass(loader.get_data_loader(num_replicas=2, rank=1)) == expected
+
+
+def test_cache_numpy_records(tmp_path: pathlib.Path) -> None:
+    pytest.importorskip("tensorflow")
+    from determined._data_layer import _records
+
+    def records() -> typing.Iterator[typing.Tuple[np.ndarray, int]]:
+        for i in range(5):
+            yield np.full((2,), i, dtype=np.float32), i
+
+    path = tmp_path.joinpath("cache.mdb")
+    assert _records.serialize_records_to_lmdb(records(), path) == 5
+
+    cached = _records.CachedDataset(path)
+    assert len(cached) == 5
+    x, y = cached[3]
+    assert x.tolist() == [3.0, 3.0] and y == 3
+
+
+class DictDataset(torch.utils.data.Dataset):
+    def __len__(self) -> int:
+        return 10
+
+    def __getitem__(self, index: int) -> typing.Dict[str, typing.Any]:
+        return {
+            "x": np.full((3,), index, dtype=np.float32),
+            "y": index,
+            "name": str(index),
+            "pair": (torch.tensor([index, index]), float(index)),
+        }
+
+
+def _assert_batches_equal(a: typing.Any, b: typing.Any) -> None:
+    if isinstance(a, torch.Tensor):
+        assert a.dtype == b.dtype and torch.equal(a, b)
+    elif isinstance(a, dict):
+        assert a.keys() == b.keys()
+        for k in a:
+            _assert_batches_equal(a[k], b[k])
+    elif isinstance(a, (list, tuple)) and a and isinstance(a[0], torch.Tensor):
+        assert len(a) == len(b)
+        for x, y in zip(a, b):
+            _assert_batches_equal(x, y)
+    else:
+        assert a == b
+
+
+@pytest.mark.parametrize("num_workers", [0, 2])  # type: ignore
+def test_shared_memory_slabs(num_workers: int) -> None:
+    expected = list(pytorch.DataLoader(DictDataset(), batch_size=4).get_data_loader())
+    loader = pytorch.DataLoader(
+        DictDataset(), batch_size=4, num_workers=num_workers, shared_memory_slabs=True
+    ).get_data_loader(num_replicas=1)
+    assert isinstance(loader, pytorch.SlabDataLoader)
+    assert len(loader) == 3
+
+    batches = 0
+    for batch, expected_batch in zip(loader, expected):
+        _assert_batches_equal(batch, expected_batch)
+        # The tensors are views of the preallocated shared memory.
+        assert batch["x"].is_shared() and batch["pair"][0].is_shared()
+        batches += 1
+    assert batches == 3
+
+
+def test_persistent_shared_memory_slabs() -> None:
+    expected = list(pytorch.DataLoader(DictDataset(), batch_size=4).get_data_loader())
+    loader = pytorch.DataLoader(
+        DictDataset(), batch_size=4, num_workers=2, shared_memory_slabs=True
+    ).get_persistent_data_loader()
+
+    for _ in range(2):
+        batches = 0
+        for batch, expected_batch in zip(loader, expected):
+            _assert_batches_equal(batch, expected_batch)
+            assert batch["x"].is_shared()
+            batches += 1
+        assert batches == 3
+
+
+def test_shared_memory_slabs_fallback() -> None:
+    def pad_collate(samples: typing.List[torch.Tensor]) -> torch.Tensor:
+        return torch.nn.utils.rnn.pad_sequence(samples, batch_first=True)
+
+    # The layout is inferred from the first sample, so longer samples do not fit in the slabs.
+    dataset = [torch.ones(i + 1) for i in range(6)]
+    loader = pytorch.DataLoader(
+        dataset, batch_size=2, collate_fn=pad_collate, shared_memory_slabs=True
+    ).get_data_loader()
+    assert [b.shape[1] for b in loader] == [2, 4, 6]
+
+    with pytest.raises(ValueError):
+        pytorch.DataLoader(
+            dataset,
+            batch_sampler=torch.utils.data.BatchSampler(range(6), 2, False),
+            shared_memory_slabs=True,
+        )
+
+
+def test_collation_benchmark() -> None:
+    from tests.benchmarks import data_loader_collation
+
+    result = data_loader_collation.run_collation_benchmark(
+        shared_memory_slabs=True, num_workers=0, batch_size=4, num_batches=3, image_shape=[2, 2]
+    )
+    assert result["batches"] == 3
+    assert result["wait_seconds"]["p50"] > 0
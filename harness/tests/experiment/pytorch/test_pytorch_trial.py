@@ -237,12 +237,23 @@ class TestPyTorchTrial:
         )
         controller.run()
 
+        controller = utils.make_trial_controller_from_trial_implementation(
+            trial_class=pytorch_xor_model.XORTrialDistributedCustomEval,
+            hparams=self.hparams,
+            workloads=make_workloads("C"),
+            trial_seed=self.trial_seed,
+        )
+        controller.run()
+
         for original, custom_eval in zip(training_metrics["A"], training_metrics["B"]):
             assert original["loss"] == custom_eval["loss"]
 
         for original, custom_eval in zip(validation_metrics["A"], validation_metrics["B"]):
             assert original["loss"] == custom_eval["loss"]
 
+        for custom_eval, distributed_eval in zip(validation_metrics["B"], validation_metrics["C"]):
+            assert custom_eval["loss"] == distributed_eval["loss"]
+
     def test_grad_clipping(self) -> None:
         training_metrics = {}
         validation_metrics = {}
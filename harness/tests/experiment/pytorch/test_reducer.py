@@ -1,5 +1,10 @@
+from typing import List
+
 import numpy as np
+import pytest
+import torch
 
+from determined import pytorch
 from determined.pytorch import Reducer, _reduce_metrics
 
 
@@ -12,3 +17,98 @@ def test_reducer() -> None:
 
     batches_per_process = [1, 2, 5, 4, 5, 6]
     assert np.around(_reduce_metrics(Reducer.AVG, metrics, batches_per_process), decimals=2) == 6.43
+
+
+def _sharded(reducer: pytorch.MetricReducer, *arrays: np.ndarray, num_slots: int = 3) -> List:
+    """Feed the arrays to the reducer in batches, as if spread over num_slots slots."""
+    per_slot = []
+    for slot in range(num_slots):
+        reducer.reset()
+        for i in range(slot * 10, len(arrays[0]), num_slots * 10):
+            reducer.update(*(torch.tensor(a[i : i + 10]) for a in arrays))
+        per_slot.append(reducer.per_slot_reduce())
+    return per_slot
+
+
+def test_welford_reducer() -> None:
+    values = np.random.RandomState(0).normal(5, 2, size=1000)
+    for output, expected in [
+        ("mean", np.mean(values)),
+        ("variance", np.var(values)),
+        ("std", np.std(values)),
+        ("count", 1000),
+    ]:
+        reducer = pytorch.WelfordReducer(output)
+        assert isinstance(reducer, pytorch.MetricReducer)
+        assert reducer.cross_slot_reduce(_sharded(reducer, values)) == pytest.approx(expected)
+
+
+def test_histogram_reducer() -> None:
+    values = np.random.RandomState(0).uniform(-1, 2, size=500)
+    reducer = pytorch.HistogramReducer(0, 1, num_bins=10)
+    counts = reducer.cross_slot_reduce(_sharded(reducer, values))
+    expected, _ = np.histogram(values, bins=10, range=(0, 1))
+    assert counts[1:-1].tolist() == expected.tolist()
+    assert counts[0] == np.sum(values < 0)
+    assert counts[-1] == np.sum(values >= 1)
+
+
+def test_quantile_reducer() -> None:
+    values = np.random.RandomState(0).lognormal(size=2000) * np.sign(np.arange(2000) - 500)
+    qs = [0.0, 0.1, 0.25, 0.5, 0.9, 0.99, 1.0]
+    reducer = pytorch.QuantileReducer(qs, relative_accuracy=0.01)
+    estimates = reducer.cross_slot_reduce(_sharded(reducer, values))
+    exact = np.sort(values)[np.floor(np.array(qs) * (len(values) - 1)).astype(int)]
+    assert np.allclose(estimates, exact, rtol=0.02)
+
+    median = pytorch.QuantileReducer(0.5)
+    assert isinstance(median.cross_slot_reduce(_sharded(median, values)), float)
+    median.reset()
+    assert np.isnan(median.cross_slot_reduce([median.per_slot_reduce()]))
+
+
+def _exact_roc_auc(labels: np.ndarray, scores: np.ndarray) -> float:
+    pos, neg = scores[labels == 1], scores[labels == 0]
+    wins = (pos[:, None] > neg[None, :]).sum() + 0.5 * (pos[:, None] == neg[None, :]).sum()
+    return float(wins / (len(pos) * len(neg)))
+
+
+def test_auc_reducer() -> None:
+    rng = np.random.RandomState(0)
+    labels = rng.randint(0, 2, size=1000)
+    # Scores in the middle of each bin make the binned AUC exact.
+    scores = (np.minimum(rng.randint(0, 70, size=1000) + labels * 30, 99) + 0.5) / 100
+
+    roc = pytorch.AUCReducer(num_thresholds=100)
+    auc = roc.cross_slot_reduce(_sharded(roc, labels, scores))
+    assert auc == pytest.approx(_exact_roc_auc(labels, scores))
+
+    pr = pytorch.AUCReducer(num_thresholds=100, curve="PR")
+    assert 0.5 < pr.cross_slot_reduce(_sharded(pr, labels, scores)) <= 1
+
+    with pytest.raises(ValueError):
+        pytorch.AUCReducer(curve="XY")
+
+
+def test_confusion_matrix_reducer() -> None:
+    rng = np.random.RandomState(0)
+    labels = rng.randint(0, 3, size=300)
+    logits = rng.normal(size=(300, 3))
+    predictions = np.argmax(logits, axis=1)
+    expected = np.zeros((3, 3), dtype=np.int64)
+    np.add.at(expected, (labels, predictions), 1)
+
+    matrix = pytorch.ConfusionMatrixReducer(3)
+    assert matrix.cross_slot_reduce(_sharded(matrix, labels, logits)).tolist() == expected.tolist()
+
+    accuracy = pytorch.ConfusionMatrixReducer(3, output="accuracy")
+    result = accuracy.cross_slot_reduce(_sharded(accuracy, labels, predictions))
+    assert result == pytest.approx(np.mean(labels == predictions))
+
+    iou = pytorch.ConfusionMatrixReducer(3, output="iou")
+    diag = np.diag(expected)
+    expected_iou = diag / (expected.sum(axis=0) + expected.sum(axis=1) - diag)
+    assert np.allclose(iou.cross_slot_reduce(_sharded(iou, labels, predictions)), expected_iou)
+
+    with pytest.raises(ValueError):
+        matrix.update(np.array([3]), np.array([0]))
@@ -2,13 +2,14 @@ import os
 import pathlib
 import tempfile
 from pathlib import Path
-from typing import Any, Callable, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 import pytest
 import tensorflow as tf
+from _pytest.monkeypatch import MonkeyPatch
 
 import determined as det
-from determined import workload
+from determined import estimator, workload
 from determined.exec import harness
 from tests.experiment import utils  # noqa: I100
 from tests.experiment.fixtures import estimator_linear_model, estimator_xor_model
@@ -320,7 +321,17 @@ class TestLinearTrial:
             if key in os.environ:
                 del os.environ[key]
 
-    def test_custom_reducer(self) -> None:
+    def test_custom_reducer(self, monkeypatch: MonkeyPatch) -> None:
+        allgathers = []  # type: List[Any]
+
+        def allgather_metrics(controller: Any, metrics: Any) -> List:
+            allgathers.append(metrics)
+            return [metrics]
+
+        monkeypatch.setattr(
+            estimator.EstimatorTrialController, "allgather_metrics", allgather_metrics
+        )
+
         def make_workloads() -> workload.Stream:
             trainer = utils.TrainAndValidate()
 
@@ -337,6 +348,10 @@ class TestLinearTrial:
                 assert metrics["label_sum_dict_fn"] == 2 * label_sum
                 assert metrics["label_sum_dict_cls"] == 2 * label_sum
 
+            # All six custom metrics are allgathered together, once per validation.
+            assert len(allgathers) == 2
+            assert all(len(states) == 6 for states in allgathers)
+
             yield workload.terminate_workload(), [], workload.ignore_workload_response
 
         controller = utils.make_trial_controller_from_trial_implementation(
@@ -1,3 +1,4 @@
+import json
 import pathlib
 
 import pytest
@@ -23,6 +24,32 @@ def test_test_one_batch() -> None:
         )
 
 
+def test_benchmark_trial(tmp_path: pathlib.Path) -> None:
+    output_path = tmp_path.joinpath("report.json")
+    with det._local_execution_manager(pathlib.Path(pytorch_xor_model.__file__).parent):
+        report = experimental.benchmark_trial(
+            trial_class=pytorch_xor_model.XORTrial,
+            config={
+                "scheduling_unit": 2,
+                "hyperparameters": {"hidden_size": 2, "learning_rate": 0.5, "global_batch_size": 4},
+            },
+            warmup_steps=1,
+            steps=3,
+            validations=2,
+            checkpoints=1,
+            output_path=str(output_path),
+        )
+
+    assert report["training"]["steps"] == 3
+    assert report["training"]["batches"] == 6
+    assert report["training"]["records_per_second"] > 0
+    assert report["validation"]["latency_seconds"]["count"] == 2
+    assert report["checkpoint"]["bytes"] > 0
+    assert report["checkpoint"]["restore_seconds"] is not None
+    assert report["peak_rss_bytes"] > 0
+    assert json.loads(output_path.read_text()) == report
+
+
 def test_pytorch_from_config() -> None:
     config = {"hyperparameters": {"global_batch_size": 4}}
     context = pytorch.PyTorchTrialContext.from_config(config)
@@ -0,0 +1,212 @@
+import base64
+import hashlib
+import socket
+import struct
+import threading
+import time
+from typing import Any, Dict, List, Optional, Union
+
+import simplejson
+
+from determined import workload
+from determined.layers import _metrics_encoding
+
+_WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+_OPCODE_TEXT = 0x1
+_OPCODE_BINARY = 0x2
+_OPCODE_CLOSE = 0x8
+_OPCODE_PING = 0x9
+_OPCODE_PONG = 0xA
+
+
+class FakeMaster:
+    """
+    FakeMaster is an in-process stand-in for the master's trial websocket endpoint. It accepts a
+    single trial runner connection, sends the rendezvous info, and then sends one RUN_WORKLOAD
+    message at a time, waiting for each WORKLOAD_COMPLETED response before sending the next.
+
+    Only the subset of RFC 6455 that the harness uses is implemented: unfragmented text and binary
+    frames, ping/pong, and the closing handshake.
+
+    `metrics_encodings` is advertised in the rendezvous message; by default none are, like the
+    real master, and the trial runner falls back to plain JSON.
+    """
+
+    def __init__(
+        self,
+        workloads: List[workload.Workload],
+        keep_responses: bool = False,
+        metrics_encodings: Optional[List[str]] = None,
+    ) -> None:
+        self._workloads = workloads
+        self._keep_responses = keep_responses
+        self._metrics_encodings = metrics_encodings
+
+        self._listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._listener.bind(("127.0.0.1", 0))
+        self._listener.listen(1)
+        self.port = self._listener.getsockname()[1]
+
+        self._thread = threading.Thread(target=self._serve, name="FakeMaster", daemon=True)
+        self._error = None  # type: Optional[BaseException]
+
+        # The time between sending each RUN_WORKLOAD message and receiving its response. The
+        # initial workload, which the trial runner reads from its environment, is not included.
+        self.round_trip_seconds = []  # type: List[float]
+        self.response_bytes = []  # type: List[int]
+        self.responses = []  # type: List[Dict[str, Any]]
+
+    def __enter__(self) -> "FakeMaster":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self._listener.close()
+        self._thread.join(timeout=10)
+        if self._error is not None:
+            raise self._error
+
+    def _serve(self) -> None:
+        try:
+            conn, _ = self._listener.accept()
+            with conn:
+                self._handshake(conn)
+                self._run(conn)
+        except BaseException as e:
+            self._error = e
+
+    @staticmethod
+    def _handshake(conn: socket.socket) -> None:
+        request = b""
+        while b"\r\n\r\n" not in request:
+            chunk = conn.recv(4096)
+            if not chunk:
+                raise ConnectionError("trial runner closed the connection during the handshake")
+            request += chunk
+
+        key = None
+        for line in request.decode("latin-1").split("\r\n"):
+            name, _, value = line.partition(":")
+            if name.strip().lower() == "sec-websocket-key":
+                key = value.strip()
+        if key is None:
+            raise ValueError("websocket handshake is missing Sec-WebSocket-Key")
+
+        accept = base64.b64encode(hashlib.sha1((key + _WEBSOCKET_GUID).encode()).digest())
+        conn.sendall(
+            b"HTTP/1.1 101 Switching Protocols\r\n"
+            b"Upgrade: websocket\r\n"
+            b"Connection: Upgrade\r\n"
+            b"Sec-WebSocket-Accept: " + accept + b"\r\n\r\n"
+        )
+
+    def _run(self, conn: socket.socket) -> None:
+        self._send(
+            conn,
+            _OPCODE_TEXT,
+            simplejson.dumps(self._rendezvous_info()).encode(),
+        )
+
+        # The response to the initial workload arrives without a RUN_WORKLOAD message.
+        self._recv_response(conn)
+
+        for wkld in self._workloads:
+            start = time.perf_counter()
+            msg = {"type": "RUN_WORKLOAD", "workload": {**wkld.__json__(), "kind": wkld.kind.name}}
+            self._send(conn, _OPCODE_TEXT, simplejson.dumps(msg).encode())
+            if wkld.kind == workload.Workload.Kind.TERMINATE:
+                break
+            self._recv_response(conn)
+            self.round_trip_seconds.append(time.perf_counter() - start)
+
+        # Wait for the trial runner to start the closing handshake.
+        while self._recv_frame(conn) is not None:
+            pass
+
+    def _rendezvous_info(self) -> Dict[str, Any]:
+        msg = {
+            "type": "RENDEZVOUS_INFO",
+            "addrs": ["127.0.0.1:0"],
+            "addrs2": ["127.0.0.1:0"],
+            "rank": 0,
+        }  # type: Dict[str, Any]
+        if self._metrics_encodings is not None:
+            msg["metrics_encodings"] = self._metrics_encodings
+        return msg
+
+    def _recv_response(self, conn: socket.socket) -> None:
+        payload = self._recv_frame(conn)
+        if payload is None:
+            raise ConnectionError("trial runner closed the connection before responding")
+        self.response_bytes.append(
+            len(payload) if isinstance(payload, bytes) else len(payload.encode("utf-8"))
+        )
+        msg = _metrics_encoding.decode(payload)
+        if msg["type"] != "WORKLOAD_COMPLETED":
+            raise ValueError(f"unexpected message from trial runner: {msg['type']}")
+        if self._keep_responses:
+            self.responses.append(msg)
+
+    def _recv_frame(self, conn: socket.socket) -> Optional[Union[str, bytes]]:
+        """
+        Return the payload of the next text (as str) or binary (as bytes) frame, or None once the
+        connection is closed.
+        """
+        while True:
+            header = self._recv_exactly(conn, 2)
+            if header is None:
+                return None
+            opcode = header[0] & 0x0F
+            masked = header[1] & 0x80
+            length = header[1] & 0x7F
+            if length == 126:
+                length = struct.unpack("!H", self._recv_exactly(conn, 2) or b"")[0]
+            elif length == 127:
+                length = struct.unpack("!Q", self._recv_exactly(conn, 8) or b"")[0]
+            mask = self._recv_exactly(conn, 4) if masked else None
+            payload = self._recv_exactly(conn, length) if length else b""
+            if payload is None:
+                return None
+            if mask is not None and payload:
+                # Unmask the whole payload with a single big-integer XOR.
+                full_mask = (mask * (length // 4 + 1))[:length]
+                payload = (
+                    int.from_bytes(payload, "big") ^ int.from_bytes(full_mask, "big")
+                ).to_bytes(length, "big")
+
+            if opcode == _OPCODE_TEXT:
+                return payload.decode("utf-8")
+            elif opcode == _OPCODE_BINARY:
+                return payload
+            elif opcode == _OPCODE_PING:
+                self._send(conn, _OPCODE_PONG, payload)
+            elif opcode == _OPCODE_CLOSE:
+                self._send(conn, _OPCODE_CLOSE, payload[:2])
+                return None
+
+    @staticmethod
+    def _recv_exactly(conn: socket.socket, n: int) -> Optional[bytes]:
+        buf = bytearray()
+        while len(buf) < n:
+            chunk = conn.recv(n - len(buf))
+            if not chunk:
+                return None
+            buf.extend(chunk)
+        return bytes(buf)
+
+    @staticmethod
+    def _send(conn: socket.socket, opcode: int, payload: bytes) -> None:
+        header = bytes([0x80 | opcode])
+        if len(payload) < 126:
+            header += bytes([len(payload)])
+        elif len(payload) < (1 << 16):
+            header += bytes([126]) + struct.pack("!H", len(payload))
+        else:
+            header += bytes([127]) + struct.pack("!Q", len(payload))
+        try:
+            conn.sendall(header + payload)
+        except OSError:
+            # The trial runner may drop the connection without waiting for our close frame.
+            pass
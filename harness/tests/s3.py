@@ -1,3 +1,4 @@
+import io
 from typing import Any, Dict, List, Tuple
 
 import boto3.exceptions
@@ -7,6 +8,9 @@ class MockS3Client:
     def __init__(self, faulty: bool = False) -> None:
         self.objects = {}  # type: Dict[Tuple[str, str], str]
         self.faulty = faulty
+        self.delete_batch_sizes = []  # type: List[int]
+        self.download_file_calls = []  # type: List[str]
+        self.get_object_calls = []  # type: List[Tuple[str, str]]
 
     def put_object(self, **kwargs: str) -> None:
         if self.faulty:
@@ -17,16 +21,33 @@ class MockS3Client:
         with open(path, "r") as fp:
             self.put_object(Bucket=bucket, Key=key, Body=fp.read())
 
-    def download_file(self, bucket: str, key: str, path: str) -> None:
+    def download_file(self, bucket: str, key: str, path: str, Config: Any = None) -> None:
+        self.download_file_calls.append(key)
         with open(path, "w") as fp:
             fp.write(self.objects[(bucket, key)])
 
+    def get_object(self, Bucket: str, Key: str, Range: str = "bytes=0-") -> Dict[str, Any]:
+        self.get_object_calls.append((Key, Range))
+        start = int(Range[len("bytes=") :].rstrip("-"))
+        return {"Body": io.BytesIO(self.objects[(Bucket, Key)].encode()[start:])}
+
     # kwargs are capital to match the signature of the boto3 s3 client
-    def delete_objects(self, Bucket: str, Delete: Dict[str, List[Dict[str, str]]]) -> None:
+    def delete_objects(
+        self, Bucket: str, Delete: Dict[str, List[Dict[str, str]]]
+    ) -> Dict[str, List[Dict[str, str]]]:
         assert "Objects" in Delete
         keys = Delete["Objects"]
+        self.delete_batch_sizes.append(len(keys))
+        response = {"Deleted": [], "Errors": []}  # type: Dict[str, List[Dict[str, str]]]
         for key in keys:
-            del self.objects[(Bucket, key["Key"])]
+            if (Bucket, key["Key"]) in self.objects:
+                del self.objects[(Bucket, key["Key"])]
+                response["Deleted"].append({"Key": key["Key"]})
+            else:
+                response["Errors"].append(
+                    {"Key": key["Key"], "Code": "NoSuchKey", "Message": "missing"}
+                )
+        return response
 
 
 def s3_client(_1: str, **_2: Any) -> MockS3Client:
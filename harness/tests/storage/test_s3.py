@@ -1,12 +1,16 @@
 import os
+import random
 import tempfile
 from pathlib import Path
+from typing import Any, List
+from unittest import mock
 
 import pytest
 from _pytest.monkeypatch import MonkeyPatch
 from boto3.exceptions import S3UploadFailedError
 
 from determined_common import storage
+from determined_common.check import CheckFailedError
 from tests import s3
 from tests.storage import util
 
@@ -48,6 +52,44 @@ def test_s3_lifecycle(manager: storage.S3StorageManager) -> None:
                 pass
 
 
+def test_s3_delete_many(manager: storage.S3StorageManager) -> None:
+    checkpoints = []
+    for _ in range(3):
+        with manager.store_path() as (storage_id, path):
+            util.create_checkpoint(path)
+            checkpoints.append(storage.StorageMetadata(storage_id, manager._list_directory(path)))
+    num_keys = sum(len(m.resources) for m in checkpoints)
+
+    # Delete a key out from under the second checkpoint so its deletion fails.
+    client = manager.client
+    missing = checkpoints[1]
+    del client.objects[
+        (manager.bucket, "{}/{}".format(missing.storage_id, next(iter(missing.resources))))
+    ]
+
+    # The random state is restored after deletions that use it from many threads.
+    delete_objects = client.delete_objects
+
+    def _delete_objects(**kwargs: Any) -> Any:
+        random.random()
+        return delete_objects(**kwargs)
+
+    state = random.getstate()
+    with mock.patch("determined_common.storage.s3._MAX_DELETE_OBJECTS", 4), mock.patch.object(
+        client, "delete_objects", _delete_objects
+    ):
+        results = dict((m.storage_id, e) for m, e in manager.delete_many(checkpoints))
+    assert random.getstate() == state
+
+    assert set(results) == {m.storage_id for m in checkpoints}
+    assert results[missing.storage_id] is not None
+    assert all(results[m.storage_id] is None for m in checkpoints if m is not missing)
+
+    # Keys are packed across checkpoints, so only the last request may be partially full.
+    assert sum(client.delete_batch_sizes) == num_keys
+    assert all(size == 4 for size in client.delete_batch_sizes[:-1])
+
+
 def test_verify_s3_upload_error(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
     tmpdir_s = str(tmp_path)
     monkeypatch.setattr("boto3.client", s3.s3_faulty_client)
@@ -62,3 +104,52 @@ def test_verify_s3_upload_error(tmp_path: Path, monkeypatch: MonkeyPatch) -> Non
     with pytest.raises(S3UploadFailedError):
         storage.validate_config(config, container_path=None)
     assert len(os.listdir(tmpdir_s)) == 0
+
+
+def test_s3_verified_download(manager: storage.S3StorageManager, tmp_path: Path) -> None:
+    stored = []  # type: List[storage.StorageMetadata]
+    with manager.store_path(on_stored=stored.append) as (storage_id, path):
+        util.create_checkpoint(path)
+    client = manager.client
+    assert storage.base.CHECKSUM_MANIFEST in stored[0].resources
+    assert set(stored[0].checksums or {}) == {"root.txt", "subdir/file.txt"}
+
+    # The master does not store checksums, so they are read from the uploaded manifest.
+    metadata = storage.StorageMetadata(storage_id, stored[0].resources)
+    download_dir = tmp_path.joinpath("download")
+    manager.download(metadata, str(download_dir))
+    util.validate_checkpoint_files(str(download_dir))
+    assert len(client.download_file_calls) == 3 and client.get_object_calls == []
+
+    # Intact files are skipped and partial files are resumed from where they stopped.
+    root_txt = download_dir.joinpath("root.txt")
+    root_txt.rename(str(root_txt) + ".partial")
+    with open(str(root_txt) + ".partial", "r+") as f:
+        f.truncate(4)
+    client.download_file_calls.clear()
+    manager.download(metadata, str(download_dir))
+    util.validate_checkpoint_files(str(download_dir))
+    assert client.download_file_calls == [
+        "{}/{}".format(storage_id, storage.base.CHECKSUM_MANIFEST)
+    ]
+    assert client.get_object_calls == [("{}/root.txt".format(storage_id), "bytes=4-")]
+
+    # A corrupt partial file is downloaded again from the start.
+    root_txt.rename(str(root_txt) + ".partial")
+    with open(str(root_txt) + ".partial", "r+") as f:
+        f.truncate(4)
+        f.seek(0)
+        f.write("XXXX")
+    client.download_file_calls.clear()
+    client.get_object_calls.clear()
+    manager.download(metadata, str(download_dir))
+    util.validate_checkpoint_files(str(download_dir))
+    assert client.get_object_calls == [("{}/root.txt".format(storage_id), "bytes=4-")]
+    assert client.download_file_calls[1:] == ["{}/root.txt".format(storage_id)]
+
+    # Corruption in storage is detected.
+    client.objects[(manager.bucket, "{}/subdir/file.txt".format(storage_id))] = "corrupted"
+    download_dir.joinpath("subdir", "file.txt").unlink()
+    with pytest.raises(CheckFailedError, match="Checksum mismatch"):
+        manager.download(metadata, str(download_dir))
+    assert not download_dir.joinpath("subdir", "file.txt.partial").exists()
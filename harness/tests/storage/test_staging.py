@@ -0,0 +1,85 @@
+import errno
+import os
+import shutil
+from pathlib import Path
+from typing import Any
+
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+
+from determined_common.storage import staging
+
+
+def _make_tree(root: Path) -> None:
+    root.joinpath("a", "b").mkdir(parents=True)
+    root.joinpath("a", "__pycache__").mkdir()
+    root.joinpath("top.txt").write_text("top")
+    root.joinpath("a", "middle.txt").write_text("middle")
+    root.joinpath("a", "b", "bottom.txt").write_text("bottom")
+    root.joinpath("a", "__pycache__", "middle.pyc").write_text("pyc")
+
+
+def _no_reflinks(monkeypatch: MonkeyPatch) -> None:
+    def _reflink(src: str, dst: str) -> None:
+        raise OSError(errno.EOPNOTSUPP, "not supported")
+
+    monkeypatch.setattr(staging, "_reflink", _reflink)
+
+
+def test_stage_tree(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    _no_reflinks(monkeypatch)
+    src = tmp_path.joinpath("src")
+    _make_tree(src)
+
+    staging.stage_tree(str(src), str(tmp_path.joinpath("copied")))
+    staging.stage_tree(
+        str(src),
+        str(tmp_path.joinpath("linked")),
+        ignore=shutil.ignore_patterns("__pycache__"),
+        allow_hardlinks=True,
+    )
+
+    for name in ("copied", "linked"):
+        dst = tmp_path.joinpath(name)
+        assert dst.joinpath("top.txt").read_text() == "top"
+        assert dst.joinpath("a", "middle.txt").read_text() == "middle"
+        assert dst.joinpath("a", "b", "bottom.txt").read_text() == "bottom"
+
+    assert tmp_path.joinpath("copied", "a", "__pycache__", "middle.pyc").exists()
+    assert not tmp_path.joinpath("linked", "a", "__pycache__").exists()
+
+    src_inode = src.joinpath("a", "b", "bottom.txt").stat().st_ino
+    assert tmp_path.joinpath("copied", "a", "b", "bottom.txt").stat().st_ino != src_inode
+    assert tmp_path.joinpath("linked", "a", "b", "bottom.txt").stat().st_ino == src_inode
+
+
+def test_stage_selected_files(tmp_path: Path) -> None:
+    src = tmp_path.joinpath("src")
+    _make_tree(src)
+
+    dst = tmp_path.joinpath("dst")
+    staging.stage_tree(str(src), str(dst), files=["top.txt", os.path.join("a", "b", "bottom.txt")])
+
+    assert sorted(str(p.relative_to(dst)) for p in dst.rglob("*") if p.is_file()) == [
+        os.path.join("a", "b", "bottom.txt"),
+        "top.txt",
+    ]
+
+
+def test_stage_file_falls_back_to_copies(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    _no_reflinks(monkeypatch)
+
+    def _link(src: Any, dst: Any) -> None:
+        raise OSError(errno.EXDEV, "cross-device link")
+
+    monkeypatch.setattr(os, "link", _link)
+
+    src = tmp_path.joinpath("src.txt")
+    src.write_text("data")
+    dst = tmp_path.joinpath("dst.txt")
+    assert staging.stage_file(str(src), str(dst), allow_hardlink=True) == staging.COPY
+    assert dst.read_text() == "data"
+
+    # Errors with the files themselves are not hidden by the fallbacks.
+    with pytest.raises(FileNotFoundError):
+        staging.stage_file(str(tmp_path.joinpath("missing")), str(tmp_path.joinpath("x")))
@@ -1,4 +1,7 @@
+import hashlib
 import os
+import pathlib
+import shutil
 
 import pytest
 
@@ -55,3 +58,29 @@ def test_list_nonexistent_directory() -> None:
     assert not os.path.exists(root)
     with pytest.raises(CheckFailedError, match="must be an extant directory"):
         StorageManager._list_directory(root)
+
+
+def test_checksum_manifest(tmp_path: pathlib.Path) -> None:
+    root = os.path.join(os.path.dirname(__file__), "fixtures")
+    checksums = StorageManager._compute_checksums(root)
+    assert set(checksums) == {"root.txt", "nested/nested.txt", "nested/another.txt"}
+    with open(os.path.join(root, "root.txt"), "rb") as f:
+        assert checksums["root.txt"] == hashlib.sha256(f.read()).hexdigest()
+
+    checkpoint_dir = tmp_path.joinpath("checkpoint")
+    shutil.copytree(root, str(checkpoint_dir))
+    assert StorageManager._write_checksum_manifest(str(checkpoint_dir)) == checksums
+    assert storage.base.CHECKSUM_MANIFEST in StorageManager._list_directory(str(checkpoint_dir))
+
+    # An existing manifest is reused rather than recomputed.
+    checkpoint_dir.joinpath("root.txt").write_text("modified")
+    assert StorageManager._write_checksum_manifest(str(checkpoint_dir)) == checksums
+
+
+def test_storage_metadata_checksums() -> None:
+    metadata = storage.StorageMetadata("id", {"a": 1})
+    assert "checksums" not in metadata.__json__()
+    assert storage.StorageMetadata.from_json(metadata.__json__()).checksums is None
+
+    metadata = storage.StorageMetadata("id", {"a": 1}, checksums={"a": "abc"})
+    assert storage.StorageMetadata.from_json(metadata.__json__()).checksums == {"a": "abc"}
@@ -25,12 +25,19 @@ def validate_checkpoint(checkpoint_dir: str) -> None:
     """Make sure an existing checkpoint looks correct."""
     assert os.path.exists(checkpoint_dir)
     files_found = set(storage.StorageManager._list_directory(checkpoint_dir))
+    # Checkpoints stored in S3 or GCS include a checksum manifest.
+    files_found.discard(storage.base.CHECKSUM_MANIFEST)
     assert files_found == set(EXPECTED_FILES.keys())
-    for found in files_found:
-        path = os.path.join(checkpoint_dir, found)
-        if EXPECTED_FILES[found] is None:
+    validate_checkpoint_files(checkpoint_dir)
+
+
+def validate_checkpoint_files(checkpoint_dir: str) -> None:
+    """Make sure the expected files of a checkpoint are present, ignoring any other files."""
+    for name, content in EXPECTED_FILES.items():
+        path = os.path.join(checkpoint_dir, name)
+        if content is None:
             assert os.path.isdir(path)
         else:
             assert os.path.isfile(path)
             with open(path) as f:
-                assert f.read() == EXPECTED_FILES[found]
+                assert f.read() == content
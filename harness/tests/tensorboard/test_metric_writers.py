@@ -0,0 +1,103 @@
+import threading
+from typing import Any, Dict, List, Set, Tuple, Union
+
+import numpy as np
+import pytest
+
+from determined import tensorboard
+
+
+class RecordingWriter(tensorboard.MetricWriter):
+    def __init__(self) -> None:
+        self.scalars = []  # type: List[Tuple[str, float, int]]
+        self.resets = 0
+        self.threads = set()  # type: Set[str]
+
+    def add_scalar(self, name: str, value: Union[int, float, np.number], step: int) -> None:
+        self.threads.add(threading.current_thread().name)
+        self.scalars.append((name, float(value), step))
+
+    def reset(self) -> None:
+        self.resets += 1
+
+
+class FailingWriter(RecordingWriter):
+    def add_scalar(self, name: str, value: Union[int, float, np.number], step: int) -> None:
+        raise OSError("disk full")
+
+
+def _train_metrics(batch_metrics: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {"batch_metrics": batch_metrics, "avg_metrics": {}}
+
+
+def test_async_writer_coalesces_and_flushes() -> None:
+    recorder = RecordingWriter()
+    writer = tensorboard.AsyncMetricWriter(recorder, flush_secs=3600, flush_size=1000)
+
+    writer.add_scalar("loss", 1.0, 0)
+    writer.add_scalar("loss", 2.0, 0)
+    writer.add_scalar("loss", 3.0, 1)
+    writer.reset()
+    writer.flush()
+
+    assert recorder.scalars == [("loss", 2.0, 0), ("loss", 3.0, 1)]
+    assert recorder.resets == 1
+    assert recorder.threads == {"AsyncMetricWriter"}
+
+    # Flushing with nothing new to write does not flush the wrapped writer again.
+    writer.flush()
+    assert recorder.resets == 1
+    writer.close()
+
+
+def test_async_writer_flushes_by_size() -> None:
+    recorder = RecordingWriter()
+    writer = tensorboard.AsyncMetricWriter(recorder, flush_secs=3600, flush_size=2)
+    batch_writer = tensorboard.BatchMetricWriter(writer)
+
+    batch_writer.on_train_step_end(1, 3, 0, _train_metrics([{"loss": float(i)} for i in range(3)]))
+    batch_writer.flush()
+    assert [s[2] for s in recorder.scalars] == [0, 1, 2]
+    writer.close()
+
+
+def test_async_writer_reports_errors() -> None:
+    writer = tensorboard.AsyncMetricWriter(FailingWriter())
+    writer.add_scalar("loss", 1.0, 0)
+    with pytest.raises(RuntimeError):
+        writer.flush()
+    with pytest.raises(RuntimeError):
+        writer.add_scalar("loss", 1.0, 1)
+
+
+def test_every_n_decimation() -> None:
+    recorder = RecordingWriter()
+    writer = tensorboard.BatchMetricWriter(recorder, "every_n", 4)
+    writer.on_train_step_end(1, 10, 100, _train_metrics([{"loss": i} for i in range(10)]))
+    assert recorder.scalars == [
+        ("Determined/loss", 0.0, 100),
+        ("Determined/loss", 4.0, 104),
+        ("Determined/loss", 8.0, 108),
+    ]
+
+
+def test_window_aggregation() -> None:
+    recorder = RecordingWriter()
+    writer = tensorboard.BatchMetricWriter(recorder, "window", 4)
+    batch_metrics = [{"loss": i, "name": "x"} for i in range(6)]
+    metrics = {"batch_metrics": batch_metrics, "avg_metrics": {"loss": 2.5, "custom": 7}}
+    writer.on_train_step_end(1, 6, 0, metrics)
+    assert recorder.scalars == [
+        ("Determined/loss", 1.5, 3),
+        ("Determined/loss_min", 0.0, 3),
+        ("Determined/loss_max", 3.0, 3),
+        ("Determined/loss", 4.5, 5),
+        ("Determined/loss_min", 4.0, 5),
+        ("Determined/loss_max", 5.0, 5),
+        ("Determined/custom", 7.0, 6),
+    ]
+
+
+def test_invalid_batch_metrics_mode() -> None:
+    with pytest.raises(ValueError):
+        tensorboard.BatchMetricWriter(RecordingWriter(), "sometimes", 2)
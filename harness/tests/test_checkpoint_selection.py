@@ -0,0 +1,113 @@
+import pathlib
+from typing import Any, Dict, List
+
+import pytest
+import requests_mock
+from _pytest.monkeypatch import MonkeyPatch
+
+from determined.experimental import ExperimentReference, TrialReference
+from determined_common.experimental import selection
+
+MASTER = "http://master:8080"
+
+
+def _checkpoint(uuid: str, trial_id: int, metrics: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "uuid": uuid,
+        "experimentConfig": {"searcher": {"metric": "loss", "smaller_is_better": True}},
+        "experimentId": 1,
+        "trialId": trial_id,
+        "hparams": {},
+        "batchNumber": 100,
+        "resources": {},
+        "metrics": {"validationMetrics": metrics},
+        "metadata": {},
+    }
+
+
+def _serve(checkpoints: List[Dict[str, Any]]) -> Any:
+    def _page(request: Any, context: Any) -> Dict[str, Any]:
+        offset = int(request.qs.get("offset", ["0"])[0])
+        limit = int(request.qs["limit"][0])
+        return {
+            "checkpoints": checkpoints[offset : offset + limit],
+            "pagination": {"total": len(checkpoints)},
+        }
+
+    return _page
+
+
+def _serve_by_uuid(requests_mock: requests_mock.Mocker, checkpoints: List[Dict[str, Any]]) -> None:
+    for ckpt in checkpoints:
+        requests_mock.get("/api/v1/checkpoints/{}".format(ckpt["uuid"]), json={"checkpoint": ckpt})
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path: pathlib.Path, monkeypatch: MonkeyPatch) -> pathlib.Path:
+    monkeypatch.setenv("DET_METRICS_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr("determined_common.api.request.add_token_to_headers", lambda h: h)
+    return tmp_path
+
+
+def test_top_k_rows() -> None:
+    table = selection.checkpoints_to_table(
+        [
+            _checkpoint("a", 1, {"loss": 0.5}),
+            _checkpoint("b", 1, {"loss": 0.1}),
+            _checkpoint("c", 2, {"loss": 0.3}),
+            _checkpoint("d", 3, {"loss": 0.3}),
+            _checkpoint("e", 4, {"accuracy": 0.9}),
+            _checkpoint("f", 5, {"loss": "n/a"}),
+        ]
+    )
+
+    assert selection.top_k_rows(table, "loss", True, 10) == [1, 2, 3]
+    assert selection.top_k_rows(table, "loss", False, 3) == [0, 3, 2]
+    assert selection.top_k_rows(table, "loss", True, 2, distinct_trials=False) == [1, 2]
+    assert selection.top_k_rows(table, "accuracy", True, 10) == [4]
+    assert selection.top_k_rows(table, "missing", True, 10) == []
+
+
+def test_top_n_checkpoints_refreshes_cache(requests_mock: requests_mock.Mocker) -> None:
+    checkpoints = [
+        _checkpoint("a", 1, {"loss": 0.5}),
+        _checkpoint("b", 2, {"loss": 0.4}),
+        _checkpoint("c", 2, {"loss": 0.3}),
+    ]
+    _serve_by_uuid(requests_mock, checkpoints + [_checkpoint("d", 3, {"loss": 0.1})])
+    requests_mock.get("/api/v1/experiments/1/checkpoints", json=_serve(checkpoints))
+
+    experiment = ExperimentReference(1, MASTER)
+    assert [c.uuid for c in experiment.top_n_checkpoints(2)] == ["c", "a"]
+
+    # A refresh only fetches the last cached checkpoint and the ones after it.
+    checkpoints.append(_checkpoint("d", 3, {"loss": 0.1}))
+    requests_mock.reset_mock()
+    assert [c.uuid for c in experiment.top_n_checkpoints(2)] == ["d", "c"]
+    pages = [r for r in requests_mock.request_history if r.path.endswith("/checkpoints")]
+    assert [r.qs["offset"] for r in pages] == [["2"]]
+
+    # When a cached checkpoint was deleted, the table is rebuilt.
+    del checkpoints[2]
+    assert [c.uuid for c in experiment.top_n_checkpoints(2)] == ["d", "b"]
+
+    assert [c.uuid for c in experiment.top_n_checkpoints(5, "loss", False, use_cache=False)] == [
+        "a",
+        "b",
+        "d",
+    ]
+
+
+def test_select_checkpoint(requests_mock: requests_mock.Mocker) -> None:
+    checkpoints = [
+        _checkpoint("b", 1, {"loss": 0.2}),
+        _checkpoint("a", 1, {"loss": 0.3}),
+        {**_checkpoint("c", 1, {}), "metrics": None},
+    ]
+    _serve_by_uuid(requests_mock, checkpoints)
+    requests_mock.get("/api/v1/trials/1/checkpoints", json=_serve(checkpoints))
+
+    trial = TrialReference(1, MASTER)
+    assert trial.select_checkpoint(latest=True).uuid == "b"
+    assert trial.select_checkpoint(best=True).uuid == "b"
+    assert trial.select_checkpoint(best=True, sort_by="loss", smaller_is_better=False).uuid == "a"
@@ -6,7 +6,7 @@ import pytest
 import simplejson
 
 from determined import util
-from determined.exec.gc_checkpoints import delete_checkpoints
+from determined.exec.gc_checkpoints import CheckpointGCError, delete_checkpoints, read_manifest
 from determined_common import storage
 from tests.storage import util as storage_util
 
@@ -38,3 +38,31 @@ def test_delete_checkpoints(
 def test_dry_run(manager: storage.StorageManager, to_delete: List[Dict[str, Any]]) -> None:
     delete_checkpoints(manager, to_delete, dry_run=True)
     assert len(os.listdir(manager._base_path)) == len(to_delete)
+
+
+def test_manifest_resume(
+    tmp_path: Path, manager: storage.StorageManager, to_delete: List[Dict[str, Any]]
+) -> None:
+    manifest = str(tmp_path.joinpath("manifest.jsonl"))
+
+    delete_checkpoints(manager, to_delete, dry_run=True, manifest_path=manifest)
+    assert read_manifest(manifest) == set()
+
+    # Delete only the first checkpoint, as if the GC job was interrupted.
+    delete_checkpoints(manager, to_delete[:1], dry_run=False, manifest_path=manifest)
+    assert read_manifest(manifest) == {r["uuid"] for r in to_delete[:1]}
+
+    # Resuming must skip the checkpoint that is already gone rather than failing on it.
+    delete_checkpoints(manager, to_delete, dry_run=False, manifest_path=manifest)
+    assert read_manifest(manifest) == {r["uuid"] for r in to_delete}
+    assert os.listdir(manager._base_path) == ["manifest.jsonl"]
+
+
+def test_failures_are_reported(
+    manager: storage.StorageManager, to_delete: List[Dict[str, Any]]
+) -> None:
+    missing = {"uuid": "does-not-exist", "resources": {}}
+    with pytest.raises(CheckpointGCError) as e:
+        delete_checkpoints(manager, [missing] + to_delete, dry_run=False, max_workers=2)
+    assert set(e.value.failed) == {"does-not-exist"}
+    assert len(os.listdir(manager._base_path)) == 0
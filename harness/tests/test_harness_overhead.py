@@ -0,0 +1,25 @@
+from tests.benchmarks import harness_overhead
+
+
+def test_pipeline_benchmark() -> None:
+    result = harness_overhead.run_pipeline_benchmark(batches_per_workload=4, num_metrics=3, steps=3)
+    assert result["steps"] == 3
+    for layer in ("socket", "encode", "workload_manager", "total"):
+        assert result["layer_overhead_seconds"][layer]["p50"] is not None
+    assert result["controller_seconds"]["p50"] > 0
+
+
+def test_broadcast_benchmark() -> None:
+    result = harness_overhead.run_broadcast_benchmark(
+        num_workers=2, batches_per_workload=4, num_metrics=3, steps=3
+    )
+    assert result["num_workers"] == 2
+    assert result["broadcast_gather_seconds"]["p50"] > 0
+
+
+def test_pipeline_benchmark_compressed_metrics() -> None:
+    result = harness_overhead.run_pipeline_benchmark(
+        batches_per_workload=4, num_metrics=3, steps=3, encoding="columnar+zlib"
+    )
+    assert result["steps"] == 3
+    assert result["encoding"] == "columnar+zlib"
@@ -0,0 +1,104 @@
+import sys
+from pathlib import Path
+from typing import Iterator, Optional
+
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+
+import determined as det
+from determined import load
+
+TRIAL_CODE = """
+import determined as det
+import {helper}
+
+class MyTrial(det.Trial):
+    tag = {helper}.TAG
+"""
+
+
+def _write_code(code_dir: Path, tag: str, helper: Optional[str] = None) -> None:
+    helper = helper or "helper_{}".format(tag)
+    code_dir.mkdir(exist_ok=True)
+    code_dir.joinpath("model_def.py").write_text(TRIAL_CODE.format(helper=helper))
+    code_dir.joinpath("{}.py".format(helper)).write_text("TAG = {!r}\n".format(tag))
+
+
+@pytest.fixture
+def clean_modules() -> Iterator[None]:
+    modules = set(sys.modules)
+    load.clear_trial_cache()
+    yield
+    load.clear_trial_cache()
+    for name in set(sys.modules) - modules:
+        sys.modules.pop(name)
+
+
+def _load(code_dir: Path, cache: bool) -> type:
+    with det._local_execution_manager(code_dir):
+        return load.load_trial_implementation("model_def:MyTrial", cache=cache)
+
+
+def test_load_trial_implementation_cache(tmp_path: Path, clean_modules: None) -> None:
+    first, copy, second = (
+        tmp_path.joinpath("first"),
+        tmp_path.joinpath("copy"),
+        tmp_path.joinpath("second"),
+    )
+    _write_code(first, "a")
+    _write_code(copy, "a")
+    _write_code(second, "b")
+
+    trial_a = _load(first, cache=True)
+    assert trial_a.tag == "a"  # type: ignore
+    assert _load(first, cache=False) is not trial_a
+
+    # The same code in another directory is not imported again.
+    trial_b = _load(second, cache=True)
+    assert trial_b.tag == "b"  # type: ignore
+    assert _load(copy, cache=True) is trial_a
+    assert getattr(sys.modules["model_def"], "MyTrial") is trial_a
+
+    # Changing the code invalidates the cache.
+    first.joinpath("helper_a.py").write_text("TAG = 'changed'\n")
+    assert load.hash_code_dir(first) != load.hash_code_dir(copy)
+    assert _load(first, cache=True) is not trial_a
+
+
+def test_load_trial_implementation_cache_same_helper_names(
+    tmp_path: Path, clean_modules: None
+) -> None:
+    first, second = tmp_path.joinpath("first"), tmp_path.joinpath("second")
+    _write_code(first, "a", helper="data")
+    _write_code(second, "b", helper="data")
+
+    trial_a = _load(first, cache=True)
+    assert trial_a.tag == "a"  # type: ignore
+
+    # The helper of the first directory does not shadow the helper of the second one.
+    trial_b = _load(second, cache=True)
+    assert trial_b.tag == "b"  # type: ignore
+    assert getattr(sys.modules["data"], "TAG") == "b"
+
+    assert _load(first, cache=True) is trial_a
+    assert getattr(sys.modules["data"], "TAG") == "a"
+
+
+def test_profile_imports(tmp_path: Path, clean_modules: None, monkeypatch: MonkeyPatch) -> None:
+    tmp_path.joinpath("outer_mod.py").write_text("import inner_mod\nimport sys\n")
+    tmp_path.joinpath("inner_mod.py").write_text("import time\ntime.sleep(0.05)\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    with load.profile_imports() as profile:
+        __import__("outer_mod")
+        # Modules that are already loaded are not timed.
+        __import__("inner_mod")
+
+    times = {i.module: i for i in profile.imports}
+    assert set(times) == {"outer_mod", "inner_mod"}
+    assert times["outer_mod"].depth == 0 and times["inner_mod"].depth == 1
+    assert times["inner_mod"].self_seconds >= 0.05
+    assert times["outer_mod"].seconds >= times["inner_mod"].seconds
+    assert times["outer_mod"].self_seconds < times["inner_mod"].self_seconds
+    assert profile.total_seconds == times["outer_mod"].seconds
+    assert "outer_mod" in profile.report(1) and "inner_mod" not in profile.report(1)
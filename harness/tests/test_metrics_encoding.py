@@ -0,0 +1,79 @@
+import math
+import zlib
+
+import numpy as np
+import pytest
+import simplejson
+from _pytest.monkeypatch import MonkeyPatch
+
+from determined import util
+from determined.layers import _metrics_encoding
+
+
+def _message(batch_metrics: list) -> dict:
+    return {
+        "type": "WORKLOAD_COMPLETED",
+        "workload": {"kind": "RUN_STEP", "step_id": 1},
+        "start_time": "2020-01-01T00:00:00Z",
+        "end_time": "2020-01-01T00:00:01Z",
+        "metrics": {"batch_metrics": batch_metrics, "avg_metrics": {"loss": 0.5}},
+    }
+
+
+def test_choose_encoding(monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.delenv("DET_METRICS_ENCODING", raising=False)
+    assert _metrics_encoding.choose_encoding(None) == "json"
+    assert _metrics_encoding.choose_encoding(["columnar"]) == "columnar"
+    assert _metrics_encoding.choose_encoding(["columnar", "columnar+zlib"]) == "columnar+zlib"
+    assert _metrics_encoding.choose_encoding(["some-future-encoding"]) == "json"
+
+    assert _metrics_encoding.choose_encoding(["columnar+zlib"], "json") == "json"
+    assert _metrics_encoding.choose_encoding(["columnar"], "columnar+zlib") == "json"
+
+    monkeypatch.setenv("DET_METRICS_ENCODING", "columnar")
+    assert _metrics_encoding.choose_encoding(["columnar", "columnar+zlib"]) == "columnar"
+
+    with pytest.raises(ValueError):
+        _metrics_encoding.choose_encoding(["columnar"], "msgpack")
+
+
+@pytest.mark.parametrize("encoding", _metrics_encoding.ENCODINGS)  # type: ignore
+def test_round_trip(encoding: str) -> None:
+    batch_metrics = [
+        {"loss": np.float32(i / 4), "count": np.int64(i), "label": f"batch-{i}", "nan": math.nan}
+        for i in range(10)
+    ]
+    msg = _message(batch_metrics)
+    payload = _metrics_encoding.encode(msg, encoding)
+    assert isinstance(payload, bytes) == (encoding == "columnar+zlib")
+
+    # Every encoding decodes to exactly what the original JSON encoding produces.
+    assert _metrics_encoding.decode(payload) == simplejson.loads(util.json_encode(msg))
+
+
+def test_columnar_is_smaller() -> None:
+    batch_metrics = [{f"metric_{j}": np.float64(i * j) for j in range(10)} for i in range(100)]
+    msg = _message(batch_metrics)
+    json_payload = _metrics_encoding.encode(msg, "json")
+    columnar_payload = _metrics_encoding.encode(msg, "columnar")
+    zlib_payload = _metrics_encoding.encode(msg, "columnar+zlib")
+    assert len(columnar_payload) < len(json_payload)
+    assert len(zlib_payload) < len(columnar_payload)
+    assert isinstance(zlib_payload, bytes)
+    assert zlib.decompress(zlib_payload).decode("utf-8") == columnar_payload
+
+
+def test_mismatched_batches_fall_back_to_json() -> None:
+    msg = _message([{"loss": 1.0}, {"loss": 2.0, "accuracy": 0.5}])
+    payload = _metrics_encoding.encode(msg, "columnar")
+    assert simplejson.loads(payload)["metrics"]["batch_metrics"] == [
+        {"loss": 1.0},
+        {"loss": 2.0, "accuracy": 0.5},
+    ]
+    assert _metrics_encoding.decode(payload) == simplejson.loads(util.json_encode(msg))
+
+
+def test_messages_without_batch_metrics() -> None:
+    msg = {"type": "WORKLOAD_COMPLETED", "metrics": {"validation_metrics": {"loss": 0.1}}}
+    for encoding in _metrics_encoding.ENCODINGS:
+        assert _metrics_encoding.decode(_metrics_encoding.encode(msg, encoding)) == msg
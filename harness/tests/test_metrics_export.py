@@ -0,0 +1,99 @@
+import pathlib
+from typing import Any, Dict, List
+
+import numpy as np
+import pytest
+import requests_mock
+from _pytest.monkeypatch import MonkeyPatch
+
+from determined.experimental import ExperimentReference, TrialReference
+
+MASTER = "http://master:8080"
+
+
+def _validation(prior_batches: int, metrics: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "validation": {
+            "state": "STATE_COMPLETED",
+            "numBatches": 100,
+            "priorBatchesProcessed": prior_batches,
+            "metrics": metrics,
+        }
+    }
+
+
+def _trial_response(trial_id: int, state: str, workloads: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {"trial": {"id": trial_id, "state": state}, "workloads": workloads}
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path: pathlib.Path, monkeypatch: MonkeyPatch) -> pathlib.Path:
+    monkeypatch.setenv("DET_METRICS_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr("determined_common.api.request.add_token_to_headers", lambda h: h)
+    return tmp_path
+
+
+def test_export_experiment_metrics(
+    requests_mock: requests_mock.Mocker, tmp_path: pathlib.Path
+) -> None:
+    requests_mock.get(
+        "/api/v1/experiments/1/trials",
+        [
+            {"json": {"trials": [{"id": 1}], "pagination": {"total": 2}}},
+            {"json": {"trials": [{"id": 2}], "pagination": {"total": 2}}},
+        ],
+    )
+    requests_mock.get(
+        "/api/v1/trials/1",
+        json=_trial_response(
+            1,
+            "STATE_COMPLETED",
+            [
+                {"training": {"state": "STATE_COMPLETED", "numBatches": 100, "metrics": {}}},
+                _validation(0, {"loss": 0.5, "accuracy": 0.1}),
+                _validation(100, {"loss": 0.25, "accuracy": 0.2}),
+            ],
+        ),
+    )
+    requests_mock.get(
+        "/api/v1/trials/2",
+        json=_trial_response(2, "STATE_COMPLETED", [_validation(0, {"loss": 1.0, "f1": "n/a"})]),
+    )
+
+    path = str(tmp_path.joinpath("metrics.npz"))
+    batch = ExperimentReference(1, MASTER).export_metrics(path=path, page_size=1)
+
+    assert sorted(batch) == ["accuracy", "batches", "f1", "loss", "trial_id"]
+    assert batch["trial_id"].tolist() == [1, 1, 2]
+    assert batch["batches"].tolist() == [100, 200, 100]
+    assert batch["loss"].tolist() == [0.5, 0.25, 1.0]
+    assert np.isnan(batch["accuracy"][2])
+    assert np.isnan(batch["f1"]).all()
+
+    with np.load(path) as saved:
+        assert saved["loss"].tolist() == [0.5, 0.25, 1.0]
+
+
+def test_metrics_cache(requests_mock: requests_mock.Mocker) -> None:
+    trial = TrialReference(1, MASTER)
+    m = requests_mock.get(
+        "/api/v1/trials/1", json=_trial_response(1, "STATE_ACTIVE", [_validation(0, {"loss": 1})])
+    )
+    assert trial.export_metrics()["loss"].tolist() == [1.0]
+
+    # A running trial is fetched again, and only its new workloads are appended.
+    m = requests_mock.get(
+        "/api/v1/trials/1",
+        json=_trial_response(
+            1, "STATE_COMPLETED", [_validation(0, {"loss": 99}), _validation(100, {"loss": 2})]
+        ),
+    )
+    assert trial.export_metrics()["loss"].tolist() == [1.0, 2.0]
+    assert m.call_count == 1
+
+    # A finished trial is served from the cache.
+    assert trial.export_metrics()["batches"].tolist() == [100, 200]
+    assert m.call_count == 1
+
+    assert trial.export_metrics(use_cache=False)["loss"].tolist() == [99.0, 2.0]
+    assert m.call_count == 2
@@ -0,0 +1,91 @@
+import pickle
+from typing import Any, Dict, List
+
+import pytest
+import requests_mock
+from _pytest.monkeypatch import MonkeyPatch
+
+from determined.experimental import Checkpoint, Determined, Model
+
+MASTER = "http://master:8080"
+
+
+def _version(version: int) -> Dict[str, Any]:
+    return {
+        "version": version,
+        "checkpoint": {
+            "uuid": "uuid-{}".format(version),
+            "experimentConfig": {"searcher": {"metric": "loss"}},
+            "experimentId": 1,
+            "trialId": version,
+            "hparams": {"lr": 0.1},
+            "batchNumber": 100 * version,
+            "resources": {"model.pt": 1024},
+            "metrics": {"validationMetrics": {"loss": 0.5}},
+            "metadata": {},
+        },
+    }
+
+
+def _serve(key: str, items: List[Any], **extra: Any) -> Any:
+    def _page(request: Any, context: Any) -> Dict[str, Any]:
+        offset = int(request.qs["offset"][0])
+        limit = int(request.qs["limit"][0])
+        return dict(
+            extra, **{key: items[offset : offset + limit], "pagination": {"total": len(items)}}
+        )
+
+    return _page
+
+
+@pytest.fixture(autouse=True)
+def no_auth(monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.setattr("determined_common.api.request.add_token_to_headers", lambda h: h)
+    monkeypatch.setattr(
+        "determined_common.api.authentication.initialize_session", lambda *a, **k: None
+    )
+
+
+def test_checkpoint_from_json() -> None:
+    ckpt = Checkpoint.from_json(_version(1)["checkpoint"], MASTER, model_version=1)
+
+    assert not hasattr(ckpt, "__dict__")
+    assert ckpt.experiment_config == {"searcher": {"metric": "loss"}}
+    assert ckpt.validation == {"metrics": {"validationMetrics": {"loss": 0.5}}, "state": None}
+    assert ckpt.model_version == 1
+
+    ckpt.metadata["key"] = "value"
+    assert ckpt.metadata == {"key": "value"}
+
+    restored = pickle.loads(pickle.dumps(ckpt))
+    assert restored.hparams == {"lr": 0.1}
+    assert restored.metadata == {"key": "value"}
+    assert restored.model_version == 1
+
+
+def test_iter_versions(requests_mock: requests_mock.Mocker) -> None:
+    versions = [_version(v) for v in range(5, 0, -1)]
+    requests_mock.get(
+        "/api/v1/models/mnist/versions/",
+        json=_serve("modelVersions", versions, model={"name": "mnist"}),
+    )
+
+    model = Model.from_json({"name": "mnist", "metadata": {"a": 1}}, MASTER)
+    assert model.metadata == {"a": 1}
+
+    ckpts = list(model.iter_versions(page_size=2))
+    assert [(c.model_name, c.model_version, c.uuid) for c in ckpts] == [
+        ("mnist", v, "uuid-{}".format(v)) for v in range(5, 0, -1)
+    ]
+    assert [r.qs["offset"] for r in requests_mock.request_history] == [["0"], ["2"], ["4"]]
+
+    assert [c.uuid for c in model.get_versions()] == [c.uuid for c in ckpts]
+
+
+def test_iter_models(requests_mock: requests_mock.Mocker) -> None:
+    models = [{"name": "model-{}".format(i), "description": ""} for i in range(3)]
+    requests_mock.get("/api/v1/models/", json=_serve("models", models))
+
+    d = Determined(MASTER)
+    assert [m.name for m in d.iter_models(page_size=2)] == ["model-0", "model-1", "model-2"]
+    assert [m.name for m in d.get_models()] == ["model-0", "model-1", "model-2"]
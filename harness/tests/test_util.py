@@ -1,3 +1,9 @@
+import shutil
+from pathlib import Path
+
+from _pytest.monkeypatch import MonkeyPatch
+
+from determined import util
 from determined.util import _dict_to_list, _list_to_dict
 from determined_common.util import sizeof_fmt
 
@@ -15,3 +21,39 @@ def test_dict_to_list() -> None:
 def test_sizeof_fmt() -> None:
     assert sizeof_fmt(1024) == "1.0KB"
     assert sizeof_fmt(36) == "36.0B"
+
+
+def test_write_user_code(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    code = tmp_path.joinpath("code")
+    code.mkdir()
+    code.joinpath("model_def.py").write_text("v1")
+    code.joinpath("__pycache__").mkdir()
+    monkeypatch.chdir(code)
+    monkeypatch.setattr(util, "_user_code_snapshot", util._UserCodeSnapshot())
+
+    first, second = tmp_path.joinpath("first"), tmp_path.joinpath("second")
+    first.mkdir()
+    second.mkdir()
+    util.write_user_code(first)
+
+    # The code is snapshotted once per trial.
+    code.joinpath("model_def.py").write_text("v2")
+    util.write_user_code(second)
+
+    for checkpoint in (first, second):
+        assert checkpoint.joinpath("code", "model_def.py").read_text() == "v1"
+        assert not checkpoint.joinpath("code", "__pycache__").exists()
+
+    # Deleting checkpoints does not affect the others.
+    shutil.rmtree(str(first))
+    assert second.joinpath("code", "model_def.py").read_text() == "v1"
+    shutil.rmtree(str(second))
+    third = tmp_path.joinpath("third")
+    third.mkdir()
+    util.write_user_code(third)
+    assert third.joinpath("code", "model_def.py").read_text() == "v1"
+
+    # The copy of the code is deleted when the trial is done.
+    snapshot = util._user_code_snapshot._take_snapshot()
+    util.close_user_code_snapshot()
+    assert not snapshot.exists()
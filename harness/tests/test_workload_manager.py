@@ -30,6 +30,9 @@ class NoopBatchMetricWriter(tensorboard.BatchMetricWriter):
     def on_validation_step_end(self, *_: Any, **__: Any) -> None:
         pass
 
+    def flush(self) -> None:
+        pass
+
 
 class NoopStorageManager(storage.StorageManager):
     @contextlib.contextmanager